@@ -0,0 +1,22 @@
+# KeepaTracker package - the Keepa engine shared by the proxy and the standalone server
+from .keepa_tracker import (
+    KeepaClientV2, PriceDrop, ProductAnalysis, TrackedProduct,
+    KEEPA_API_KEY, DISCORD_WEBHOOK_URL,
+    configure_engine, get_alert_sink, get_scheduler, get_deal_cache,
+    get_client, set_client, get_or_create_client, get_deduplicator,
+    start_deals_monitor, stop_monitor, handle_keepa_webhook,
+    send_discord_alert, send_brand_opportunity_alert, send_smart_deal_alert,
+)
+from .keepa_alerts import AlertSink, DiscordWebhookSink, LogAlertSink, CallbackAlertSink
+from .keepa_store import AlertDeduplicator, DealPageCache, MonitorLease, get_state_store
+
+__all__ = [
+    'KeepaClientV2', 'PriceDrop', 'ProductAnalysis', 'TrackedProduct',
+    'KEEPA_API_KEY', 'DISCORD_WEBHOOK_URL',
+    'configure_engine', 'get_alert_sink', 'get_scheduler', 'get_deal_cache',
+    'get_client', 'set_client', 'get_or_create_client', 'get_deduplicator',
+    'start_deals_monitor', 'stop_monitor', 'handle_keepa_webhook',
+    'send_discord_alert', 'send_brand_opportunity_alert', 'send_smart_deal_alert',
+    'AlertSink', 'DiscordWebhookSink', 'LogAlertSink', 'CallbackAlertSink',
+    'AlertDeduplicator', 'DealPageCache', 'MonitorLease', 'get_state_store',
+]
@@ -6,13 +6,17 @@ import asyncio
 import aiohttp
 import sys
 import os
-import json
-from datetime import datetime, timedelta
+from datetime import datetime
+from pathlib import Path
 from dotenv import load_dotenv
 
 sys.stdout.reconfigure(encoding='utf-8')
 load_dotenv()
 
+# Alerted ASINs are shared with the KeepaTracker engine (utils/alert_store.py)
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from KeepaTracker.keepa_store import get_keepa_alerts, import_legacy_alerts
+
 KEEPA_API_KEY = os.getenv("KEEPA_API_KEY")
 DISCORD_WEBHOOK_URL = os.getenv("DISCORD_WEBHOOK_URL")
 
@@ -20,37 +24,24 @@ DISCORD_WEBHOOK_URL = os.getenv("DISCORD_WEBHOOK_URL")
 CHECK_INTERVAL_MINUTES = 5
 MIN_DROP_PERCENT = 40
 MIN_MONTHLY_SOLD = 50      # Lowered from 100
-ALERT_COOLDOWN_HOURS = 24  # Don't re-alert same ASIN within this window
+ALERT_COOLDOWN_HOURS = 24  # Don't re-alert same ASIN within this window (keepa_store)
 
-# Track alerted ASINs to avoid duplicates
+# Track alerted ASINs to avoid duplicates (legacy file, imported once)
 ALERTED_FILE = "alerted_asins.json"
 
 def load_alerted_asins():
-    """Load previously alerted ASINs"""
-    if os.path.exists(ALERTED_FILE):
-        try:
-            with open(ALERTED_FILE, 'r') as f:
-                data = json.load(f)
-                # Clean up old entries
-                cutoff = datetime.now() - timedelta(hours=ALERT_COOLDOWN_HOURS)
-                return {k: v for k, v in data.items()
-                        if datetime.fromisoformat(v) > cutoff}
-        except:
-            return {}
-    return {}
+    """Alerted ASINs shared with the KeepaTracker engine"""
+    alerted = get_keepa_alerts()
+    import_legacy_alerts(alerted, ALERTED_FILE)
+    return alerted
 
 def save_alerted_asins(alerted):
-    """Save alerted ASINs"""
-    with open(ALERTED_FILE, 'w') as f:
-        json.dump(alerted, f)
+    """Write this check's alerted ASINs in one batch"""
+    alerted.flush()
 
 def was_recently_alerted(asin, alerted):
     """Check if ASIN was alerted recently"""
-    if asin in alerted:
-        alert_time = datetime.fromisoformat(alerted[asin])
-        if datetime.now() - alert_time < timedelta(hours=ALERT_COOLDOWN_HOURS):
-            return True
-    return False
+    return alerted.is_recent(asin)
 
 async def get_deals():
     """Fetch deals from Keepa"""
@@ -269,7 +260,7 @@ async def check_for_deals():
         success = await send_discord_alert(deal, product, graph, drop_pct, monthly_sold)
 
         if success:
-            alerted[asin] = datetime.now().isoformat()
+            alerted.mark(asin)
             new_alerts += 1
             print(f"  ✓ ALERT: {deal.get('title', '')[:50]}... ({drop_pct}% drop, {monthly_sold}+ sales/mo)")
 
@@ -0,0 +1,95 @@
+"""
+Keepa Alert Sinks - where the engine delivers alerts
+
+send_discord_alert / send_brand_opportunity_alert / send_smart_deal_alert
+build a Discord-style payload, check deduplication and hand the payload to
+the configured sink; the ASIN is only marked alerted when the sink reports
+success. The embedded proxy and the standalone server can therefore share
+one engine and still deliver alerts differently.
+
+- DiscordWebhookSink: POST to a webhook (multipart when there is an image)
+- LogAlertSink: log the embed title only (dry runs)
+- CallbackAlertSink: hand the payload to any async callable
+
+Usage:
+    configure_engine(alert_sink=CallbackAlertSink(my_handler))
+"""
+
+import io
+import json
+import logging
+from contextlib import asynccontextmanager
+from typing import Awaitable, Callable, Dict, Optional
+
+import httpx
+
+logger = logging.getLogger("keepa_alerts")
+
+GRAPH_FILENAME = "keepa_graph.png"
+
+
+@asynccontextmanager
+async def default_session(name: str = "default", timeout: Optional[float] = None):
+    """Throwaway httpx client; main.py swaps in the pooled http_clients.session"""
+    async with httpx.AsyncClient(**({"timeout": timeout} if timeout is not None else {})) as client:
+        yield client
+
+
+class AlertSink:
+    """Delivers one alert payload; returns True when it was accepted"""
+
+    name = "sink"
+
+    async def send(self, asin: str, payload: Dict, attachment: Optional[bytes] = None) -> bool:
+        raise NotImplementedError
+
+
+class DiscordWebhookSink(AlertSink):
+    """Discord webhook delivery (JSON, or multipart with a graph attachment)"""
+
+    name = "discord"
+
+    def __init__(self, url: str, session: Callable = None):
+        self.url = url
+        self.session = session or default_session
+
+    async def send(self, asin: str, payload: Dict, attachment: Optional[bytes] = None) -> bool:
+        try:
+            async with self.session("discord") as client:
+                if attachment:
+                    files = {"file": (GRAPH_FILENAME, io.BytesIO(attachment), "image/png")}
+                    data = {"payload_json": json.dumps(payload)}
+                    response = await client.post(self.url, data=data, files=files, timeout=15.0)
+                else:
+                    response = await client.post(self.url, json=payload, timeout=10.0)
+                return response.status_code in (200, 204)
+        except Exception as e:
+            logger.error(f"[KEEPA] Discord error: {e}")
+            return False
+
+
+class LogAlertSink(AlertSink):
+    """Log alerts instead of delivering them"""
+
+    name = "log"
+
+    async def send(self, asin: str, payload: Dict, attachment: Optional[bytes] = None) -> bool:
+        title = (payload.get("embeds") or [{}])[0].get("title", "")
+        logger.info(f"[KEEPA] Alert for {asin}: {title}")
+        return True
+
+
+class CallbackAlertSink(AlertSink):
+    """Hand alerts to an async callable(asin, payload, attachment) -> bool"""
+
+    name = "callback"
+
+    def __init__(self, callback: Callable[[str, Dict, Optional[bytes]], Awaitable[bool]]):
+        self.callback = callback
+
+    async def send(self, asin: str, payload: Dict, attachment: Optional[bytes] = None) -> bool:
+        try:
+            return bool(await self.callback(asin, payload, attachment))
+        except Exception as e:
+            logger.error(f"[KEEPA] Alert callback error: {e}")
+            return False
@@ -0,0 +1,340 @@
+"""
+Keepa Analytics - vectorized flip-score inputs for many products at once
+
+ProductAnalysis used to walk each product's stats and interleaved
+[time, value, time, value, ...] histories in Python, and every PriceDrop
+re-derived its fee table per property access. analyze_and_filter_deals
+scores hundreds of deals per cycle, so the work is done here in one pass:
+
+- every product's csv series is stacked into one (points, 2) array with an
+  owner row per point (the histories are decoded from Keepa lists once,
+  by the product cache)
+- rank drops, new-price volatility and Amazon's buy-box share are segment
+  reductions (np.bincount over owner rows) over those arrays
+- stats fields (averages, min/max, current prices) become columns, so
+  stability, anomaly and monthly-sales estimates are array expressions
+- fees for a list of PriceDrops are computed from one price array
+
+Usage:
+    metrics = KeepaMetrics.from_products(entries, keepa_now())
+    analysis.calculate_flip_score(metrics=metrics, row=i)
+    profits = profit_potentials(deals)
+
+benchmark_keepa_analytics.py checks parity against the per-product loops
+and times both.
+"""
+
+from bisect import bisect_right
+from dataclasses import dataclass
+from typing import Any, Dict, List, Sequence
+
+import numpy as np
+
+AMAZON_SELLER_ID = "ATVPDKIKX0DER"
+
+MINUTES_PER_DAY = 1440
+RANK_DROP_DAYS = 30
+VOLATILITY_DAYS = 90
+BUY_BOX_DAYS = 90
+
+# Amazon referral fees by product category (2024 rates)
+REFERRAL_RATES = {
+    'shoes': 0.15,        # 15% footwear
+    'clothing': 0.17,     # 17% apparel
+    'toys': 0.15,         # 15% toys
+    'electronics': 0.08,  # 8% consumer electronics
+    'video_games': 0.15,  # 15% video games
+    'home': 0.15,         # 15% home & kitchen
+    'sports': 0.15,       # 15% sports
+    'beauty': 0.15,       # 8-15% beauty (using 15% as conservative)
+    'grocery': 0.15,      # 8-15% grocery
+    'general': 0.15,      # Default 15%
+}
+MIN_REFERRAL_FEE = 0.30
+
+# FBA fulfillment fee by sell price (proxy for size tier):
+# <$20 small standard, <$50 / <$100 / above: large standard small / medium / large
+FBA_FEE_PRICE_BREAKS = (20, 50, 100)
+FBA_FEES = (3.22, 4.75, 5.40, 6.50)
+INBOUND_FEE = 0.27  # Inbound placement (~$0.27 avg per unit)
+
+# ProductAnalysis fields filled from a KeepaMetrics row
+ANALYSIS_FIELDS = (
+    "avg_price_90d", "avg_price_180d", "historical_low", "historical_high",
+    "price_stability_score", "price_is_anomaly", "price_volatility_90d",
+    "sales_rank_current", "sales_rank_avg_90d", "estimated_monthly_sales", "sales_rank_drops_30d",
+    "fba_seller_count", "fbm_seller_count", "amazon_on_listing", "buy_box_price", "buy_box_amazon_share",
+)
+
+
+# ============================================================
+# FEES
+# ============================================================
+
+def fee_breakdown(sell_price: float, category: str = "general") -> Dict[str, float]:
+    """Referral / FBA / inbound fees for one sale (unrounded)"""
+    rate = REFERRAL_RATES.get(category, REFERRAL_RATES['general'])
+    referral_fee = max(sell_price * rate, MIN_REFERRAL_FEE)
+    fba_fee = FBA_FEES[bisect_right(FBA_FEE_PRICE_BREAKS, sell_price)]
+    return {
+        'referral_fee': referral_fee,
+        'fba_fee': fba_fee,
+        'inbound_fee': INBOUND_FEE,
+        'total_fees': referral_fee + fba_fee + INBOUND_FEE,
+        'referral_rate': rate,
+    }
+
+
+def batch_fees(sell_prices: Sequence[float], categories: Sequence[str]) -> Dict[str, np.ndarray]:
+    """fee_breakdown for many sales at once"""
+    sell = np.asarray(sell_prices, dtype=np.float64)
+    rate = np.array([REFERRAL_RATES.get(c, REFERRAL_RATES['general']) for c in categories], dtype=np.float64)
+    referral_fee = np.maximum(sell * rate, MIN_REFERRAL_FEE)
+    fba_fee = np.asarray(FBA_FEES)[np.searchsorted(FBA_FEE_PRICE_BREAKS, sell, side="right")]
+    return {
+        'referral_fee': referral_fee,
+        'fba_fee': fba_fee,
+        'inbound_fee': np.full(sell.shape, INBOUND_FEE),
+        'total_fees': referral_fee + fba_fee + INBOUND_FEE,
+        'referral_rate': rate,
+    }
+
+
+def profit_potentials(deals: Sequence) -> np.ndarray:
+    """PriceDrop.profit_potential for a list of deals (0 when the target is not above the buy price)"""
+    if not deals:
+        return np.zeros(0)
+    sell = np.array([d.target_price for d in deals], dtype=np.float64)
+    buy = np.array([d.current_price for d in deals], dtype=np.float64)
+    fees = batch_fees(sell, [d.product_category for d in deals])
+    return np.where(sell > buy, sell - buy - fees['total_fees'], 0.0)
+
+
+# ============================================================
+# HISTORY SEGMENTS
+# ============================================================
+
+def _stack_series(products: Sequence, csv_index: int) -> tuple:
+    """One csv series of every product as (times, values, owner row) arrays"""
+    series = [product.series(csv_index) for product in products]
+    lengths = np.array([len(s) for s in series], dtype=np.int64)
+    if not lengths.sum():
+        empty = np.zeros(0, dtype=np.int64)
+        return empty, empty, empty
+    points = np.concatenate([s[:, :2] for s in series if len(s)]).astype(np.int64)
+    owner = np.repeat(np.arange(len(series)), lengths)
+    return points[:, 0], points[:, 1], owner
+
+
+def _last_values(values: np.ndarray, owner: np.ndarray, rows: int, default: int = -1) -> np.ndarray:
+    """Last value per owner row (series are time ordered)"""
+    last = np.full(rows, default, dtype=np.int64)
+    if len(owner):
+        ends = np.flatnonzero(np.append(owner[1:] != owner[:-1], True))
+        last[owner[ends]] = values[ends]
+    return last
+
+
+def _rank_drops(times, values, owner, rows: int, since: int) -> np.ndarray:
+    """Rank improvements (each roughly a sale) per product since `since`"""
+    keep = (times >= since) & (values > 0)
+    ranks, rank_owner = values[keep], owner[keep]
+    dropped = (np.diff(ranks) < 0) & (rank_owner[1:] == rank_owner[:-1])
+    return np.bincount(rank_owner[1:][dropped], minlength=rows)
+
+
+def _volatility(times, values, owner, rows: int, since: int) -> np.ndarray:
+    """Coefficient of variation (std / mean) of the in-stock prices since `since`"""
+    keep = (times >= since) & (values > 0)
+    prices, price_owner = values[keep].astype(np.float64), owner[keep]
+    count = np.bincount(price_owner, minlength=rows)
+    total = np.bincount(price_owner, weights=prices, minlength=rows)
+    squares = np.bincount(price_owner, weights=prices * prices, minlength=rows)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        mean = total / count
+        std = np.sqrt(np.maximum(squares / count - mean * mean, 0.0))
+        cv = std / mean
+    return np.where(count > 1, cv, 0.0)
+
+
+def _time_share(times, flags, owner, rows: int, since: int, now: int) -> np.ndarray:
+    """Fraction of [since, now] each product spent with `flags` set (step function)"""
+    if not len(times):
+        return np.zeros(rows)
+    ends = np.append(times[1:], now)
+    ends[np.append(owner[1:] != owner[:-1], True)] = now
+    starts = np.clip(times, since, now)
+    duration = np.clip(ends, since, now) - starts
+    held = np.bincount(owner, weights=duration * flags, minlength=rows)
+    covered = np.bincount(owner, weights=duration, minlength=rows)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(covered > 0, held / covered, 0.0)
+
+
+def _buy_box_history(products: Sequence) -> tuple:
+    """buyBoxSellerIdHistory ([time, sellerId, ...] strings) as (times, is_amazon, owner) arrays"""
+    times, sellers, lengths = [], [], []
+    for product in products:
+        history = product.get("buyBoxSellerIdHistory") or []
+        pairs = len(history) // 2
+        times.extend(history[0:pairs * 2:2])
+        sellers.extend(history[1:pairs * 2:2])
+        lengths.append(pairs)
+    owner = np.repeat(np.arange(len(products)), lengths)
+    return (np.asarray(times, dtype=np.int64), np.asarray(sellers, dtype=str) == AMAZON_SELLER_ID, owner)
+
+
+def _current_ranks(products: Sequence) -> np.ndarray:
+    """Latest positive rank of the first salesRanks category that has one, else the salesRank field"""
+    segments = [(row, flat[1::2]) for row, product in enumerate(products)
+                for name, flat in product.history.items() if name.startswith("salesRanks:") and flat.size >= 2]
+    ranks = np.zeros(len(products), dtype=np.int64)
+    if segments:
+        values = np.concatenate([ranks_ for _, ranks_ in segments]).astype(np.int64)
+        segment = np.repeat(np.arange(len(segments)), [len(ranks_) for _, ranks_ in segments])
+        positive = np.flatnonzero(values > 0)
+        last = _last_values(positive, segment[positive], len(segments))
+        found = np.flatnonzero(last >= 0)
+        segment_row = np.array([row for row, _ in segments])[found]
+        first_rows, first = np.unique(segment_row, return_index=True)
+        ranks[first_rows] = values[last[found[first]]]
+    for row in np.flatnonzero(ranks == 0):
+        rank = products[row].info.get("salesRank")
+        if rank is not None and rank > 0:
+            ranks[row] = rank
+    return ranks
+
+
+# ============================================================
+# STATS COLUMNS
+# ============================================================
+
+# (stats key, list index or None for scalars) read into KeepaMetrics columns
+STAT_COLUMNS = (
+    ("avg90", 1), ("avg180", 1), ("min", 1), ("max", 1), ("current", 1),  # new price, cents
+    ("avg90", -1),  # sales rank average (last element)
+    ("buyBoxPrice", None),
+)
+
+
+def _stat_columns(stats: List[Dict]) -> np.ndarray:
+    """(products, STAT_COLUMNS) array of stats values in one pass; -1 when missing"""
+    table = np.full((len(stats), len(STAT_COLUMNS)), -1.0)
+    for row, product_stats in enumerate(stats):
+        if not product_stats:
+            continue
+        for column, (key, index) in enumerate(STAT_COLUMNS):
+            value = product_stats.get(key)
+            if index is not None:
+                value = value[index] if isinstance(value, list) and len(value) > max(index, -index - 1) else None
+            if value:
+                table[row, column] = value
+    return table
+
+
+def _monthly_sales(rank: np.ndarray) -> np.ndarray:
+    """Rank -> rough monthly sales (category-independent, Sales ≈ (C / Rank) ^ k)"""
+    with np.errstate(divide="ignore"):
+        safe = np.where(rank > 0, rank, 1).astype(np.float64)
+        estimate = np.select(
+            [rank <= 1000, rank <= 10000, rank <= 100000, rank <= 500000],
+            [500 * (1000 / safe) ** 0.5, 200 * (10000 / safe) ** 0.6,
+             50 * (100000 / safe) ** 0.7, 10 * (500000 / safe) ** 0.8],
+            np.maximum(1, np.floor(5 * (1000000 / safe))),
+        )
+    return np.where(rank > 0, np.floor(estimate), 0).astype(np.int64)
+
+
+@dataclass
+class KeepaMetrics:
+    """Flip-score inputs for a batch of cached products (one array element per product)"""
+    asins: List[str]
+    brands: List[str]
+    avg_price_90d: np.ndarray
+    avg_price_180d: np.ndarray
+    historical_low: np.ndarray
+    historical_high: np.ndarray
+    price_stability_score: np.ndarray
+    price_is_anomaly: np.ndarray
+    price_volatility_90d: np.ndarray
+    sales_rank_current: np.ndarray
+    sales_rank_avg_90d: np.ndarray
+    estimated_monthly_sales: np.ndarray
+    sales_rank_drops_30d: np.ndarray
+    fba_seller_count: np.ndarray
+    fbm_seller_count: np.ndarray
+    amazon_on_listing: np.ndarray
+    buy_box_price: np.ndarray
+    buy_box_amazon_share: np.ndarray
+
+    @classmethod
+    def from_products(cls, products: Sequence, now: int) -> "KeepaMetrics":
+        """
+        Analyze CachedProducts in one pass. `now` is the current Keepa
+        time (keepa_cache.keepa_now()); the 30/90-day windows end there.
+        """
+        rows = len(products)
+        stats = [product.stats for product in products]
+
+        # Price levels from the stats object (cents, -1 = no data)
+        def dollars(column: np.ndarray) -> np.ndarray:
+            return np.where(column > 0, column / 100.0, 0.0)
+
+        table = _stat_columns(stats)
+        avg_90, avg_180, low, high, current_new = (dollars(table[:, i]) for i in range(5))
+        avg_rank, buy_box = table[:, 5], dollars(table[:, 6])
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            volatility = (high - low) / high
+            stability = np.where((avg_90 > 0) & (high > 0), np.clip(100 - (volatility * 100), 0, 100), 0.0)
+            anomaly = (current_new > 0) & (avg_90 > 0) & ((avg_90 - current_new) / avg_90 >= 0.30)
+
+        # Sales velocity
+        rank = _current_ranks(products)
+        rank_times, rank_values, rank_owner = _stack_series(products, 3)
+        rank_drops = _rank_drops(rank_times, rank_values, rank_owner, rows, now - RANK_DROP_DAYS * MINUTES_PER_DAY)
+
+        new_times, new_values, new_owner = _stack_series(products, 1)
+        price_volatility = _volatility(new_times, new_values, new_owner, rows,
+                                       now - VOLATILITY_DAYS * MINUTES_PER_DAY)
+
+        # Competition
+        offers_new = np.array([product.get("offerCountNew") or 0 for product in products], dtype=np.int64)
+        offers_fba = np.array([product.get("offerCountFBA") or 0 for product in products], dtype=np.int64)
+        _, amazon_values, amazon_owner = _stack_series(products, 0)
+        amazon_latest = _last_values(amazon_values, amazon_owner, rows)
+
+        bb_times, bb_amazon, bb_owner = _buy_box_history(products)
+        amazon_share = _time_share(bb_times, bb_amazon, bb_owner, rows, now - BUY_BOX_DAYS * MINUTES_PER_DAY, now)
+
+        return cls(
+            asins=[product.asin for product in products],
+            brands=[product.get("brand") or "" for product in products],
+            avg_price_90d=avg_90,
+            avg_price_180d=avg_180,
+            historical_low=low,
+            historical_high=high,
+            price_stability_score=stability,
+            price_is_anomaly=anomaly,
+            price_volatility_90d=price_volatility,
+            sales_rank_current=rank,
+            sales_rank_avg_90d=np.where(avg_rank > 0, avg_rank, 0).astype(np.int64),
+            estimated_monthly_sales=_monthly_sales(rank),
+            sales_rank_drops_30d=rank_drops,
+            fba_seller_count=offers_fba,
+            fbm_seller_count=np.maximum(0, offers_new - offers_fba),
+            amazon_on_listing=amazon_latest > 0,
+            buy_box_price=buy_box,
+            buy_box_amazon_share=amazon_share,
+        )
+
+    def __len__(self) -> int:
+        return len(self.asins)
+
+    def row(self, index: int) -> Dict[str, Any]:
+        """One product's ANALYSIS_FIELDS as plain Python values"""
+        values = {name: getattr(self, name)[index].item() for name in ANALYSIS_FIELDS}
+        values["price_volatility_90d"] = round(values["price_volatility_90d"], 4)
+        values["buy_box_amazon_share"] = round(values["buy_box_amazon_share"], 3)
+        values["brand"] = self.brands[index]
+        return values
@@ -0,0 +1,391 @@
+"""
+Keepa Product Cache - field-level TTLs over compact history arrays
+
+get_product_details used to fetch 180-day stats, the full price/rank history
+and 20 offers every time an ASIN was analyzed, including the same ASIN seen
+again by check_deals_against_tracked, check_deals_by_brand and
+/keepa/smart-analyze. Most of that barely changes between lookups, so a
+product is cached in three field groups with their own TTLs:
+
+- history: csv price histories and salesRanks (long TTL). Stored as one
+  int32 NumPy buffer per product plus an offset index, not JSON lists
+- info: stats (averages, min/max, current prices), sales rank, title,
+  brand (medium TTL; stats cost no tokens, so any refresh includes them)
+- offers: offer list/counts and buy box fields (short TTL, and the
+  expensive part: 6 tokens per 10 offers)
+
+A lookup only requests the stale groups (history=0 and no offers when those
+are fresh), and a fully fresh product costs nothing.
+ProductAnalysis.calculate_flip_score reads the cached arrays directly
+(keepa_analytics.KeepaMetrics, CachedProduct.series).
+
+Recently used products are also kept decoded in an in-memory LRU
+(MEMORY_ENTRIES) in front of SQLite. aget() answers from it without leaving
+the event loop and only reads SQLite on a worker thread; aput() writes on a
+worker thread.
+
+Usage:
+    cache = get_product_cache()
+    entry = await cache.aget(asin, domain_id)
+    stale = cache.stale_groups(entry)
+    if stale:
+        product = await scheduler.product(asin, product_params(domain_id, stale))
+        entry = await cache.aput(asin, domain_id, product, stale)
+    analysis.calculate_flip_score(entry)
+"""
+
+import os
+import json
+import time
+import asyncio
+import sqlite3
+import logging
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Dict, Optional, Set, Tuple
+
+import numpy as np
+
+logger = logging.getLogger("keepa_cache")
+
+KEEPA_CACHE_DB = os.getenv("KEEPA_CACHE_DB", os.path.join(os.path.dirname(os.path.abspath(__file__)), "keepa_cache.db"))
+
+# Field-group TTLs (seconds)
+HISTORY_TTL = 24 * 3600  # price / rank histories only ever grow at the end
+INFO_TTL = 30 * 60       # stats, current prices, sales rank, title / brand
+OFFERS_TTL = 10 * 60     # offers, offer counts, buy box
+
+GROUPS = ("history", "info", "offers")
+
+# Decoded products kept in memory in front of SQLite
+MEMORY_ENTRIES = int(os.getenv("KEEPA_CACHE_MEMORY_ENTRIES", "512"))
+
+# Product API parameters for a full refresh
+STATS_DAYS = 180
+OFFERS_COUNT = 20
+
+HISTORY_KEYS = ("csv", "salesRanks")
+OFFER_KEYS = ("offers", "liveOffersOrder", "offerCountNew", "offerCountFBA", "offerCountUsed",
+              "buyBoxSellerIdHistory", "buyBoxUsedHistory")
+OFFER_STAT_KEYS = ("offerCountFBA", "offerCountFBM", "totalOfferCount", "retrievedOfferCount")
+
+# csv series stored as (keepaTime, price, shipping) triples; all others are (keepaTime, value)
+SHIPPING_SERIES = {7, 18, 19, 20, 21, 22, 23, 24, 25, 26, 27}
+
+KEEPA_EPOCH = datetime(2011, 1, 1)
+
+
+def keepa_now() -> int:
+    """Current time in Keepa minutes (since 2011-01-01)"""
+    return int((datetime.now() - KEEPA_EPOCH).total_seconds() / 60)
+
+
+def product_params(domain_id: int, groups: Set[str]) -> Dict[str, Any]:
+    """Product API parameters that refresh exactly `groups`"""
+    params = {
+        "domain": domain_id,
+        "stats": STATS_DAYS,  # free, so every refresh includes it
+        "history": 1 if "history" in groups else 0,
+        "rating": 1,
+    }
+    if "offers" in groups:
+        params["offers"] = OFFERS_COUNT
+    return params
+
+
+def _is_offer_stat(key: str) -> bool:
+    return key.startswith("buyBox") or key in OFFER_STAT_KEYS
+
+
+def _pack_history(product: Dict) -> Tuple[bytes, Dict]:
+    """csv + salesRanks -> (one int buffer, {series: [offset, length]})"""
+    series = {}
+    for index, values in enumerate(product.get("csv") or []):
+        if values:
+            series[f"csv:{index}"] = values
+    for category, values in (product.get("salesRanks") or {}).items():
+        if values:
+            series[f"salesRanks:{category}"] = values
+
+    index, chunks, offset = {}, [], 0
+    for name, values in series.items():
+        index[name] = [offset, len(values)]
+        chunks.append(np.asarray(values, dtype=np.int64))
+        offset += len(values)
+    flat = np.concatenate(chunks) if chunks else np.zeros(0, dtype=np.int64)
+    dtype = np.int32 if not flat.size or np.abs(flat).max() < 2 ** 31 else np.int64
+    index["_dtype"] = np.dtype(dtype).str
+    return flat.astype(dtype).tobytes(), index
+
+
+@dataclass
+class CachedProduct:
+    """One product's cached field groups; history series are views into one array"""
+    asin: str
+    domain: int
+    history: Dict[str, np.ndarray] = field(default_factory=dict)
+    info: Dict[str, Any] = field(default_factory=dict)
+    offers: Dict[str, Any] = field(default_factory=dict)
+    fetched_at: Dict[str, float] = field(default_factory=dict)  # group -> unix time
+
+    @classmethod
+    def from_product(cls, product: Dict, domain: int = 1) -> "CachedProduct":
+        """Wrap a raw Keepa product dict (deals / uncached payloads) without storing it"""
+        history = {}
+        for name, values in (
+            *((f"csv:{i}", v) for i, v in enumerate(product.get("csv") or [])),
+            *((f"salesRanks:{c}", v) for c, v in (product.get("salesRanks") or {}).items()),
+        ):
+            if values:
+                history[name] = np.asarray(values, dtype=np.int64)
+        info = {k: v for k, v in product.items() if k not in HISTORY_KEYS and k not in OFFER_KEYS}
+        offers = {k: product[k] for k in OFFER_KEYS if k in product}
+        return cls(asin=product.get("asin", ""), domain=domain, history=history, info=info, offers=offers)
+
+    @property
+    def stats(self) -> Dict[str, Any]:
+        """Keepa stats object (info stats + buy box / offer stats)"""
+        return {**(self.info.get("stats") or {}), **(self.offers.get("stats") or {})}
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """Top-level product field from whichever group holds it"""
+        if key in self.offers:
+            return self.offers[key]
+        return self.info.get(key, default)
+
+    def series(self, csv_index: int) -> np.ndarray:
+        """csv history as an (n, 2) or (n, 3) array of (keepaTime, value[, shipping])"""
+        flat = self.history.get(f"csv:{csv_index}")
+        width = 3 if csv_index in SHIPPING_SERIES else 2
+        if flat is None or flat.size < width:
+            return np.zeros((0, width), dtype=np.int32)
+        return flat[:flat.size - flat.size % width].reshape(-1, width)
+
+    def latest(self, csv_index: int) -> Optional[int]:
+        """Most recent value of a csv series (-1 = no offer at that time)"""
+        series = self.series(csv_index)
+        return int(series[-1, 1]) if len(series) else None
+
+    def rank_drops(self, days: int = 30) -> int:
+        """Sales rank improvements (each roughly a sale) over the last `days`"""
+        ranks = self.series(3)
+        if not len(ranks):
+            return 0
+        recent = ranks[ranks[:, 0] >= keepa_now() - days * 1440, 1]
+        recent = recent[recent > 0]
+        return int(np.count_nonzero(np.diff(recent) < 0))
+
+    def current_rank(self) -> int:
+        """Latest positive rank from salesRanks, else the salesRank field, else 0"""
+        for name, flat in self.history.items():
+            if name.startswith("salesRanks:") and flat.size >= 2:
+                values = flat[1::2]
+                positive = values[values > 0]
+                if positive.size:
+                    return int(positive[-1])
+        rank = self.info.get("salesRank")
+        return rank if rank is not None and rank > 0 else 0
+
+    def to_product(self) -> Dict[str, Any]:
+        """Keepa-style product dict (csv / salesRanks as flat lists) for callers that want raw data"""
+        product = {**self.info, **{k: v for k, v in self.offers.items() if k != "stats"}, "stats": self.stats}
+        csv_series = {int(name[4:]): flat for name, flat in self.history.items() if name.startswith("csv:")}
+        if csv_series:
+            csv_list = [None] * (max(csv_series) + 1)
+            for index, flat in csv_series.items():
+                csv_list[index] = flat.tolist()
+            product["csv"] = csv_list
+        sales_ranks = {name.split(":", 1)[1]: flat.tolist()
+                       for name, flat in self.history.items() if name.startswith("salesRanks:")}
+        if sales_ranks:
+            product["salesRanks"] = sales_ranks
+        return product
+
+
+class KeepaProductCache:
+    """SQLite-backed product cache with per-group TTLs and an in-memory LRU in front"""
+
+    def __init__(self, path: str = KEEPA_CACHE_DB, ttls: Optional[Dict[str, float]] = None,
+                 memory_entries: int = MEMORY_ENTRIES):
+        self.path = str(path)
+        self.ttls = {"history": HISTORY_TTL, "info": INFO_TTL, "offers": OFFERS_TTL, **(ttls or {})}
+        self.memory_entries = memory_entries
+        self._memory: "OrderedDict[Tuple[str, int], CachedProduct]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS keepa_products (
+                asin TEXT NOT NULL,
+                domain INTEGER NOT NULL,
+                history BLOB,
+                history_index TEXT,
+                history_at REAL DEFAULT 0,
+                info TEXT,
+                info_at REAL DEFAULT 0,
+                offers TEXT,
+                offers_at REAL DEFAULT 0,
+                PRIMARY KEY (asin, domain)
+            )
+        """)
+        self._conn.commit()
+        self._stats = {"lookups": 0, "hits": 0, "partial": 0, "misses": 0, "tokens_saved": 0,
+                       "memory_hits": 0, "groups_refreshed": {group: 0 for group in GROUPS}}
+
+    def _remember(self, entry: CachedProduct):
+        """Caller holds the lock"""
+        key = (entry.asin, entry.domain)
+        self._memory[key] = entry
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+
+    def peek(self, asin: str, domain: int) -> Optional[CachedProduct]:
+        """The in-memory entry, if any (never touches SQLite)"""
+        with self._lock:
+            entry = self._memory.get((asin, domain))
+            if entry is not None:
+                self._memory.move_to_end((asin, domain))
+                self._stats["memory_hits"] += 1
+        return entry
+
+    def get(self, asin: str, domain: int) -> Optional[CachedProduct]:
+        """Memory first, then SQLite (blocking - use aget() on the event loop)"""
+        entry = self.peek(asin, domain)
+        if entry is not None:
+            return entry
+        entry = self._read(asin, domain)
+        if entry is not None:
+            with self._lock:
+                self._remember(entry)
+        return entry
+
+    async def aget(self, asin: str, domain: int) -> Optional[CachedProduct]:
+        """get() that reads SQLite on a worker thread when the product isn't in memory"""
+        entry = self.peek(asin, domain)
+        if entry is not None:
+            return entry
+        return await asyncio.to_thread(self.get, asin, domain)
+
+    def _read(self, asin: str, domain: int) -> Optional[CachedProduct]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT history, history_index, history_at, info, info_at, offers, offers_at "
+                "FROM keepa_products WHERE asin = ? AND domain = ?", (asin, domain)
+            ).fetchone()
+        if not row:
+            return None
+        history_blob, history_index, history_at, info, info_at, offers, offers_at = row
+
+        history = {}
+        if history_blob is not None and history_index:
+            index = json.loads(history_index)
+            flat = np.frombuffer(history_blob, dtype=np.dtype(index.pop("_dtype", "<i4")))
+            history = {name: flat[start:start + length] for name, (start, length) in index.items()}
+
+        return CachedProduct(
+            asin=asin,
+            domain=domain,
+            history=history,
+            info=json.loads(info) if info else {},
+            offers=json.loads(offers) if offers else {},
+            fetched_at={"history": history_at or 0, "info": info_at or 0, "offers": offers_at or 0},
+        )
+
+    def stale_groups(self, entry: Optional[CachedProduct], now: Optional[float] = None) -> Set[str]:
+        """Groups past their TTL (all of them for an uncached product); updates hit stats"""
+        now = time.time() if now is None else now
+        if entry is None:
+            stale = set(GROUPS)
+        else:
+            stale = {group for group in GROUPS if now - entry.fetched_at.get(group, 0) > self.ttls[group]}
+        self._stats["lookups"] += 1
+        if entry is None:
+            self._stats["misses"] += 1
+        elif not stale:
+            self._stats["hits"] += 1
+        else:
+            self._stats["partial"] += 1
+        return stale
+
+    def put(self, asin: str, domain: int, product: Dict, groups: Set[str]) -> CachedProduct:
+        """Store the groups that were requested; info is refreshed by every fetch"""
+        now = time.time()
+        groups = set(groups) | {"info"}
+
+        info = {k: v for k, v in product.items() if k not in HISTORY_KEYS and k not in OFFER_KEYS}
+        info["stats"] = {k: v for k, v in (product.get("stats") or {}).items() if not _is_offer_stat(k)}
+        offers = None
+        if "offers" in groups:
+            offers = {k: product[k] for k in OFFER_KEYS if k in product}
+            offers["stats"] = {k: v for k, v in (product.get("stats") or {}).items() if _is_offer_stat(k)}
+        history_blob = history_index = None
+        if "history" in groups:
+            history_blob, history_index = _pack_history(product)
+
+        with self._lock:
+            self._conn.execute("INSERT OR IGNORE INTO keepa_products (asin, domain) VALUES (?, ?)", (asin, domain))
+            self._conn.execute("UPDATE keepa_products SET info = ?, info_at = ? WHERE asin = ? AND domain = ?",
+                               (json.dumps(info), now, asin, domain))
+            if offers is not None:
+                self._conn.execute(
+                    "UPDATE keepa_products SET offers = ?, offers_at = ? WHERE asin = ? AND domain = ?",
+                    (json.dumps(offers), now, asin, domain))
+            if history_blob is not None:
+                self._conn.execute(
+                    "UPDATE keepa_products SET history = ?, history_index = ?, history_at = ? "
+                    "WHERE asin = ? AND domain = ?",
+                    (history_blob, json.dumps(history_index), now, asin, domain))
+            self._conn.commit()
+        for group in groups:
+            self._stats["groups_refreshed"][group] += 1
+        entry = self._read(asin, domain)
+        with self._lock:
+            self._remember(entry)
+        return entry
+
+    async def aput(self, asin: str, domain: int, product: Dict, groups: Set[str]) -> CachedProduct:
+        """put() on a worker thread"""
+        return await asyncio.to_thread(self.put, asin, domain, product, groups)
+
+    def record_savings(self, tokens: int):
+        """Tokens a lookup did not spend compared with a full product request"""
+        self._stats["tokens_saved"] += max(0, tokens)
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+            self._conn.execute("DELETE FROM keepa_products")
+            self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            entries, history_bytes = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(LENGTH(history)), 0) FROM keepa_products").fetchone()
+        lookups = self._stats["lookups"]
+        return {
+            **self._stats,
+            "groups_refreshed": dict(self._stats["groups_refreshed"]),
+            "hit_rate": round(self._stats["hits"] / lookups, 3) if lookups else 0.0,
+            "entries": entries,
+            "memory_entries": len(self._memory),
+            "history_bytes": history_bytes,
+            "ttl_seconds": dict(self.ttls),
+        }
+
+
+# Global cache instance (shared by every KeepaClientV2)
+_product_cache: Optional[KeepaProductCache] = None
+
+
+def get_product_cache() -> KeepaProductCache:
+    global _product_cache
+    if _product_cache is None:
+        _product_cache = KeepaProductCache()
+    return _product_cache
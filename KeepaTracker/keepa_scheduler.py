@@ -0,0 +1,325 @@
+"""
+Keepa Scheduler - token-bucket pacing and batched Product API lookups
+
+KeepaClientV2 used to sleep a fixed RATE_LIMIT_INTERVAL between calls and
+ignore the token data Keepa returns with every response, and
+analyze_and_filter_deals fetched one ASIN per `product` request. The
+scheduler replaces both:
+
+- KeepaTokenBucket models the account's bucket from each response's
+  tokensLeft / refillIn / refillRate, so a request waits exactly until
+  enough tokens have refilled instead of a fixed interval, and a 429 resets
+  the model rather than retrying blind
+- product() queues an ASIN lookup; a batcher coalesces pending lookups that
+  share the same parameters into one multi-ASIN request (Keepa accepts up to
+  100). When tokens are short, batches shrink to what the bucket can pay for
+  and the highest-priority (expected deal value) ASINs go first
+- get_stats() reports token burn rate vs. refill and time to empty for the
+  dashboards
+
+Usage:
+    scheduler = KeepaScheduler(fetch=client._request)
+    data = await scheduler.call("deal", params)
+    product = await scheduler.product(asin, params, priority=drop.profit_potential)
+"""
+
+import math
+import time
+import heapq
+import asyncio
+import logging
+import itertools
+from collections import deque
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger("keepa_scheduler")
+
+# Keepa Product API limit per request
+MAX_ASINS_PER_REQUEST = 100
+
+# How long product() lookups wait for company before a batch is sent
+BATCH_WINDOW_SECONDS = 0.25
+
+# Assumed until the first response reports the account's refillRate
+DEFAULT_REFILL_RATE = 20  # tokens per minute
+REFILL_PERIOD_SECONDS = 60
+
+# Keepa charges 6 extra tokens per page of 10 offers
+OFFER_PAGE_TOKENS = 6
+ENDPOINT_TOKENS = {"deal": 5, "query": 10, "bestsellers": 50}
+
+# Window for burn-rate metrics
+BURN_HISTORY_SECONDS = 3600
+
+
+def estimate_tokens(endpoint: str, params: Dict) -> int:
+    """Expected token cost of a request (the response's tokensConsumed is authoritative)"""
+    if endpoint == "product":
+        asins = len([a for a in str(params.get("asin", "")).split(",") if a]) or 1
+        per_asin = 1
+        offers = int(params.get("offers") or 0)
+        if offers:
+            per_asin += OFFER_PAGE_TOKENS * math.ceil(offers / 10)
+        if params.get("rating"):
+            per_asin += 1
+        return asins * per_asin
+    return ENDPOINT_TOKENS.get(endpoint, 1)
+
+
+class KeepaTokenBucket:
+    """
+    Client-side model of the Keepa token bucket.
+
+    Keepa refills refillRate tokens once a minute (refillIn ms from the
+    response) and lets unused tokens pile up for an hour. Between responses
+    the model advances the refill clock and subtracts requests in flight.
+    """
+
+    def __init__(self, refill_rate: float = DEFAULT_REFILL_RATE):
+        self.tokens_left: Optional[float] = None  # unknown until the first response
+        self.refill_rate = float(refill_rate)
+        self._next_refill = time.monotonic() + REFILL_PERIOD_SECONDS
+        self._in_flight = 0
+        self._lock = asyncio.Lock()
+
+    @property
+    def capacity(self) -> float:
+        return self.refill_rate * 60
+
+    def _refills_since_update(self, now: float) -> int:
+        if now < self._next_refill:
+            return 0
+        return 1 + int((now - self._next_refill) // REFILL_PERIOD_SECONDS)
+
+    def available(self, now: Optional[float] = None) -> float:
+        """Estimated tokens right now (inf until Keepa has reported a balance)"""
+        if self.tokens_left is None:
+            return float("inf")
+        now = time.monotonic() if now is None else now
+        refilled = self.tokens_left + self._refills_since_update(now) * self.refill_rate
+        return min(refilled, max(self.capacity, self.tokens_left)) - self._in_flight
+
+    def refill_in(self, now: Optional[float] = None) -> float:
+        """Seconds until the next refill"""
+        now = time.monotonic() if now is None else now
+        return self._next_refill + self._refills_since_update(now) * REFILL_PERIOD_SECONDS - now
+
+    def wait_time(self, cost: int, now: Optional[float] = None) -> float:
+        """Seconds until `cost` tokens (capped at the bucket size) are available"""
+        now = time.monotonic() if now is None else now
+        needed = min(cost, self.capacity) if self.capacity > 0 else cost
+        deficit = needed - self.available(now)
+        if deficit <= 0:
+            return 0.0
+        if self.refill_rate <= 0:
+            return float(REFILL_PERIOD_SECONDS)
+        refills = math.ceil(deficit / self.refill_rate)
+        return self.refill_in(now) + (refills - 1) * REFILL_PERIOD_SECONDS
+
+    async def acquire(self, cost: int) -> float:
+        """Wait until `cost` tokens are available and reserve them. Returns seconds waited."""
+        waited = 0.0
+        async with self._lock:
+            while True:
+                delay = self.wait_time(cost)
+                if delay <= 0:
+                    break
+                await asyncio.sleep(delay)
+                waited += delay
+            self._in_flight += cost
+        return waited
+
+    def release(self, cost: int):
+        """The request is answered (or failed); its cost is now in tokensLeft"""
+        self._in_flight = max(0, self._in_flight - cost)
+
+    def update(self, data: Dict, throttled: bool = False):
+        """Re-sync from a response's tokensLeft / refillIn / refillRate"""
+        now = time.monotonic()
+        if data.get("refillRate"):
+            self.refill_rate = float(data["refillRate"])
+        if data.get("refillIn") is not None:
+            self._next_refill = now + max(0, data["refillIn"]) / 1000
+        elif self.tokens_left is not None:
+            # Keep the refill clock, just roll it forward to now
+            self._next_refill += self._refills_since_update(now) * REFILL_PERIOD_SECONDS
+        if data.get("tokensLeft") is not None:
+            self.tokens_left = float(data["tokensLeft"])
+        elif throttled:
+            self.tokens_left = min(self.tokens_left or 0, 0)
+
+
+class KeepaScheduler:
+    """Paces every Keepa call through one token bucket and batches product lookups"""
+
+    def __init__(
+        self,
+        fetch: Callable[[str, Dict], Awaitable[Tuple[int, Dict]]],
+        max_batch: int = MAX_ASINS_PER_REQUEST,
+        batch_window: float = BATCH_WINDOW_SECONDS,
+        max_retries: int = 2,
+    ):
+        self._fetch = fetch  # (endpoint, params) -> (status_code, json)
+        self.bucket = KeepaTokenBucket()
+        self.max_batch = max_batch
+        self.batch_window = batch_window
+        self.max_retries = max_retries
+
+        # Pending product lookups: (-priority, seq, asin, params_key, params)
+        self._queue: List[tuple] = []
+        self._pending: Dict[Tuple[str, tuple], asyncio.Future] = {}
+        self._seq = itertools.count()
+        self._batcher: Optional[asyncio.Task] = None
+
+        self._burn: deque = deque()  # (monotonic, tokens consumed)
+        self._stats = {
+            "requests": 0,
+            "product_requests": 0,
+            "asins_requested": 0,
+            "coalesced_lookups": 0,
+            "tokens_consumed": 0,
+            "throttled": 0,
+            "waits": 0,
+            "wait_seconds": 0.0,
+        }
+        self._tokens_by_endpoint: Dict[str, int] = {}
+
+    # ---------------- single requests ----------------
+
+    async def call(self, endpoint: str, params: Dict, cost: Optional[int] = None) -> Dict:
+        """One paced request. Returns the JSON body, or {} on error."""
+        cost = estimate_tokens(endpoint, params) if cost is None else cost
+        for attempt in range(self.max_retries + 1):
+            waited = await self.bucket.acquire(cost)
+            if waited:
+                self._stats["waits"] += 1
+                self._stats["wait_seconds"] += waited
+            try:
+                status, data = await self._fetch(endpoint, params)
+            finally:
+                self.bucket.release(cost)
+
+            throttled = status == 429
+            self.bucket.update(data, throttled=throttled)
+            self._record(endpoint, data.get("tokensConsumed", 0 if throttled else cost))
+            if not throttled:
+                return data if status == 200 else {}
+
+            self._stats["throttled"] += 1
+            if attempt < self.max_retries:
+                logger.warning(f"[KEEPA] 429 on {endpoint} (tokens left {self.bucket.tokens_left}), "
+                               f"waiting for refill ({attempt + 1}/{self.max_retries})")
+        logger.error(f"[KEEPA] {endpoint} still throttled after {self.max_retries} retries")
+        return {}
+
+    def _record(self, endpoint: str, consumed: int):
+        now = time.monotonic()
+        self._stats["requests"] += 1
+        self._stats["tokens_consumed"] += consumed
+        self._tokens_by_endpoint[endpoint] = self._tokens_by_endpoint.get(endpoint, 0) + consumed
+        self._burn.append((now, consumed))
+        while self._burn and now - self._burn[0][0] > BURN_HISTORY_SECONDS:
+            self._burn.popleft()
+
+    # ---------------- batched product lookups ----------------
+
+    async def product(self, asin: str, params: Dict, priority: float = 0.0) -> Optional[Dict]:
+        """
+        Product data for one ASIN, fetched in a multi-ASIN request together
+        with every other lookup pending with the same params. Higher
+        priority ASINs are sent first when tokens are short.
+        """
+        asin = asin.upper().strip()
+        params = {k: v for k, v in params.items() if k != "asin"}
+        key = tuple(sorted((k, str(v)) for k, v in params.items()))
+
+        future = self._pending.get((asin, key))
+        if future is None:
+            future = asyncio.get_running_loop().create_future()
+            self._pending[(asin, key)] = future
+        else:
+            self._stats["coalesced_lookups"] += 1
+        # A repeat lookup may raise the priority; stale heap entries are skipped
+        heapq.heappush(self._queue, (-priority, next(self._seq), asin, key, params))
+
+        if self._batcher is None or self._batcher.done():
+            self._batcher = asyncio.create_task(self._run_batches())
+        return await asyncio.shield(future)
+
+    def _next_batch(self) -> Tuple[Dict, List[str]]:
+        """Pop the highest-priority ASINs sharing the top entry's params"""
+        _, _, _, key, params = self._queue[0]
+        per_asin = estimate_tokens("product", {**params, "asin": "X"})
+        affordable = self.bucket.available() // per_asin
+        size = int(max(1, min(self.max_batch, affordable)))
+
+        asins, skipped = [], []
+        while self._queue and len(asins) < size:
+            entry = heapq.heappop(self._queue)
+            asin, entry_key = entry[2], entry[3]
+            if (asin, entry_key) not in self._pending:
+                continue  # stale entry, already sent
+            if entry_key != key:
+                skipped.append(entry)
+            elif asin not in asins:
+                asins.append(asin)
+        for entry in skipped:
+            heapq.heappush(self._queue, entry)
+        return params, asins
+
+    async def _run_batches(self):
+        while self._queue:
+            await asyncio.sleep(self.batch_window)
+            if not self._queue:
+                break
+            params, asins = self._next_batch()
+            if not asins:
+                continue
+            key = tuple(sorted((k, str(v)) for k, v in params.items()))
+            futures = [self._pending.pop((asin, key)) for asin in asins]
+
+            self._stats["product_requests"] += 1
+            self._stats["asins_requested"] += len(asins)
+            try:
+                data = await self.call("product", {**params, "asin": ",".join(asins)})
+            except Exception as e:
+                for future in futures:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+
+            products = {str(p.get("asin", "")).upper(): p for p in data.get("products") or []}
+            for asin, future in zip(asins, futures):
+                if not future.done():
+                    future.set_result(products.get(asin))
+
+    # ---------------- metrics ----------------
+
+    def burn_rate(self, window_seconds: float) -> float:
+        """Tokens consumed per minute over the last window_seconds"""
+        cutoff = time.monotonic() - window_seconds
+        consumed = sum(n for t, n in self._burn if t >= cutoff)
+        return consumed / (window_seconds / 60)
+
+    def get_stats(self) -> Dict[str, Any]:
+        bucket = self.bucket
+        available = bucket.available()
+        burn_5m = self.burn_rate(300)
+        net_burn = burn_5m - bucket.refill_rate
+        requests = self._stats["product_requests"]
+        return {
+            **self._stats,
+            "wait_seconds": round(self._stats["wait_seconds"], 1),
+            "tokens_left": bucket.tokens_left,
+            "tokens_estimated": round(available, 1) if available != float("inf") else None,
+            "refill_rate_per_min": bucket.refill_rate,
+            "refill_in_seconds": round(bucket.refill_in(), 1),
+            "burn_rate_5m": round(burn_5m, 1),
+            "burn_rate_60m": round(self.burn_rate(BURN_HISTORY_SECONDS), 1),
+            "net_burn_per_min": round(net_burn, 1),
+            "minutes_to_empty": (round(max(available, 0) / net_burn, 1)
+                                 if net_burn > 0 and available != float("inf") else None),
+            "avg_asins_per_request": round(self._stats["asins_requested"] / requests, 1) if requests else 0,
+            "queued_lookups": len(self._pending),
+            "tokens_by_endpoint": dict(self._tokens_by_endpoint),
+        }
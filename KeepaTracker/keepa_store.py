@@ -0,0 +1,257 @@
+"""
+Keepa State Store - engine state shared by every process running the engine
+
+The proxy (routes/keepa.py, mini_pc_runner) and the standalone KeepaTracker
+server used to keep separate copies of everything: an alerted_asins.json
+rewritten on every alert, their own Deals API polling and their own token
+spend. Shared state now lives in SQLite files (WAL, safe for several processes):
+
+- alerts: the "keepa" namespace of the proxy-wide alert store
+  (utils/alert_store.py, loaded on its own so the standalone server doesn't
+  import the rest of utils), also used by deal_monitor.py. AlertDeduplicator
+  answers from memory, falls back to the table for ASINs another process
+  alerted on, and writes marks in batches
+- deal_pages: Deals API responses keyed by selection, so a second process
+  asking for the same deals within DEAL_CACHE_TTL spends no tokens
+- leases: which process currently runs the deals monitor. A monitor
+  started in a second process stands by until the lease expires
+
+Usage:
+    store = get_state_store()
+    dedup = AlertDeduplicator()
+    if dedup.should_alert(asin):
+        ...
+        dedup.mark_alerted(asin)
+    lease = MonitorLease(store, "deals_monitor", ttl=600)
+    if lease.acquire():
+        ...
+"""
+
+import os
+import sys
+import json
+import time
+import socket
+import sqlite3
+import hashlib
+import logging
+import threading
+import importlib.util
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+logger = logging.getLogger("keepa_store")
+
+
+def _load_alert_store():
+    """
+    utils/alert_store.py (stdlib only) without running utils/__init__, which
+    pulls in the proxy's config, fastapi, httpx and numpy.
+
+    The module is registered under its usual name, so inside the proxy the
+    later `from .alert_store import ...` gets this same instance - one store
+    connection, one dedup per namespace, one flusher.
+    """
+    name = "utils.alert_store"
+    module = sys.modules.get(name)
+    if module is None:
+        path = Path(__file__).resolve().parent.parent / "utils" / "alert_store.py"
+        spec = importlib.util.spec_from_file_location(name, path)
+        module = importlib.util.module_from_spec(spec)
+        sys.modules[name] = module
+        try:
+            spec.loader.exec_module(module)
+        except BaseException:
+            del sys.modules[name]
+            raise
+    return module
+
+
+_alert_store = _load_alert_store()
+AlertDedup = _alert_store.AlertDedup
+get_alert_dedup = _alert_store.get_alert_dedup
+
+KEEPA_STATE_DB = os.getenv("KEEPA_STATE_DB", str(Path(__file__).parent / "keepa_state.db"))
+
+ALERT_COOLDOWN_HOURS = 24  # Don't re-alert same ASIN within this period
+ALERT_NAMESPACE = "keepa"
+LEGACY_ALERTED_FILE = "alerted_asins.json"
+
+# Deals responses are reused for a bit less than the 5 minute monitor interval
+DEAL_CACHE_TTL = int(os.getenv("KEEPA_DEAL_CACHE_TTL", "240"))
+
+
+class KeepaStateStore:
+    """One SQLite connection (WAL) for the deal page and lease tables"""
+
+    def __init__(self, path: str = KEEPA_STATE_DB):
+        self.path = str(path)
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(self.path, check_same_thread=False, timeout=10.0)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS deal_pages (
+                selection_key TEXT PRIMARY KEY,
+                fetched_at REAL NOT NULL,
+                deals TEXT NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS leases (
+                name TEXT PRIMARY KEY,
+                owner TEXT NOT NULL,
+                expires_at REAL NOT NULL
+            );
+        """)
+        self.conn.commit()
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
+
+
+def get_keepa_alerts() -> AlertDedup:
+    """ASINs alerted by any Keepa sender (engine, deal_monitor.py) in the last cooldown period"""
+    return get_alert_dedup(ALERT_NAMESPACE, ALERT_COOLDOWN_HOURS * 3600, shared=True)
+
+
+def import_legacy_alerts(dedup: AlertDedup, path: str = LEGACY_ALERTED_FILE) -> int:
+    """Import an old alerted_asins.json ({asin: iso} or {"alerted": {asin: iso}}) once"""
+    path = Path(path)
+    if not path.exists() or dedup.db.count(dedup.namespace):
+        return 0
+    try:
+        with open(path, 'r') as f:
+            data = json.load(f)
+        entries = data.get("alerted", data)
+        imported = dedup.import_entries({asin: datetime.fromisoformat(ts).timestamp() for asin, ts in entries.items()})
+    except Exception as e:
+        logger.error(f"[DEDUP] Error importing {path}: {e}")
+        return 0
+    logger.info(f"[DEDUP] Imported {imported} entries from {path}")
+    return imported
+
+
+class AlertDeduplicator:
+    """
+    Prevents duplicate alerts for the same ASIN across restarts and
+    processes (a view of the shared "keepa" alert namespace).
+    """
+
+    def __init__(self, dedup: Optional[AlertDedup] = None, legacy_file: str = LEGACY_ALERTED_FILE):
+        self.dedup = dedup or get_keepa_alerts()
+        if legacy_file:
+            import_legacy_alerts(self.dedup, legacy_file)
+        logger.info(f"[DEDUP] Loaded {len(self.dedup)} alerted ASINs")
+
+    @property
+    def alerted(self) -> Dict[str, float]:
+        """ASIN -> unix time of last alert (oldest first)"""
+        return self.dedup.entries
+
+    def should_alert(self, asin: str) -> bool:
+        """Check if we should send alert for this ASIN"""
+        return not self.dedup.is_recent(asin)
+
+    def mark_alerted(self, asin: str):
+        """Mark ASIN as alerted (written with the next batch)"""
+        self.dedup.mark(asin)
+
+    def flush(self):
+        """Write pending marks now"""
+        self.dedup.flush()
+
+    async def aflush(self):
+        """flush() off the event loop"""
+        await self.dedup.aflush()
+
+    def get_stats(self) -> Dict:
+        """Get deduplication stats"""
+        return {
+            **self.dedup.get_stats(),
+            "total_tracked": len(self.dedup),
+            "cooldown_hours": ALERT_COOLDOWN_HOURS,
+        }
+
+
+class DealPageCache:
+    """Deals API responses shared between processes for `ttl` seconds"""
+
+    def __init__(self, store: KeepaStateStore, ttl: float = DEAL_CACHE_TTL):
+        self.store = store
+        self.ttl = ttl
+        self._stats = {"hits": 0, "misses": 0}
+
+    @staticmethod
+    def key(selection: Dict) -> str:
+        return hashlib.sha1(json.dumps(selection, sort_keys=True).encode()).hexdigest()
+
+    def get(self, selection: Dict) -> Optional[List[Dict]]:
+        with self.store.lock:
+            row = self.store.conn.execute(
+                "SELECT fetched_at, deals FROM deal_pages WHERE selection_key = ?", (self.key(selection),)
+            ).fetchone()
+        if row and time.time() - row[0] <= self.ttl:
+            self._stats["hits"] += 1
+            return json.loads(row[1])
+        self._stats["misses"] += 1
+        return None
+
+    def put(self, selection: Dict, deals: List[Dict]):
+        now = time.time()
+        with self.store.lock:
+            self.store.conn.execute(
+                "INSERT OR REPLACE INTO deal_pages (selection_key, fetched_at, deals) VALUES (?, ?, ?)",
+                (self.key(selection), now, json.dumps(deals)),
+            )
+            self.store.conn.execute("DELETE FROM deal_pages WHERE fetched_at < ?", (now - self.ttl,))
+            self.store.conn.commit()
+
+    def get_stats(self) -> Dict:
+        return {**self._stats, "ttl_seconds": self.ttl}
+
+
+class MonitorLease:
+    """Time-limited lock so only one process runs a given loop"""
+
+    def __init__(self, store: KeepaStateStore, name: str, ttl: float, owner: str = None):
+        self.store = store
+        self.name = name
+        self.ttl = ttl
+        self.owner = owner or f"{socket.gethostname()}:{os.getpid()}"
+
+    def acquire(self) -> bool:
+        """Take or renew the lease; False while another owner holds an unexpired one"""
+        now = time.time()
+        with self.store.lock:
+            self.store.conn.execute(
+                "INSERT INTO leases (name, owner, expires_at) VALUES (?, ?, ?) "
+                "ON CONFLICT(name) DO UPDATE SET owner = excluded.owner, expires_at = excluded.expires_at "
+                "WHERE leases.owner = excluded.owner OR leases.expires_at < ?",
+                (self.name, self.owner, now + self.ttl, now),
+            )
+            self.store.conn.commit()
+            holder = self.store.conn.execute("SELECT owner FROM leases WHERE name = ?", (self.name,)).fetchone()
+        return bool(holder) and holder[0] == self.owner
+
+    def holder(self) -> Optional[str]:
+        with self.store.lock:
+            row = self.store.conn.execute(
+                "SELECT owner FROM leases WHERE name = ? AND expires_at >= ?", (self.name, time.time())
+            ).fetchone()
+        return row[0] if row else None
+
+    def release(self):
+        with self.store.lock:
+            self.store.conn.execute("DELETE FROM leases WHERE name = ? AND owner = ?", (self.name, self.owner))
+            self.store.conn.commit()
+
+
+# Global store instance (one connection per process)
+_state_store: Optional[KeepaStateStore] = None
+
+
+def get_state_store() -> KeepaStateStore:
+    global _state_store
+    if _state_store is None:
+        _state_store = KeepaStateStore()
+    return _state_store
@@ -10,6 +10,12 @@ This replaces polling 2,599 ASINs with:
 - One-time registration of trackings
 - Webhook endpoint to receive alerts
 - Periodic deals feed check (1 API call returns many drops)
+
+This is the one Keepa engine: the proxy embeds it (routes/keepa.py,
+mini_pc_runner.py) and KeepaTracker/main.py runs it standalone. Processes
+share one token scheduler per API key, the product cache, and the
+keepa_store state (alert dedup, Deals responses, monitor lease), so two
+processes never re-fetch or re-alert the same deals.
 """
 
 import os
@@ -17,12 +23,17 @@ import asyncio
 import logging
 import json
 import csv
-import httpx
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Tuple
+from typing import Callable, Dict, List, Optional, Tuple
 from dataclasses import dataclass, field
 from pathlib import Path
 
+from .keepa_alerts import AlertSink, DiscordWebhookSink, GRAPH_FILENAME, default_session
+from .keepa_analytics import ANALYSIS_FIELDS, KeepaMetrics, fee_breakdown, profit_potentials
+from .keepa_cache import CachedProduct, get_product_cache, keepa_now, product_params, GROUPS
+from .keepa_scheduler import KeepaScheduler, estimate_tokens
+from .keepa_store import ALERT_COOLDOWN_HOURS, AlertDeduplicator, DealPageCache, MonitorLease, get_state_store
+
 # ============================================================
 # CONFIGURATION
 # ============================================================
@@ -39,12 +50,12 @@ SP_API_MARKETPLACE_ID = "ATVPDKIKX0DER"  # US marketplace
 # Keepa API base URL
 KEEPA_API_BASE = "https://api.keepa.com"
 
-# Rate limiting
-RATE_LIMIT_INTERVAL = 2  # seconds between calls
+# Rate limiting: calls are paced by Keepa's token bucket (keepa_scheduler)
+# and concurrent product lookups are batched up to this many ASINs per call
+PRODUCT_BATCH_SIZE = 100
 
-# Alert deduplication settings
-ALERT_COOLDOWN_HOURS = 24  # Don't re-alert same ASIN within this period
-ALERTED_ASINS_FILE = "alerted_asins.json"
+# Deals monitor lease name (one monitor across all processes sharing keepa_store)
+MONITOR_LEASE = "deals_monitor"
 
 # Analysis thresholds
 MIN_MONTHLY_SALES = 50  # Minimum estimated monthly sales (lowered from 100)
@@ -143,87 +154,93 @@ def is_known_brand(brand: str) -> bool:
 # ALERT DEDUPLICATION
 # ============================================================
 
-class AlertDeduplicator:
-    """
-    Prevents duplicate Discord alerts for the same ASIN.
-    Persists to JSON file to survive restarts.
-    """
+# Global deduplicator instance
+_deduplicator: Optional[AlertDeduplicator] = None
 
-    def __init__(self, filepath: str = ALERTED_ASINS_FILE):
-        self.filepath = Path(filepath)
-        self.alerted: Dict[str, str] = {}  # ASIN -> ISO timestamp
-        self._load()
 
-    def _load(self):
-        """Load alerted ASINs from file"""
-        if self.filepath.exists():
-            try:
-                with open(self.filepath, 'r') as f:
-                    data = json.load(f)
-                    self.alerted = data.get("alerted", {})
-                    # Clean up old entries
-                    self._cleanup()
-                    logger.info(f"[DEDUP] Loaded {len(self.alerted)} alerted ASINs")
-            except Exception as e:
-                logger.error(f"[DEDUP] Error loading: {e}")
-                self.alerted = {}
+def get_deduplicator() -> AlertDeduplicator:
+    """Get or create the global deduplicator"""
+    global _deduplicator
+    if _deduplicator is None:
+        _deduplicator = AlertDeduplicator()
+    return _deduplicator
 
-    def _save(self):
-        """Save alerted ASINs to file"""
-        try:
-            with open(self.filepath, 'w') as f:
-                json.dump({"alerted": self.alerted, "updated": datetime.now().isoformat()}, f, indent=2)
-        except Exception as e:
-            logger.error(f"[DEDUP] Error saving: {e}")
-
-    def _cleanup(self):
-        """Remove entries older than cooldown period"""
-        cutoff = datetime.now() - timedelta(hours=ALERT_COOLDOWN_HOURS)
-        old_count = len(self.alerted)
-        self.alerted = {
-            asin: ts for asin, ts in self.alerted.items()
-            if datetime.fromisoformat(ts) > cutoff
-        }
-        removed = old_count - len(self.alerted)
-        if removed > 0:
-            logger.info(f"[DEDUP] Cleaned up {removed} expired entries")
 
-    def should_alert(self, asin: str) -> bool:
-        """Check if we should send alert for this ASIN"""
-        if asin not in self.alerted:
-            return True
+# ============================================================
+# SHARED ENGINE STATE
+# ============================================================
 
-        last_alert = datetime.fromisoformat(self.alerted[asin])
-        cooldown = timedelta(hours=ALERT_COOLDOWN_HOURS)
+# HTTP session factory: (pool name, timeout) -> async context manager.
+# main.py passes http_clients.session so the embedded engine uses the proxy's pools.
+_http_session: Callable = default_session
 
-        if datetime.now() - last_alert > cooldown:
-            return True
+# Alert delivery; defaults to the Discord webhook when one is configured
+_alert_sink: Optional[AlertSink] = None
 
-        return False
+# One token scheduler per API key, shared by every client in the process
+_schedulers: Dict[str, KeepaScheduler] = {}
+_api_stats: Dict[str, Dict] = {}
 
-    def mark_alerted(self, asin: str):
-        """Mark ASIN as alerted"""
-        self.alerted[asin] = datetime.now().isoformat()
-        self._save()
+# Deals API responses shared with other processes through keepa_store
+_deal_cache: Optional[DealPageCache] = None
 
-    def get_stats(self) -> Dict:
-        """Get deduplication stats"""
-        return {
-            "total_tracked": len(self.alerted),
-            "cooldown_hours": ALERT_COOLDOWN_HOURS,
-        }
 
+def configure_engine(http_session: Callable = None, alert_sink: AlertSink = None):
+    """Inject the host's HTTP session factory and/or alert sink"""
+    global _http_session, _alert_sink
+    if http_session is not None:
+        _http_session = http_session
+    if alert_sink is not None:
+        _alert_sink = alert_sink
 
-# Global deduplicator instance
-_deduplicator: Optional[AlertDeduplicator] = None
 
+def get_alert_sink() -> Optional[AlertSink]:
+    """Configured alert sink (None = alerts disabled)"""
+    global _alert_sink
+    if _alert_sink is None and DISCORD_WEBHOOK_URL:
+        _alert_sink = DiscordWebhookSink(DISCORD_WEBHOOK_URL, session=lambda name, timeout=None: _http_session(name, timeout))
+    return _alert_sink
 
-def get_deduplicator() -> AlertDeduplicator:
-    """Get or create the global deduplicator"""
-    global _deduplicator
-    if _deduplicator is None:
-        _deduplicator = AlertDeduplicator()
-    return _deduplicator
+
+def get_deal_cache() -> DealPageCache:
+    global _deal_cache
+    if _deal_cache is None:
+        _deal_cache = DealPageCache(get_state_store())
+    return _deal_cache
+
+
+async def _keepa_request(api_key: str, endpoint: str, params: Dict) -> Tuple[int, Dict]:
+    """One HTTP round trip to Keepa (pacing is the scheduler's job)"""
+    url = f"{KEEPA_API_BASE}/{endpoint}"
+    params = {**params, "key": api_key}
+    stats = _api_stats.setdefault(api_key, {"api_calls": 0, "tokens_left": 0})
+
+    try:
+        async with _http_session("keepa", 30.0) as client:
+            response = await client.get(url, params=params)
+            stats["api_calls"] += 1
+            try:
+                data = response.json()
+            except ValueError:
+                data = {}
+
+            if response.status_code == 200:
+                stats["tokens_left"] = data.get("tokensLeft", 0)
+            elif response.status_code != 429:
+                logger.error(f"[KEEPA] API error {response.status_code}: {response.text}")
+            return response.status_code, data
+    except Exception as e:
+        logger.error(f"[KEEPA] Request error: {e}")
+        return 0, {}
+
+
+def get_scheduler(api_key: str) -> KeepaScheduler:
+    """Token scheduler for an API key (Keepa's bucket is per key, not per client)"""
+    if api_key not in _schedulers:
+        async def fetch(endpoint: str, params: Dict) -> Tuple[int, Dict]:
+            return await _keepa_request(api_key, endpoint, params)
+        _schedulers[api_key] = KeepaScheduler(fetch, max_batch=PRODUCT_BATCH_SIZE)
+    return _schedulers[api_key]
 
 
 # ============================================================
@@ -249,6 +266,7 @@ class ProductAnalysis:
     price_is_anomaly: bool = False  # True if current price is unusually low
     historical_low: float = 0.0
     historical_high: float = 0.0
+    price_volatility_90d: float = 0.0  # std / mean of in-stock new prices over 90 days
 
     # Sales Velocity
     estimated_monthly_sales: int = 0
@@ -261,6 +279,7 @@ class ProductAnalysis:
     fbm_seller_count: int = 0
     amazon_on_listing: bool = False
     buy_box_price: float = 0.0
+    buy_box_amazon_share: float = 0.0  # Share of the last 90 days Amazon held the buy box
 
     # Brand info
     brand: str = ""
@@ -271,11 +290,42 @@ class ProductAnalysis:
     recommendation: str = ""  # "STRONG BUY", "BUY", "RESEARCH", "PASS"
     flags: List[str] = field(default_factory=list)  # Warning flags
 
-    def calculate_flip_score(self):
-        """Calculate overall flip score based on all factors"""
+    def load_keepa(self, product: Optional[CachedProduct] = None,
+                   metrics: Optional[KeepaMetrics] = None, row: int = 0):
+        """
+        Fill the price / rank / competition fields from a cached Keepa
+        product, or from its row of a batch already run through
+        KeepaMetrics (keepa_analytics).
+        """
+        if metrics is None:
+            metrics = KeepaMetrics.from_products([product], keepa_now())
+            row = 0
+        values = metrics.row(row)
+        for name in ANALYSIS_FIELDS:
+            setattr(self, name, values[name])
+
+        # Brand extraction
+        if values["brand"]:
+            self.brand = values["brand"]
+
+    def calculate_flip_score(self, product: Optional[CachedProduct] = None,
+                             metrics: Optional[KeepaMetrics] = None, row: int = 0):
+        """
+        Calculate overall flip score based on all factors.
+
+        With a cached Keepa product (or a KeepaMetrics batch row) the inputs
+        are re-derived from its history arrays first (load_keepa).
+        """
         score = 50  # Start neutral
         self.flags = []
 
+        if product is not None or metrics is not None:
+            try:
+                self.load_keepa(product, metrics, row)
+            except Exception as e:
+                logger.error(f"[KEEPA] Error analyzing product {self.asin}: {e}")
+                self.flags.append(f"PARSE_ERROR: {str(e)[:50]}")
+
         # Gating check (-50 if gated)
         if self.is_gated:
             score -= 50
@@ -355,10 +405,12 @@ class ProductAnalysis:
             "avg_price_180d": self.avg_price_180d,
             "price_stability_score": self.price_stability_score,
             "price_is_anomaly": self.price_is_anomaly,
+            "price_volatility_90d": self.price_volatility_90d,
             "estimated_monthly_sales": self.estimated_monthly_sales,
             "sales_rank_avg_90d": self.sales_rank_avg_90d,
             "fba_seller_count": self.fba_seller_count,
             "amazon_on_listing": self.amazon_on_listing,
+            "buy_box_amazon_share": self.buy_box_amazon_share,
             "flip_score": self.flip_score,
             "recommendation": self.recommendation,
             "flags": self.flags,
@@ -475,88 +527,31 @@ class PriceDrop:
         """
         Estimated profit using category-specific Amazon fees
 
-        Fee structure:
+        Fee structure (keepa_analytics.fee_breakdown):
         - Referral fee: varies by category (8-17%, most 15%)
         - FBA fee: based on size tier (~$3.22 small standard, ~$4.75 large standard)
         - Inbound placement: ~$0.27 avg per unit
+
+        profit_potentials() computes this for a whole list of deals at once.
         """
         if self.target_price <= self.current_price:
             return 0
 
-        sell_price = self.target_price
-        buy_price = self.current_price
-
-        # Category-specific referral fees (Amazon 2024 rates)
-        referral_rates = {
-            'shoes': 0.15,       # 15% footwear
-            'clothing': 0.17,   # 17% apparel
-            'toys': 0.15,       # 15% toys
-            'electronics': 0.08, # 8% consumer electronics
-            'video_games': 0.15, # 15% video games
-            'home': 0.15,       # 15% home & kitchen
-            'sports': 0.15,     # 15% sports
-            'beauty': 0.15,     # 8-15% beauty (using 15% as conservative)
-            'grocery': 0.15,    # 8-15% grocery
-            'general': 0.15,    # Default 15%
-        }
-
-        # FBA fulfillment fees (small standard as base, ~$3.22-$5.40)
-        # Using tiered estimate based on sell price as proxy for size
-        if sell_price < 20:
-            fba_fee = 3.22  # Small standard
-        elif sell_price < 50:
-            fba_fee = 4.75  # Large standard small
-        elif sell_price < 100:
-            fba_fee = 5.40  # Large standard medium
-        else:
-            fba_fee = 6.50  # Large standard large
-
-        # Inbound placement fee (~$0.27 avg)
-        inbound_fee = 0.27
-
-        # Calculate fees
-        category_key = self.product_category if self.product_category in referral_rates else 'general'
-        referral_fee = sell_price * referral_rates[category_key]
-
-        # Minimum referral fee is $0.30
-        referral_fee = max(referral_fee, 0.30)
-
-        total_fees = referral_fee + fba_fee + inbound_fee
-
-        profit = sell_price - buy_price - total_fees
-        return profit
+        fees = fee_breakdown(self.target_price, self.product_category)
+        return self.target_price - self.current_price - fees['total_fees']
 
     @property
     def estimated_fees(self) -> Dict:
         """Return breakdown of estimated fees"""
-        sell_price = self.target_price
-
-        referral_rates = {
-            'shoes': 0.15, 'clothing': 0.17, 'toys': 0.15, 'electronics': 0.08,
-            'video_games': 0.15, 'home': 0.15, 'sports': 0.15, 'beauty': 0.15,
-            'grocery': 0.15, 'general': 0.15,
-        }
-
-        if sell_price < 20:
-            fba_fee = 3.22
-        elif sell_price < 50:
-            fba_fee = 4.75
-        elif sell_price < 100:
-            fba_fee = 5.40
-        else:
-            fba_fee = 6.50
-
-        category_key = self.product_category if self.product_category in referral_rates else 'general'
-        referral_fee = max(sell_price * referral_rates[category_key], 0.30)
-
+        fees = fee_breakdown(self.target_price, self.product_category)
         return {
-            'referral_fee': round(referral_fee, 2),
-            'fba_fee': fba_fee,
-            'inbound_fee': 0.27,
-            'total_fees': round(referral_fee + fba_fee + 0.27, 2),
-            'referral_rate': referral_rates[category_key],
+            'referral_fee': round(fees['referral_fee'], 2),
+            'fba_fee': fees['fba_fee'],
+            'inbound_fee': fees['inbound_fee'],
+            'total_fees': round(fees['total_fees'], 2),
+            'referral_rate': fees['referral_rate'],
         }
-    
+
     def to_dict(self) -> Dict:
         fees = self.estimated_fees
         return {
@@ -621,50 +616,21 @@ class KeepaClientV2:
         self.api_key = api_key or KEEPA_API_KEY
         self.tracked_products: Dict[str, TrackedProduct] = {}  # ASIN -> Product
         self.tracked_brands: Dict[str, List[str]] = {}  # Brand -> List of ASINs
-        self._last_call = 0
+        self.scheduler = get_scheduler(self.api_key)
+        self.product_cache = get_product_cache()
 
-        # Stats
+        # Stats (api_calls / tokens_left are per API key, see _keepa_request)
         self.stats = {
-            "api_calls": 0,
-            "tokens_left": 0,
             "deals_checked": 0,
+            "deal_cache_hits": 0,
             "alerts_sent": 0,
             "last_check": None,
             "brands_tracked": 0,
         }
     
-    async def _rate_limit(self):
-        """Respect rate limits"""
-        import time
-        now = time.time()
-        elapsed = now - self._last_call
-        if elapsed < RATE_LIMIT_INTERVAL:
-            await asyncio.sleep(RATE_LIMIT_INTERVAL - elapsed)
-        self._last_call = time.time()
-    
     async def _api_call(self, endpoint: str, params: Dict = None) -> Dict:
-        """Make API call to Keepa"""
-        await self._rate_limit()
-        
-        url = f"{KEEPA_API_BASE}/{endpoint}"
-        params = params or {}
-        params["key"] = self.api_key
-        
-        try:
-            async with httpx.AsyncClient(timeout=30.0) as client:
-                response = await client.get(url, params=params)
-                self.stats["api_calls"] += 1
-                
-                if response.status_code == 200:
-                    data = response.json()
-                    self.stats["tokens_left"] = data.get("tokensLeft", 0)
-                    return data
-                else:
-                    logger.error(f"[KEEPA] API error {response.status_code}: {response.text}")
-                    return {}
-        except Exception as e:
-            logger.error(f"[KEEPA] Request error: {e}")
-            return {}
+        """Make API call to Keepa, waiting for tokens if the bucket is low"""
+        return await self.scheduler.call(endpoint, params or {})
     
     def load_tracked_products_csv(self, filepath: str):
         """Load products from FlipAlert CSV export with target prices"""
@@ -801,14 +767,23 @@ class KeepaClientV2:
         elif exclude_categories:
             selection["excludeCategories"] = exclude_categories
 
-        deal_params = {
-            "domain": domain_id,
-            "selection": json.dumps(selection),
-        }
-        
-        data = await self._api_call("deal", deal_params)
-        
-        deals = data.get("deals", {}).get("dr", [])
+        # Another process (or caller) may have fetched this exact selection moments ago
+        deal_cache = get_deal_cache()
+        deals = await asyncio.to_thread(deal_cache.get, selection)
+        if deals is not None:
+            self.stats["deal_cache_hits"] += 1
+        else:
+            deal_params = {
+                "domain": domain_id,
+                "selection": json.dumps(selection),
+            }
+
+            data = await self._api_call("deal", deal_params)
+
+            deals = data.get("deals", {}).get("dr", [])
+            if "deals" in data:
+                await asyncio.to_thread(deal_cache.put, selection, deals)
+
         self.stats["deals_checked"] += len(deals)
         self.stats["last_check"] = datetime.now()
         
@@ -1418,9 +1393,40 @@ class KeepaClientV2:
     # PRODUCT API - Detailed product analysis
     # ========================================================
 
-    async def get_product_details(self, asin: str, domain: str = "US") -> Optional[Dict]:
+    async def get_cached_product(self, asin: str, domain: str = "US",
+                                 priority: float = 0.0) -> Optional[CachedProduct]:
+        """
+        Product data from the local Keepa cache (keepa_cache), refreshing
+        only the field groups past their TTL: histories rarely, stats
+        sometimes, offers / buy box often. A fresh product costs no tokens.
+
+        Concurrent refreshes are batched into multi-ASIN requests by the
+        scheduler; higher priority ASINs are fetched first when tokens run low.
+        """
+        asin = asin.upper().strip()
+        domain_id = self._domain_to_id(domain)
+        entry = await self.product_cache.aget(asin, domain_id)
+        stale = self.product_cache.stale_groups(entry)
+
+        params = product_params(domain_id, stale)
+        full_cost = estimate_tokens("product", product_params(domain_id, set(GROUPS)))
+        self.product_cache.record_savings(full_cost - (estimate_tokens("product", params) if stale else 0))
+        if not stale:
+            return entry
+
+        try:
+            product = await self.scheduler.product(asin, params, priority=priority)
+        except Exception as e:
+            logger.error(f"[KEEPA] Product lookup error for {asin}: {e}")
+            product = None
+
+        if not product:
+            return entry  # stale data beats none
+        return await self.product_cache.aput(asin, domain_id, product, stale)
+
+    async def get_product_details(self, asin: str, domain: str = "US", priority: float = 0.0) -> Optional[Dict]:
         """
-        Fetch detailed product data from Keepa Product API.
+        Fetch detailed product data from Keepa Product API (via the cache).
 
         Returns comprehensive data including:
         - Price history (Amazon, New, Used, FBA)
@@ -1428,24 +1434,13 @@ class KeepaClientV2:
         - Offer counts
         - Buy box statistics
 
-        Note: Costs 1 token per product (vs 50 for deals)
+        Note: A full refresh costs 1 token per product plus 6 per 10 offers
+        (vs 5 for deals); cached field groups cost nothing.
         """
-        params = {
-            "asin": asin,
-            "domain": self._domain_to_id(domain),
-            "stats": 180,  # Get 180-day statistics
-            "history": 1,  # Include price history
-            "offers": 20,  # Include offer data
-            "rating": 1,   # Include review data
-        }
-
-        data = await self._api_call("product", params)
+        entry = await self.get_cached_product(asin, domain, priority=priority)
+        return entry.to_product() if entry else None
 
-        if data.get("products"):
-            return data["products"][0]
-        return None
-
-    async def analyze_product(self, asin: str) -> ProductAnalysis:
+    async def analyze_product(self, asin: str, priority: float = 0.0) -> ProductAnalysis:
         """
         Perform comprehensive analysis of a product for flip potential.
 
@@ -1455,136 +1450,42 @@ class KeepaClientV2:
         - Seller competition
         - Buy box ownership
         """
-        analysis = ProductAnalysis(asin=asin)
-
-        # Fetch detailed product data
-        product = await self.get_product_details(asin)
+        return (await self.analyze_products([asin], [priority]))[0]
 
-        if not product:
-            analysis.flags.append("NO_DATA")
-            analysis.recommendation = "RESEARCH - No Keepa data"
-            return analysis
+    async def analyze_products(self, asins: List[str],
+                               priorities: Optional[List[float]] = None) -> List[ProductAnalysis]:
+        """
+        analyze_product for many ASINs: the lookups go out together (so the
+        scheduler batches them, highest priority first) and every product's
+        history is scored in one vectorized pass (keepa_analytics).
+        """
+        priorities = priorities if priorities is not None else [0.0] * len(asins)
+        entries = await asyncio.gather(*(
+            self.get_cached_product(asin, priority=priority) for asin, priority in zip(asins, priorities)
+        ))
 
-        # Parse price history and statistics
+        found = [entry for entry in entries if entry]
         try:
-            stats = product.get("stats", {})
-            csv_data = product.get("csv", [])
-
-            # === PRICE ANALYSIS ===
-            # Keepa stores prices in cents, -1 means no data
-            # csv indices: 0=Amazon, 1=New, 2=Used, 7=New FBA, 18=Buy Box
-
-            # Get 90/180 day averages from stats
-            if stats:
-                # New price averages (index 1)
-                avg_90 = stats.get("avg90", [[]])[1] if len(stats.get("avg90", [[]])) > 1 else None
-                avg_180 = stats.get("avg180", [[]])[1] if len(stats.get("avg180", [[]])) > 1 else None
-
-                if avg_90 and avg_90 > 0:
-                    analysis.avg_price_90d = avg_90 / 100.0
-                if avg_180 and avg_180 > 0:
-                    analysis.avg_price_180d = avg_180 / 100.0
-
-                # Min/Max prices
-                min_prices = stats.get("min", [])
-                max_prices = stats.get("max", [])
-                if len(min_prices) > 1 and min_prices[1] > 0:
-                    analysis.historical_low = min_prices[1] / 100.0
-                if len(max_prices) > 1 and max_prices[1] > 0:
-                    analysis.historical_high = max_prices[1] / 100.0
-
-            # Calculate price stability score
-            if analysis.avg_price_90d > 0 and analysis.historical_high > 0:
-                price_range = analysis.historical_high - analysis.historical_low
-                if analysis.historical_high > 0:
-                    volatility = price_range / analysis.historical_high
-                    analysis.price_stability_score = max(0, min(100, 100 - (volatility * 100)))
-
-            # Check if current price is anomaly (30%+ below 90-day avg)
-            current_prices = stats.get("current", []) if stats else []
-            current_new = current_prices[1] / 100.0 if len(current_prices) > 1 and current_prices[1] > 0 else 0
-
-            if current_new > 0 and analysis.avg_price_90d > 0:
-                discount_from_avg = (analysis.avg_price_90d - current_new) / analysis.avg_price_90d
-                if discount_from_avg >= 0.30:  # 30% or more below average
-                    analysis.price_is_anomaly = True
-
-            # === SALES RANK ANALYSIS ===
-            analysis.sales_rank_current = get_current_rank(product)
-
-            # Get 90-day average rank
-            if stats:
-                avg_rank = stats.get("avg90", [])
-                if len(avg_rank) > 0:
-                    # Sales rank is at different index depending on category
-                    rank_idx = len(avg_rank) - 1  # Usually last element
-                    if avg_rank[rank_idx] and avg_rank[rank_idx] > 0:
-                        analysis.sales_rank_avg_90d = avg_rank[rank_idx]
-
-            # Estimate monthly sales from rank (rough category-independent formula)
-            # Based on empirical data: Sales ≈ (Category_Constant / Rank) ^ 0.6
-            # This is a simplified estimate - real calculation varies by category
-            if analysis.sales_rank_current > 0:
-                rank = analysis.sales_rank_current
-                if rank <= 1000:
-                    analysis.estimated_monthly_sales = int(500 * (1000 / rank) ** 0.5)
-                elif rank <= 10000:
-                    analysis.estimated_monthly_sales = int(200 * (10000 / rank) ** 0.6)
-                elif rank <= 100000:
-                    analysis.estimated_monthly_sales = int(50 * (100000 / rank) ** 0.7)
-                elif rank <= 500000:
-                    analysis.estimated_monthly_sales = int(10 * (500000 / rank) ** 0.8)
-                else:
-                    analysis.estimated_monthly_sales = max(1, int(5 * (1000000 / rank)))
-
-            # Count rank drops in 30 days (approximates sales)
-            # Each significant rank drop typically indicates a sale
-            if csv_data and len(csv_data) > 3:  # Sales rank is index 3
-                rank_history = csv_data[3] if len(csv_data) > 3 else []
-                if rank_history:
-                    drops = 0
-                    for i in range(2, len(rank_history), 2):  # Every other is value
-                        if i + 2 < len(rank_history):
-                            if rank_history[i] > 0 and rank_history[i + 2] > 0:
-                                if rank_history[i + 2] < rank_history[i]:  # Rank improved
-                                    drops += 1
-                    analysis.sales_rank_drops_30d = drops
-
-            # === SELLER COMPETITION ===
-            # Offer counts
-            offer_counts = product.get("offerCountNew", 0)
-            offer_counts_fba = product.get("offerCountFBA", 0)
-            analysis.fba_seller_count = offer_counts_fba if offer_counts_fba else 0
-            analysis.fbm_seller_count = max(0, (offer_counts or 0) - analysis.fba_seller_count)
-
-            # Check if Amazon is selling
-            if csv_data and len(csv_data) > 0:
-                amazon_prices = csv_data[0]  # Index 0 is Amazon price
-                if amazon_prices:
-                    # Check last few entries for Amazon presence
-                    recent_amazon = amazon_prices[-2] if len(amazon_prices) >= 2 else -1
-                    if recent_amazon > 0:
-                        analysis.amazon_on_listing = True
-
-            # Buy box price
-            if stats and "buyBoxPrice" in stats:
-                bb = stats["buyBoxPrice"]
-                if bb and bb > 0:
-                    analysis.buy_box_price = bb / 100.0
-
-            # Brand extraction
-            brand = product.get("brand", "")
-            if brand:
-                analysis.brand = brand
-
+            metrics = KeepaMetrics.from_products(found, keepa_now())
         except Exception as e:
-            logger.error(f"[KEEPA] Error analyzing product {asin}: {e}")
-            analysis.flags.append(f"PARSE_ERROR: {str(e)[:50]}")
-
-        # Calculate final flip score
-        analysis.calculate_flip_score()
-
-        return analysis
+            # One malformed product: score them one by one so only it gets PARSE_ERROR
+            logger.error(f"[KEEPA] Batch analysis failed, falling back per product: {e}")
+            metrics = None
+
+        analyses = []
+        row = 0
+        for asin, entry in zip(asins, entries):
+            analysis = ProductAnalysis(asin=asin)
+            if not entry:
+                analysis.flags.append("NO_DATA")
+                analysis.recommendation = "RESEARCH - No Keepa data"
+            elif metrics is not None:
+                analysis.calculate_flip_score(metrics=metrics, row=row)
+                row += 1
+            else:
+                analysis.calculate_flip_score(entry)
+            analyses.append(analysis)
+        return analyses
 
     async def analyze_and_filter_deals(
         self,
@@ -1603,9 +1504,11 @@ class KeepaClientV2:
         """
         results = []
 
-        for deal in deals:
-            analysis = await self.analyze_product(deal.asin)
+        # One batched lookup and one vectorized scoring pass, best deals fetched first
+        profits = profit_potentials(deals)
+        analyses = await self.analyze_products([deal.asin for deal in deals], profits.tolist())
 
+        for deal, analysis in zip(deals, analyses):
             if analysis.flip_score >= min_flip_score:
                 results.append((deal, analysis))
                 logger.info(f"[KEEPA] ✓ {deal.asin} - Score {analysis.flip_score}: {analysis.recommendation}")
@@ -1641,7 +1544,7 @@ class KeepaClientV2:
                 "client_secret": SP_API_CLIENT_SECRET,
             }
 
-            async with httpx.AsyncClient() as client:
+            async with _http_session("keepa") as client:
                 token_response = await client.post(token_url, data=token_data)
                 if token_response.status_code != 200:
                     return (None, "Failed to get access token")
@@ -1718,11 +1621,15 @@ class KeepaClientV2:
         )[:10]
 
         return {
+            **_api_stats.get(self.api_key, {"api_calls": 0, "tokens_left": 0}),
             **self.stats,
             "tracked_products": len(self.tracked_products),
             "tracked_brands": len(self.tracked_brands),
             "top_brands": top_brands,
             "last_check": self.stats["last_check"].isoformat() if self.stats["last_check"] else None,
+            "tokens": self.scheduler.get_stats(),
+            "product_cache": self.product_cache.get_stats(),
+            "deal_cache": get_deal_cache().get_stats(),
         }
 
 
@@ -1748,7 +1655,8 @@ async def send_discord_alert(
     Returns:
         True if alert was sent, False if skipped/failed
     """
-    if not DISCORD_WEBHOOK_URL:
+    sink = get_alert_sink()
+    if sink is None:
         return False
 
     # Check deduplication
@@ -1793,9 +1701,15 @@ async def send_discord_alert(
         title_prefix = source if source else "🔥 Price Drop"
         fields.extend([
             {"name": "Drop %", "value": f"{drop.drop_percent:.1f}%", "inline": True},
+            {"name": "90 Day Avg", "value": f"${drop.previous_price:.2f}" if drop.previous_price > 0 else "N/A", "inline": True},
             {"name": "Sales Rank", "value": f"{drop.sales_rank:,}", "inline": True},
         ])
 
+    # Add Keepa link with item title (clickable link to Keepa graph)
+    keepa_url = f"https://keepa.com/#!product/1-{drop.asin}"
+    short_title = drop.title[:50] + "..." if len(drop.title) > 50 else drop.title
+    fields.append({"name": "Keepa Graph", "value": f"[{short_title}]({keepa_url})", "inline": False})
+
     embed = {
         "title": f"{title_prefix}: ${drop.current_price:.2f}",
         "description": drop.title[:200],
@@ -1812,16 +1726,11 @@ async def send_discord_alert(
         "embeds": [embed],
     }
 
-    try:
-        async with httpx.AsyncClient() as client:
-            response = await client.post(DISCORD_WEBHOOK_URL, json=payload, timeout=10.0)
-            if response.status_code in (200, 204):
-                # Mark as alerted AFTER successful send
-                dedup.mark_alerted(drop.asin)
-                logger.info(f"[KEEPA] Discord alert sent for {drop.asin}")
-                return True
-    except Exception as e:
-        logger.error(f"[KEEPA] Discord error: {e}")
+    if await sink.send(drop.asin, payload):
+        # Mark as alerted AFTER successful send
+        dedup.mark_alerted(drop.asin)
+        logger.info(f"[KEEPA] {sink.name} alert sent for {drop.asin}")
+        return True
 
     return False
 
@@ -1833,7 +1742,8 @@ async def send_brand_opportunity_alert(opportunity: Dict) -> bool:
     Returns:
         True if alert was sent, False if skipped/failed
     """
-    if not DISCORD_WEBHOOK_URL:
+    sink = get_alert_sink()
+    if sink is None:
         return False
 
     # Check deduplication
@@ -1858,6 +1768,7 @@ async def send_brand_opportunity_alert(opportunity: Dict) -> bool:
             {"name": "Brand", "value": opportunity['brand'].title(), "inline": True},
             {"name": "Sales Rank", "value": f"{opportunity['sales_rank']:,}", "inline": True},
             {"name": "Category", "value": opportunity['category'], "inline": True},
+            {"name": "Keepa Graph", "value": f"[{opportunity['title'][:50]}...](https://keepa.com/#!product/1-{asin})", "inline": False},
         ],
         "footer": {"text": f"ASIN: {asin} | {opportunity['reason']}"},
         "timestamp": datetime.now().isoformat(),
@@ -1868,16 +1779,11 @@ async def send_brand_opportunity_alert(opportunity: Dict) -> bool:
         "embeds": [embed],
     }
 
-    try:
-        async with httpx.AsyncClient() as client:
-            response = await client.post(DISCORD_WEBHOOK_URL, json=payload, timeout=10.0)
-            if response.status_code in (200, 204):
-                # Mark as alerted AFTER successful send
-                dedup.mark_alerted(asin)
-                logger.info(f"[KEEPA] Brand opportunity alert sent for {asin}")
-                return True
-    except Exception as e:
-        logger.error(f"[KEEPA] Discord error: {e}")
+    if await sink.send(asin, payload):
+        # Mark as alerted AFTER successful send
+        dedup.mark_alerted(asin)
+        logger.info(f"[KEEPA] Brand opportunity alert sent for {asin}")
+        return True
 
     return False
 
@@ -1896,7 +1802,8 @@ async def send_smart_deal_alert(score: 'DealScore', skip_dedup: bool = False) ->
     Returns:
         True if alert was sent, False if skipped/failed
     """
-    if not DISCORD_WEBHOOK_URL:
+    sink = get_alert_sink()
+    if sink is None:
         return False
 
     # Check deduplication
@@ -1983,7 +1890,7 @@ async def send_smart_deal_alert(score: 'DealScore', skip_dedup: bool = False) ->
             f"&amazon=1&new=1&salesrank=1&bb=1"
             f"&range=90&width=600&height=300"
         )
-        async with httpx.AsyncClient() as client:
+        async with _http_session("keepa") as client:
             graph_resp = await client.get(graph_url, timeout=10.0)
             if graph_resp.status_code == 200:
                 graph_image = graph_resp.content
@@ -1992,34 +1899,17 @@ async def send_smart_deal_alert(score: 'DealScore', skip_dedup: bool = False) ->
 
     # If we have graph image, attach it
     if graph_image:
-        embed["image"] = {"url": "attachment://keepa_graph.png"}
+        embed["image"] = {"url": f"attachment://{GRAPH_FILENAME}"}
 
     payload = {
         "username": "Smart Deal Analyzer",
         "embeds": [embed],
     }
 
-    try:
-        async with httpx.AsyncClient() as client:
-            if graph_image:
-                # Multipart form with image attachment
-                import io
-                files = {
-                    "file": ("keepa_graph.png", io.BytesIO(graph_image), "image/png"),
-                }
-                data = {
-                    "payload_json": json.dumps(payload),
-                }
-                response = await client.post(DISCORD_WEBHOOK_URL, data=data, files=files, timeout=15.0)
-            else:
-                response = await client.post(DISCORD_WEBHOOK_URL, json=payload, timeout=10.0)
-
-            if response.status_code in (200, 204):
-                dedup.mark_alerted(score.asin)
-                logger.info(f"[SMART] Discord alert sent for {score.asin} (Score: {score.total_score})")
-                return True
-    except Exception as e:
-        logger.error(f"[SMART] Discord error: {e}")
+    if await sink.send(score.asin, payload, attachment=graph_image):
+        dedup.mark_alerted(score.asin)
+        logger.info(f"[SMART] {sink.name} alert sent for {score.asin} (Score: {score.total_score})")
+        return True
 
     return False
 
@@ -2094,112 +1984,133 @@ async def start_deals_monitor(
     - Deduplication: Each ASIN only alerted once per 24 hours
     - Analysis: Optional detailed product analysis before alerting
     - Brand monitoring: Find deals from tracked brands
+    - Single monitor: processes sharing keepa_store take turns via a lease;
+      the others stand by instead of polling the same deals
     """
-    global _client
+    global _monitor_task
 
-    _client = KeepaClientV2()
-    _client.load_tracked_products_csv(csv_path)
+    _monitor_task = asyncio.current_task()
+    client = get_or_create_client()
+    client.load_tracked_products_csv(csv_path)
 
     # Save brands list for reference
-    _client.save_tracked_brands()
+    client.save_tracked_brands()
 
     # Initialize deduplicator
     dedup = get_deduplicator()
+    lease = MonitorLease(get_state_store(), MONITOR_LEASE, ttl=check_interval * 2 + 60)
 
     logger.info(f"[KEEPA] Starting deals monitor (every {check_interval}s)")
-    logger.info(f"[KEEPA] Tracking {len(_client.tracked_products)} products from {len(_client.tracked_brands)} brands")
+    logger.info(f"[KEEPA] Tracking {len(client.tracked_products)} products from {len(client.tracked_brands)} brands")
     logger.info(f"[KEEPA] Analysis: {'ENABLED' if enable_analysis else 'DISABLED'}, Min flip score: {min_flip_score}")
     logger.info(f"[KEEPA] Deduplication: {dedup.get_stats()}")
 
     cycle_count = 0
+    standing_by = False
 
-    while True:
-        try:
-            cycle_count += 1
-            alerts_sent = 0
-            alerts_skipped = 0
-
-            # Check deals against our tracked ASIN list
-            matches = await _client.check_deals_against_tracked()
-
-            # Filter and send alerts
-            for drop in matches:
-                analysis = None
-
-                if enable_analysis:
-                    # Perform detailed analysis
-                    analysis = await _client.analyze_product(drop.asin)
-
-                    # Skip if flip score too low
-                    if analysis.flip_score < min_flip_score:
-                        logger.info(f"[KEEPA] Skipping {drop.asin} - Flip score {analysis.flip_score} < {min_flip_score}")
+    try:
+        while True:
+            try:
+                if not lease.acquire():
+                    if not standing_by:
+                        logger.info(f"[KEEPA] Monitor running in {lease.holder()}, standing by")
+                        standing_by = True
+                    await asyncio.sleep(check_interval)
+                    continue
+                standing_by = False
+
+                cycle_count += 1
+                alerts_sent = 0
+                alerts_skipped = 0
+
+                # Check deals against our tracked ASIN list
+                matches = await client.check_deals_against_tracked()
+
+                # Detailed analysis for every match at once (batched product lookups)
+                analyses = [None] * len(matches)
+                if enable_analysis and matches:
+                    analyses = await client.analyze_products(
+                        [drop.asin for drop in matches], profit_potentials(matches).tolist()
+                    )
+
+                # Filter and send alerts
+                for drop, analysis in zip(matches, analyses):
+                    if enable_analysis:
+                        # Skip if flip score too low
+                        if analysis.flip_score < min_flip_score:
+                            logger.info(f"[KEEPA] Skipping {drop.asin} - Flip score {analysis.flip_score} < {min_flip_score}")
+                            alerts_skipped += 1
+                            continue
+
+                    # Send alert (deduplication handled inside)
+                    if await send_discord_alert(drop, analysis):
+                        alerts_sent += 1
+                        client.stats["alerts_sent"] += 1
+                    else:
                         alerts_skipped += 1
-                        continue
 
-                # Send alert (deduplication handled inside)
-                if await send_discord_alert(drop, analysis):
-                    alerts_sent += 1
-                    _client.stats["alerts_sent"] += 1
-                else:
-                    alerts_skipped += 1
-
-            # Every N cycles, also check brand-based opportunities
-            brand_alerts_sent = 0
-            if enable_brand_monitoring and cycle_count % brand_check_interval == 0:
-                brand_opportunities = await _client.check_deals_by_brand(
-                    min_profit=25.0,  # Raised from $5 - brand opportunities need real margin
-                    max_sales_rank=300000,  # Expanded from 150K
+                # Every N cycles, also check brand-based opportunities
+                brand_alerts_sent = 0
+                if enable_brand_monitoring and cycle_count % brand_check_interval == 0:
+                    brand_opportunities = await client.check_deals_by_brand(
+                        min_profit=25.0,  # Raised from $5 - brand opportunities need real margin
+                        max_sales_rank=300000,  # Expanded from 150K
+                    )
+
+                    # Send alerts for brand opportunities (limit to top 5 to avoid spam)
+                    for opp in brand_opportunities[:5]:
+                        if await send_brand_opportunity_alert(opp):
+                            brand_alerts_sent += 1
+
+                # Open Discovery - Find ANY profitable deal (40%+ discount)
+                open_discovery_sent = 0
+                if enable_open_discovery and cycle_count % open_discovery_interval == 0:
+                    open_deals = await client.check_open_discovery_deals(
+                        min_discount_pct=40.0,  # 40% minimum discount
+                        min_profit=5.0,
+                        max_sales_rank=500000,
+                        price_range=(1000, 10000),  # $10-$100
+                    )
+
+                    # Send alerts for open discovery (limit to top 5)
+                    for deal in open_deals[:5]:
+                        asin = deal["asin"]
+                        if dedup.should_alert(asin):
+                            # Create PriceDrop for alert
+                            price_drop = PriceDrop(
+                                asin=asin,
+                                title=deal["title"],
+                                current_price=deal["current_price"],
+                                previous_price=deal["previous_price"],
+                                target_price=deal["estimated_sell_price"],
+                                drop_percent=deal["discount_pct"],
+                                sales_rank=deal["sales_rank"],
+                                category=deal["category"],
+                                image_url="",
+                                amazon_url=deal["amazon_url"],
+                                product_category=deal["category"],
+                            )
+                            # Marked alerted inside on success
+                            if await send_discord_alert(price_drop, source="🔥 OPEN DISCOVERY"):
+                                open_discovery_sent += 1
+
+                # One write for every alert sent this cycle
+                await dedup.aflush()
+
+                logger.info(
+                    f"[KEEPA] Cycle {cycle_count}: "
+                    f"{len(matches)} matches, {alerts_sent} sent, {alerts_skipped} skipped"
+                    + (f", {brand_alerts_sent} brand alerts" if brand_alerts_sent else "")
+                    + (f", {open_discovery_sent} discovery alerts" if open_discovery_sent else "")
                 )
 
-                # Send alerts for brand opportunities (limit to top 5 to avoid spam)
-                for opp in brand_opportunities[:5]:
-                    if await send_brand_opportunity_alert(opp):
-                        brand_alerts_sent += 1
-
-            # Open Discovery - Find ANY profitable deal (40%+ discount)
-            open_discovery_sent = 0
-            if enable_open_discovery and cycle_count % open_discovery_interval == 0:
-                open_deals = await _client.check_open_discovery_deals(
-                    min_discount_pct=40.0,  # 40% minimum discount
-                    min_profit=5.0,
-                    max_sales_rank=500000,
-                    price_range=(1000, 10000),  # $10-$100
-                )
-
-                # Send alerts for open discovery (limit to top 5)
-                dedup = get_deduplicator()
-                for deal in open_deals[:5]:
-                    asin = deal["asin"]
-                    if dedup.should_alert(asin):
-                        # Create PriceDrop for alert
-                        price_drop = PriceDrop(
-                            asin=asin,
-                            title=deal["title"],
-                            current_price=deal["current_price"],
-                            previous_price=deal["previous_price"],
-                            target_price=deal["estimated_sell_price"],
-                            drop_percent=deal["discount_pct"],
-                            sales_rank=deal["sales_rank"],
-                            category=deal["category"],
-                            image_url="",
-                            amazon_url=deal["amazon_url"],
-                            product_category=deal["category"],
-                        )
-                        if await send_discord_alert(price_drop, source="🔥 OPEN DISCOVERY"):
-                            dedup.mark_alerted(asin)
-                            open_discovery_sent += 1
-
-            logger.info(
-                f"[KEEPA] Cycle {cycle_count}: "
-                f"{len(matches)} matches, {alerts_sent} sent, {alerts_skipped} skipped"
-                + (f", {brand_alerts_sent} brand alerts" if brand_alerts_sent else "")
-                + (f", {open_discovery_sent} discovery alerts" if open_discovery_sent else "")
-            )
-
-        except Exception as e:
-            logger.error(f"[KEEPA] Monitor error: {e}")
+            except Exception as e:
+                logger.error(f"[KEEPA] Monitor error: {e}")
 
-        await asyncio.sleep(check_interval)
+            await asyncio.sleep(check_interval)
+    finally:
+        dedup.flush()
+        lease.release()
 
 
 async def stop_monitor():
@@ -2216,6 +2127,20 @@ def get_client() -> Optional[KeepaClientV2]:
     return _client
 
 
+def set_client(client: Optional[KeepaClientV2]):
+    """Share a client created elsewhere (routes) with the monitor"""
+    global _client
+    _client = client
+
+
+def get_or_create_client() -> KeepaClientV2:
+    """The process-wide client, created on first use"""
+    global _client
+    if _client is None:
+        _client = KeepaClientV2()
+    return _client
+
+
 # ============================================================
 # CLI TESTING
 # ============================================================
@@ -10,6 +10,7 @@ from dotenv import load_dotenv
 load_dotenv()
 
 import os
+import sys
 import asyncio
 import logging
 from pathlib import Path
@@ -19,8 +20,10 @@ from fastapi import FastAPI, Request
 from fastapi.responses import HTMLResponse, JSONResponse
 import uvicorn
 
-# Import Keepa tracker module (after env is loaded)
-from keepa_tracker import (
+# Import the shared Keepa engine (after env is loaded); the package lives in
+# the repo root, so make it importable when run from this directory
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from KeepaTracker.keepa_tracker import (
     KeepaClientV2,
     start_deals_monitor,
     stop_monitor,
@@ -154,6 +157,8 @@ async def get_stats():
             "top_brands": stats.get("top_brands", []),
             "last_check": stats.get("last_check"),
             "dedup_stats": dedup.get_stats() if dedup else {},
+            # Token bucket: burn rate vs. refill, time to empty, batching
+            "tokens": stats.get("tokens", {}),
         }
     })
 
@@ -314,7 +319,6 @@ async def open_discovery(
                 asin = deal["asin"]
                 if deduplicator.should_alert(asin):
                     # Create PriceDrop for alert
-                    from keepa_tracker import PriceDrop
                     price_drop = PriceDrop(
                         asin=asin,
                         title=deal["title"],
@@ -21,6 +21,8 @@ from .pens import PensAgent
 from .industrial import IndustrialAgent
 from .allen_bradley import AllenBradleyAgent
 
+from utils.keyword_matcher import KeywordMatcher
+
 # Agent registry
 AGENTS = {
     "gold": GoldAgent,
@@ -44,6 +46,122 @@ def get_agent(category: str):
     """Get the agent class for a category"""
     return AGENTS.get(category, SilverAgent)
 
+
+# ============================================================
+# Title keyword lists for detect_category (compiled into one matcher)
+# ============================================================
+
+# Define keywords
+# Include numeric purity marks: 750=18K, 585=14K, 417=10K, 375=9K
+# Also include variations with space before "k" (e.g., "14 k" from URL encoding)
+GOLD_KEYWORDS = ["10k", "14k", "18k", "22k", "24k", "10 k", "14 k", "18 k", "22 k", "24 k", "karat", "750", "585", "417", "375"]
+
+SILVER_KEYWORDS = ["sterling", "925", ".925", "800", ".800"]
+
+PLATINUM_KEYWORDS = ["platinum", "pt950", "pt900", "pt850", "plat ", " plat", "iridplat"]
+
+PALLADIUM_KEYWORDS = ["palladium", "pd950", "pd500", " pd ", "pall "]
+
+# Watch detection
+WATCH_KEYWORDS = ["watch", "wristwatch", "timepiece", "chronograph", "pocket watch"]
+
+WATCH_BRANDS = [
+    "rolex", "omega", "patek", "cartier", "breitling", "tag heuer", "tudor",
+    "longines", "hamilton", "tissot", "seiko", "bulova", "movado", "citizen",
+    "wittnauer", "gruen", "elgin", "waltham", "benrus", "zodiac", "oris",
+    "mido", "rado", "heuer", "iwc", "panerai", "audemars", "vacheron"
+]
+
+# Jewelry/metal context (omega chain vs. Omega watch)
+JEWELRY_CONTEXT = ["necklace", "chain", "bracelet", "pendant", "earring", "ring ", " ring", "anklet", "choker"]
+
+PRECIOUS_METAL_CONTEXT = ["sterling", "925", ".925", "14k", "18k", "10k", "gold", "silver", "platinum"]
+
+# Solid gold watch cases vs. filled/plated/tone
+SOLID_GOLD_INDICATORS = ["14k gold case", "18k gold case", "10k gold case", "14 k gold case",
+                        "18 k gold case", "10 k gold case", "solid gold", "solid 14k", "solid 18k",
+                        "14kt gold case", "18kt gold case", "14k case", "18k case"]
+
+NOT_SOLID_GOLD = ["gold filled", "gold plated", "gold tone", "gf ", " gf", "rolled gold", "rgp"]
+
+# Known mixed-metal brands (always silver)
+MIXED_METAL_BRANDS = ['john hardy', 'david yurman', 'lagos', 'konstantino', 'andrea candela']
+
+# Title fallback keywords
+VIDEOGAME_KEYWORDS = ["sega", "genesis", "nintendo", "nes", "snes", "n64", "gamecube", "wii", "switch",
+                     "playstation", "ps1", "ps2", "ps3", "ps4", "ps5", "psp", "vita",
+                     "xbox", "dreamcast", "saturn", "game boy", "gameboy", "gba", "ds", "3ds",
+                     "resident evil", "final fantasy", "zelda", "mario", "sonic", "mega man"]
+
+LEGO_KEYWORDS = ["lego", "sealed set"]
+
+TCG_KEYWORDS = ["pokemon", "booster box", "etb", "elite trainer", "yugioh", "mtg booster", "tcg",
+               "psa 10", "psa 9", "psa 8", "psa 7", "bgs 10", "bgs 9.5", "bgs 9", "cgc 10", "cgc 9",
+               "psa graded", "bgs graded", "cgc graded", "graded card", "1st edition", "shadowless"]
+
+COSTUME_KEYWORDS = ["costume jewelry", "vintage jewelry lot", "jewelry lot", "trifari", "coro", "eisenberg"]
+
+TEXTBOOK_KEYWORDS = [
+    # General
+    "textbook", "college textbook", "university textbook",
+    # Publishers
+    "pearson", "mcgraw hill", "mcgraw-hill", "cengage", "wiley textbook",
+    "elsevier", "springer", "oxford university press", "cambridge university press",
+    "norton", "sage publications", "routledge", "houghton mifflin", "bedford",
+    "worth publishers", "jones bartlett", "lippincott", "mosby", "saunders",
+    # Edition patterns
+    "10th edition", "11th edition", "12th edition", "13th edition", "14th edition",
+    "15th edition", "16th edition", "17th edition", "18th edition",
+    "edition hardcover", "latest edition", "instructor edition", "solutions manual",
+    # Course patterns
+    "intro to psychology", "intro to sociology", "intro to biology",
+    "principles of economics", "principles of accounting", "principles of marketing",
+    "fundamentals of nursing", "fundamentals of physics",
+    "organic chemistry", "calculus early transcendentals", "anatomy physiology",
+    "macroeconomics", "microeconomics", "financial accounting", "managerial accounting",
+    # Subject indicators (catches listings without 'textbook' in title)
+    "calculus", "chemistry textbook", "biology textbook", "physics textbook",
+    "psychology textbook", "statistics textbook", "economics textbook",
+    "accounting textbook", "engineering textbook", "nursing textbook",
+    "medical textbook", "pharmacology", "pathophysiology",
+    "computer science textbook", "business law", "corporate finance",
+]
+
+# Knife keywords for title fallback
+KNIFE_KEYWORDS = ["chris reeve", "strider knife", "microtech", "benchmade", "spyderco",
+                 "zero tolerance", "hinderer", "protech", "case xx", "randall knife",
+                 "william henry knife", "custom knife", "pocket knife lot", "knife collection"]
+
+# Pen keywords for title fallback
+PEN_KEYWORDS = ["montblanc", "mont blanc", "pelikan", "visconti", "aurora pen",
+               "fountain pen", "waterman pen", "parker duofold", "sheaffer", "sailor pen",
+               "namiki", "pilot custom", "vintage fountain"]
+
+# Industrial keywords for title fallback
+# Allen Bradley specific - route to allen_bradley agent
+ALLEN_BRADLEY_KEYWORDS = ["allen bradley", "allen-bradley", "rockwell automation",
+                         "controllogix", "compactlogix", "micrologix", "guardlogix",
+                         "panelview", "powerflex", "kinetix", "stratix",
+                         "1756-", "1769-", "1761-", "1762-", "1763-", "1764-",
+                         "1734-", "1794-", "2711p-", "2711-", "2198-", "2094-",
+                         "20f-", "22f-", "25b-", "1747-", "1785-"]
+
+# Other industrial brands - route to generic industrial agent
+INDUSTRIAL_KEYWORDS = ["siemens plc", "s7-1500", "s7-1200", "s7-300", "s7-400",
+                      "sinamics", "simatic", "mitsubishi plc", "melsec",
+                      "omron plc", "fanuc", "yaskawa", "abb drive"]
+
+_TITLE_MATCHER = KeywordMatcher(
+    GOLD_KEYWORDS + SILVER_KEYWORDS + PLATINUM_KEYWORDS + PALLADIUM_KEYWORDS
+    + WATCH_KEYWORDS + WATCH_BRANDS + JEWELRY_CONTEXT
+    + PRECIOUS_METAL_CONTEXT + SOLID_GOLD_INDICATORS + NOT_SOLID_GOLD
+    + MIXED_METAL_BRANDS + VIDEOGAME_KEYWORDS + LEGO_KEYWORDS
+    + TCG_KEYWORDS + COSTUME_KEYWORDS + TEXTBOOK_KEYWORDS
+    + KNIFE_KEYWORDS + PEN_KEYWORDS + ALLEN_BRADLEY_KEYWORDS
+    + INDUSTRIAL_KEYWORDS
+)
+
+
 def detect_category(data: dict) -> tuple:
     """Detect listing category from data fields, return (category, reasoning)"""
     alias = data.get("Alias", "").lower()
@@ -51,18 +169,13 @@ def detect_category(data: dict) -> tuple:
     title = data.get("Title", "").lower().replace('+', ' ')
     reasons = []
 
-    # Define keywords
-    # Include numeric purity marks: 750=18K, 585=14K, 417=10K, 375=9K
-    # Also include variations with space before "k" (e.g., "14 k" from URL encoding)
-    gold_keywords = ["10k", "14k", "18k", "22k", "24k", "10 k", "14 k", "18 k", "22 k", "24 k", "karat", "750", "585", "417", "375"]
-    silver_keywords = ["sterling", "925", ".925", "800", ".800"]
-    platinum_keywords = ["platinum", "pt950", "pt900", "pt850", "plat ", " plat", "iridplat"]
-    palladium_keywords = ["palladium", "pd950", "pd500", " pd ", "pall "]
+    # One pass over the title for every keyword list below
+    hits = _TITLE_MATCHER.find_all(title)
 
-    gold_matches = [kw for kw in gold_keywords if kw in title]
-    silver_matches = [kw for kw in silver_keywords if kw in title]
-    platinum_matches = [kw for kw in platinum_keywords if kw in title]
-    palladium_matches = [kw for kw in palladium_keywords if kw in title]
+    gold_matches = [kw for kw in GOLD_KEYWORDS if kw in hits]
+    silver_matches = [kw for kw in SILVER_KEYWORDS if kw in hits]
+    platinum_matches = [kw for kw in PLATINUM_KEYWORDS if kw in hits]
+    palladium_matches = [kw for kw in PALLADIUM_KEYWORDS if kw in hits]
 
     # === PRIORITY -1: MIXED METAL CHECK (BEFORE alias routing) ===
     # Items with BOTH silver (925/.925/sterling) AND gold karat = ALWAYS SILVER
@@ -92,23 +205,13 @@ def detect_category(data: dict) -> tuple:
 
     # === PRIORITY 0: WATCH DETECTION (before gold!) ===
     # Watches should be handled by watch agent UNLESS they have solid gold content
-    watch_keywords = ["watch", "wristwatch", "timepiece", "chronograph", "pocket watch"]
-    watch_brands = [
-        "rolex", "omega", "patek", "cartier", "breitling", "tag heuer", "tudor",
-        "longines", "hamilton", "tissot", "seiko", "bulova", "movado", "citizen",
-        "wittnauer", "gruen", "elgin", "waltham", "benrus", "zodiac", "oris",
-        "mido", "rado", "heuer", "iwc", "panerai", "audemars", "vacheron"
-    ]
-
-    has_watch_keyword = any(kw in title for kw in watch_keywords)
-    has_watch_brand = any(brand in title for brand in watch_brands)
+    has_watch_keyword = not hits.isdisjoint(WATCH_KEYWORDS)
+    has_watch_brand = not hits.isdisjoint(WATCH_BRANDS)
 
     # IMPORTANT: "Omega" is ALSO a jewelry chain style (omega chain/necklace)
     # If title has jewelry context + precious metal, it's NOT a watch!
-    jewelry_context = ["necklace", "chain", "bracelet", "pendant", "earring", "ring ", " ring", "anklet", "choker"]
-    precious_metal_context = ["sterling", "925", ".925", "14k", "18k", "10k", "gold", "silver", "platinum"]
-    has_jewelry_context = any(jw in title for jw in jewelry_context)
-    has_precious_metal = any(pm in title for pm in precious_metal_context)
+    has_jewelry_context = not hits.isdisjoint(JEWELRY_CONTEXT)
+    has_precious_metal = not hits.isdisjoint(PRECIOUS_METAL_CONTEXT)
 
     # If "omega" appears with jewelry + metal context, it's an omega chain, not Omega watch
     if has_watch_brand and has_jewelry_context and has_precious_metal and not has_watch_keyword:
@@ -117,13 +220,8 @@ def detect_category(data: dict) -> tuple:
 
     # Check if watch has SOLID gold content (not gold-filled, plated, or tone)
     # These should go to gold agent for melt value evaluation
-    solid_gold_indicators = ["14k gold case", "18k gold case", "10k gold case", "14 k gold case",
-                            "18 k gold case", "10 k gold case", "solid gold", "solid 14k", "solid 18k",
-                            "14kt gold case", "18kt gold case", "14k case", "18k case"]
-    not_solid_gold = ["gold filled", "gold plated", "gold tone", "gf ", " gf", "rolled gold", "rgp"]
-
-    has_solid_gold_case = any(indicator in title for indicator in solid_gold_indicators)
-    has_fake_gold = any(fake in title for fake in not_solid_gold)
+    has_solid_gold_case = not hits.isdisjoint(SOLID_GOLD_INDICATORS)
+    has_fake_gold = not hits.isdisjoint(NOT_SOLID_GOLD)
 
     # If watch has solid gold case (and not gold-filled), route to GOLD agent for melt evaluation
     if (has_watch_keyword or has_watch_brand) and has_solid_gold_case and not has_fake_gold:
@@ -146,9 +244,8 @@ def detect_category(data: dict) -> tuple:
         return "watch", reasons
 
     # PRIORITY 1: Known mixed-metal brands = ALWAYS SILVER
-    mixed_metal_brands = ['john hardy', 'david yurman', 'lagos', 'konstantino', 'andrea candela']
-    for brand in mixed_metal_brands:
-        if brand in title:
+    for brand in MIXED_METAL_BRANDS:
+        if brand in hits:
             reasons.append(f"Known mixed-metal brand '{brand}' detected - primarily SILVER")
             return "silver", reasons
 
@@ -207,71 +304,15 @@ def detect_category(data: dict) -> tuple:
         return "industrial", [f"Alias contains industrial keywords"]
 
     # PRIORITY 5: Fall back to title keywords
-    videogame_keywords = ["sega", "genesis", "nintendo", "nes", "snes", "n64", "gamecube", "wii", "switch",
-                         "playstation", "ps1", "ps2", "ps3", "ps4", "ps5", "psp", "vita",
-                         "xbox", "dreamcast", "saturn", "game boy", "gameboy", "gba", "ds", "3ds",
-                         "resident evil", "final fantasy", "zelda", "mario", "sonic", "mega man"]
-    lego_keywords = ["lego", "sealed set"]
-    tcg_keywords = ["pokemon", "booster box", "etb", "elite trainer", "yugioh", "mtg booster", "tcg",
-                   "psa 10", "psa 9", "psa 8", "psa 7", "bgs 10", "bgs 9.5", "bgs 9", "cgc 10", "cgc 9",
-                   "psa graded", "bgs graded", "cgc graded", "graded card", "1st edition", "shadowless"]
-    costume_keywords = ["costume jewelry", "vintage jewelry lot", "jewelry lot", "trifari", "coro", "eisenberg"]
-    textbook_keywords = [
-        # General
-        "textbook", "college textbook", "university textbook",
-        # Publishers
-        "pearson", "mcgraw hill", "mcgraw-hill", "cengage", "wiley textbook",
-        "elsevier", "springer", "oxford university press", "cambridge university press",
-        "norton", "sage publications", "routledge", "houghton mifflin", "bedford",
-        "worth publishers", "jones bartlett", "lippincott", "mosby", "saunders",
-        # Edition patterns
-        "10th edition", "11th edition", "12th edition", "13th edition", "14th edition",
-        "15th edition", "16th edition", "17th edition", "18th edition",
-        "edition hardcover", "latest edition", "instructor edition", "solutions manual",
-        # Course patterns
-        "intro to psychology", "intro to sociology", "intro to biology",
-        "principles of economics", "principles of accounting", "principles of marketing",
-        "fundamentals of nursing", "fundamentals of physics",
-        "organic chemistry", "calculus early transcendentals", "anatomy physiology",
-        "macroeconomics", "microeconomics", "financial accounting", "managerial accounting",
-        # Subject indicators (catches listings without 'textbook' in title)
-        "calculus", "chemistry textbook", "biology textbook", "physics textbook",
-        "psychology textbook", "statistics textbook", "economics textbook",
-        "accounting textbook", "engineering textbook", "nursing textbook",
-        "medical textbook", "pharmacology", "pathophysiology",
-        "computer science textbook", "business law", "corporate finance",
-    ]
-
-    # Knife keywords for title fallback
-    knife_keywords = ["chris reeve", "strider knife", "microtech", "benchmade", "spyderco",
-                     "zero tolerance", "hinderer", "protech", "case xx", "randall knife",
-                     "william henry knife", "custom knife", "pocket knife lot", "knife collection"]
-    # Pen keywords for title fallback
-    pen_keywords = ["montblanc", "mont blanc", "pelikan", "visconti", "aurora pen",
-                   "fountain pen", "waterman pen", "parker duofold", "sheaffer", "sailor pen",
-                   "namiki", "pilot custom", "vintage fountain"]
-    # Industrial keywords for title fallback
-    # Allen Bradley specific - route to allen_bradley agent
-    allen_bradley_keywords = ["allen bradley", "allen-bradley", "rockwell automation",
-                             "controllogix", "compactlogix", "micrologix", "guardlogix",
-                             "panelview", "powerflex", "kinetix", "stratix",
-                             "1756-", "1769-", "1761-", "1762-", "1763-", "1764-",
-                             "1734-", "1794-", "2711p-", "2711-", "2198-", "2094-",
-                             "20f-", "22f-", "25b-", "1747-", "1785-"]
-    # Other industrial brands - route to generic industrial agent
-    industrial_keywords = ["siemens plc", "s7-1500", "s7-1200", "s7-300", "s7-400",
-                          "sinamics", "simatic", "mitsubishi plc", "melsec",
-                          "omron plc", "fanuc", "yaskawa", "abb drive"]
-
-    videogame_matches = [kw for kw in videogame_keywords if kw in title]
-    lego_matches = [kw for kw in lego_keywords if kw in title]
-    tcg_matches = [kw for kw in tcg_keywords if kw in title]
-    costume_matches = [kw for kw in costume_keywords if kw in title]
-    textbook_matches = [kw for kw in textbook_keywords if kw in title]
-    knife_matches = [kw for kw in knife_keywords if kw in title]
-    pen_matches = [kw for kw in pen_keywords if kw in title]
-    allen_bradley_matches = [kw for kw in allen_bradley_keywords if kw in title]
-    industrial_matches = [kw for kw in industrial_keywords if kw in title]
+    videogame_matches = [kw for kw in VIDEOGAME_KEYWORDS if kw in hits]
+    lego_matches = [kw for kw in LEGO_KEYWORDS if kw in hits]
+    tcg_matches = [kw for kw in TCG_KEYWORDS if kw in hits]
+    costume_matches = [kw for kw in COSTUME_KEYWORDS if kw in hits]
+    textbook_matches = [kw for kw in TEXTBOOK_KEYWORDS if kw in hits]
+    knife_matches = [kw for kw in KNIFE_KEYWORDS if kw in hits]
+    pen_matches = [kw for kw in PEN_KEYWORDS if kw in hits]
+    allen_bradley_matches = [kw for kw in ALLEN_BRADLEY_KEYWORDS if kw in hits]
+    industrial_matches = [kw for kw in INDUSTRIAL_KEYWORDS if kw in hits]
 
     if textbook_matches:
         return "textbook", [f"Title contains textbook keywords: {textbook_matches}"]
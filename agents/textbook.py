@@ -5,6 +5,7 @@ Unlike other agents, this one doesn't use AI prompts - it calls KeepaTracker API
 
 import httpx
 import logging
+from services.http_clients import http_clients
 from .base import BaseAgent, Tier1Model, Tier2Model
 
 logger = logging.getLogger(__name__)
@@ -71,7 +72,7 @@ class TextbookAgent(BaseAgent):
             description = f"{description} ISBN: {isbn_field}"
 
         try:
-            async with httpx.AsyncClient(timeout=30.0) as client:
+            async with http_clients.session("default", timeout=30.0) as client:
                 response = await client.post(
                     f"{KEEPA_TRACKER_URL}/textbook/analyze",
                     json={
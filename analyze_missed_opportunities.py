@@ -10,11 +10,12 @@ This data trains our system to catch similar deals in the future.
 """
 import sqlite3
 import json
-import re
 from pathlib import Path
 from collections import defaultdict
 from datetime import datetime
 
+from utils.listing_features import get_listing_features
+
 # Database paths
 TRACKING_DB = Path(__file__).parent / "item_tracking.db"
 ARBITRAGE_DB = Path(__file__).parent / "arbitrage_data.db"
@@ -46,60 +47,13 @@ def load_spot_prices():
 
 
 def extract_weight(title, description=""):
-    """Extract weight in grams from title/description."""
-    text = f"{title} {description}".lower()
-
-    # Patterns for weight extraction
-    patterns = [
-        (r'(\d+\.?\d*)\s*(?:gram|grams|gr)\b', 1.0),
-        (r'(\d+\.?\d*)\s*g\b', 1.0),
-        (r'(\d+\.?\d*)\s*(?:dwt|DWT)\b', 1.555),
-        (r'(\d+\.?\d*)\s*(?:ozt|oz\.t|troy\s*oz)\b', 31.1),
-        (r'(\d+\.?\d*)\s*oz\b', 28.35),
-    ]
-
-    for pattern, multiplier in patterns:
-        match = re.search(pattern, text)
-        if match:
-            weight = float(match.group(1))
-            # Skip years (1900-2030)
-            if 1900 <= weight <= 2030:
-                continue
-            # Skip fineness markings (375, 417, 585, 750, 800, 830, 900, 916, 925, 950, 999)
-            if weight in [375, 417, 585, 750, 800, 830, 900, 916, 925, 936, 950, 958, 999]:
-                continue
-            final_weight = weight * multiplier
-            # Sanity check: jewelry rarely weighs more than 500g
-            if final_weight > 500:
-                continue
-            return final_weight
-
-    return None
+    """Extract weight in grams from title/description (jewelry rarely weighs more than 500g)."""
+    return get_listing_features(title, description).weight(max_weight=500)[0]
 
 
 def extract_karat(title):
     """Extract karat from title."""
-    title_lower = title.lower()
-
-    patterns = [
-        (r'24\s*k(?:t|arat)?', 24),
-        (r'22\s*k(?:t|arat)?', 22),
-        (r'18\s*k(?:t|arat)?', 18),
-        (r'14\s*k(?:t|arat)?', 14),
-        (r'10\s*k(?:t|arat)?', 10),
-        (r'9\s*k(?:t|arat)?', 9),
-        (r'999', 24),
-        (r'916', 22),
-        (r'750', 18),
-        (r'585', 14),
-        (r'417', 10),
-        (r'375', 9),
-    ]
-
-    for pattern, karat in patterns:
-        if re.search(pattern, title_lower):
-            return karat
-    return None
+    return get_listing_features(title).karat
 
 
 def calculate_melt_value(weight_grams, karat=None, category="gold"):
@@ -0,0 +1,368 @@
+"""
+Golden-corpus parity check and timing for utils/listing_features.py.
+
+listing_features_golden.jsonl holds one listing per line (title,
+description, item_specifics) with the ListingFeatures it must produce.
+The check re-extracts every listing and reports any field that changed,
+then times a cold extraction pass against memoized lookups (every stage of
+a request reads the same listing).
+
+Build / refresh the corpus from logged requests (JSONL, one request per
+line: uBuyFirst payloads with Title/Description, purchases.jsonl entries,
+training_overrides.jsonl entries) plus the built-in edge cases:
+    python benchmark_features.py --build --source requests.jsonl purchases.jsonl
+
+listing_features_legacy.jsonl pins the replaced weight parsers: the same
+listings run through instant_pass.extract_weight_from_title and
+utils/extraction.extract_weight_from_title as they were before the
+unification (loaded from git). Each wrapper must still return the legacy
+weight, except on rows tagged with one of the intended rule changes
+(LEGACY_CHANGES), which must return the recorded new weight instead:
+    python benchmark_features.py --build-legacy <git rev before the unification>
+
+Usage:
+    python benchmark_features.py
+    python benchmark_features.py --rounds 5 --lookups 8
+"""
+
+import re
+import json
+import time
+import random
+import argparse
+import tempfile
+import subprocess
+import importlib.util
+from pathlib import Path
+
+from config import PURCHASE_LOG_PATH, TRAINING_LOG_PATH
+from utils.listing_features import clear_feature_cache, get_listing_features
+
+BASE_DIR = Path(__file__).parent
+GOLDEN_PATH = BASE_DIR / "listing_features_golden.jsonl"
+LEGACY_PATH = BASE_DIR / "listing_features_legacy.jsonl"
+MISSED_ANALYSIS_PATH = BASE_DIR / "missed_opportunity_analysis.json"
+
+# Cases the parsers used to disagree on (units, fractions, years, fineness, specifics)
+EDGE_CASES = [
+    {"title": "14K Yellow Gold Rope Chain 20 inch 5.2 grams"},
+    {"title": "14kt gold ring size 7 3.1g"},
+    {"title": "18 karat gold band .8g"},
+    {"title": "1/2 oz gold american eagle 2015"},
+    {"title": "1/10 troy oz gold maple leaf"},
+    {"title": "one half ounce 999 fine silver round"},
+    {"title": "quarter oz gold bar"},
+    {"title": "Sterling silver bracelet 2 oz"},
+    {"title": "10k gold class ring 1997 7.4 dwt"},
+    {"title": "1997 NFC Champions 10K gold ring"},
+    {"title": "Vintage 585 gold pendant 2.3 gm"},
+    {"title": "750 white gold diamond ring 4.1 gms"},
+    {"title": "14k 18k mixed gold scrap lot 12.5g"},
+    {"title": "Gold filled 1/20 12k pocket watch case"},
+    {"title": "14K GF chain 20in 8g"},
+    {"title": "HGE 18k bracelet"},
+    {"title": "Sterling pearl necklace 925 clasp 45g"},
+    {"title": "Lot of 12 sterling silver teaspoons"},
+    {"title": "6 sterling silver dinner forks 270g"},
+    {"title": "Set of 8 sterling salad fork gorham"},
+    {"title": "Sterling silver pie server"},
+    {"title": "coin silver spoon 19th century"},
+    {"title": "2 pcs lot 14k earrings"},
+    {"title": "bulk lot sterling jewelry scrap 250 grams"},
+    {"title": "14k+gold+chain+3.5+grams"},
+    {"title": "Jade bangle 14k gold clasp 60g"},
+    {"title": "14k cameo brooch carved shell 9.8g"},
+    {"title": "5000g silver bar"},
+    {"title": "Ladies 14k gold watch 15.2 grams"},
+    {"title": "Platinum pt950 band 6.2g"},
+    {"title": "Heavy 14k miami cuban link chain 24\""},
+    {"title": "Gold ring", "description": "Weighs 3.4 grams, stamped 14k inside the band."},
+    {"title": "Vintage sterling brooch", "description": "Total weight 12 dwt. Marked 925."},
+    {"title": "Gold pendant 4g", "item_specifics": {"MetalPurity": "18k", "MainStone": "Pearl"}},
+    {"title": "Yellow gold chain 10g", "item_specifics": {"Fineness": "0.585", "MainStone": "No Stone"}},
+    {"title": "Gold ring 2.2g", "item_specifics": {"MetalPurity": "10k", "MainStone": "Diamond"}},
+    {"title": "1 ozt silver round"},
+    {"title": "1/2 ozt gold eagle"},
+    {"title": "silver bar 5 ozt .999"},
+    {"title": "14k gold chain 5.2 gr"},
+    {"title": "5 oz.t silver bar .999"},
+    {"title": "2 troy oz silver bar"},
+    {"title": "1/4 troy oz gold coin"},
+    {"title": "sterling 1997 g"},
+    {"title": "1997 10k class ring 12 gr"},
+    {"title": "2010 silver eagle 1 ozt"},
+]
+
+SYNTH_KARATS = ["14k", "14K", "14kt", "18k", "10K", "22kt", "24 karat", "585", "750", "9k", "", ""]
+SYNTH_SILVER = ["sterling", "925", ".925", "sterling silver", "coin silver", ".999 fine silver"]
+SYNTH_WEIGHTS = ["3.2g", "3.2 grams", "12 gram", "2 dwt", "1/2 oz", "1/4 troy oz", "half ounce", "1 oz",
+                 "10.5 gm", "1.2 Grams", ".8g", "45 gms", "", "", ""]
+SYNTH_ITEMS = ["ring", "chain", "necklace", "bracelet", "pendant", "earrings", "lot of 5 rings", "dinner fork",
+               "set of 6 teaspoons", "brooch", "band", "charm", "bar", "round", "scrap lot", "watch"]
+SYNTH_EXTRAS = ["vintage", "estate", "diamond", "pearl", "gold filled", "GF", "plated", "1997", "heavy",
+                "signed", "jade", "turquoise", "size 7", "20 inch", "", "", "", ""]
+
+
+def synthetic_listings(count: int, seed: int = 42) -> list:
+    rng = random.Random(seed)
+    listings = []
+    for _ in range(count):
+        metal = rng.choice(SYNTH_KARATS + ["gold"]) if rng.random() < 0.6 else rng.choice(SYNTH_SILVER)
+        words = [metal, rng.choice(SYNTH_ITEMS), rng.choice(SYNTH_EXTRAS), rng.choice(SYNTH_EXTRAS)]
+        rng.shuffle(words)
+        words.insert(rng.randint(0, len(words)), rng.choice(SYNTH_WEIGHTS))
+        title = " ".join(w for w in words if w)
+        description = ""
+        if rng.random() < 0.2:
+            description = f"Weighs {rng.choice(SYNTH_WEIGHTS) or 'about 4 grams'}. {rng.choice(SYNTH_EXTRAS)}"
+        listings.append({"title": title, "description": description})
+    return listings
+
+
+def listing_from_request(record: dict) -> dict:
+    """Title / description / specifics from a logged request, purchase or training override"""
+    if "listing" in record:
+        record = record["listing"]
+    elif "input" in record:
+        record = {**record["input"].get("listing_fields", {}), "title": record["input"].get("title", "")}
+    title = record.get("Title") or record.get("title") or ""
+    description = " ".join(filter(None, [
+        record.get("description", ""), record.get("Description", ""), record.get("ConditionDescription", ""),
+    ]))
+    specifics = {k: record[k] for k in ("MetalPurity", "Fineness", "MainStone") if record.get(k)}
+    listing = {"title": str(title).replace("+", " "), "description": description}
+    if specifics:
+        listing["item_specifics"] = specifics
+    return listing
+
+
+def load_sources(paths: list) -> list:
+    listings = []
+    for path in paths:
+        path = Path(path)
+        if not path.exists():
+            continue
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    listing = listing_from_request(json.loads(line))
+                except (json.JSONDecodeError, AttributeError):
+                    continue
+                if listing["title"]:
+                    listings.append(listing)
+    if MISSED_ANALYSIS_PATH.exists():
+        missed = json.loads(MISSED_ANALYSIS_PATH.read_text(encoding="utf-8"))
+        listings.extend({"title": row["title"]} for row in missed.get("true_missed", []) if row.get("title"))
+    return listings
+
+
+def extract(listing: dict):
+    return get_listing_features(listing["title"], listing.get("description", ""), listing.get("item_specifics"))
+
+
+def build(sources: list, synthetic: int):
+    listings = EDGE_CASES + load_sources(sources) + synthetic_listings(synthetic)
+    seen, rows = set(), []
+    for listing in listings:
+        key = json.dumps(listing, sort_keys=True)
+        if key in seen:
+            continue
+        seen.add(key)
+        rows.append({**listing, "expected": extract(listing).as_dict()})
+    with open(GOLDEN_PATH, "w", encoding="utf-8") as f:
+        for row in rows:
+            f.write(json.dumps(row, ensure_ascii=False) + "\n")
+    print(f"Wrote {len(rows)} listings to {GOLDEN_PATH.name}")
+
+
+# ============================================================
+# LEGACY PARSER PARITY
+# ============================================================
+
+# Wrappers over the shared features, and the legacy modules they replaced
+LEGACY_PARSERS = {
+    "instant_pass": "pipeline/instant_pass.py",
+    "extraction": "utils/extraction.py",
+}
+
+# Intended rule changes from the unification (fast_extract's rules won)
+LEGACY_CHANGES = {
+    "troy_oz": "plain / fractional oz is troy (31.1035g), not avoirdupois (28.35g)",
+    "title_first": "a weight in the title beats one in the description",
+    "gm_unit": "'gm' / 'gms' are grams",
+    "word_fraction": "'half / quarter / tenth ounce' are weights",
+    "url_plus": "'+' is a URL-encoded space ('3.5+grams')",
+}
+
+
+def _weight_of(parser: str, module, title: str, description: str):
+    weight = module.extract_weight_from_title(title, description)
+    return weight[0] if parser == "instant_pass" else weight
+
+
+def current_weight(parser: str, title: str, description: str = ""):
+    if parser == "instant_pass":
+        from pipeline import instant_pass as module
+    else:
+        from utils import extraction as module
+    return _weight_of(parser, module, title, description)
+
+
+def _close(a, b) -> bool:
+    if a is None or b is None:
+        return a is None and b is None
+    return abs(a - b) <= 0.005 * max(abs(a), 1.0)  # 31.1 vs 31.1035 g/ozt
+
+
+def legacy_change(legacy, current, title: str, description: str) -> str:
+    """Which LEGACY_CHANGES explains legacy -> current ("" if none does)"""
+    text = f"{title} {description}".lower()
+    if legacy is not None and current is not None and _close(legacy / 28.35 * 31.1035, current):
+        return "troy_oz"
+    if description and current is not None and _close(current, get_listing_features(title).weight()[0]):
+        return "title_first"
+    if legacy is None and re.search(r'\d\s*gms?\b', text):
+        return "gm_unit"
+    if legacy is None and "+" in text and _close(current, get_listing_features(title.replace("+", " ")).weight()[0]):
+        return "url_plus"
+    if legacy is None and re.search(r'\b(?:half|quarter|tenth)\s+(?:troy\s+)?(?:oz|ounce)', text):
+        return "word_fraction"
+    return ""
+
+
+def _load_legacy_module(rev: str, path: str, tmp_dir: Path):
+    source = subprocess.run(["git", "show", f"{rev}:{path}"], cwd=BASE_DIR, check=True,
+                            capture_output=True, text=True, encoding="utf-8").stdout
+    module_path = tmp_dir / f"legacy_{Path(path).stem}.py"
+    module_path.write_text(source, encoding="utf-8")
+    spec = importlib.util.spec_from_file_location(module_path.stem, module_path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def build_legacy(rev: str):
+    """Snapshot the pre-unification parsers at rev on the golden corpus listings"""
+    listings = [{"title": row["title"], "description": row.get("description", "")} for row in load_golden()]
+    rows, unexplained = [], 0
+    with tempfile.TemporaryDirectory() as tmp:
+        for parser, path in LEGACY_PARSERS.items():
+            module = _load_legacy_module(rev, path, Path(tmp))
+            for listing in listings:
+                title, description = listing["title"], listing["description"]
+                legacy = _weight_of(parser, module, title, description)
+                current = current_weight(parser, title, description)
+                change = "" if _close(legacy, current) else legacy_change(legacy, current, title, description)
+                if not _close(legacy, current) and not change:
+                    unexplained += 1
+                    print(f"  UNEXPLAINED {parser} {title[:60]!r}: {legacy} -> {current}")
+                row = {"parser": parser, **listing, "legacy": legacy}
+                if change:
+                    row["change"], row["expected"] = change, current
+                rows.append(row)
+    with open(LEGACY_PATH, "w", encoding="utf-8") as f:
+        for row in rows:
+            f.write(json.dumps(row, ensure_ascii=False) + "\n")
+    print(f"Wrote {len(rows)} legacy parser rows (from {rev}) to {LEGACY_PATH.name}")
+    if unexplained:
+        raise SystemExit(f"{unexplained} rows differ from the legacy parsers without an intended change")
+
+
+def check_legacy() -> int:
+    if not LEGACY_PATH.exists():
+        return 0
+    with open(LEGACY_PATH, encoding="utf-8") as f:
+        rows = [json.loads(line) for line in f if line.strip()]
+    mismatches, changed = 0, {}
+    for row in rows:
+        actual = current_weight(row["parser"], row["title"], row.get("description", ""))
+        change = row.get("change")
+        wanted = row["expected"] if change else row["legacy"]
+        if change:
+            changed[change] = changed.get(change, 0) + 1
+        if not _close(actual, wanted):
+            mismatches += 1
+            if mismatches <= 20:
+                print(f"  LEGACY MISMATCH {row['parser']} {row['title'][:60]!r}: "
+                      f"{'new' if change else 'legacy'} {wanted!r} -> {actual!r}")
+    print(f"Legacy parsers: {len(rows) - mismatches}/{len(rows)} rows match "
+          f"({len(rows) - sum(changed.values())} legacy weights kept, intended changes: "
+          + ", ".join(f"{k} {v}" for k, v in sorted(changed.items())) + ")")
+    return mismatches
+
+
+def load_golden() -> list:
+    with open(GOLDEN_PATH, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def check(rows: list) -> int:
+    mismatches = 0
+    for row in rows:
+        actual = extract(row).as_dict()
+        diff = {k: (v, actual.get(k)) for k, v in row["expected"].items() if actual.get(k) != v}
+        if diff:
+            mismatches += 1
+            if mismatches <= 20:
+                print(f"  MISMATCH {row['title'][:60]!r}: " +
+                      ", ".join(f"{k} {old!r} -> {new!r}" for k, (old, new) in diff.items()))
+    print(f"Parity: {len(rows) - mismatches}/{len(rows)} listings match the golden corpus")
+    return mismatches
+
+
+def bench(rows: list, rounds: int, lookups: int):
+    def timed(fn) -> float:
+        best = float("inf")
+        for _ in range(rounds):
+            clear_feature_cache()
+            start = time.perf_counter()
+            fn()
+            best = min(best, time.perf_counter() - start)
+        return best / len(rows) * 1e6
+
+    def cold():
+        for row in rows:
+            extract(row)
+
+    def per_request():
+        # Each stage of a request asks for the same listing's features
+        for row in rows:
+            for _ in range(lookups):
+                extract(row)
+
+    cold_us = timed(cold)
+    request_us = timed(per_request)
+    print(f"\n=== LISTING FEATURES ({len(rows)} listings, us per listing) ===")
+    print(f"{'cold extraction':<34} {cold_us:>9.1f}")
+    print(f"{f'request ({lookups} stage lookups)':<34} {request_us:>9.1f}")
+    print(f"{'memoized lookup':<34} {(request_us - cold_us) / max(lookups - 1, 1):>9.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="ListingFeatures golden-corpus parity check and timing")
+    parser.add_argument("--build", action="store_true", help="Rewrite the golden corpus from current output")
+    parser.add_argument("--source", nargs="*", default=[str(PURCHASE_LOG_PATH), str(TRAINING_LOG_PATH)],
+                        help="JSONL request logs to include when building")
+    parser.add_argument("--build-legacy", metavar="REV",
+                        help="Snapshot the pre-unification weight parsers from this git revision")
+    parser.add_argument("--synthetic", type=int, default=400, help="Synthetic listings to add when building")
+    parser.add_argument("--rounds", type=int, default=3, help="Timing rounds (best is reported)")
+    parser.add_argument("--lookups", type=int, default=8, help="Feature lookups per listing in one request")
+    args = parser.parse_args()
+
+    if args.build:
+        build(args.source, args.synthetic)
+        return
+    if args.build_legacy:
+        build_legacy(args.build_legacy)
+        return
+
+    rows = load_golden()
+    mismatches = check(rows) + check_legacy()
+    bench(rows, args.rounds, args.lookups)
+    if mismatches:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+"""
+Benchmark image decode+resize and event-loop lag.
+
+Measures:
+1. Per-image decode+resize time for each target size, with and without
+   reduced JPEG decoding (Image.draft)
+2. Event-loop lag while 20 listings x 5 images are resized concurrently,
+   inline on the loop vs. the image worker pool as processes and as threads
+
+Usage:
+    python benchmark_images.py                    # synthetic 1600px eBay-style JPEGs
+    python benchmark_images.py --images ./samples # real JPEGs from a folder
+    python benchmark_images.py --listings 20 --workers 4
+"""
+
+import io
+import time
+import random
+import asyncio
+import argparse
+import statistics
+from pathlib import Path
+
+from PIL import Image
+
+import image_processing
+from image_processing import resize_image
+from config import IMAGES
+
+
+def synthetic_jpegs(count: int = 5, size=(1600, 1200)) -> list:
+    """eBay s-l1600 sized JPEGs with enough detail to not compress to nothing"""
+    images = []
+    rng = random.Random(42)
+    for _ in range(count):
+        img = Image.effect_noise(size, 64).convert("RGB")
+        overlay = Image.new("RGB", size, tuple(rng.randint(0, 255) for _ in range(3)))
+        img = Image.blend(img, overlay, 0.5)
+        buf = io.BytesIO()
+        img.save(buf, format="JPEG", quality=90)
+        images.append(buf.getvalue())
+    return images
+
+
+def load_jpegs(folder: str) -> list:
+    paths = sorted(Path(folder).glob("*.jp*g"))
+    if not paths:
+        raise SystemExit(f"No JPEGs found in {folder}")
+    return [p.read_bytes() for p in paths]
+
+
+def bench_resize(images: list, sizes=(384, 768, 1024), rounds: int = 5):
+    print("=== DECODE + RESIZE (per image, ms) ===")
+    print(f"{'target':>8} {'full decode':>12} {'draft':>10} {'speedup':>8}")
+    for size in sizes:
+        results = {}
+        for label, ratio in (("full", float("inf")), ("draft", 2)):
+            image_processing.DRAFT_MIN_RATIO = ratio
+            timings = []
+            for _ in range(rounds):
+                for data in images:
+                    start = time.perf_counter()
+                    resize_image(data, "image/jpeg", size)
+                    timings.append((time.perf_counter() - start) * 1000)
+            results[label] = statistics.median(timings)
+        image_processing.DRAFT_MIN_RATIO = 2
+        speedup = results["full"] / results["draft"] if results["draft"] else 0
+        print(f"{size:>8} {results['full']:>12.1f} {results['draft']:>10.1f} {speedup:>7.1f}x")
+
+
+async def _measure_lag(stop: asyncio.Event, interval: float = 0.005) -> list:
+    """Sample how late a short sleep wakes up - that's how long the loop was blocked"""
+    lags = []
+    loop = asyncio.get_running_loop()
+    while not stop.is_set():
+        start = loop.time()
+        await asyncio.sleep(interval)
+        lags.append((loop.time() - start - interval) * 1000)
+    return lags
+
+
+async def bench_loop_lag(images: list, listings: int, workers: int, size: int = 1024):
+    from image_fetcher import run_image_job, shutdown_image_pool
+
+    print(f"\n=== EVENT LOOP LAG ({listings} listings x {len(images)} images @ {size}px) ===")
+    print(f"{'mode':>8} {'wall s':>8} {'lag p50':>9} {'lag p99':>9} {'lag max':>9}")
+    for label, pool_workers, mode in (("inline", 0, "process"), ("process", workers, "process"),
+                                      ("thread", workers, "thread")):
+        IMAGES.process_workers = pool_workers
+        IMAGES.worker_mode = mode
+        if pool_workers:
+            # Warm the pool so process start-up isn't counted
+            await asyncio.gather(*[run_image_job(resize_image, images[0], "image/jpeg", size)
+                                   for _ in range(pool_workers)])
+
+        async def listing():
+            return await asyncio.gather(*[
+                run_image_job(resize_image, data, "image/jpeg", size) for data in images
+            ])
+
+        stop = asyncio.Event()
+        lag_task = asyncio.create_task(_measure_lag(stop))
+        start = time.perf_counter()
+        await asyncio.gather(*[listing() for _ in range(listings)])
+        wall = time.perf_counter() - start
+        stop.set()
+        lags = sorted(await lag_task) or [0.0]
+        p50 = lags[int(0.50 * (len(lags) - 1))]
+        p99 = lags[int(0.99 * (len(lags) - 1))]
+        print(f"{label:>8} {wall:>8.2f} {p50:>8.1f}ms {p99:>8.1f}ms {lags[-1]:>8.1f}ms")
+        shutdown_image_pool()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark Pillow resize and event-loop lag")
+    parser.add_argument("--images", help="Folder of sample JPEGs (default: synthetic)")
+    parser.add_argument("--listings", type=int, default=20, help="Concurrent listings")
+    parser.add_argument("--workers", type=int, default=IMAGES.process_workers or 2, help="Pool workers (processes / threads)")
+    parser.add_argument("--rounds", type=int, default=5, help="Rounds for per-image timing")
+    args = parser.parse_args()
+
+    images = load_jpegs(args.images) if args.images else synthetic_jpegs()
+    print(f"Loaded {len(images)} images ({sum(map(len, images)) / 1024:.0f}KB total)\n")
+
+    bench_resize(images, rounds=args.rounds)
+    asyncio.run(bench_loop_lag(images, args.listings, args.workers))
+
+
+if __name__ == "__main__":
+    main()
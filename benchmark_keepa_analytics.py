@@ -0,0 +1,297 @@
+"""
+Benchmark Keepa flip-score analytics on synthetic Keepa payloads.
+
+ProductAnalysis used to read each product's stats and interleaved
+[time, value, ...] csv / salesRanks / buy-box lists in Python, and
+PriceDrop re-derived its fee table on every profit_potential access.
+Measured for a batch of products:
+
+1. legacy - the per-product loops (replicated here), parity reference
+2. decode - CachedProduct.from_product: raw lists -> NumPy arrays, once
+3. batch  - KeepaMetrics.from_products + profit_potentials over the batch
+            (what analyze_and_filter_deals runs on cached products)
+
+Every ANALYSIS_FIELDS value and every deal's profit must match the legacy
+loops (floats to 1e-9).
+
+Usage:
+    python benchmark_keepa_analytics.py
+    python benchmark_keepa_analytics.py --products 2000 --points 600 --rounds 5
+"""
+
+import math
+import time
+import random
+import argparse
+from typing import Dict, List
+
+import numpy as np
+
+from KeepaTracker.keepa_analytics import (
+    ANALYSIS_FIELDS, AMAZON_SELLER_ID, BUY_BOX_DAYS, MINUTES_PER_DAY, RANK_DROP_DAYS, VOLATILITY_DAYS,
+    KeepaMetrics, profit_potentials,
+)
+from KeepaTracker.keepa_cache import CachedProduct, keepa_now
+from KeepaTracker.keepa_tracker import PriceDrop
+
+CATEGORIES = ["shoes", "clothing", "toys", "electronics", "video_games", "home", "sports", "beauty",
+              "grocery", "general", "unknown"]
+SELLERS = [AMAZON_SELLER_ID, "A1SELLER", "A2SELLER", "A3SELLER", "-1"]
+
+
+def synthetic_product(rng: random.Random, asin: str, now: int, points: int) -> Dict:
+    """A Keepa product payload: stats, csv price/rank histories, salesRanks, buy-box seller history"""
+    start = now - 200 * MINUTES_PER_DAY
+
+    def history(low: int, high: int, count: int, missing: float = 0.05) -> List[int]:
+        times = sorted(rng.randint(start, now) for _ in range(count))
+        values = []
+        for t in times:
+            values += [t, -1 if rng.random() < missing else rng.randint(low, high)]
+        return values
+
+    base = rng.randint(800, 20000)
+    rank_base = rng.choice([500, 5000, 50000, 300000, 2000000])
+    csv = [None] * 19
+    if rng.random() < 0.4:
+        csv[0] = history(base, int(base * 1.3), points // 4, missing=0.3)
+    csv[1] = history(int(base * 0.7), int(base * 1.4), points)
+    csv[3] = history(rank_base // 2, rank_base * 2, points, missing=0.02)
+    category_id = str(rng.randint(1000, 9999))
+
+    buy_box = []
+    for t in sorted(rng.randint(start, now) for _ in range(points // 10)):
+        buy_box += [str(t), rng.choice(SELLERS)]
+
+    def stat(value):
+        return [-1, value, -1, rank_base]
+
+    product = {
+        "asin": asin,
+        "title": f"Synthetic product {asin}",
+        "brand": rng.choice(["Acme", "Globex", "", "QWXZYT"]),
+        "salesRank": rank_base if rng.random() < 0.9 else None,
+        "salesRanks": {category_id: csv[3][:]} if rng.random() < 0.8 else {},
+        "csv": csv,
+        "stats": {
+            "avg90": stat(int(base * rng.uniform(0.9, 1.2))),
+            "avg180": stat(int(base * rng.uniform(0.9, 1.2))),
+            "min": stat(int(base * 0.7)),
+            "max": stat(int(base * 1.4)),
+            "current": stat(int(base * rng.uniform(0.5, 1.1))),
+            "buyBoxPrice": int(base * rng.uniform(0.9, 1.1)) if rng.random() < 0.8 else -1,
+        },
+        "offerCountNew": rng.randint(0, 30),
+        "offerCountFBA": rng.randint(0, 10),
+        "buyBoxSellerIdHistory": buy_box,
+    }
+    return product
+
+
+def synthetic_deals(rng: random.Random, products: List[Dict]) -> List[PriceDrop]:
+    deals = []
+    for product in products:
+        previous = rng.uniform(5, 300)
+        deals.append(PriceDrop(
+            asin=product["asin"], title=product["title"], current_price=previous * rng.uniform(0.3, 1.1),
+            previous_price=previous, target_price=previous * rng.choice([0.8, 1.0]), drop_percent=0,
+            sales_rank=product["salesRank"] or 0, category="", image_url="", amazon_url="",
+            product_category=rng.choice(CATEGORIES),
+        ))
+    return deals
+
+
+# ============================================================
+# LEGACY PER-PRODUCT LOOPS
+# ============================================================
+
+def legacy_analysis(product: Dict, now: int) -> Dict:
+    """The pre-batch ProductAnalysis parse, one product at a time over raw lists"""
+    result = {name: 0 for name in ANALYSIS_FIELDS}
+    result.update(price_is_anomaly=False, amazon_on_listing=False)
+    stats = product.get("stats", {})
+
+    if stats:
+        avg_90 = stats.get("avg90", [[]])[1] if len(stats.get("avg90", [[]])) > 1 else None
+        avg_180 = stats.get("avg180", [[]])[1] if len(stats.get("avg180", [[]])) > 1 else None
+        if avg_90 and avg_90 > 0:
+            result["avg_price_90d"] = avg_90 / 100.0
+        if avg_180 and avg_180 > 0:
+            result["avg_price_180d"] = avg_180 / 100.0
+        min_prices = stats.get("min", [])
+        max_prices = stats.get("max", [])
+        if len(min_prices) > 1 and min_prices[1] > 0:
+            result["historical_low"] = min_prices[1] / 100.0
+        if len(max_prices) > 1 and max_prices[1] > 0:
+            result["historical_high"] = max_prices[1] / 100.0
+
+    if result["avg_price_90d"] > 0 and result["historical_high"] > 0:
+        volatility = (result["historical_high"] - result["historical_low"]) / result["historical_high"]
+        result["price_stability_score"] = max(0, min(100, 100 - (volatility * 100)))
+
+    current_prices = stats.get("current", []) if stats else []
+    current_new = current_prices[1] / 100.0 if len(current_prices) > 1 and current_prices[1] > 0 else 0
+    if current_new > 0 and result["avg_price_90d"] > 0:
+        if (result["avg_price_90d"] - current_new) / result["avg_price_90d"] >= 0.30:
+            result["price_is_anomaly"] = True
+
+    # Current rank: salesRanks walked backwards, then salesRank
+    rank = 0
+    for history in (product.get("salesRanks") or {}).values():
+        if history and len(history) >= 2:
+            for i in range(len(history) - 1, 0, -2):
+                if history[i] > 0:
+                    rank = history[i]
+                    break
+        if rank:
+            break
+    if not rank and product.get("salesRank") and product["salesRank"] > 0:
+        rank = product["salesRank"]
+    result["sales_rank_current"] = rank
+
+    avg_rank = stats.get("avg90", [])
+    if avg_rank and avg_rank[-1] and avg_rank[-1] > 0:
+        result["sales_rank_avg_90d"] = avg_rank[-1]
+
+    if rank > 0:
+        if rank <= 1000:
+            result["estimated_monthly_sales"] = int(500 * (1000 / rank) ** 0.5)
+        elif rank <= 10000:
+            result["estimated_monthly_sales"] = int(200 * (10000 / rank) ** 0.6)
+        elif rank <= 100000:
+            result["estimated_monthly_sales"] = int(50 * (100000 / rank) ** 0.7)
+        elif rank <= 500000:
+            result["estimated_monthly_sales"] = int(10 * (500000 / rank) ** 0.8)
+        else:
+            result["estimated_monthly_sales"] = max(1, int(5 * (1000000 / rank)))
+
+    csv = product.get("csv") or []
+
+    # Rank drops over the interleaved rank history
+    ranks = csv[3] if len(csv) > 3 and csv[3] else []
+    since = now - RANK_DROP_DAYS * MINUTES_PER_DAY
+    previous, drops = None, 0
+    for i in range(0, len(ranks) - 1, 2):
+        if ranks[i] >= since and ranks[i + 1] > 0:
+            if previous is not None and ranks[i + 1] < previous:
+                drops += 1
+            previous = ranks[i + 1]
+    result["sales_rank_drops_30d"] = drops
+
+    # New-price coefficient of variation
+    prices = csv[1] if len(csv) > 1 and csv[1] else []
+    since = now - VOLATILITY_DAYS * MINUTES_PER_DAY
+    window = [prices[i + 1] for i in range(0, len(prices) - 1, 2) if prices[i] >= since and prices[i + 1] > 0]
+    if len(window) > 1:
+        mean = sum(window) / len(window)
+        result["price_volatility_90d"] = math.sqrt(sum((p - mean) ** 2 for p in window) / len(window)) / mean
+
+    offer_counts = product.get("offerCountNew", 0)
+    offer_counts_fba = product.get("offerCountFBA", 0)
+    result["fba_seller_count"] = offer_counts_fba or 0
+    result["fbm_seller_count"] = max(0, (offer_counts or 0) - result["fba_seller_count"])
+
+    amazon = csv[0] if csv and csv[0] else []
+    result["amazon_on_listing"] = len(amazon) >= 2 and amazon[-1] > 0
+
+    if stats and stats.get("buyBoxPrice") and stats["buyBoxPrice"] > 0:
+        result["buy_box_price"] = stats["buyBoxPrice"] / 100.0
+
+    # Time-weighted Amazon buy-box share
+    history = product.get("buyBoxSellerIdHistory") or []
+    since = now - BUY_BOX_DAYS * MINUTES_PER_DAY
+    held = covered = 0
+    for i in range(0, len(history) - 1, 2):
+        start = min(max(int(history[i]), since), now)
+        end = int(history[i + 2]) if i + 2 < len(history) - 1 else now
+        end = min(max(end, since), now)
+        covered += end - start
+        if history[i + 1] == AMAZON_SELLER_ID:
+            held += end - start
+    result["buy_box_amazon_share"] = held / covered if covered else 0.0
+    return result
+
+
+def legacy_profit(deal: PriceDrop) -> float:
+    """The pre-batch PriceDrop.profit_potential body"""
+    if deal.target_price <= deal.current_price:
+        return 0
+    sell_price = deal.target_price
+    referral_rates = {'shoes': 0.15, 'clothing': 0.17, 'toys': 0.15, 'electronics': 0.08, 'video_games': 0.15,
+                      'home': 0.15, 'sports': 0.15, 'beauty': 0.15, 'grocery': 0.15, 'general': 0.15}
+    if sell_price < 20:
+        fba_fee = 3.22
+    elif sell_price < 50:
+        fba_fee = 4.75
+    elif sell_price < 100:
+        fba_fee = 5.40
+    else:
+        fba_fee = 6.50
+    category_key = deal.product_category if deal.product_category in referral_rates else 'general'
+    referral_fee = max(sell_price * referral_rates[category_key], 0.30)
+    return sell_price - deal.current_price - (referral_fee + fba_fee + 0.27)
+
+
+# ============================================================
+# BENCHMARK
+# ============================================================
+
+def best_of(rounds: int, fn):
+    best, result = float("inf"), None
+    for _ in range(rounds):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return result, best
+
+
+def check_parity(legacy: List[Dict], metrics: KeepaMetrics, legacy_profits: List[float],
+                 profits: np.ndarray) -> int:
+    mismatches = 0
+    for row, expected in enumerate(legacy):
+        values = {name: getattr(metrics, name)[row].item() for name in ANALYSIS_FIELDS}
+        diff = {name: (expected[name], values[name]) for name in ANALYSIS_FIELDS
+                if not math.isclose(expected[name], values[name], rel_tol=1e-9, abs_tol=1e-9)}
+        if diff:
+            mismatches += 1
+            if mismatches <= 10:
+                print(f"  MISMATCH {metrics.asins[row]}: {diff}")
+    bad_profits = int(np.count_nonzero(~np.isclose(profits, legacy_profits, rtol=1e-12, atol=1e-12)))
+    print(f"Parity: {len(legacy) - mismatches}/{len(legacy)} products, "
+          f"{len(profits) - bad_profits}/{len(profits)} deal profits match the legacy loops")
+    return mismatches + bad_profits
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark vectorized Keepa flip-score analytics")
+    parser.add_argument("--products", type=int, default=500, help="Products per batch")
+    parser.add_argument("--points", type=int, default=400, help="History points per csv series")
+    parser.add_argument("--rounds", type=int, default=3, help="Timing rounds (best is reported)")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    now = keepa_now()
+    payloads = [synthetic_product(rng, f"B{i:09d}", now, args.points) for i in range(args.products)]
+    deals = synthetic_deals(rng, payloads)
+
+    legacy, legacy_s = best_of(args.rounds, lambda: [legacy_analysis(p, now) for p in payloads])
+    legacy_profits, legacy_fees_s = best_of(args.rounds, lambda: [legacy_profit(d) for d in deals])
+    products, decode_s = best_of(args.rounds, lambda: [CachedProduct.from_product(p) for p in payloads])
+    metrics, batch_s = best_of(args.rounds, lambda: KeepaMetrics.from_products(products, now))
+    profits, fees_s = best_of(args.rounds, lambda: profit_potentials(deals))
+
+    print(f"=== KEEPA ANALYTICS ({args.products} products x {args.points} points per series) ===")
+    print(f"{'legacy analysis':<28} {legacy_s * 1000:>9.1f} ms")
+    print(f"{'decode to arrays (once)':<28} {decode_s * 1000:>9.1f} ms")
+    print(f"{'batch analysis (cached)':<28} {batch_s * 1000:>9.1f} ms {legacy_s / batch_s:>7.1f}x")
+    print(f"{'legacy fees':<28} {legacy_fees_s * 1000:>9.2f} ms")
+    print(f"{'batch fees':<28} {fees_s * 1000:>9.2f} ms {legacy_fees_s / fees_s:>7.1f}x")
+    print()
+
+    if check_parity(legacy, metrics, legacy_profits, profits):
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
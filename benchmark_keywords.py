@@ -0,0 +1,125 @@
+"""
+Benchmark keyword matching: substring loops vs. compiled KeywordMatcher.
+
+Measures per-title cost of the plain loop, a matcher_for() lookup per
+title, and a prebuilt KeywordMatcher's first() / search() (how the
+callers hold it), for:
+1. The poller's title filters (INSTANT_PASS_KEYWORDS + UBF_TITLE_FILTERS)
+2. Every search keyword in the KeywordsExport_*.csv files
+3. agents.detect_category (one matcher over all category keyword lists)
+
+Titles are synthesized from the same keywords plus filler words, so a
+realistic share of them hit a filter.
+
+Usage:
+    python benchmark_keywords.py
+    python benchmark_keywords.py --titles 20000 --rounds 5
+"""
+
+import csv
+import time
+import random
+import argparse
+from pathlib import Path
+
+from config import INSTANT_PASS_KEYWORDS, UBF_TITLE_FILTERS
+from utils.keyword_matcher import KeywordMatcher, matcher_for
+
+FILLER = [
+    "vintage", "estate", "necklace", "ring", "bracelet", "lot", "pendant", "chain",
+    "signed", "mens", "womens", "size", "7", "heavy", "grams", "antique", "old",
+    "nice", "rare", "set", "new", "used", "box", "with", "and", "the",
+]
+
+
+def load_csv_keywords(folder: Path) -> list:
+    """All keywords from the "Keywords" column of KeywordsExport_*.csv (deduped, lowercase)"""
+    keywords = []
+    for path in sorted(folder.glob("KeywordsExport_*.csv")):
+        with open(path, newline="", encoding="utf-8-sig") as f:
+            for row in csv.DictReader(f):
+                field = row.get("Keywords") or ""
+                # The column is itself a comma-separated, quoted list
+                for parts in csv.reader([field], skipinitialspace=True):
+                    keywords.extend(kw.strip().lower() for kw in parts if kw.strip())
+    return list(dict.fromkeys(keywords))
+
+
+def synthetic_titles(keywords: list, count: int, hit_rate: float = 0.3) -> list:
+    rng = random.Random(42)
+    titles = []
+    for _ in range(count):
+        words = rng.sample(FILLER, rng.randint(6, 12))
+        if keywords and rng.random() < hit_rate:
+            words.insert(rng.randint(0, len(words)), rng.choice(keywords))
+        titles.append(" ".join(words))
+    return titles
+
+
+def loop_first(keywords: list, title: str):
+    for kw in keywords:
+        if kw in title:
+            return kw
+    return None
+
+
+def bench(label: str, keywords: list, titles: list, rounds: int):
+    matcher = KeywordMatcher(keywords)
+
+    def timed(fn) -> float:
+        best = float("inf")
+        for _ in range(rounds):
+            start = time.perf_counter()
+            for title in titles:
+                fn(title)
+            best = min(best, time.perf_counter() - start)
+        return best / len(titles) * 1e6
+
+    # Sanity check: both paths must agree before timing them
+    mismatches = sum(1 for t in titles if loop_first(keywords, t) != matcher.first(t))
+    mismatches += sum(1 for t in titles if (loop_first(keywords, t) is not None) != matcher.search(t))
+    loop_us = timed(lambda t: loop_first(keywords, t))
+    lookup_us = timed(lambda t: matcher_for(keywords).first(t))
+    first_us = timed(matcher.first)
+    search_us = timed(matcher.search)
+    print(f"{label:<28} {len(keywords):>6} {loop_us:>9.2f} {lookup_us:>11.2f} {first_us:>9.2f} {search_us:>9.2f} "
+          f"{loop_us / first_us:>7.1f}x {mismatches:>5}")
+
+
+def bench_detect_category(titles: list, rounds: int):
+    import agents
+
+    rows = [{"Title": t, "Alias": ""} for t in titles]
+    best = float("inf")
+    for _ in range(rounds):
+        start = time.perf_counter()
+        for row in rows:
+            agents.detect_category(row)
+        best = min(best, time.perf_counter() - start)
+    print(f"\ndetect_category: {best / len(rows) * 1e6:.2f} us/title")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark keyword loops vs. compiled matcher")
+    parser.add_argument("--titles", type=int, default=10000, help="Synthetic titles per set")
+    parser.add_argument("--rounds", type=int, default=3, help="Timing rounds (best is reported)")
+    parser.add_argument("--csv-dir", default=str(Path(__file__).parent), help="Folder with KeywordsExport_*.csv")
+    args = parser.parse_args()
+
+    filters = list(INSTANT_PASS_KEYWORDS) + list(UBF_TITLE_FILTERS)
+    csv_keywords = load_csv_keywords(Path(args.csv_dir))
+
+    print("=== KEYWORD MATCHING (us per title) ===")
+    print(f"{'set':<28} {'kws':>6} {'loop':>9} {'matcher_for':>11} {'first':>9} {'search':>9} {'speedup':>8} {'diff':>5}")
+    bench("instant-pass", list(INSTANT_PASS_KEYWORDS), synthetic_titles(filters, args.titles), args.rounds)
+    bench("instant-pass + UBF title", filters, synthetic_titles(filters, args.titles), args.rounds)
+    if csv_keywords:
+        bench("KeywordsExport CSVs", csv_keywords, synthetic_titles(csv_keywords, args.titles), args.rounds)
+    else:
+        print("(no KeywordsExport_*.csv found)")
+
+    bench_detect_category(synthetic_titles(csv_keywords or filters, args.titles), args.rounds)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+"""
+Benchmark parse_ebay_history purchase -> sale title matching.
+
+match_by_title used to score every purchase against every later sale
+(title_similarity re-tokenizes both titles per pair), which is O(P x S)
+and takes minutes on a multi-year export. Measured on synthetic histories:
+
+1. legacy - the old nested loop (replicated here), parity reference
+2. index  - greedy_title_matches: pre-tokenized titles, token -> sale
+            posting lists sorted by date, only sales sharing a token scored
+3. lsh    - greedy_title_matches(use_lsh=True): MinHash/LSH candidates
+
+index must produce exactly the legacy assignment; lsh is approximate and
+reports how many matches it kept.
+
+Usage:
+    python benchmark_title_matching.py
+    python benchmark_title_matching.py --purchases 3000 --sales 2500 --scale 20000
+"""
+
+import time
+import random
+import argparse
+from datetime import datetime, timedelta
+
+from parse_ebay_history import greedy_title_matches, title_similarity
+
+METALS = ["14k", "10k", "18k", "sterling silver", "925", "gold filled", "platinum", "vintage gold"]
+ITEMS = ["ring", "chain", "necklace", "bracelet", "pendant", "earrings", "brooch", "charm", "band",
+         "spoon", "fork", "watch", "cufflinks", "locket", "bangle"]
+EXTRAS = ["vintage", "estate", "antique", "diamond", "pearl", "signed", "mexico", "taxco", "heavy", "scrap",
+          "lot", "size", "inch", "victorian", "art deco", "mid century", "designer", "ladies", "mens"]
+BRANDS = ["tiffany", "gorham", "towle", "wallace", "reed barton", "james avery", "david yurman", "coro",
+          "trifari", "monet", "napier", "", "", ""]
+
+
+SYLLABLES = ["ka", "lo", "ver", "san", "mar", "tel", "bri", "on", "dax", "rem", "ful", "cor", "vin", "tas", "mel"]
+
+
+def long_tail_vocabulary(size: int = 4000, seed: int = 1) -> tuple:
+    """Pattern / maker / model words with Zipf-like weights (real titles have a long tail)"""
+    rng = random.Random(seed)
+    words = sorted({"".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 3))) for _ in range(size)})
+    rng.shuffle(words)
+    return words, [1 / (rank + 1) for rank in range(len(words))]
+
+
+VOCABULARY, VOCABULARY_WEIGHTS = long_tail_vocabulary()
+
+
+def random_title(rng: random.Random) -> str:
+    words = [rng.choice(METALS), rng.choice(ITEMS), rng.choice(BRANDS)]
+    words += rng.sample(EXTRAS, rng.randint(1, 3))
+    words += rng.choices(VOCABULARY, VOCABULARY_WEIGHTS, k=rng.randint(1, 3))
+    words.append(f"{rng.randint(1, 60)}.{rng.randint(0, 9)}g")
+    rng.shuffle(words)
+    return " ".join(w for w in words if w)
+
+
+def relist_title(rng: random.Random, title: str) -> str:
+    """How a flipped item gets retitled: a word dropped, a word or two added"""
+    words = title.split()
+    if len(words) > 3 and rng.random() < 0.5:
+        words.pop(rng.randrange(len(words)))
+    for _ in range(rng.randint(0, 2)):
+        words.insert(rng.randint(0, len(words)), rng.choice(EXTRAS))
+    return " ".join(words)
+
+
+def synthetic_history(purchases: int, sales: int, years: float = 4, seed: int = 42) -> tuple:
+    """(purchases, sales) as date-sorted (iso_date, title) lists; ~70% of sales are relisted purchases"""
+    rng = random.Random(seed)
+    start = datetime(2021, 1, 1)
+    span = years * 365 * 86400
+
+    bought = [(start + timedelta(seconds=rng.uniform(0, span)), random_title(rng)) for _ in range(purchases)]
+    sold = []
+    for _ in range(sales):
+        if bought and rng.random() < 0.7:
+            date, title = rng.choice(bought)
+            sold.append((date + timedelta(days=rng.uniform(0.5, 120)), relist_title(rng, title)))
+        else:
+            sold.append((start + timedelta(seconds=rng.uniform(0, span)), random_title(rng)))
+    bought.sort()
+    sold.sort()
+    return ([(d.isoformat(), t) for d, t in bought], [(d.isoformat(), t) for d, t in sold])
+
+
+def legacy_matches(purchases: list, sales: list, min_similarity: float) -> list:
+    """The pre-index match_by_title loop"""
+    matches = []
+    used_sales = set()
+    for p_index, (p_date, p_title) in enumerate(purchases):
+        p_date_dt = datetime.fromisoformat(p_date)
+        best_match = None
+        best_sim = 0
+        for s_index, (s_date, s_title) in enumerate(sales):
+            if s_index in used_sales:
+                continue
+            if datetime.fromisoformat(s_date) <= p_date_dt:
+                continue
+            sim = title_similarity(p_title, s_title)
+            if sim > best_sim and sim >= min_similarity:
+                best_sim = sim
+                best_match = s_index
+        if best_match is not None:
+            used_sales.add(best_match)
+            matches.append((p_index, best_match, best_sim))
+    return matches
+
+
+def timed(fn) -> tuple:
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark purchase -> sale title matching")
+    parser.add_argument("--purchases", type=int, default=2000, help="Purchases in the parity run")
+    parser.add_argument("--sales", type=int, default=1600, help="Sales in the parity run")
+    parser.add_argument("--scale", type=int, default=20000, help="Purchases in the large run (sales = 0.8x)")
+    parser.add_argument("--min-similarity", type=float, default=0.4)
+    args = parser.parse_args()
+
+    purchases, sales = synthetic_history(args.purchases, args.sales)
+    legacy, legacy_s = timed(lambda: legacy_matches(purchases, sales, args.min_similarity))
+    index, index_s = timed(lambda: greedy_title_matches(purchases, sales, args.min_similarity))
+    lsh, lsh_s = timed(lambda: greedy_title_matches(purchases, sales, args.min_similarity, use_lsh=True))
+
+    print(f"=== TITLE MATCHING ({len(purchases)} purchases x {len(sales)} sales) ===")
+    print(f"{'legacy (nested loop)':<24} {legacy_s:>8.2f}s {len(legacy):>7} matches")
+    print(f"{'index':<24} {index_s:>8.2f}s {len(index):>7} matches {legacy_s / index_s:>7.1f}x")
+    print(f"{'lsh':<24} {lsh_s:>8.2f}s {len(lsh):>7} matches {legacy_s / lsh_s:>7.1f}x")
+
+    parity = index == legacy
+    kept = len(set(lsh) & set(legacy))
+    print(f"\nindex parity with legacy: {'OK' if parity else 'MISMATCH'}")
+    print(f"lsh: {kept}/{len(legacy)} legacy matches reproduced")
+
+    if args.scale:
+        purchases, sales = synthetic_history(args.scale, int(args.scale * 0.8), seed=7)
+        index, index_s = timed(lambda: greedy_title_matches(purchases, sales, args.min_similarity))
+        lsh, lsh_s = timed(lambda: greedy_title_matches(purchases, sales, args.min_similarity, use_lsh=True))
+        print(f"\n=== LARGE HISTORY ({len(purchases)} purchases x {len(sales)} sales) ===")
+        print(f"{'index':<24} {index_s:>8.2f}s {len(index):>7} matches")
+        print(f"{'lsh':<24} {lsh_s:>8.2f}s {len(lsh):>7} matches")
+
+    if not parity:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
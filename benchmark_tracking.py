@@ -0,0 +1,158 @@
+"""
+Benchmark item_tracking writes: connection-per-call vs. TrackingStore.
+
+Per analyzed listing the pipeline runs track_item, update_item_recommendation
+and store_analysis_result, and the sold poller later bumps update_item_check.
+Measured (us per listing) on a temporary database:
+
+1. legacy  - the old pattern: sqlite3.connect / execute / commit / close
+             for every one of those calls
+2. store   - the same item_tracking functions on the persistent per-thread
+             WAL connection (prepared statements reused)
+3. bulk    - track_items_many + update_checks_many for the whole batch
+
+Usage:
+    python benchmark_tracking.py
+    python benchmark_tracking.py --listings 5000 --rounds 5
+"""
+
+import json
+import time
+import random
+import sqlite3
+import argparse
+import tempfile
+from datetime import datetime
+from pathlib import Path
+
+from services import item_tracking
+
+CATEGORIES = ["gold", "silver", "lego", "tcg", "videogames", "costume"]
+
+
+def synthetic_listings(count: int, seed: int = 42) -> list:
+    rng = random.Random(seed)
+    listings = []
+    for i in range(count):
+        category = rng.choice(CATEGORIES)
+        listings.append({
+            "item_id": f"v1|{300000000000 + i}|0",
+            "title": f"{category} lot {i} vintage estate {rng.randint(1, 999)}",
+            "price": round(rng.uniform(5, 900), 2),
+            "category": category,
+            "alias": "",
+            "seller_name": f"seller{rng.randint(1, 400)}",
+            "posted_time": datetime.now().isoformat(),
+            "recommendation": "",
+            "original_data": {"Title": f"listing {i}", "TotalPrice": "12.50", "Description": "x" * 300},
+        })
+    return listings
+
+
+def analysis_for(listing: dict) -> dict:
+    return {"Recommendation": random.choice(["PASS", "PASS", "RESEARCH", "BUY"]),
+            "Profit": round(listing["price"] * 0.2, 2), "reasoning": "benchmark"}
+
+
+def legacy_pass(db_path: str, listings: list):
+    """The pre-store pattern: a fresh connection (default rollback journal) for every call"""
+    conn = sqlite3.connect(db_path)
+    conn.execute("PRAGMA journal_mode=DELETE")
+    conn.close()
+    for listing in listings:
+        row = item_tracking._tracked_item_row(**listing)
+        conn = sqlite3.connect(db_path)
+        cursor = conn.cursor()
+        cursor.execute("SELECT item_id, original_data_json FROM tracked_items WHERE item_id = ?", (row[0],))
+        if not cursor.fetchone():
+            cursor.execute(item_tracking._INSERT_TRACKED_ITEM, row)
+        conn.commit()
+        conn.close()
+
+        result = analysis_for(listing)
+        conn = sqlite3.connect(db_path)
+        conn.execute("UPDATE tracked_items SET recommendation = ? WHERE item_id = ?",
+                     (result["Recommendation"], row[0]))
+        conn.commit()
+        conn.close()
+
+        conn = sqlite3.connect(db_path)
+        conn.execute("""UPDATE tracked_items
+               SET analysis_result_json = ?, original_data_json = ?, recommendation = ?
+               WHERE item_id = ?""",
+                     (json.dumps(result), json.dumps(listing["original_data"]), result["Recommendation"], row[0]))
+        conn.commit()
+        conn.close()
+
+        conn = sqlite3.connect(db_path)
+        conn.execute("""
+            UPDATE tracked_items
+            SET check_count = check_count + 1, last_checked = ?, status = ?
+            WHERE item_id = ?
+        """, (datetime.now().isoformat(), "active", row[0]))
+        conn.commit()
+        conn.close()
+
+
+def store_pass(listings: list):
+    for listing in listings:
+        item_tracking.track_item(**listing)
+        result = analysis_for(listing)
+        item_tracking.update_item_recommendation(listing["item_id"], result["Recommendation"])
+        item_tracking.store_analysis_result(listing["item_id"], result, listing["original_data"])
+        item_tracking.update_item_check(listing["item_id"], "active")
+
+
+def bulk_pass(listings: list):
+    item_tracking.track_items_many(listings)
+    item_tracking.update_checks_many([(listing["item_id"], "active") for listing in listings])
+
+
+def fresh_db(folder: Path, name: str) -> Path:
+    """Empty item_tracking schema at folder/name, with the store pointed at it"""
+    path = folder / name
+    item_tracking.store.reopen(path)
+    item_tracking.init_database()
+    return path
+
+
+def timed(label: str, folder: Path, listings: list, rounds: int, fn) -> float:
+    best = float("inf")
+    for r in range(rounds):
+        path = fresh_db(folder, f"{label}_{r}.db")
+        if label == "legacy":
+            item_tracking.store.close()
+        start = time.perf_counter()
+        fn(str(path))
+        best = min(best, time.perf_counter() - start)
+    return best / len(listings) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark item tracking writes: legacy vs. persistent store")
+    parser.add_argument("--listings", type=int, default=2000, help="Synthetic listings per round")
+    parser.add_argument("--rounds", type=int, default=3, help="Timing rounds (best is reported)")
+    args = parser.parse_args()
+
+    listings = synthetic_listings(args.listings)
+    with tempfile.TemporaryDirectory() as tmp:
+        folder = Path(tmp)
+        legacy_us = timed("legacy", folder, listings, args.rounds, lambda path: legacy_pass(path, listings))
+        store_us = timed("store", folder, listings, args.rounds, lambda path: store_pass(listings))
+        bulk_us = timed("bulk", folder, listings, args.rounds, lambda path: bulk_pass(listings))
+
+        # Sanity check: the bulk path tracked every listing
+        fresh_db(folder, "check.db")
+        bulk_pass(listings)
+        stats = item_tracking.get_tracking_stats()
+        item_tracking.store.reopen(item_tracking.DB_PATH)
+
+    print(f"=== ITEM TRACKING WRITES ({args.listings} listings, us per listing) ===")
+    print(f"{'legacy (connect per call)':<28} {legacy_us:>9.1f}")
+    print(f"{'store (persistent WAL)':<28} {store_us:>9.1f} {legacy_us / store_us:>7.1f}x")
+    print(f"{'bulk (track/update many)':<28} {bulk_us:>9.1f} {legacy_us / bulk_us:>7.1f}x")
+    print(f"\nbulk check: {stats.get('total_tracked', stats)} tracked")
+
+
+if __name__ == "__main__":
+    main()
@@ -66,6 +66,26 @@ from .settings import (
     IMAGES,
     DatabaseConfig,
     DATABASE,
+    LookupConfig,
+    LOOKUPS,
+    HttpPoolConfig,
+    HTTP_POOLS,
+    EbayBudgetConfig,
+    EBAY_BUDGET,
+    EbayOAuthConfig,
+    EBAY_OAUTH,
+    SoldScheduleConfig,
+    SOLD_SCHEDULE,
+    KeywordScheduleConfig,
+    KEYWORD_SCHEDULE,
+    BrowseStreamConfig,
+    BROWSE_STREAM,
+    AnalysisQueueConfig,
+    ANALYSIS_QUEUE,
+    PerfConfig,
+    PERF,
+    RagConfig,
+    RAG,
     GoldRules,
     GOLD_RULES,
     SilverRules,
@@ -188,6 +188,17 @@ class ImageConfig:
     max_concurrent: int = 8           # Concurrent fetch limit
     user_agent: str = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
 
+    # Image cache (one download serves every resize variant)
+    cache_max_bytes: int = 96 * 1024 * 1024       # Encoded (base64) variants kept in memory
+    cache_raw_max_bytes: int = 64 * 1024 * 1024   # Raw downloaded bytes kept in memory
+    cache_disk_dir: str = os.getenv("IMAGE_CACHE_DIR", "")  # Empty = no disk tier
+    cache_disk_max_bytes: int = 512 * 1024 * 1024 # Disk tier budget
+
+    # Pillow resize/compress workers (0 = run inline on the event loop)
+    process_workers: int = int(os.getenv("IMAGE_WORKERS", "2"))
+    # "process" (spawned workers that import only image_processing) or "thread"
+    worker_mode: str = os.getenv("IMAGE_WORKER_MODE", "process")
+
 IMAGES = ImageConfig()
 
 # ============================================================
@@ -202,8 +213,166 @@ class DatabaseConfig:
     synchronous: str = "NORMAL"
     journal_size_limit: int = 67108864  # 64MB
 
+    # Write-behind queue (listing/pattern writes off the request path)
+    write_queue_max: int = 10000       # Max pending writes before dropping
+    write_batch_ms: int = 50           # Flush a batch at least this often
+    write_batch_rows: int = 200        # ...or once this many writes are pending
+
 DATABASE = DatabaseConfig()
 
+# ============================================================
+# OFF-LOOP LOOKUP SETTINGS (PriceCharting / Bricklink)
+# ============================================================
+@dataclass
+class LookupConfig:
+    """Thread pool sizing and timeouts for blocking price lookups"""
+    pricecharting_workers: int = 4     # Concurrent PriceCharting FTS lookups
+    bricklink_workers: int = 2         # Concurrent Bricklink OAuth requests
+    pricecharting_timeout: float = 8.0 # Seconds (includes any Bricklink calls it makes)
+    bricklink_timeout: float = 6.0     # Seconds per Bricklink lookup
+    latency_window: int = 500          # Samples kept per source for p50/p99
+
+LOOKUPS = LookupConfig()
+
+# ============================================================
+# SHARED HTTP CLIENT POOLS
+# ============================================================
+@dataclass
+class HttpPoolConfig:
+    """Connection pool sizing for the shared per-host HTTP clients"""
+    http2: bool = True                 # Used only if the h2 package is installed
+    keepalive_expiry: float = 30.0     # Seconds an idle connection is kept open
+    ebay_api_connections: int = 20     # api.ebay.com / svcs.ebay.com (Browse, Finding, OAuth)
+    ebay_images_connections: int = 16  # i.ebayimg.com (two listings' worth of image fetches)
+    discord_connections: int = 5       # Discord webhooks
+    keepa_connections: int = 5         # Keepa / Amazon SP-API
+    default_connections: int = 20      # Everything else (Ollama, KeepaTracker, proxies)
+    default_timeout: float = 10.0
+
+HTTP_POOLS = HttpPoolConfig()
+
+# ============================================================
+# EBAY API CALL BUDGET / SOLD-STATUS POLLING
+# ============================================================
+@dataclass
+class EbayBudgetConfig:
+    """Browse API call budget shared by ebay_poller and sold-status polling"""
+    daily_calls: int = int(os.getenv("EBAY_DAILY_CALL_LIMIT", "25000"))  # Refill rate = daily_calls / 24h
+    burst: int = 300                   # Bucket size (calls that can be spent at once)
+    background_reserve: int = 60       # Background callers leave this many for the poller
+    background_share: float = 0.1      # Refill set aside for background callers; foreground can't spend it
+    background_burst: int = 10         # Calls the set-aside share can bank while unused
+    acquire_timeout: float = 30.0      # Background callers give up waiting after this long
+    sold_poll_batch: int = 20          # Item IDs per getItems call (API max is 20)
+    sold_poll_concurrency: int = 4     # getItems calls in flight at once
+    sold_poll_max_items: int = 5000    # Active items checked per polling cycle
+
+EBAY_BUDGET = EbayBudgetConfig()
+
+@dataclass
+class EbayOAuthConfig:
+    """Browse API application token shared by every process (services/ebay_oauth.py)"""
+    cache_path: str = os.getenv("EBAY_TOKEN_CACHE", str(BASE_DIR / "ebay_token.json"))
+    refresh_ahead: float = 900.0       # Background refresh this long before the token expires
+    min_validity: float = 60.0         # Tokens closer than this to expiry are never handed out
+    retry_interval: float = 30.0       # Wait between failed background refreshes
+    lock_timeout: float = 20.0         # Give up waiting for another process's refresh after this long
+
+EBAY_OAUTH = EbayOAuthConfig()
+
+@dataclass
+class SoldScheduleConfig:
+    """Adaptive per-item sold-status check intervals (services/sold_scheduler.py)"""
+    cycle_seconds: float = 60.0        # How often the scheduler picks items to check
+    min_interval: float = 60.0         # Never re-check an item sooner than this
+    max_interval: float = 3600.0       # ...or later than this while it's tracked
+    fast_window_minutes: float = 10.0  # Interval grows by min_interval per this many minutes of age
+    max_age_hours: float = 6.0         # Older items can't be fast sales - stop checking
+    value_reference: float = 100.0     # Price at which value doesn't change the interval
+    max_value_factor: float = 3.0      # Expensive items are checked up to this much more often
+    recommendation_factors: Dict[str, float] = field(default_factory=lambda: {"BUY": 3.0, "RESEARCH": 2.0})
+    hot_seller_factor: float = 2.0     # Sellers with repeated fast sales (get_hot_sellers)
+
+SOLD_SCHEDULE = SoldScheduleConfig()
+
+@dataclass
+class KeywordScheduleConfig:
+    """Adaptive per-keyword Browse API search intervals (services/keyword_scheduler.py)"""
+    enabled: bool = os.getenv("ADAPTIVE_KEYWORD_POLLING", "true").lower() == "true"  # false = fixed round-robin
+    poller_share: float = 0.8          # Share of EBAY_BUDGET.daily_calls the keyword searches pace to
+    min_call_gap: float = 2.0          # Never search more often than this (seconds, any keyword)
+    min_interval: float = 6.0          # No single keyword refreshes faster than this
+    max_interval: float = 120.0        # ...or slower (the floor every keyword keeps)
+    rate_half_life: float = 1800.0     # Seconds for the new-listing rate estimate to halve its old weight
+    default_arrivals_per_hour: float = 6.0  # Rate assumed for a keyword before it has any polls
+    buy_weight: float = 20.0           # One BUY is worth this many plain new listings
+    buy_prior: float = 0.02            # BUY rate assumed for a keyword with no outcomes...
+    buy_prior_weight: float = 50.0     # ...worth this many outcomes
+    history_days: float = 7.0          # Poll log outcomes this recent seed BUY yield at startup
+    freshness_seconds: float = 300.0   # Listings found later than this are skipped by the poller
+    poll_log_max_mb: float = 50.0      # keyword_polls.jsonl is rotated to .1 above this size
+
+KEYWORD_SCHEDULE = KeywordScheduleConfig()
+
+@dataclass
+class BrowseStreamConfig:
+    """Incremental Browse search ingest for the keyword poller (services/browse_stream.py)"""
+    enabled: bool = os.getenv("BROWSE_STREAMING", "true").lower() == "true"  # false = full-page parse
+    min_page: int = 10                 # Smallest page requested per search
+    max_page: int = 50                 # Largest (the old fixed page size)
+    page_headroom: float = 2.0         # Page = headroom x recent new listings per poll + page_pad
+    page_pad: int = 5
+    seen_run_stop: int = 3             # Stop converting after this many seen items in a row...
+    index_lag: float = 120.0           # ...listed more than this before the keyword's previous search (eBay indexing delay)
+    stop_age: float = 300.0            # Always stop at items past the poller's 5-minute freshness check
+
+BROWSE_STREAM = BrowseStreamConfig()
+
+@dataclass
+class AnalysisQueueConfig:
+    """Poller analysis dispatcher (services/analysis_dispatcher.py)"""
+    workers: int = 6                   # Listings analyzed at once
+    max_queued: int = 200              # Lowest-priority listing is shed beyond this
+    stale_after: float = 90.0          # Listings that waited longer are dropped, not analyzed
+    max_listing_age: float = 600.0     # ...as are listings posted longer ago than this
+    provider_limits: Dict[str, int] = field(default_factory=lambda: {"openai": 6, "anthropic": 3, "proxy": 4})
+    default_provider_limit: int = 2    # Providers missing from provider_limits
+    seller_weight: float = 0.3         # Priority = weighted seller score, price-vs-melt and freshness (0-100 each)
+    value_weight: float = 0.5
+    freshness_weight: float = 0.2
+    fresh_window: float = 300.0        # Freshness falls from 100 to 0 over this many seconds of listing age
+    hot_priority: float = 70.0         # Wait times at or above this priority are also reported separately
+
+ANALYSIS_QUEUE = AnalysisQueueConfig()
+
+# ============================================================
+# REQUEST TRACING SETTINGS
+# ============================================================
+@dataclass
+class PerfConfig:
+    """Rolling windows for per-stage/per-exit-path latency (/api/perf)"""
+    window: int = 1000                 # Samples kept per stage and per exit path
+    recent_traces: int = 50            # Full traces kept for inspection
+    slow_request_ms: float = 10000.0   # Log a one-line stage breakdown above this
+
+PERF = PerfConfig()
+
+# ============================================================
+# RAG EMBEDDING / VECTOR SEARCH SETTINGS
+# ============================================================
+@dataclass
+class RagConfig:
+    """Embedding micro-batching, embedding cache and vector index backend"""
+    batch_window_ms: float = 5.0       # Wait this long to collect concurrent encode requests
+    max_batch: int = 32                # ...or flush as soon as this many are pending
+    build_chunk: int = 256             # Index builds encode this many titles per model-lock hold
+    embedding_cache_size: int = 4096   # Embeddings kept by normalized title
+    backend: str = os.getenv("RAG_BACKEND", "numpy")  # "numpy" (in-memory brute force) or "lancedb"
+    watch_interval: float = 60.0       # Check purchase sources for new rows this often
+    watch_debounce: float = 2.0        # Wait after a logged purchase before embedding
+
+RAG = RagConfig()
+
 # ============================================================
 # PRECIOUS METAL RATES & RULES
 # ============================================================
@@ -7,17 +7,245 @@ import json
 import re
 import logging
 import os
+import queue
+import threading
+import time
+import atexit
 from datetime import datetime, timedelta
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Tuple
 from collections import defaultdict
 from pathlib import Path
 
+from config import DATABASE
+
 logger = logging.getLogger(__name__)
 
 # Get absolute path to database file (same directory as this script)
 DB_DIR = Path(__file__).parent.absolute()
 DB_PATH = DB_DIR / "arbitrage_data.db"
 
+# ============================================================
+# WRITE-BEHIND QUEUE
+# ============================================================
+# Batch size histogram buckets (upper bounds, inclusive)
+BATCH_SIZE_BUCKETS = (1, 5, 20, 50, 100, 200)
+
+
+class WriteBehindQueue:
+    """
+    Bounded write queue drained by a dedicated writer thread.
+
+    Each enqueued write is a list of (sql, params) statements that belong
+    together. The writer groups pending writes into a single transaction
+    every `batch_ms` milliseconds or `batch_rows` writes, whichever comes
+    first, so callers on the event loop never wait on a commit/fsync.
+
+    When the queue is full the write is dropped and counted - these tables
+    are analytics/history, never worth stalling a live analysis for.
+    """
+
+    def __init__(self, path: str, max_size: int = None, batch_ms: int = None,
+                 batch_rows: int = None):
+        self.path = path
+        self.max_size = max_size or DATABASE.write_queue_max
+        self.batch_ms = batch_ms or DATABASE.write_batch_ms
+        self.batch_rows = batch_rows or DATABASE.write_batch_rows
+        self._queue: queue.Queue = queue.Queue(maxsize=self.max_size)
+        self._thread: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._stats = {
+            'enqueued': 0,
+            'written': 0,
+            'statements': 0,
+            'batches': 0,
+            'dropped': 0,
+            'errors': 0,
+            'max_depth': 0,
+            'last_batch_size': 0,
+            'last_commit_ms': 0.0,
+            'total_commit_ms': 0.0,
+        }
+        self._batch_hist = {b: 0 for b in BATCH_SIZE_BUCKETS}
+        self._batch_hist_overflow = 0
+
+    # ---------------- lifecycle ----------------
+
+    def start(self):
+        """Start the writer thread (idempotent)"""
+        with self._start_lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._thread = threading.Thread(target=self._run, name="db-writer", daemon=True)
+            self._thread.start()
+            logger.info(f"[DB] Write-behind writer started (batch {self.batch_ms}ms / {self.batch_rows} rows, max queue {self.max_size})")
+
+    def stop(self, timeout: float = 10.0):
+        """Flush everything still queued and stop the writer thread"""
+        if self._thread is None or not self._thread.is_alive():
+            return
+        try:
+            self._queue.put(None, timeout=timeout)  # Sentinel - drained in order
+        except queue.Full:
+            logger.warning("[DB] Write queue full at shutdown - writer may not flush everything")
+        self._thread.join(timeout)
+        if self._thread.is_alive():
+            logger.warning(f"[DB] Writer did not stop within {timeout}s ({self._queue.qsize()} pending)")
+        else:
+            logger.info(f"[DB] Write-behind writer stopped ({self._stats['written']} writes committed)")
+        self._thread = None
+
+    def flush(self, timeout: float = 10.0) -> bool:
+        """Block until every write enqueued so far is committed"""
+        if self._thread is None or not self._thread.is_alive():
+            return self._queue.empty()
+        done = threading.Event()
+        try:
+            self._queue.put(done, timeout=timeout)  # Marker - set once everything ahead is committed
+        except queue.Full:
+            return False
+        return done.wait(timeout)
+
+    # ---------------- producer side ----------------
+
+    def enqueue(self, statements: List[Tuple[str, tuple]]) -> bool:
+        """Queue a group of statements for the writer. Never blocks."""
+        if not statements:
+            return True
+        if self._thread is None or not self._thread.is_alive():
+            self.start()
+        try:
+            self._queue.put_nowait(statements)
+        except queue.Full:
+            with self._stats_lock:
+                self._stats['dropped'] += 1
+                dropped = self._stats['dropped']
+            if dropped == 1 or dropped % 100 == 0:
+                logger.warning(f"[DB] Write queue full ({self.max_size}) - dropped {dropped} writes so far")
+            return False
+        with self._stats_lock:
+            self._stats['enqueued'] += 1
+            depth = self._queue.qsize()
+            if depth > self._stats['max_depth']:
+                self._stats['max_depth'] = depth
+        return True
+
+    # ---------------- writer thread ----------------
+
+    def _run(self):
+        conn = sqlite3.connect(self.path, check_same_thread=False)
+        conn.execute(f"PRAGMA busy_timeout={DATABASE.busy_timeout}")
+        if DATABASE.wal_mode:
+            conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(f"PRAGMA synchronous={DATABASE.synchronous}")
+
+        stopping = False
+        while not stopping:
+            try:
+                first = self._queue.get(timeout=1.0)
+            except queue.Empty:
+                continue
+            if first is None:
+                break
+
+            batch = [first]
+            deadline = time.monotonic() + self.batch_ms / 1000.0
+            while len(batch) < self.batch_rows:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if item is None:
+                    stopping = True
+                    break
+                batch.append(item)
+
+            self._write_batch(conn, batch)
+
+        # Drain anything that raced in behind the sentinel
+        leftover = []
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is not None:
+                leftover.append(item)
+        if leftover:
+            self._write_batch(conn, leftover)
+        conn.close()
+
+    def _write_batch(self, conn: sqlite3.Connection, batch: List[Any]):
+        """Execute a batch of writes in one transaction, then release flush() waiters"""
+        waiters = []
+        writes = 0
+        statements = 0
+        errors = 0
+        start = time.perf_counter()
+        try:
+            for group in batch:
+                if isinstance(group, threading.Event):
+                    waiters.append(group)
+                    continue
+                writes += 1
+                for sql, params in group:
+                    try:
+                        conn.execute(sql, params)
+                        statements += 1
+                    except Exception as e:
+                        errors += 1
+                        logger.error(f"[DB] Write failed: {e} | {sql.strip()[:60]}")
+            conn.commit()
+        except Exception as e:
+            errors += 1
+            logger.error(f"[DB] Batch commit failed ({writes} writes): {e}")
+            try:
+                conn.rollback()
+            except Exception:
+                pass
+        commit_ms = (time.perf_counter() - start) * 1000
+
+        with self._stats_lock:
+            if writes:
+                self._stats['written'] += writes
+                self._stats['statements'] += statements
+                self._stats['batches'] += 1
+                self._stats['last_batch_size'] = writes
+                self._stats['last_commit_ms'] = round(commit_ms, 2)
+                self._stats['total_commit_ms'] += commit_ms
+                for bucket in BATCH_SIZE_BUCKETS:
+                    if writes <= bucket:
+                        self._batch_hist[bucket] += 1
+                        break
+                else:
+                    self._batch_hist_overflow += 1
+            self._stats['errors'] += errors
+
+        for done in waiters:
+            done.set()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Backpressure counters for the dashboard"""
+        with self._stats_lock:
+            stats = dict(self._stats)
+            hist = {f"<={b}": n for b, n in self._batch_hist.items()}
+            hist[f">{BATCH_SIZE_BUCKETS[-1]}"] = self._batch_hist_overflow
+        batches = stats['batches']
+        stats['total_commit_ms'] = round(stats['total_commit_ms'], 1)
+        stats['avg_commit_ms'] = round(stats['total_commit_ms'] / batches, 2) if batches else 0.0
+        stats['avg_batch_size'] = round(stats['written'] / batches, 1) if batches else 0.0
+        stats['depth'] = self._queue.qsize()
+        stats['max_size'] = self.max_size
+        stats['batch_ms'] = self.batch_ms
+        stats['batch_rows'] = self.batch_rows
+        stats['running'] = self._thread is not None and self._thread.is_alive()
+        stats['batch_size_histogram'] = hist
+        return stats
+
+
 # ============================================================
 # DATABASE CONNECTION
 # ============================================================
@@ -27,6 +255,7 @@ class Database:
         self.path = str(path or DB_PATH)
         self.conn = None
         self._init_db()
+        self.writer = WriteBehindQueue(self.path)
         logger.info(f"[DB] Database initialized at: {self.path}")
     
     def _init_db(self):
@@ -177,9 +406,29 @@ class Database:
     def commit(self):
         self.conn.commit()
 
+    def enqueue_write(self, statements: List[Tuple[str, tuple]]) -> bool:
+        """Queue statements for the write-behind writer (non-blocking)"""
+        return self.writer.enqueue(statements)
+
+    def start_writer(self):
+        self.writer.start()
+
+    def stop_writer(self, timeout: float = 10.0):
+        """Flush pending writes and stop the writer - call on shutdown"""
+        self.writer.stop(timeout)
+
+    def flush_writes(self, timeout: float = 10.0) -> bool:
+        return self.writer.flush(timeout)
+
+    def get_write_stats(self) -> Dict[str, Any]:
+        return self.writer.get_stats()
+
 # Global database instance
 db = Database()
 
+# Scripts that import database without the FastAPI lifespan still get their writes flushed
+atexit.register(db.stop_writer)
+
 
 # ============================================================
 # LISTING MANAGEMENT
@@ -191,7 +440,7 @@ def save_listing(listing: Dict[str, Any]):
         title = listing.get('title', '')[:50]
         recommendation = listing.get('recommendation', '')
         
-        db.execute("""
+        db.enqueue_write([("""
             INSERT OR REPLACE INTO listings 
             (id, timestamp, title, total_price, category, recommendation, margin, confidence, reasoning, raw_response, input_data)
             VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
@@ -207,9 +456,8 @@ def save_listing(listing: Dict[str, Any]):
             listing.get('reasoning', ''),
             listing.get('raw_response', ''),
             json.dumps(listing.get('input_data', {}))
-        ))
-        db.commit()
-        logger.info(f"[DB] Saved listing: {listing_id} | {title}... | {recommendation}")
+        ))])
+        logger.info(f"[DB] Queued listing: {listing_id} | {title}... | {recommendation}")
     except Exception as e:
         logger.error(f"[DB] Error saving listing: {e}")
 
@@ -217,11 +465,11 @@ def save_listing(listing: Dict[str, Any]):
 def log_incoming_listing(title: str, price: float, category: str, alias: str = ""):
     """Log an incoming listing for pattern analysis"""
     try:
-        db.execute("""
+        now = datetime.now().isoformat()
+        statements = [("""
             INSERT INTO incoming_log (timestamp, title, price, category, alias)
             VALUES (?, ?, ?, ?, ?)
-        """, (datetime.now().isoformat(), title, price, category, alias))
-        db.commit()
+        """, (now, title, price, category, alias))]
 
         # Normalize alias for consistency
         clean_alias = alias.strip().lower() if alias else ""
@@ -229,14 +477,14 @@ def log_incoming_listing(title: str, price: float, category: str, alias: str = "
         # Update keyword patterns (times_seen) - now organized by alias
         keywords = extract_title_keywords(title)
         for keyword in keywords:
-            db.execute("""
+            statements.append(("""
                 INSERT INTO keyword_patterns (keyword, category, alias, times_seen, last_seen)
                 VALUES (?, ?, ?, 1, ?)
                 ON CONFLICT(keyword, category, alias) DO UPDATE SET
                     times_seen = times_seen + 1,
                     last_seen = ?
-            """, (keyword, category, clean_alias, datetime.now().isoformat(), datetime.now().isoformat()))
-        db.commit()
+            """, (keyword, category, clean_alias, now, now)))
+        db.enqueue_write(statements)
         logger.debug(f"[DB] Logged incoming: {title[:40]}... | {category} | {alias} | ${price}")
     except Exception as e:
         logger.error(f"[DB] Error logging incoming: {e}")
@@ -286,41 +534,22 @@ def update_pattern_outcome(title: str, category: str, recommendation: str, margi
         conf_val = _parse_confidence(confidence) if confidence else 50
         clean_alias = alias.strip().lower() if alias else ""
 
-        for keyword in keywords:
-            if recommendation == 'BUY':
-                db.execute("""
-                    UPDATE keyword_patterns
-                    SET times_analyzed = times_analyzed + 1,
-                        buy_count = buy_count + 1,
-                        total_margin = total_margin + ?,
-                        total_confidence = total_confidence + ?,
-                        avg_margin = (total_margin + ?) / (times_analyzed + 1),
-                        avg_confidence = (total_confidence + ?) / (times_analyzed + 1)
-                    WHERE keyword = ? AND category = ? AND alias = ?
-                """, (margin_val, conf_val, margin_val, conf_val, keyword, category, clean_alias))
-            elif recommendation == 'PASS':
-                db.execute("""
-                    UPDATE keyword_patterns
-                    SET times_analyzed = times_analyzed + 1,
-                        pass_count = pass_count + 1,
-                        total_margin = total_margin + ?,
-                        total_confidence = total_confidence + ?,
-                        avg_margin = (total_margin + ?) / (times_analyzed + 1),
-                        avg_confidence = (total_confidence + ?) / (times_analyzed + 1)
-                    WHERE keyword = ? AND category = ? AND alias = ?
-                """, (margin_val, conf_val, margin_val, conf_val, keyword, category, clean_alias))
-            else:  # RESEARCH
-                db.execute("""
-                    UPDATE keyword_patterns
-                    SET times_analyzed = times_analyzed + 1,
-                        research_count = research_count + 1,
-                        total_margin = total_margin + ?,
-                        total_confidence = total_confidence + ?,
-                        avg_margin = (total_margin + ?) / (times_analyzed + 1),
-                        avg_confidence = (total_confidence + ?) / (times_analyzed + 1)
-                    WHERE keyword = ? AND category = ? AND alias = ?
-                """, (margin_val, conf_val, margin_val, conf_val, keyword, category, clean_alias))
-        db.commit()
+        # Outcome column by recommendation (anything else counts as RESEARCH)
+        outcome_col = {'BUY': 'buy_count', 'PASS': 'pass_count'}.get(recommendation, 'research_count')
+        sql = f"""
+            UPDATE keyword_patterns
+            SET times_analyzed = times_analyzed + 1,
+                {outcome_col} = {outcome_col} + 1,
+                total_margin = total_margin + ?,
+                total_confidence = total_confidence + ?,
+                avg_margin = (total_margin + ?) / (times_analyzed + 1),
+                avg_confidence = (total_confidence + ?) / (times_analyzed + 1)
+            WHERE keyword = ? AND category = ? AND alias = ?
+        """
+        db.enqueue_write([
+            (sql, (margin_val, conf_val, margin_val, conf_val, keyword, category, clean_alias))
+            for keyword in keywords
+        ])
     except Exception as e:
         logger.error(f"Error updating pattern outcome: {e}")
 
@@ -17,27 +17,40 @@ Usage:
 """
 
 import os
+import sys
 import asyncio
 import logging
 import httpx
 import json
-import threading
 import time as _time
-import base64
 from datetime import datetime, timedelta, date
 from typing import Dict, List, Optional, Any
 from dataclasses import dataclass, field
 from pathlib import Path
 import urllib.parse
 
+from services.http_clients import http_clients
+from services.ebay_budget import ebay_budget
+from services.ebay_oauth import ebay_tokens
+from services.analysis_dispatcher import AnalysisDispatcher
+from services.keyword_scheduler import KeywordPollScheduler, load_keyword_outcomes
+from services.browse_stream import BrowseItemStream, PageSizer
+from config import KEYWORD_SCHEDULE, BROWSE_STREAM
+from utils.expiring_set import ExpiringSet
+from utils.keyword_matcher import KeywordMatcher
+
 # Import blocked sellers for filtering
 try:
     from utils.spam_detection import BLOCKED_SELLERS, check_seller_spam
     BLOCKED_SELLERS_ENABLED = True
     from config import INSTANT_PASS_KEYWORDS, UBF_TITLE_FILTERS, UBF_LOCATION_FILTERS, UBF_FEEDBACK_RULES
+    # Title filters compiled once (the config lists don't change at runtime)
+    INSTANT_PASS_MATCHER = KeywordMatcher(INSTANT_PASS_KEYWORDS)
+    UBF_TITLE_MATCHER = KeywordMatcher(UBF_TITLE_FILTERS)
 except ImportError:
     BLOCKED_SELLERS = set()
     BLOCKED_SELLERS_ENABLED = False
+    INSTANT_PASS_MATCHER = UBF_TITLE_MATCHER = KeywordMatcher(())
     
 # Import seller profiling
 try:
@@ -77,14 +90,8 @@ EBAY_CERT_ID = os.getenv("EBAY_CERT_ID", "")  # Client Secret for OAuth
 
 # API endpoints
 BROWSE_API_URL = "https://api.ebay.com/buy/browse/v1/item_summary/search"
-OAUTH_URL = "https://api.ebay.com/identity/v1/oauth2/token"
 FINDING_API_URL = "https://svcs.ebay.com/services/search/FindingService/v1"  # Legacy fallback
 
-# OAuth token cache
-_oauth_token: Optional[str] = None
-_oauth_expires: Optional[datetime] = None
-_oauth_lock = threading.Lock()
-
 # Rate limiting - Production mode with efficient itemStartDate filtering
 # With efficient filtering, we can poll faster since responses are smaller
 # Daily quota: 25,000 calls/day (increased from 5K on 2026-01-16)
@@ -96,6 +103,9 @@ _last_api_call: Optional[float] = None
 # Efficient polling: Track newest timestamp per keyword for itemStartDate filtering
 # This dramatically reduces data transfer by only fetching truly new items
 KEYWORD_TIMESTAMPS: Dict[str, datetime] = {}
+
+# Streamed keyword searches: page size per keyword from its recent new-listing counts
+BROWSE_PAGE_SIZER = PageSizer()
 _rate_limit_lock: Optional[asyncio.Lock] = None  # Async lock for proper serialization
 
 def _get_rate_limit_lock():
@@ -124,6 +134,9 @@ async def rate_limit_wait():
         # Update last call time BEFORE releasing lock
         _last_api_call = _time.time()
 
+    # Count against the quota shared with sold-status polling (never blocks the poller)
+    ebay_budget.spend(1, "search")
+
 
 # ============================================================
 # DISCORD NOTIFICATIONS
@@ -238,7 +251,7 @@ async def send_discord_listing(
             "username": "eBay API Monitor"
         }
 
-        async with httpx.AsyncClient(timeout=10.0) as client:
+        async with http_clients.session("discord", timeout=10.0) as client:
             response = await client.post(DISCORD_WEBHOOK_URL, json=payload)
             if response.status_code not in (200, 204):
                 logger.warning(f"[DISCORD] Failed to send: {response.status_code}")
@@ -263,7 +276,7 @@ async def send_discord_status(message: str, color: int = 0x0099ff):
             "username": "eBay API Monitor"
         }
 
-        async with httpx.AsyncClient(timeout=10.0) as client:
+        async with http_clients.session("discord", timeout=10.0) as client:
             await client.post(DISCORD_WEBHOOK_URL, json=payload)
     except Exception as e:
         logger.debug(f"[DISCORD] Status error: {e}")
@@ -271,61 +284,11 @@ async def send_discord_status(message: str, color: int = 0x0099ff):
 
 async def get_oauth_token() -> Optional[str]:
     """
-    Get OAuth2 token for Browse API using Client Credentials flow.
-    Caches token until it expires.
+    OAuth2 application token for the Browse API (Client Credentials flow).
+    Served by the shared token manager, which refreshes it in the background
+    ahead of expiry and shares it with other processes (services/ebay_oauth.py).
     """
-    global _oauth_token, _oauth_expires
-
-    # Check if we have a valid cached token
-    with _oauth_lock:
-        if _oauth_token and _oauth_expires and datetime.now() < _oauth_expires:
-            return _oauth_token
-
-    if not EBAY_APP_ID or not EBAY_CERT_ID:
-        logger.warning("[EBAY OAuth] Missing EBAY_APP_ID or EBAY_CERT_ID")
-        return None
-
-    try:
-        # Create Basic Auth header
-        credentials = f"{EBAY_APP_ID}:{EBAY_CERT_ID}"
-        encoded_credentials = base64.b64encode(credentials.encode()).decode()
-
-        headers = {
-            "Content-Type": "application/x-www-form-urlencoded",
-            "Authorization": f"Basic {encoded_credentials}",
-        }
-
-        # Request application token (no user auth needed for Browse API search)
-        data = {
-            "grant_type": "client_credentials",
-            "scope": "https://api.ebay.com/oauth/api_scope",
-        }
-
-        async with httpx.AsyncClient(timeout=10.0) as client:
-            response = await client.post(OAUTH_URL, headers=headers, data=data)
-
-            if response.status_code != 200:
-                logger.error(f"[EBAY OAuth] Token request failed: {response.status_code} - {response.text[:200]}")
-                return None
-
-            token_data = response.json()
-            access_token = token_data.get("access_token")
-            expires_in = token_data.get("expires_in", 7200)  # Default 2 hours
-
-            if access_token:
-                with _oauth_lock:
-                    _oauth_token = access_token
-                    # Set expiry 5 minutes early to be safe
-                    _oauth_expires = datetime.now() + timedelta(seconds=expires_in - 300)
-                logger.info(f"[EBAY OAuth] Token acquired, expires in {expires_in}s")
-                return access_token
-            else:
-                logger.error("[EBAY OAuth] No access_token in response")
-                return None
-
-    except Exception as e:
-        logger.error(f"[EBAY OAuth] Error getting token: {e}")
-        return None
+    return await ebay_tokens.get_token()
 
 
 def browse_api_available() -> bool:
@@ -361,6 +324,9 @@ RSS_BASE_URL = "https://www.ebay.com/sch/i.html"
 # Track API usage - persisted to file for survival across restarts
 API_STATS_FILE = Path(__file__).parent / "api_stats.json"
 
+# Per-poll search cost (bytes on the wire, parse CPU, items converted vs skipped), reset daily
+POLL_COST_KEYS = ("measured_polls", "bytes_downloaded", "parse_cpu_ms", "items_parsed", "items_skipped", "early_exits")
+
 def _load_api_stats() -> dict:
     """Load API stats from file, reset if new day"""
     default_stats = {
@@ -370,6 +336,7 @@ def _load_api_stats() -> dict:
         "calls_by_category": {},
         "errors": 0,
         "last_call": None,
+        "poll_cost": dict.fromkeys(POLL_COST_KEYS, 0),
     }
 
     if API_STATS_FILE.exists():
@@ -384,7 +351,9 @@ def _load_api_stats() -> dict:
                     saved["calls_today"] = 0
                     saved["calls_by_category"] = {}
                     saved["errors"] = 0
+                    saved["poll_cost"] = {}
                     saved["last_reset"] = today
+                saved["poll_cost"] = {**dict.fromkeys(POLL_COST_KEYS, 0), **saved.get("poll_cost", {})}
                 return saved
         except Exception as e:
             logger.warning(f"[EBAY API] Could not load stats: {e}")
@@ -408,9 +377,15 @@ def _save_api_stats():
 # Load stats on module import
 API_STATS = _load_api_stats()
 
-# Track seen listings to avoid duplicates
-SEEN_LISTINGS: Dict[str, datetime] = {}
+# Track seen listings to avoid duplicates (persisted so a restart's baseline poll
+# doesn't re-emit everything from the last hour)
 SEEN_LISTINGS_MAX_AGE = 3600  # Forget listings after 1 hour
+SEEN_LISTINGS_FILE = Path(__file__).parent / "seen_listings.txt"
+SEEN_LISTINGS_SAVE_INTERVAL = 30  # Seconds between saves while polling
+SEEN_LISTINGS = ExpiringSet(SEEN_LISTINGS_MAX_AGE, SEEN_LISTINGS_FILE)
+_seen_loaded = SEEN_LISTINGS.load()
+if _seen_loaded:
+    logger.info(f"[EBAY API] Restored {_seen_loaded} seen listings from last run")
 
 # Keyword rotation - only search a subset per poll to avoid rate limits
 KEYWORDS_PER_POLL = 10  # Max keywords to search per poll cycle
@@ -745,6 +720,8 @@ class EbayListing:
     seller_type: str = "unknown"
     seller_priority: str = "NORMAL"
     seller_patterns: List[str] = field(default_factory=list)
+    # Staggered-poller keyword that found this listing (keyword scheduler BUY yield)
+    search_keyword: str = ""
 
     def to_dict(self) -> Dict:
         # Handle start_time serialization carefully
@@ -849,6 +826,7 @@ def update_api_stats(category: str, success: bool = True):
         logger.info(f"[EBAY API] Daily reset - yesterday's calls: {API_STATS['calls_today']}")
         API_STATS["calls_today"] = 0
         API_STATS["calls_by_category"] = {}
+        API_STATS["poll_cost"] = dict.fromkeys(POLL_COST_KEYS, 0)
         API_STATS["last_reset"] = today
 
     API_STATS["total_calls"] += 1
@@ -866,6 +844,18 @@ def update_api_stats(category: str, success: bool = True):
     _save_api_stats()
 
 
+def record_poll_cost(bytes_downloaded: int, parse_cpu_ms: float, items_parsed: int, items_skipped: int = 0,
+                     early_exit: bool = False):
+    """Add one search's cost to API_STATS (saved with the next update_api_stats)"""
+    cost = API_STATS["poll_cost"]
+    cost["measured_polls"] += 1
+    cost["bytes_downloaded"] += bytes_downloaded
+    cost["parse_cpu_ms"] = round(cost["parse_cpu_ms"] + parse_cpu_ms, 2)
+    cost["items_parsed"] += items_parsed
+    cost["items_skipped"] += items_skipped
+    cost["early_exits"] += int(early_exit)
+
+
 def get_api_stats() -> Dict:
     """Get current API usage statistics"""
     # Serialize dates properly
@@ -882,7 +872,8 @@ def get_api_stats() -> Dict:
             last_reset_str = API_STATS["last_reset"].isoformat()
         except:
             last_reset_str = str(API_STATS["last_reset"])
-    
+
+    polls = API_STATS["poll_cost"]["measured_polls"]
     return {
         "total_calls": API_STATS["total_calls"],
         "calls_today": API_STATS["calls_today"],
@@ -890,6 +881,15 @@ def get_api_stats() -> Dict:
         "calls_by_category": API_STATS["calls_by_category"],
         "errors": API_STATS["errors"],
         "last_call": last_call_str,
+        "poll_cost": {
+            **API_STATS["poll_cost"],
+            "bytes_per_poll": round(API_STATS["poll_cost"]["bytes_downloaded"] / polls) if polls else None,
+            "parse_cpu_ms_per_poll": round(API_STATS["poll_cost"]["parse_cpu_ms"] / polls, 3) if polls else None,
+            "page_sizes": BROWSE_PAGE_SIZER.get_stats(),
+        },
+        "analysis_queue": ANALYSIS_DISPATCHER.get_stats(),
+        "keyword_schedule": KEYWORD_SCHEDULER.get_stats() if KEYWORD_SCHEDULER else None,
+        "oauth": ebay_tokens.get_stats(),
     }
 
 
@@ -936,7 +936,7 @@ async def search_ebay_web(
     listings = []
 
     try:
-        async with httpx.AsyncClient(timeout=15.0) as client:
+        async with http_clients.session("default", timeout=15.0) as client:
             response = await client.get(url, headers={
                 "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
                 "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8",
@@ -1061,7 +1061,7 @@ async def search_ebay_rss(
     listings = []
 
     try:
-        async with httpx.AsyncClient(timeout=15.0) as client:
+        async with http_clients.session("default", timeout=15.0) as client:
             response = await client.get(url, headers={
                 "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
             })
@@ -1212,6 +1212,7 @@ async def search_ebay(
     use_rss: bool = True,
     since_date: datetime = None,
     condition_filter: str = None,  # "USED" for pre-owned only, "NEW" for new only
+    stop_at_seen: bool = False,
 ) -> List[EbayListing]:
     """
     Search eBay - tries multiple methods in order of speed:
@@ -1222,6 +1223,7 @@ async def search_ebay(
 
     since_date: If provided, only return items listed AFTER this timestamp (Browse API only)
     condition_filter: "USED" for pre-owned only, "NEW" for new only, None for all
+    stop_at_seen: Stream the Browse page and stop at already-seen listings (pollers only)
 
     Returns list of EbayListing objects
     """
@@ -1255,7 +1257,8 @@ async def search_ebay(
         logger.error("[EBAY API] Browse API not available - check EBAY_CERT_ID")
         return []
 
-    result = await search_ebay_browse(keywords, category_ids, price_min, price_max, sort_order, entries_per_page, since_date, condition_filter)
+    result = await search_ebay_browse(keywords, category_ids, price_min, price_max, sort_order, entries_per_page,
+                                      since_date, condition_filter, stop_at_seen=stop_at_seen)
     if result is None:  # None means API error
         logger.warning("[EBAY API] Browse API returned error - skipping this search")
         return []
@@ -1271,6 +1274,7 @@ async def search_ebay_browse(
     entries_per_page: int = 50,
     since_date: datetime = None,
     condition_filter: str = None,  # "USED" for pre-owned only, "NEW" for new only, None for all
+    stop_at_seen: bool = False,
 ) -> Optional[List[EbayListing]]:
     """
     Search eBay using Browse API (modern REST API)
@@ -1279,6 +1283,8 @@ async def search_ebay_browse(
     since_date: If provided, only return items listed AFTER this timestamp (itemStartDate filter)
                 This makes polling much more efficient by only fetching truly new items.
     condition_filter: "USED" for pre-owned only, "NEW" for new only, None for all conditions
+    stop_at_seen: Poller mode - parse the newest-first page as it streams and stop
+                  converting once it is back among seen listings (see _read_browse_stream)
     """
     # Get OAuth token
     token = await get_oauth_token()
@@ -1338,12 +1344,21 @@ async def search_ebay_browse(
 
     try:
         url = BROWSE_API_URL
-        async with httpx.AsyncClient(timeout=15.0) as client:
+        async with http_clients.session("ebay_api", timeout=15.0) as client:
+            if stop_at_seen and sort_order == "StartTimeNewest":
+                async with client.stream("GET", url, headers=headers, params=params) as response:
+                    update_api_stats(keywords[:20], success=(response.status_code == 200))
+                    if response.status_code == 200:
+                        return await _read_browse_stream(response, keywords, int(params["limit"]))
+                    await response.aread()
+                    return _browse_error(response, token)
+
             response = await client.get(url, headers=headers, params=params)
 
             update_api_stats(keywords[:20], success=(response.status_code == 200))
 
             if response.status_code == 200:
+                cpu_start = _time.thread_time()
                 data = response.json()
                 items = data.get("itemSummaries", [])
                 total = data.get("total", len(items))
@@ -1359,20 +1374,10 @@ async def search_ebay_browse(
                     except Exception as e:
                         logger.debug(f"[Browse API] Error parsing item: {e}")
 
+                record_poll_cost(response.num_bytes_downloaded, (_time.thread_time() - cpu_start) * 1000, len(items))
                 return listings
 
-            elif response.status_code == 401:
-                # Token expired, clear cache and retry once
-                global _oauth_token, _oauth_expires
-                with _oauth_lock:
-                    _oauth_token = None
-                    _oauth_expires = None
-                logger.warning("[Browse API] Token expired, will retry with new token")
-                return None
-
-            else:
-                logger.error(f"[Browse API] Error {response.status_code}: {response.text[:300]}")
-                return None
+            return _browse_error(response, token)
 
     except Exception as e:
         logger.error(f"[Browse API] Request error: {e}")
@@ -1380,6 +1385,90 @@ async def search_ebay_browse(
         return None
 
 
+def _browse_error(response, token: Optional[str] = None) -> None:
+    """Handle a non-200 Browse search response (always returns None so the caller falls back)"""
+    if response.status_code == 401:
+        # Token rejected - the manager refreshes it before the next search
+        ebay_tokens.invalidate(token)
+        logger.warning("[Browse API] Token expired, will retry with new token")
+        return None
+
+    if response.status_code == 429:
+        ebay_budget.throttle("Browse search 429")
+    logger.error(f"[Browse API] Error {response.status_code}: {response.text[:300]}")
+    return None
+
+
+def _browse_item_id(item: Dict) -> str:
+    """Browse API returns itemId as "v1|376847105664|0" - the middle part is the actual item ID"""
+    raw_item_id = item.get("itemId", "")
+    parts = raw_item_id.split("|")
+    return parts[1] if len(parts) >= 2 else raw_item_id
+
+
+def _listed_seconds_ago(item: Dict, now: datetime) -> Optional[float]:
+    try:
+        return (now - datetime.fromisoformat(item["itemCreationDate"].replace("Z", "+00:00"))).total_seconds()
+    except (KeyError, AttributeError, ValueError):
+        return None
+
+
+async def _read_browse_stream(response, keywords: str, page_size: int) -> List[EbayListing]:
+    """
+    Convert a newlyListed page item by item as the body arrives, stopping at
+    the first listing past the freshness window, or after a run of
+    seen_run_stop already-seen listings that were already indexed at the
+    keyword's previous search (a late-indexed listing sorts behind newer
+    seen ones, so a seen run alone is not enough).
+    """
+    from datetime import timezone
+    cfg = BROWSE_STREAM
+    stream = BrowseItemStream()
+    now = datetime.now(timezone.utc)
+    horizon = BROWSE_PAGE_SIZER.stop_horizon(keywords, now.timestamp())
+    listings = []
+    arrivals = seen_run = 0
+    stopped = False
+    cpu = 0.0
+
+    chunks = response.aiter_bytes()
+    async for chunk in chunks:
+        cpu_start = _time.thread_time()
+        for item in stream.feed(chunk):
+            age = _listed_seconds_ago(item, now)
+            if age is not None and age > cfg.stop_age:
+                stopped = True
+                break
+            if _browse_item_id(item) in SEEN_LISTINGS:
+                seen_run += 1
+                if seen_run >= cfg.seen_run_stop and horizon is not None and age is not None and age > horizon:
+                    stopped = True
+                    break
+            else:
+                seen_run = 0
+                arrivals += 1
+            listing = parse_browse_item(item)
+            if listing:
+                listings.append(listing)
+        cpu += _time.thread_time() - cpu_start
+        if stopped or stream.done:
+            break
+
+    if stopped and response.http_version != "HTTP/2":
+        # HTTP/1.1: read the rest unparsed so the pooled connection can be reused
+        async for _ in chunks:
+            pass
+
+    page_items = min(page_size, stream.total) if stream.total is not None else stream.items_seen
+    BROWSE_PAGE_SIZER.observe(keywords, arrivals, page_size, reached_seen=stopped or page_items < page_size,
+                              searched_at=now.timestamp())
+    record_poll_cost(response.num_bytes_downloaded, cpu * 1000, len(listings),
+                     max(page_items - len(listings), 0), early_exit=stopped)
+    logger.debug(f"[Browse API] Streamed {len(listings)} of {page_items} for '{keywords[:30]}' "
+                 f"({arrivals} unseen{', early exit' if stopped else ''})")
+    return listings
+
+
 def parse_browse_item(item: Dict) -> Optional[EbayListing]:
     """Parse a Browse API item response into EbayListing"""
     try:
@@ -1429,10 +1518,7 @@ def parse_browse_item(item: Dict) -> Optional[EbayListing]:
                 pass
 
         # Build listing
-        # Browse API returns itemId as "v1|376847105664|0" - extract middle part (actual item ID)
-        raw_item_id = item.get("itemId", "")
-        parts = raw_item_id.split("|")
-        item_id = parts[1] if len(parts) >= 2 else raw_item_id  # Get middle part
+        item_id = _browse_item_id(item)
 
         listing = EbayListing(
             item_id=item_id,
@@ -1492,7 +1578,7 @@ async def get_item_details(item_id: str) -> Optional[Dict]:
     url = f"https://api.ebay.com/buy/browse/v1/item/v1|{clean_id}|0"
     
     try:
-        async with httpx.AsyncClient(timeout=10.0) as client:
+        async with http_clients.session("ebay_api", timeout=10.0) as client:
             response = await client.get(url, headers=headers)
             
             if response.status_code == 200:
@@ -1540,6 +1626,8 @@ async def get_item_details(item_id: str) -> Optional[Dict]:
                 logger.debug(f"[EBAY DETAILS] Item {clean_id} not found")
                 return None
             else:
+                if response.status_code == 401:
+                    ebay_tokens.invalidate(token)
                 logger.debug(f"[EBAY DETAILS] Error {response.status_code} for item {clean_id}")
                 return None
                 
@@ -1607,7 +1695,7 @@ async def search_ebay_finding(
         filter_idx += 1
 
     try:
-        async with httpx.AsyncClient(timeout=15.0) as client:
+        async with http_clients.session("ebay_api", timeout=15.0) as client:
             response = await client.get(FINDING_API_URL, params=params)
 
             update_api_stats(keywords[:20], success=(response.status_code == 200))
@@ -1719,63 +1807,42 @@ def parse_finding_item(item: Dict) -> Optional[EbayListing]:
 # POLLING FUNCTIONS
 # ============================================================
 
-async def _safe_callback(callback, listing):
-    """Wrapper to safely run callback without crashing the poller"""
-    try:
-        await callback(listing)
-    except Exception as e:
-        logger.error(f"[EBAY API] Callback error: {e}")
+def _analysis_provider(listing) -> str:
+    """Backend the analysis callback will call: the pipeline's Tier 1 provider, or the remote proxy"""
+    orchestrator = sys.modules.get("pipeline.orchestrator")
+    if orchestrator is None or not orchestrator.is_configured():
+        return "proxy"
+    return orchestrator.tier1_provider()
 
-# ============================================================
 
-# Lock to prevent race conditions in is_new_listing
-_SEEN_LISTINGS_LOCK = asyncio.Lock()
+# New listings are analyzed by a bounded worker pool, best listings first
+# (seller score, price vs melt, freshness) - see services/analysis_dispatcher.py
+ANALYSIS_DISPATCHER = AnalysisDispatcher(provider_for=_analysis_provider)
+
+# ============================================================
 
 def is_new_listing(item_id: str) -> bool:
     """
-    Check if we've seen this listing before (SYNC version for backwards compat).
-    WARNING: This has a race condition in async code - use is_new_listing_async instead.
+    Check if we've seen this listing before, marking it seen.
+    The check-and-mark is atomic (ExpiringSet holds its own lock).
     """
-    global SEEN_LISTINGS
+    return SEEN_LISTINGS.add(item_id)
 
-    # Clean old entries
-    now = datetime.now()
-    expired = [k for k, v in SEEN_LISTINGS.items()
-               if (now - v).total_seconds() > SEEN_LISTINGS_MAX_AGE]
-    for k in expired:
-        del SEEN_LISTINGS[k]
 
-    # Check if new
-    if item_id in SEEN_LISTINGS:
-        return False
-
-    # Mark as seen
-    SEEN_LISTINGS[item_id] = now
-    return True
+async def is_new_listing_async(item_id: str) -> bool:
+    """Async alias of is_new_listing (kept for existing callers)."""
+    return SEEN_LISTINGS.add(item_id)
 
 
-async def is_new_listing_async(item_id: str) -> bool:
+async def filter_new_listing_ids(listings: List["EbayListing"]) -> set:
     """
-    Check if we've seen this listing before (ASYNC version with lock).
-    Uses a lock to prevent race conditions when multiple tasks check the same item.
+    Batch check-and-mark a whole poll result, return the set of new item IDs.
+    Also saves the seen set to disk every SEEN_LISTINGS_SAVE_INTERVAL seconds.
     """
-    global SEEN_LISTINGS
-
-    async with _SEEN_LISTINGS_LOCK:
-        # Clean old entries (do this inside lock to avoid mutation during iteration)
-        now = datetime.now()
-        expired = [k for k, v in SEEN_LISTINGS.items()
-                   if (now - v).total_seconds() > SEEN_LISTINGS_MAX_AGE]
-        for k in expired:
-            del SEEN_LISTINGS[k]
-
-        # Check if new
-        if item_id in SEEN_LISTINGS:
-            return False
-
-        # Mark as seen IMMEDIATELY (atomic with check)
-        SEEN_LISTINGS[item_id] = now
-        return True
+    new_ids = SEEN_LISTINGS.add_many(listing.item_id for listing in listings)
+    if new_ids:
+        await asyncio.to_thread(SEEN_LISTINGS.maybe_save, SEEN_LISTINGS_SAVE_INTERVAL)
+    return new_ids
 
 
 async def get_new_listings(category: str, enrich_sellers: bool = True, immediate_callback=None) -> List[EbayListing]:
@@ -1854,13 +1921,14 @@ async def get_new_listings(category: str, enrich_sellers: bool = True, immediate
             logger.debug(f"[EFFICIENT] {keyword}: {len(listings)} new items (since {since_date.strftime('%H:%M:%S')})")
 
         # Filter to new listings only
+        new_ids = await filter_new_listing_ids(listings)
         for listing in listings:
             # Update keyword timestamp for efficient polling (track ALL items)
             if listing.start_time:
                 current_ts = KEYWORD_TIMESTAMPS.get(keyword)
                 if current_ts is None or listing.start_time > current_ts:
                     KEYWORD_TIMESTAMPS[keyword] = listing.start_time
-            if await is_new_listing_async(listing.item_id):
+            if listing.item_id in new_ids:
                 # FRESHNESS CHECK - only analyze listings from last 5 minutes
                 if listing.start_time:
                     try:
@@ -1905,20 +1973,14 @@ async def get_new_listings(category: str, enrich_sellers: bool = True, immediate
 
                 # Check for instant pass keywords (gold plated, silver plated, etc.)
                 title_lower = listing.title.lower()
-                skip_instant = False
-                for kw in INSTANT_PASS_KEYWORDS:
-                    if kw in title_lower:
-                        logger.debug(f"[EBAY API] Skipping instant-pass keyword '{kw}': {listing.title[:40]}")
-                        skip_instant = True
-                        break
+                kw = INSTANT_PASS_MATCHER.first(title_lower)
+                if kw:
+                    logger.debug(f"[EBAY API] Skipping instant-pass keyword '{kw}': {listing.title[:40]}")
+                    continue
                 # Also check UBF title filters (trading cards, coins, etc.)
-                if not skip_instant:
-                    for kw in UBF_TITLE_FILTERS:
-                        if kw in title_lower:
-                            logger.debug(f"[EBAY API] Skipping UBF filter '{kw}': {listing.title[:40]}")
-                            skip_instant = True
-                            break
-                if skip_instant:
+                kw = UBF_TITLE_MATCHER.first(title_lower)
+                if kw:
+                    logger.debug(f"[EBAY API] Skipping UBF filter '{kw}': {listing.title[:40]}")
                     continue
 
                 # Enrich with seller profile data
@@ -1934,7 +1996,7 @@ async def get_new_listings(category: str, enrich_sellers: bool = True, immediate
                 # Fire immediate callback if provided (real-time mode)
                 if immediate_callback:
                     try:
-                        asyncio.create_task(_safe_callback(immediate_callback, listing))
+                        ANALYSIS_DISPATCHER.submit(immediate_callback, listing)
                     except Exception as e:
                         logger.error(f"[EBAY API] Immediate callback error: {e}")
 
@@ -2039,9 +2101,10 @@ async def poll_single_keyword(kw_info: Dict, callback=None) -> List[EbayListing]
             category_ids=kw_info.get("category_ids"),
             price_min=kw_info.get("price_min", 50),
             price_max=kw_info.get("price_max", 10000),
-            entries_per_page=50,
+            entries_per_page=BROWSE_PAGE_SIZER.size(keyword) if BROWSE_STREAM.enabled else 50,
             since_date=None,  # Fetch all recent items, filter locally
             condition_filter=condition,  # Pre-owned only for gold/silver
+            stop_at_seen=BROWSE_STREAM.enabled,  # Stop converting once back among seen items
         )
 
         # Log stats
@@ -2050,6 +2113,7 @@ async def poll_single_keyword(kw_info: Dict, callback=None) -> List[EbayListing]
         else:
             logger.debug(f"[POLL] {keyword}: {len(listings)} items fetched, filtering for new")
 
+        new_ids = await filter_new_listing_ids(listings)
         for listing in listings:
             # Update keyword timestamp for efficient polling (track ALL items, even filtered)
             if listing.start_time:
@@ -2057,7 +2121,7 @@ async def poll_single_keyword(kw_info: Dict, callback=None) -> List[EbayListing]
                 if current_ts is None or listing.start_time > current_ts:
                     KEYWORD_TIMESTAMPS[keyword] = listing.start_time
 
-            if await is_new_listing_async(listing.item_id):
+            if listing.item_id in new_ids:
                 # Freshness check - only items from last 5 minutes
                 if listing.start_time:
                     try:
@@ -2092,25 +2156,18 @@ async def poll_single_keyword(kw_info: Dict, callback=None) -> List[EbayListing]
 
                 # Check instant pass keywords AND uBuyFirst title filters
                 title_lower = listing.title.lower()
-                skip = False
                 # Check basic instant pass keywords
-                for kw in INSTANT_PASS_KEYWORDS:
-                    if kw in title_lower:
-                        skip = True
-                        break
+                if INSTANT_PASS_MATCHER.search(title_lower):
+                    continue
                 # Check uBuyFirst title filters (trading cards, coins, etc.)
-                if not skip:
-                    for kw in UBF_TITLE_FILTERS:
-                        if kw in title_lower:
-                            skip = True
-                            break
-                if skip:
+                if UBF_TITLE_MATCHER.search(title_lower):
                     continue
 
                 # Enrich with seller profile
                 if SELLER_PROFILING_ENABLED:
                     listing = enrich_listing_with_seller_profile(listing, category)
 
+                listing.search_keyword = keyword
                 new_listings.append(listing)
 
                 priority_tag = f"[{listing.seller_priority}]" if listing.seller_score >= 60 else ""
@@ -2118,7 +2175,7 @@ async def poll_single_keyword(kw_info: Dict, callback=None) -> List[EbayListing]
 
                 # Send to analysis callback - Discord notification handled there based on recommendation
                 if callback and not is_initial_baseline:
-                    asyncio.create_task(_safe_callback(callback, listing))
+                    ANALYSIS_DISPATCHER.submit(callback, listing)
 
     except Exception as e:
         logger.error(f"[EBAY API] Error polling '{keyword}': {e}")
@@ -2126,6 +2183,56 @@ async def poll_single_keyword(kw_info: Dict, callback=None) -> List[EbayListing]
     return new_listings
 
 
+# Adaptive keyword schedule (set while poll_staggered runs with KEYWORD_SCHEDULE.enabled)
+KEYWORD_POLL_LOG = Path(__file__).parent / "keyword_polls.jsonl"
+KEYWORD_SCHEDULER: Optional[KeywordPollScheduler] = None
+
+
+async def _seed_keyword_outcomes(scheduler: KeywordPollScheduler):
+    """BUY history per search keyword from the outcome lines of the poll log"""
+    since = _time.time() - KEYWORD_SCHEDULE.history_days * 86400
+    outcomes = await asyncio.to_thread(load_keyword_outcomes, KEYWORD_POLL_LOG, since)
+    seeded = scheduler.seed_outcomes(outcomes)
+    if seeded:
+        logger.info(f"[SCHEDULE] Seeded BUY yield for {seeded} keywords from {KEYWORD_POLL_LOG.name}")
+
+
+async def poll_adaptive(keywords: List[Dict], callback=None):
+    """
+    Yield-weighted polling loop: each keyword gets its own interval from its
+    new-listing rate and BUY yield, paced to the daily quota (see
+    services/keyword_scheduler.py).
+    """
+    global KEYWORD_SCHEDULER
+    scheduler = KeywordPollScheduler(keywords, log_path=KEYWORD_POLL_LOG)
+    KEYWORD_SCHEDULER = scheduler
+    await _seed_keyword_outcomes(scheduler)
+    last_log_flush = _time.time()
+
+    try:
+        while True:
+            kw_info, wait = scheduler.next_keyword(calls_today=API_STATS.get("calls_today", 0))
+            if wait > 0:
+                await asyncio.sleep(wait)
+
+            keyword = kw_info["keyword"]
+            is_baseline = not KEYWORD_TIMESTAMPS.get(keyword)
+            new_items = await poll_single_keyword(kw_info, callback)
+            if is_baseline:
+                scheduler.mark_polled(keyword)
+            else:
+                scheduler.record_poll(keyword, new_items)
+            logger.debug(f"[SCHEDULE] {keyword}: {len(new_items)} new | "
+                         f"interval {1 / scheduler.keywords[keyword].rate:.1f}s")
+
+            if _time.time() - last_log_flush >= SEEN_LISTINGS_SAVE_INTERVAL:
+                last_log_flush = _time.time()
+                await asyncio.to_thread(scheduler.flush_log)
+    finally:
+        scheduler.flush_log()
+        KEYWORD_SCHEDULER = None
+
+
 async def poll_staggered(callback=None):
     """
     Staggered round-robin polling loop.
@@ -2136,6 +2243,9 @@ async def poll_staggered(callback=None):
     2. Even distribution of calls over time
     3. Better rate limit handling
     4. Same per-keyword refresh rate (26s each with 3 keywords at 8.6s interval)
+
+    With KEYWORD_SCHEDULE.enabled (default) the keywords are handed to
+    poll_adaptive, which gives high-yield keywords shorter intervals.
     """
     keywords = build_staggered_keyword_list()
 
@@ -2143,6 +2253,14 @@ async def poll_staggered(callback=None):
         logger.error("[EBAY API] No keywords configured for staggered polling!")
         return
 
+    if KEYWORD_SCHEDULE.enabled:
+        logger.info(f"[SCHEDULE] Starting adaptive polling: {len(keywords)} keywords, "
+                    f"{KEYWORD_SCHEDULE.min_interval:.0f}-{KEYWORD_SCHEDULE.max_interval:.0f}s per keyword "
+                    f"(ADAPTIVE_KEYWORD_POLLING=false for round-robin)")
+        logger.info(f"[SCHEDULE] Keywords: {[k['keyword'] for k in keywords]}")
+        await poll_adaptive(keywords, callback)
+        return
+
     logger.info(f"[STAGGERED] Starting round-robin polling: {len(keywords)} keywords, {STAGGERED_POLL_INTERVAL}s interval")
     logger.info(f"[STAGGERED] Each keyword refreshes every {STAGGERED_POLL_INTERVAL * len(keywords):.1f}s")
     logger.info(f"[STAGGERED] Keywords: {[k['keyword'] for k in keywords]}")
@@ -2224,8 +2342,9 @@ async def poll_rss_fast(callback=None):
             )
 
             new_count = 0
+            new_ids = await filter_new_listing_ids(listings)
             for listing in listings:
-                if await is_new_listing_async(listing.item_id):
+                if listing.item_id in new_ids:
                     # Freshness check - only items from last 5 minutes
                     if listing.start_time:
                         try:
@@ -2241,10 +2360,7 @@ async def poll_rss_fast(callback=None):
                     title_lower = listing.title.lower()
                     skip = False
                     try:
-                        for kw in INSTANT_PASS_KEYWORDS:
-                            if kw in title_lower:
-                                skip = True
-                                break
+                        skip = INSTANT_PASS_MATCHER.search(title_lower)
                     except:
                         pass
                     if skip:
@@ -2253,9 +2369,9 @@ async def poll_rss_fast(callback=None):
                     new_count += 1
                     logger.info(f"[RSS] NEW: ${listing.price:.0f} - {listing.title[:50]}...")
 
-                    # Fire callback immediately
+                    # Queue for analysis (no enrichment here - priority is price vs melt + freshness)
                     if callback:
-                        asyncio.create_task(_safe_callback(callback, listing))
+                        ANALYSIS_DISPATCHER.submit(callback, listing)
 
             if new_count > 0:
                 logger.info(f"[RSS FAST] {keyword}: {new_count} new items")
@@ -2348,6 +2464,10 @@ async def stop_polling(categories: List[str] = None):
             del POLL_TASKS[category]
             logger.info(f"[EBAY API] Stopped polling: {category}")
 
+    # Persist seen listings so the next start doesn't re-emit them
+    saved = await asyncio.to_thread(SEEN_LISTINGS.save)
+    logger.info(f"[EBAY API] Saved {saved} seen listings")
+
 
 # ============================================================
 # TEXTBOOK ARBITRAGE POLLING
@@ -2365,7 +2485,7 @@ async def analyze_textbook_listing(listing: EbayListing) -> Optional[Dict]:
     Returns deal info if profitable, None otherwise.
     """
     try:
-        async with httpx.AsyncClient() as client:
+        async with http_clients.session("default") as client:
             response = await client.post(
                 f"{KEEPA_TRACKER_URL}/textbook/analyze",
                 json={
@@ -2544,60 +2664,59 @@ async def analyze_listing_callback(listing):
         except Exception as e:
             logger.warning(f"[ANALYSIS] Source comparison logging failed: {e}")
 
-        proxy_url = os.getenv("PROXY_URL", "http://127.0.0.1:8000") + "/match_mydata"
+        # Import here to avoid circular imports (the pipeline imports this module lazily)
+        from utils.listing_adapter import normalize_api_listing
+        try:
+            from pipeline import orchestrator
+        except ImportError:
+            orchestrator = None  # standalone poller without the proxy's dependencies
 
-        # Fetch full item details (description, images) for better analysis
-        item_details = await get_item_details(listing.item_id)
-        description = ""
-        images = []
-        if item_details:
-            description = item_details.get('description', '')
-            images = item_details.get('images', [])
-        
-        # Build request data - include description and images for full AI analysis
-        data = {
-            "Title": listing.title,
-            "TotalPrice": f"${listing.price:.2f}",
+        # Full item details (description, images, item specifics) for better analysis
+        standardized = await normalize_api_listing(listing)
+        extra = {
             "ItemPrice": f"${listing.price:.2f}",
             "URL": listing.view_url or f"https://www.ebay.com/itm/{listing.item_id}",
             "SellerName": listing.seller_id,
-            "Description": description,
-            "response_type": "json",
         }
-        
-        # Add images if available (for scale photo detection)
-        if images:
-            data["Images"] = ",".join(images[:5])  # Max 5 images
-        
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            response = await client.get(proxy_url, params=data)
-            if response.status_code == 200:
-                result = response.json()
-                recommendation = result.get("Recommendation", "UNKNOWN")
-                
-                # Update Discord notification with analysis results
-                if recommendation == "BUY":
-                    # Extract numeric values from proxy response
-                    max_buy_str = result.get("MaxBuy", "0") or "0"
-                    max_buy = float(max_buy_str.replace("$", "").replace(",", "").replace("+", "") or 0)
-                    
-                    profit_str = result.get("Profit", "0") or "0"
-                    profit = float(profit_str.replace("$", "").replace(",", "").replace("+", "") or 0)
-                    
-                    await send_discord_listing(
-                        listing,
-                        keyword="API Analysis",
-                        source="Full Pipeline",
-                        recommendation=recommendation,
-                        reasoning=f"Profit: ${profit:.0f} | {result.get('reasoning', '')[:100]}",
-                        melt_value=None,  # Don't show raw melt value
-                        max_buy=max_buy if max_buy > 0 else None,
-                    )
-                    logger.info(f"[ANALYSIS] {recommendation}: {listing.title[:40]}...")
-                else:
-                    logger.debug(f"[ANALYSIS] {recommendation}: {listing.title[:40]}...")
-            else:
+
+        if orchestrator is not None and orchestrator.is_configured():
+            # Running inside the proxy - no HTTP loopback to /match_mydata
+            result = await orchestrator.analyze(standardized, extra)
+        else:
+            # Remote proxy (mini PC runner) - JSON body, so description/images aren't query params
+            proxy_url = os.getenv("PROXY_URL", "http://127.0.0.1:8000") + "/match_mydata"
+            async with http_clients.session("default", timeout=30.0) as client:
+                response = await client.post(proxy_url, json={**standardized.to_pipeline_dict(), **extra})
+            if response.status_code != 200:
                 logger.warning(f"[ANALYSIS] Proxy error {response.status_code}")
+                return
+            result = response.json()
+
+        recommendation = result.get("Recommendation", "UNKNOWN")
+        if KEYWORD_SCHEDULER and listing.search_keyword:
+            KEYWORD_SCHEDULER.record_outcome(listing.search_keyword, recommendation, listing.item_id)
+
+        # Update Discord notification with analysis results
+        if recommendation == "BUY":
+            # Extract numeric values from the analysis result
+            max_buy_str = result.get("MaxBuy", "0") or "0"
+            max_buy = float(max_buy_str.replace("$", "").replace(",", "").replace("+", "") or 0)
+
+            profit_str = result.get("Profit", "0") or "0"
+            profit = float(profit_str.replace("$", "").replace(",", "").replace("+", "") or 0)
+
+            await send_discord_listing(
+                listing,
+                keyword="API Analysis",
+                source="Full Pipeline",
+                recommendation=recommendation,
+                reasoning=f"Profit: ${profit:.0f} | {result.get('reasoning', '')[:100]}",
+                melt_value=None,  # Don't show raw melt value
+                max_buy=max_buy if max_buy > 0 else None,
+            )
+            logger.info(f"[ANALYSIS] {recommendation}: {listing.title[:40]}...")
+        else:
+            logger.debug(f"[ANALYSIS] {recommendation}: {listing.title[:40]}...")
     except Exception as e:
         logger.warning(f"[ANALYSIS] Error analyzing listing: {e}")
 
@@ -13,6 +13,8 @@ import re
 from typing import Dict, Optional, Tuple
 from dataclasses import dataclass
 
+from utils.listing_features import get_listing_features
+
 # Get spot prices from config (will be imported in main)
 # These are FALLBACKS if live fetch fails - update periodically to stay close to market
 DEFAULT_GOLD_OZ = 4500       # Fallback ~Jan 2026 prices
@@ -307,29 +309,6 @@ def check_item_specifics_danger(data: dict) -> Tuple[bool, str]:
     return False, ""
 
 
-# ============================================================
-# KARAT EXTRACTION (Pre-compiled for speed)
-# ============================================================
-
-# Pre-compile karat patterns at module load
-KARAT_PATTERNS_COMPILED = [
-    # Standard karat marks - most reliable
-    (re.compile(r'\b24\s*k(?:t|arat)?\b', re.IGNORECASE), 24),
-    (re.compile(r'\b22\s*k(?:t|arat)?\b', re.IGNORECASE), 22),
-    (re.compile(r'\b18\s*k(?:t|arat)?\b', re.IGNORECASE), 18),
-    (re.compile(r'\b14\s*k(?:t|arat)?\b', re.IGNORECASE), 14),
-    (re.compile(r'\b10\s*k(?:t|arat)?\b', re.IGNORECASE), 10),
-    (re.compile(r'\b9\s*k(?:t|arat)?\b', re.IGNORECASE), 9),
-    # European fineness marks
-    (re.compile(r'\b999\b'), 24),   # Pure gold
-    (re.compile(r'\b916\b'), 22),   # 22K
-    (re.compile(r'\b750\b'), 18),   # 18K
-    (re.compile(r'\b585\b'), 14),   # 14K
-    (re.compile(r'\b417\b'), 10),   # 10K
-    (re.compile(r'\b375\b'), 9),    # 9K
-]
-
-
 # ============================================================
 # PLATINUM PURITY PATTERNS (Pre-compiled for speed)
 # ============================================================
@@ -374,6 +353,10 @@ PALLADIUM_PURITY_PATTERNS_COMPILED = [
 ]
 
 
+# ============================================================
+# KARAT EXTRACTION (memoized ListingFeatures)
+# ============================================================
+
 def extract_karat(title: str, description: str = "", item_specifics: dict = None) -> Tuple[Optional[int], str]:
     """
     Extract karat from title/description/item_specifics.
@@ -383,135 +366,32 @@ def extract_karat(title: str, description: str = "", item_specifics: dict = None
     1. Item specifics (MetalPurity, Fineness) - most reliable, from eBay database
     2. Title - seller's main description
     3. Description - additional details
-    """
-    # Check item specifics FIRST (most reliable - from eBay database)
-    if item_specifics:
-        # MetalPurity field (e.g., "14K", "18K", "24K", ".925")
-        metal_purity = str(item_specifics.get('MetalPurity', '') or '').lower().strip()
-        if metal_purity:
-            # Parse karat from common formats: "14k", "18kt", "24 karat", etc.
-            for pattern, karat in KARAT_PATTERNS_COMPILED:
-                if pattern.search(metal_purity):
-                    return karat, "MetalPurity"
-
-        # Fineness field (e.g., "585", "750", "999")
-        fineness = str(item_specifics.get('Fineness', '') or '').strip()
-        if fineness:
-            # Fineness to karat mapping
-            fineness_map = {
-                '999': 24, '9999': 24,
-                '916': 22,
-                '750': 18,
-                '585': 14,
-                '417': 10,
-                '375': 9,
-            }
-            # Check for fineness number
-            for fin_val, karat in fineness_map.items():
-                if fin_val in fineness:
-                    return karat, "Fineness"
-
-    # Check title (more reliable than description)
-    for pattern, karat in KARAT_PATTERNS_COMPILED:
-        if pattern.search(title):
-            return karat, "title"
 
-    # Check description
-    if description:
-        for pattern, karat in KARAT_PATTERNS_COMPILED:
-            if pattern.search(description):
-                return karat, "description"
-
-    return None, "none"
+    Reads the memoized ListingFeatures (utils/listing_features.py).
+    """
+    features = get_listing_features(title, description, item_specifics)
+    return features.karat, features.karat_source
 
 
 # ============================================================
-# WEIGHT EXTRACTION (Pre-compiled for speed)
+# WEIGHT EXTRACTION (memoized ListingFeatures)
 # ============================================================
 
-# Pre-compile weight patterns
-WEIGHT_GRAM_PATTERN = re.compile(r'(\d*\.?\d+)\s*(?:g(?:ram)?s?|gm|gms)\b', re.IGNORECASE)
-WEIGHT_DWT_PATTERN = re.compile(r'(\d+\.?\d*)\s*dwt\b', re.IGNORECASE)
-# Troy oz pattern: matches "6.19 oz", "6.19 troy oz", "6.19 TROY OZ", etc.
-WEIGHT_OZ_PATTERN = re.compile(r'(\d+\.?\d*)\s*(?:troy\s+)?(?:oz|ounce)s?\b', re.IGNORECASE)
-# Fractional oz pattern: matches "1/2 oz", "1/4 troy oz", "1/10 oz", etc.
-WEIGHT_FRAC_OZ_PATTERN = re.compile(r'(\d+)/(\d+)\s*(?:troy\s+)?(?:oz|ounce)s?\b', re.IGNORECASE)
-# Word fraction patterns: "one half oz", "half ounce", "quarter oz"
-WEIGHT_WORD_FRAC_PATTERN = re.compile(
-    r'\b(?:one\s+)?(?P<frac>half|quarter|tenth)\s+(?:troy\s+)?(?:oz|ounce)s?\b',
-    re.IGNORECASE
-)
-WORD_FRAC_MAP = {'half': 0.5, 'quarter': 0.25, 'tenth': 0.1}
-
-
 def extract_weight(title: str, description: str = "", max_weight: float = 3000) -> Tuple[Optional[float], str]:
     """
     Extract weight from title/description.
     Returns (weight_grams, source)
 
-    Handles: grams, dwt (pennyweight), oz
-    Uses pre-compiled patterns for speed.
+    Handles: grams, dwt (pennyweight), oz (troy), fractional and word-fraction oz.
+    Title is checked before description. Reads the memoized ListingFeatures
+    (utils/listing_features.py), so repeated calls for one listing scan once.
 
     Args:
         title: Item title
         description: Item description
         max_weight: Maximum valid weight in grams (default 3000g for large silver pieces)
     """
-    text_sources = [
-        (title, "title"),
-        (description, "description")
-    ]
-
-    for text, source in text_sources:
-        if not text:
-            continue
-
-        # Clean text: replace + with space (URL encoding), then lowercase
-        text_lower = text.replace('+', ' ').lower()
-
-        # Pattern: "X.Xg" or "X.X grams" or "X.X gram" (pre-compiled)
-        gram_match = WEIGHT_GRAM_PATTERN.search(text_lower)
-        if gram_match:
-            weight = float(gram_match.group(1))
-            if 0.1 <= weight <= max_weight:  # Allow up to max_weight for large silver
-                return weight, source
-
-        # Pattern: "X.X dwt" (pennyweight) - multiply by 1.555
-        dwt_match = WEIGHT_DWT_PATTERN.search(text_lower)
-        if dwt_match:
-            weight = float(dwt_match.group(1)) * 1.555
-            if 0.1 <= weight <= max_weight:
-                return weight, source
-
-        # Check fractional patterns FIRST (before regular oz pattern)
-        # Pattern: "1/2 oz", "1/4 oz", "1/10 oz" (fractional ounces)
-        frac_oz_match = WEIGHT_FRAC_OZ_PATTERN.search(text_lower)
-        if frac_oz_match:
-            numerator = float(frac_oz_match.group(1))
-            denominator = float(frac_oz_match.group(2))
-            if denominator > 0:
-                weight = (numerator / denominator) * 31.1035
-                if 0.1 <= weight <= max_weight:
-                    return weight, source
-
-        # Pattern: "one half oz", "half ounce", "quarter oz"
-        word_frac_match = WEIGHT_WORD_FRAC_PATTERN.search(text_lower)
-        if word_frac_match:
-            frac_word = word_frac_match.group('frac').lower()
-            if frac_word in WORD_FRAC_MAP:
-                weight = WORD_FRAC_MAP[frac_word] * 31.1035
-                if 0.1 <= weight <= max_weight:
-                    return weight, source
-
-        # Pattern: "X.X oz" (ounces) - multiply by 31.1
-        # Check AFTER fractional patterns to avoid matching "2" from "1/2 oz"
-        oz_match = WEIGHT_OZ_PATTERN.search(text_lower)
-        if oz_match:
-            weight = float(oz_match.group(1)) * 31.1035
-            if 0.1 <= weight <= max_weight:
-                return weight, source
-
-    return None, "none"
+    return get_listing_features(title, description).weight(max_weight)
 
 
 # ============================================================
@@ -817,6 +697,8 @@ def fast_extract_gold(
                        These are more reliable than regex extraction from title.
     """
     result = FastExtractResult()
+    # Weight, karat, plated and non-metal flags: one memoized pass per listing
+    features = get_listing_features(title, description, item_specifics)
 
     # Step 0: Check item specifics for danger signals (plated, stainless, etc.)
     if item_specifics:
@@ -829,7 +711,7 @@ def fast_extract_gold(
             return result
 
     # Step 1: Check for plated/filled (instant PASS - always safe)
-    is_plated, plated_reason = detect_plated(title, description)
+    is_plated, plated_reason = features.is_plated, features.plated_reason
     if is_plated:
         result.is_plated = True
         result.plated_reason = plated_reason
@@ -889,7 +771,7 @@ def fast_extract_gold(
 
     # Step 2: Check for non-metal components (stones, pearls, watches)
     # These need AI analysis - don't do price-based instant pass!
-    has_non_metal, non_metal_type = detect_non_metal(title, description, item_specifics)
+    has_non_metal, non_metal_type = features.has_non_metal, features.non_metal_type
     if has_non_metal:
         result.has_non_metal = True
         result.non_metal_type = non_metal_type
@@ -1063,7 +945,7 @@ def fast_extract_gold(
         result.hot_reason = f"HEAVY GOLD INDICATOR: '{heavy_reason}' @ ${price:.0f} - may be large/valuable"
 
     # Step 3: Extract karat (uses item_specifics first, then title/description)
-    karat, karat_source = extract_karat(title, description, item_specifics)
+    karat, karat_source = features.karat, features.karat_source
     if karat:
         result.karat = karat
         result.karat_source = karat_source
@@ -1071,7 +953,7 @@ def fast_extract_gold(
 
     # Step 4: Extract weight from TITLE FIRST (gold rarely exceeds 500g)
     # Title weight ALWAYS takes priority over estimates
-    title_weight, title_weight_source = extract_weight(title, description, max_weight=500)
+    title_weight, title_weight_source = features.weight(max_weight=500)
     if title_weight:
         # Title has explicit weight - use it, overriding any estimate
         result.weight_grams = title_weight
@@ -1186,6 +1068,7 @@ def fast_extract_silver(
         item_specifics: eBay item specifics dict with fields like Metal, MetalPurity, Fineness, etc.
     """
     result = FastExtractResult()
+    features = get_listing_features(title, description, item_specifics)
 
     text = f"{title} {description}".lower()
 
@@ -1234,7 +1117,7 @@ def fast_extract_silver(
             # Don't return - continue to let AI handle it
 
     # Step 2: Check for non-metal components (stones, beads)
-    has_non_metal, non_metal_type = detect_non_metal(title, description, item_specifics)
+    has_non_metal, non_metal_type = features.has_non_metal, features.non_metal_type
     if has_non_metal:
         result.has_non_metal = True
         result.non_metal_type = non_metal_type
@@ -1246,7 +1129,7 @@ def fast_extract_silver(
         result.confidence += 30
 
     # Step 4: Extract weight (silver can be heavy - up to 3kg for flatware/serving sets)
-    weight, weight_source = extract_weight(title, description, max_weight=3000)
+    weight, weight_source = features.weight(max_weight=3000)
     if weight:
         result.weight_grams = weight
         result.weight_source = weight_source
@@ -1301,7 +1184,8 @@ def fast_extract_platinum(
             return result
 
     # Step 2: Check for non-metal components
-    has_non_metal, non_metal_type = detect_non_metal(title, description)
+    features = get_listing_features(title, description)
+    has_non_metal, non_metal_type = features.has_non_metal, features.non_metal_type
     if has_non_metal:
         result.has_non_metal = True
         result.non_metal_type = non_metal_type
@@ -1315,7 +1199,7 @@ def fast_extract_platinum(
         result.confidence += 30
 
     # Step 4: Extract weight
-    weight, weight_source = extract_weight(title, description, max_weight=500)
+    weight, weight_source = features.weight(max_weight=500)
     if weight:
         result.weight_grams = weight
         result.weight_source = weight_source
@@ -1369,7 +1253,8 @@ def fast_extract_palladium(
             return result
 
     # Step 2: Check for non-metal components
-    has_non_metal, non_metal_type = detect_non_metal(title, description)
+    features = get_listing_features(title, description)
+    has_non_metal, non_metal_type = features.has_non_metal, features.non_metal_type
     if has_non_metal:
         result.has_non_metal = True
         result.non_metal_type = non_metal_type
@@ -1383,7 +1268,7 @@ def fast_extract_palladium(
         result.confidence += 30
 
     # Step 4: Extract weight
-    weight, weight_source = extract_weight(title, description, max_weight=500)
+    weight, weight_source = features.weight(max_weight=500)
     if weight:
         result.weight_grams = weight
         result.weight_source = weight_source
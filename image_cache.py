@@ -0,0 +1,292 @@
+"""
+Image Cache - one download per image, one encode per size
+
+The same eBay image URLs are fetched for Tier 1, again by the Tier 2
+prefetch and again by background Sonnet verification, each time at a
+different resize target. This cache keeps:
+
+- raw downloaded bytes, content-addressed (sha256 of the body), in a byte
+  budgeted LRU with an optional on-disk tier
+- encoded variants (base64 payload at a given max dimension) keyed by
+  content digest + size, in a second byte budgeted LRU
+
+Concurrent requests for the same URL (or the same variant) share one
+in-flight task instead of racing duplicate downloads.
+"""
+
+import os
+import asyncio
+import hashlib
+import logging
+import threading
+from pathlib import Path
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from config import IMAGES
+
+logger = logging.getLogger(__name__)
+
+# Max URL -> digest mappings remembered (raw bytes may be evicted sooner)
+MAX_URL_INDEX = 20000
+
+
+class _ByteLRU:
+    """OrderedDict LRU bounded by total payload bytes rather than entry count"""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self.evictions = 0
+        self._entries: OrderedDict = OrderedDict()
+
+    def get(self, key):
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+        return entry
+
+    def put(self, key, value, size: int):
+        if size > self.max_bytes:
+            return
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self.bytes -= old[1]
+        self._entries[key] = (value, size)
+        self.bytes += size
+        while self.bytes > self.max_bytes and self._entries:
+            _, (_, evicted_size) = self._entries.popitem(last=False)
+            self.bytes -= evicted_size
+            self.evictions += 1
+
+    def clear(self):
+        self._entries.clear()
+        self.bytes = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class ImageCache:
+    """
+    Content-addressed image cache with pre-resized variants.
+
+    Usage (from image_fetcher):
+        block = await image_cache.get_variant(url, 768, fetch_raw, build_variant)
+
+    `fetch_raw(url)` returns (raw_bytes, media_type) and raises on failure.
+    `build_variant(raw_bytes, media_type)` is async too and returns
+    (base64_str, media_type), raising on failure. Failures are never cached.
+    """
+
+    def __init__(self, max_bytes: int = None, raw_max_bytes: int = None,
+                 disk_dir: str = None, disk_max_bytes: int = None):
+        self._variants = _ByteLRU(max_bytes or IMAGES.cache_max_bytes)
+        self._raw = _ByteLRU(raw_max_bytes or IMAGES.cache_raw_max_bytes)
+        self._url_digest: OrderedDict[str, str] = OrderedDict()
+        self._inflight: Dict[Any, asyncio.Future] = {}
+        self._lock = threading.RLock()
+
+        disk_dir = IMAGES.cache_disk_dir if disk_dir is None else disk_dir
+        self._disk_dir = Path(disk_dir) if disk_dir else None
+        self._disk_max_bytes = disk_max_bytes or IMAGES.cache_disk_max_bytes
+        self._disk_bytes = 0
+        if self._disk_dir:
+            try:
+                self._disk_dir.mkdir(parents=True, exist_ok=True)
+                self._disk_bytes = sum(p.stat().st_size for p in self._disk_dir.glob("*.img"))
+            except OSError as e:
+                logger.warning(f"[IMAGE CACHE] Disk tier disabled ({self._disk_dir}): {e}")
+                self._disk_dir = None
+
+        self._stats = {
+            'requests': 0,
+            'variant_hits': 0,
+            'raw_hits': 0,
+            'disk_hits': 0,
+            'downloads': 0,
+            'coalesced': 0,
+            'bytes_downloaded': 0,
+            'bytes_saved': 0,
+        }
+
+    # ----------------------------------------------------------
+    # Coalescing
+    # ----------------------------------------------------------
+
+    async def _coalesce(self, key, factory: Callable[[], Awaitable]):
+        """Run factory() once per key; concurrent callers await the same task."""
+        with self._lock:
+            task = self._inflight.get(key)
+            if task is not None:
+                self._stats['coalesced'] += 1
+            else:
+                task = asyncio.ensure_future(factory())
+                self._inflight[key] = task
+                task.add_done_callback(lambda _t, k=key: self._inflight.pop(k, None))
+        # shield: one cancelled caller must not cancel the fetch for the others
+        return await asyncio.shield(task)
+
+    # ----------------------------------------------------------
+    # Raw tier (memory + optional disk)
+    # ----------------------------------------------------------
+
+    def _disk_path(self, url: str) -> Path:
+        return self._disk_dir / f"{hashlib.sha256(url.encode()).hexdigest()}.img"
+
+    def _disk_read(self, url: str) -> Optional[Tuple[bytes, str]]:
+        path = self._disk_path(url)
+        try:
+            blob = path.read_bytes()
+        except OSError:
+            return None
+        media_type, _, data = blob.partition(b"\n")
+        os.utime(path)  # LRU by mtime
+        return data, media_type.decode() or 'image/jpeg'
+
+    def _disk_write(self, url: str, data: bytes, media_type: str):
+        path = self._disk_path(url)
+        try:
+            tmp = path.with_suffix(".tmp")
+            tmp.write_bytes(media_type.encode() + b"\n" + data)
+            tmp.replace(path)
+        except OSError as e:
+            logger.debug(f"[IMAGE CACHE] Disk write failed: {e}")
+            return
+        with self._lock:
+            self._disk_bytes += path.stat().st_size
+            over_budget = self._disk_bytes > self._disk_max_bytes
+        if over_budget:
+            self._disk_evict()
+
+    def _disk_evict(self):
+        """Drop least recently used files until the disk tier is at 90% of budget"""
+        files = sorted(self._disk_dir.glob("*.img"), key=lambda p: p.stat().st_mtime)
+        total = sum(p.stat().st_size for p in files)
+        target = int(self._disk_max_bytes * 0.9)
+        for path in files:
+            if total <= target:
+                break
+            try:
+                size = path.stat().st_size
+                path.unlink()
+                total -= size
+            except OSError:
+                pass
+        with self._lock:
+            self._disk_bytes = total
+
+    def _remember(self, url: str, data: bytes, media_type: str) -> str:
+        digest = hashlib.sha256(data).hexdigest()
+        with self._lock:
+            self._raw.put(digest, (data, media_type), len(data))
+            self._url_digest[url] = digest
+            self._url_digest.move_to_end(url)
+            while len(self._url_digest) > MAX_URL_INDEX:
+                self._url_digest.popitem(last=False)
+        return digest
+
+    async def _load_raw(self, url: str, fetch_raw) -> Tuple[str, bytes, str]:
+        if self._disk_dir:
+            cached = await asyncio.to_thread(self._disk_read, url)
+            if cached is not None:
+                data, media_type = cached
+                with self._lock:
+                    self._stats['disk_hits'] += 1
+                    self._stats['bytes_saved'] += len(data)
+                return self._remember(url, data, media_type), data, media_type
+
+        data, media_type = await fetch_raw(url)
+        with self._lock:
+            self._stats['downloads'] += 1
+            self._stats['bytes_downloaded'] += len(data)
+        digest = self._remember(url, data, media_type)
+        if self._disk_dir:
+            await asyncio.to_thread(self._disk_write, url, data, media_type)
+        return digest, data, media_type
+
+    async def get_raw(self, url: str, fetch_raw) -> Tuple[str, bytes, str]:
+        """Return (digest, raw_bytes, media_type), downloading at most once."""
+        with self._lock:
+            digest = self._url_digest.get(url)
+            entry = self._raw.get(digest) if digest else None
+            if entry is not None:
+                (data, media_type), _ = entry
+                self._stats['raw_hits'] += 1
+                self._stats['bytes_saved'] += len(data)
+                return digest, data, media_type
+        return await self._coalesce(('raw', url), lambda: self._load_raw(url, fetch_raw))
+
+    # ----------------------------------------------------------
+    # Encoded variants
+    # ----------------------------------------------------------
+
+    async def _build(self, url: str, max_size: Optional[int], fetch_raw, build_variant) -> Dict[str, Any]:
+        digest, data, media_type = await self.get_raw(url, fetch_raw)
+        key = (digest, max_size)
+        with self._lock:
+            entry = self._variants.get(key)
+        if entry is not None:
+            # Same content already encoded under another URL
+            return entry[0]
+        encoded, out_type = await build_variant(data, media_type)
+        block = {
+            "type": "image",
+            "source": {"type": "base64", "media_type": out_type, "data": encoded},
+        }
+        with self._lock:
+            self._variants.put(key, block, len(encoded))
+        return block
+
+    async def get_variant(self, url: str, max_size: Optional[int], fetch_raw, build_variant) -> Dict[str, Any]:
+        """
+        Return a Claude image block for url resized to max_size (None = original).
+        Raises whatever fetch_raw/build_variant raise.
+        """
+        with self._lock:
+            self._stats['requests'] += 1
+            digest = self._url_digest.get(url)
+            entry = self._variants.get((digest, max_size)) if digest else None
+            if entry is not None:
+                self._stats['variant_hits'] += 1
+                raw = self._raw.get(digest)
+                if raw is not None:
+                    self._stats['bytes_saved'] += raw[1]
+                return entry[0]
+        return await self._coalesce(
+            ('variant', url, max_size),
+            lambda: self._build(url, max_size, fetch_raw, build_variant),
+        )
+
+    def clear(self) -> int:
+        """Clear in-memory tiers, return number of variants dropped"""
+        with self._lock:
+            count = len(self._variants)
+            self._variants.clear()
+            self._raw.clear()
+            self._url_digest.clear()
+            return count
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get image cache statistics"""
+        with self._lock:
+            requests = self._stats['requests']
+            hit_rate = self._stats['variant_hits'] / requests * 100 if requests else 0
+            return {
+                **self._stats,
+                'hit_rate': f"{hit_rate:.1f}%",
+                'variants': len(self._variants),
+                'variant_bytes': self._variants.bytes,
+                'variant_max_bytes': self._variants.max_bytes,
+                'raw_images': len(self._raw),
+                'raw_bytes': self._raw.bytes,
+                'raw_max_bytes': self._raw.max_bytes,
+                'evictions': self._variants.evictions + self._raw.evictions,
+                'disk_enabled': self._disk_dir is not None,
+                'disk_bytes': self._disk_bytes,
+                'inflight': len(self._inflight),
+            }
+
+
+# Global image cache instance
+image_cache = ImageCache()
@@ -4,36 +4,133 @@ Reduces image fetch time from 10-15 seconds (sequential) to 2-3 seconds (paralle
 Includes automatic compression for images exceeding API limits
 """
 
+import sys
 import asyncio
 import base64
 import logging
-import io
+import threading
+import functools
+import multiprocessing
+from contextlib import contextmanager
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from typing import List, Dict, Optional, Any, Tuple
 from dataclasses import dataclass
 
 try:
     import httpx
+    from services.http_clients import http_clients
     HTTPX_AVAILABLE = True
 except ImportError:
     HTTPX_AVAILABLE = False
     print("[IMAGES] httpx not installed. Run: pip install httpx")
 
-try:
-    from PIL import Image
-    PIL_AVAILABLE = True
-except ImportError:
-    PIL_AVAILABLE = False
+import image_processing
+from image_processing import (
+    PIL_AVAILABLE,
+    MAX_RAW_BYTES,
+    MAX_BASE64_BYTES,
+    ImageTooLargeError,
+    compress_image,
+    resize_image,
+    build_variant,
+)
+
+if not PIL_AVAILABLE:
     print("[IMAGES] Pillow not installed. Large images won't be compressed. Run: pip install Pillow")
 
 from config import IMAGES
+from image_cache import image_cache
 
 logger = logging.getLogger(__name__)
 
-# Anthropic API limit is 5MB (5,242,880 bytes) for BASE64 encoded data
-# Base64 encoding adds ~33% overhead, so raw bytes limit is 5MB / 1.33 ≈ 3.75MB
-# We use 3.5MB to be safe
-MAX_RAW_BYTES = 3_500_000  # Before base64 encoding
-MAX_BASE64_BYTES = 5_000_000  # After base64 encoding (API limit with buffer)
+
+# ============================================================
+# IMAGE WORKER POOL
+# ============================================================
+# Pillow decode/resample/re-encode runs in worker processes so a burst of
+# gold/silver listings doesn't stall the event loop (or fight over the GIL).
+# Workers are spawned, never forked: by the time images are processed the
+# parent runs the event loop, HTTP pools and executor threads, and a fork
+# would copy their locks mid-use. The pool is started from the lifespan
+# (start_image_pool) with __main__ pointed at image_processing, so each
+# spawned worker imports that module instead of re-running main.py.
+
+_pool: Optional[Executor] = None
+_pool_lock = threading.Lock()
+
+
+@contextmanager
+def _image_processing_as_main():
+    """Spawn preparation data names __main__; make it image_processing while workers launch"""
+    main = sys.modules.get('__main__')
+    sys.modules['__main__'] = image_processing
+    try:
+        yield
+    finally:
+        sys.modules['__main__'] = main
+
+
+def _new_pool(workers: int) -> Executor:
+    if getattr(IMAGES, 'worker_mode', 'process') == "process":
+        pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"),
+                                   initializer=image_processing.init_worker)
+        # Non-fork pools launch every worker on the first submit
+        with _image_processing_as_main():
+            ready = pool.submit(image_processing.worker_ready)
+        ready.result()
+        logger.info(f"[IMAGES] Started image worker pool ({workers} processes)")
+        return pool
+    logger.info(f"[IMAGES] Started image worker pool ({workers} threads)")
+    return ThreadPoolExecutor(max_workers=workers, thread_name_prefix="image")
+
+
+def _get_pool() -> Optional[Executor]:
+    """The image worker pool, started on first use outside the server (None = process inline)"""
+    global _pool
+    workers = getattr(IMAGES, 'process_workers', 0)
+    if workers <= 0:
+        return None
+    with _pool_lock:
+        if _pool is None:
+            _pool = _new_pool(workers)
+        return _pool
+
+
+def start_image_pool():
+    """Start the image workers now (lifespan startup; blocking - run via asyncio.to_thread)"""
+    _get_pool()
+
+
+async def run_image_job(fn, *args):
+    """Run a CPU-bound image_processing function in the worker pool"""
+    global _pool
+    pool = _pool
+    if pool is None:
+        # Started off the loop: launching spawned workers takes a while
+        pool = await asyncio.to_thread(_get_pool)
+    if pool is None:
+        return fn(*args)
+    loop = asyncio.get_running_loop()
+    try:
+        return await loop.run_in_executor(pool, functools.partial(fn, *args))
+    except BrokenProcessPool:
+        # A worker died (e.g. OOM on a huge image) - restart the pool next time
+        logger.warning("[IMAGES] Image worker pool broken, restarting")
+        with _pool_lock:
+            if _pool is pool:
+                _pool = None
+        pool.shutdown(wait=False)
+        return fn(*args)
+
+
+def shutdown_image_pool():
+    """Stop the image worker pool (call from lifespan shutdown)"""
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.shutdown(wait=False, cancel_futures=True)
 
 # Default max images when not specified (fallback)
 DEFAULT_MAX_IMAGES = 5
@@ -49,117 +146,56 @@ class FetchedImage:
     error: Optional[str] = None
 
 
-def compress_image(image_data: bytes, media_type: str, max_bytes: int = MAX_RAW_BYTES) -> Tuple[bytes, str]:
-    """
-    Compress image if it exceeds max_bytes.
-    Returns (compressed_data, media_type)
-    """
-    if len(image_data) <= max_bytes:
-        return image_data, media_type
-    
-    if not PIL_AVAILABLE:
-        logger.warning(f"[IMAGES] Image too large ({len(image_data)/1024/1024:.1f}MB) but PIL not available for compression")
-        return image_data, media_type
-    
-    try:
-        original_size = len(image_data)
-        img = Image.open(io.BytesIO(image_data))
-        
-        # Convert RGBA to RGB if necessary (for JPEG)
-        if img.mode == 'RGBA':
-            background = Image.new('RGB', img.size, (255, 255, 255))
-            background.paste(img, mask=img.split()[3])
-            img = background
-        elif img.mode != 'RGB':
-            img = img.convert('RGB')
-        
-        # Try progressively smaller sizes and quality levels
-        for scale in [0.75, 0.6, 0.5, 0.4, 0.3, 0.25, 0.2]:
-            for quality in [85, 70, 55, 40, 30]:
-                # Resize
-                new_width = int(img.width * scale)
-                new_height = int(img.height * scale)
-                
-                # Don't go smaller than 600px on longest side
-                if max(new_width, new_height) < 600:
-                    continue
-                
-                resized = img.resize((new_width, new_height), Image.Resampling.LANCZOS)
-                
-                # Compress to JPEG
-                buffer = io.BytesIO()
-                resized.save(buffer, format='JPEG', quality=quality, optimize=True)
-                compressed_data = buffer.getvalue()
-                
-                if len(compressed_data) <= max_bytes:
-                    print(f"[IMAGES] Compressed {original_size/1024/1024:.1f}MB -> {len(compressed_data)/1024/1024:.1f}MB ({new_width}x{new_height}, q={quality})")
-                    return compressed_data, 'image/jpeg'
-        
-        # Last resort: very small and low quality
-        min_dim = 600
-        if img.width > img.height:
-            new_width = min_dim
-            new_height = int(min_dim * img.height / img.width)
-        else:
-            new_height = min_dim
-            new_width = int(min_dim * img.width / img.height)
-            
-        resized = img.resize((new_width, new_height), Image.Resampling.LANCZOS)
-        buffer = io.BytesIO()
-        resized.save(buffer, format='JPEG', quality=25, optimize=True)
-        compressed_data = buffer.getvalue()
-        print(f"[IMAGES] Compressed {original_size/1024/1024:.1f}MB -> {len(compressed_data)/1024/1024:.1f}MB (last resort {new_width}x{new_height})")
-        return compressed_data, 'image/jpeg'
-        
-    except Exception as e:
-        logger.error(f"[IMAGES] Compression failed: {e}")
-        return image_data, media_type
+async def _download_image(client: "httpx.AsyncClient", url: str, timeout: float) -> Tuple[bytes, str]:
+    """Download raw image bytes, returns (data, media_type)"""
+    response = await client.get(url, timeout=timeout)
+    response.raise_for_status()
+
+    # Get content type
+    content_type = response.headers.get('content-type', 'image/jpeg')
+    if ';' in content_type:
+        content_type = content_type.split(';')[0].strip()
+
+    # Validate it's actually an image
+    if not content_type.startswith('image/'):
+        content_type = 'image/jpeg'  # Default fallback
+
+    return response.content, content_type
+
+
+async def _encode_variant(image_data: bytes, media_type: str, max_size: Optional[int]) -> Tuple[str, str]:
+    """Build a cached variant, only paying the worker round-trip when Pillow has work to do"""
+    if len(image_data) > MAX_RAW_BYTES or (max_size and PIL_AVAILABLE):
+        return await run_image_job(build_variant, image_data, media_type, max_size)
+    return build_variant(image_data, media_type, max_size)
 
 
 async def fetch_single_image(
     client: "httpx.AsyncClient",
     url: str,
-    timeout: float = 5.0
+    timeout: float = 5.0,
+    max_size: Optional[int] = None
 ) -> FetchedImage:
-    """Fetch a single image asynchronously, compressing if too large"""
+    """Fetch a single image (via the image cache), compressing if too large and resizing to max_size"""
     try:
-        response = await client.get(url, timeout=timeout)
-        response.raise_for_status()
-        
-        # Get content type
-        content_type = response.headers.get('content-type', 'image/jpeg')
-        if ';' in content_type:
-            content_type = content_type.split(';')[0].strip()
-        
-        # Validate it's actually an image
-        if not content_type.startswith('image/'):
-            content_type = 'image/jpeg'  # Default fallback
-        
-        # Get raw image data
-        image_data = response.content
-        
-        # Compress if too large (using lower threshold to account for base64 expansion)
-        if len(image_data) > MAX_RAW_BYTES:
-            image_data, content_type = compress_image(image_data, content_type)
-        
-        # Encode to base64
-        img_data = base64.b64encode(image_data).decode('utf-8')
-        
-        # FINAL CHECK: Skip if still too large after base64 encoding
-        if len(img_data) > MAX_BASE64_BYTES:
-            logger.warning(f"[IMAGES] Image still too large after compression: {len(img_data)/1024/1024:.1f}MB base64, skipping")
-            return FetchedImage(
-                url=url, data="", media_type="",
-                success=False, error="Too large even after compression"
-            )
-        
+        block = await image_cache.get_variant(
+            url, max_size,
+            fetch_raw=lambda u: _download_image(client, u, timeout),
+            build_variant=lambda data, mt: _encode_variant(data, mt, max_size),
+        )
         return FetchedImage(
             url=url,
-            data=img_data,
-            media_type=content_type,
+            data=block["source"]["data"],
+            media_type=block["source"]["media_type"],
             success=True
         )
-        
+
+    except ImageTooLargeError as e:
+        logger.warning(f"[IMAGES] Image still too large after compression, skipping: {url}")
+        return FetchedImage(
+            url=url, data="", media_type="",
+            success=False, error=str(e)
+        )
     except httpx.TimeoutException:
         return FetchedImage(
             url=url, data="", media_type="",
@@ -180,10 +216,11 @@ async def fetch_single_image(
 async def fetch_images_parallel(
     urls: List[str],
     max_images: int = None,
-    timeout: float = None
+    timeout: float = None,
+    max_size: int = None
 ) -> List[Dict[str, Any]]:
     """
-    Fetch multiple images in parallel
+    Fetch multiple images in parallel, resized to max_size (None = original)
     
     Returns list of Claude-compatible image dicts:
     [{"type": "image", "source": {"type": "base64", "media_type": "...", "data": "..."}}]
@@ -208,19 +245,17 @@ async def fetch_images_parallel(
     print(f"[IMAGES] Fetching {len(valid_urls)} images in parallel...")
     start_time = asyncio.get_event_loop().time()
     
-    async with httpx.AsyncClient(
-        headers={'User-Agent': getattr(IMAGES, 'user_agent', 'Mozilla/5.0')},
-        follow_redirects=True,
-        limits=httpx.Limits(max_connections=getattr(IMAGES, 'max_concurrent', 5))
-    ) as client:
-        # Create tasks for all images
-        tasks = [
-            fetch_single_image(client, url, timeout)
-            for url in valid_urls
-        ]
-        
-        # Wait for all with timeout
-        results = await asyncio.gather(*tasks, return_exceptions=True)
+    # Shared keep-alive pool for i.ebayimg.com (UA + redirects set on the pool)
+    client = http_clients.get("ebay_images")
+
+    # Create tasks for all images
+    tasks = [
+        fetch_single_image(client, url, timeout, max_size)
+        for url in valid_urls
+    ]
+
+    # Wait for all with timeout
+    results = await asyncio.gather(*tasks, return_exceptions=True)
     
     elapsed = asyncio.get_event_loop().time() - start_time
     
@@ -329,64 +364,6 @@ def parse_data_url(data_url: str) -> Optional[Dict[str, Any]]:
         return None
 
 
-def resize_image(image_data: bytes, media_type: str, max_dimension: int = 512) -> Tuple[bytes, str]:
-    """
-    Resize image to max_dimension on longest side.
-    This significantly reduces API latency and costs.
-    
-    Args:
-        image_data: Raw image bytes
-        media_type: MIME type (e.g., 'image/jpeg')
-        max_dimension: Max pixels on longest side (default 512)
-    
-    Returns:
-        (resized_data, media_type) - JPEG output for consistency
-    """
-    if not PIL_AVAILABLE:
-        return image_data, media_type
-    
-    try:
-        img = Image.open(io.BytesIO(image_data))
-        
-        # Check if resize needed
-        if img.width <= max_dimension and img.height <= max_dimension:
-            return image_data, media_type
-        
-        # Calculate new dimensions maintaining aspect ratio
-        if img.width > img.height:
-            new_width = max_dimension
-            new_height = int(img.height * (max_dimension / img.width))
-        else:
-            new_height = max_dimension
-            new_width = int(img.width * (max_dimension / img.height))
-        
-        # Convert to RGB if necessary (for JPEG output)
-        if img.mode == 'RGBA':
-            background = Image.new('RGB', img.size, (255, 255, 255))
-            background.paste(img, mask=img.split()[3])
-            img = background
-        elif img.mode != 'RGB':
-            img = img.convert('RGB')
-        
-        # Resize with high-quality resampling
-        resized = img.resize((new_width, new_height), Image.Resampling.LANCZOS)
-        
-        # Save to JPEG with good quality
-        output = io.BytesIO()
-        resized.save(output, format='JPEG', quality=85, optimize=True)
-        resized_data = output.getvalue()
-        
-        original_kb = len(image_data) / 1024
-        new_kb = len(resized_data) / 1024
-        logger.debug(f"[IMAGES] Resized {img.width}x{img.height} -> {new_width}x{new_height} ({original_kb:.0f}KB -> {new_kb:.0f}KB)")
-        
-        return resized_data, 'image/jpeg'
-        
-    except Exception as e:
-        logger.warning(f"[IMAGES] Resize failed: {e}")
-        return image_data, media_type
-
-
 async def process_image_list(raw_images: List[Any], max_size: int = None, max_count: int = None, selection: str = "first") -> List[Dict[str, Any]]:
     """
     Process a mixed list of image URLs and data URLs
@@ -447,27 +424,21 @@ async def process_image_list(raw_images: List[Any], max_size: int = None, max_co
     elif max_count and len(http_urls) > max_count:
         http_urls = http_urls[:max_count]
     
-    # Fetch HTTP URLs in parallel
-    fetched = await fetch_images_parallel(http_urls, max_images=len(http_urls))
-    
-    # Combine data URLs and fetched images
-    all_images = data_images + fetched
+    # Fetch HTTP URLs in parallel (cached per URL + size, so Tier 1, Tier 2
+    # and background verification share one download)
+    fetched = await fetch_images_parallel(http_urls, max_images=len(http_urls), max_size=max_size)
     
-    # Apply max_count to final result (if specified and not using first_last)
-    if max_count and selection != "first_last" and len(all_images) > max_count:
-        all_images = all_images[:max_count]
-    
-    # Resize images if max_size specified
+    # Resize data URL images if max_size specified (fetched ones already are)
     if max_size and PIL_AVAILABLE:
         resized_images = []
-        for img in all_images:
+        for img in data_images:
             try:
                 if img.get('source', {}).get('type') == 'base64':
                     # Decode, resize, re-encode
                     raw_data = base64.b64decode(img['source']['data'])
                     media_type = img['source'].get('media_type', 'image/jpeg')
                     
-                    resized_data, new_media_type = resize_image(raw_data, media_type, max_size)
+                    resized_data, new_media_type = await run_image_job(resize_image, raw_data, media_type, max_size)
                     
                     resized_images.append({
                         "type": "image",
@@ -480,8 +451,14 @@ async def process_image_list(raw_images: List[Any], max_size: int = None, max_co
             except Exception as e:
                 logger.warning(f"[IMAGES] Resize failed, keeping original: {e}")
                 resized_images.append(img)
-        
-        return resized_images
+        data_images = resized_images
+    
+    # Combine data URLs and fetched images
+    all_images = data_images + fetched
+    
+    # Apply max_count to final result (if specified and not using first_last)
+    if max_count and selection != "first_last" and len(all_images) > max_count:
+        all_images = all_images[:max_count]
     
     return all_images
 
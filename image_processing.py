@@ -0,0 +1,190 @@
+"""
+Image Processing - CPU-bound Pillow work (decode, resample, re-encode)
+
+Kept free of network/app imports so it can run in the image worker
+processes started by image_fetcher without pulling in the rest of the app.
+"""
+
+import io
+import signal
+import base64
+import logging
+from typing import Optional, Tuple
+
+try:
+    from PIL import Image
+    PIL_AVAILABLE = True
+except ImportError:
+    PIL_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+
+def init_worker():
+    """Image worker process setup: leave Ctrl+C to the parent"""
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+
+def worker_ready() -> bool:
+    """No-op job used to start the worker processes"""
+    return True
+
+# Anthropic API limit is 5MB (5,242,880 bytes) for BASE64 encoded data
+# Base64 encoding adds ~33% overhead, so raw bytes limit is 5MB / 1.33 ≈ 3.75MB
+# We use 3.5MB to be safe
+MAX_RAW_BYTES = 3_500_000  # Before base64 encoding
+MAX_BASE64_BYTES = 5_000_000  # After base64 encoding (API limit with buffer)
+
+# Use reduced JPEG decoding (Image.draft) when the source is at least this
+# many times larger than the resize target
+DRAFT_MIN_RATIO = 2
+
+
+def compress_image(image_data: bytes, media_type: str, max_bytes: int = MAX_RAW_BYTES) -> Tuple[bytes, str]:
+    """
+    Compress image if it exceeds max_bytes.
+    Returns (compressed_data, media_type)
+    """
+    if len(image_data) <= max_bytes:
+        return image_data, media_type
+    
+    if not PIL_AVAILABLE:
+        logger.warning(f"[IMAGES] Image too large ({len(image_data)/1024/1024:.1f}MB) but PIL not available for compression")
+        return image_data, media_type
+    
+    try:
+        original_size = len(image_data)
+        img = Image.open(io.BytesIO(image_data))
+        
+        # Convert RGBA to RGB if necessary (for JPEG)
+        if img.mode == 'RGBA':
+            background = Image.new('RGB', img.size, (255, 255, 255))
+            background.paste(img, mask=img.split()[3])
+            img = background
+        elif img.mode != 'RGB':
+            img = img.convert('RGB')
+        
+        # Try progressively smaller sizes and quality levels
+        for scale in [0.75, 0.6, 0.5, 0.4, 0.3, 0.25, 0.2]:
+            for quality in [85, 70, 55, 40, 30]:
+                # Resize
+                new_width = int(img.width * scale)
+                new_height = int(img.height * scale)
+                
+                # Don't go smaller than 600px on longest side
+                if max(new_width, new_height) < 600:
+                    continue
+                
+                resized = img.resize((new_width, new_height), Image.Resampling.LANCZOS)
+                
+                # Compress to JPEG
+                buffer = io.BytesIO()
+                resized.save(buffer, format='JPEG', quality=quality, optimize=True)
+                compressed_data = buffer.getvalue()
+                
+                if len(compressed_data) <= max_bytes:
+                    print(f"[IMAGES] Compressed {original_size/1024/1024:.1f}MB -> {len(compressed_data)/1024/1024:.1f}MB ({new_width}x{new_height}, q={quality})")
+                    return compressed_data, 'image/jpeg'
+        
+        # Last resort: very small and low quality
+        min_dim = 600
+        if img.width > img.height:
+            new_width = min_dim
+            new_height = int(min_dim * img.height / img.width)
+        else:
+            new_height = min_dim
+            new_width = int(min_dim * img.width / img.height)
+            
+        resized = img.resize((new_width, new_height), Image.Resampling.LANCZOS)
+        buffer = io.BytesIO()
+        resized.save(buffer, format='JPEG', quality=25, optimize=True)
+        compressed_data = buffer.getvalue()
+        print(f"[IMAGES] Compressed {original_size/1024/1024:.1f}MB -> {len(compressed_data)/1024/1024:.1f}MB (last resort {new_width}x{new_height})")
+        return compressed_data, 'image/jpeg'
+        
+    except Exception as e:
+        logger.error(f"[IMAGES] Compression failed: {e}")
+        return image_data, media_type
+
+
+class ImageTooLargeError(Exception):
+    """Image exceeds the API size limit even after compression"""
+
+
+def build_variant(image_data: bytes, media_type: str, max_size: Optional[int] = None) -> Tuple[str, str]:
+    """Compress/resize raw bytes and base64 encode, returns (data, media_type)"""
+    # Compress if too large (using lower threshold to account for base64 expansion)
+    if len(image_data) > MAX_RAW_BYTES:
+        image_data, media_type = compress_image(image_data, media_type)
+
+    # FINAL CHECK: Skip if still too large after base64 encoding (4 chars per 3 bytes)
+    if (len(image_data) + 2) // 3 * 4 > MAX_BASE64_BYTES:
+        raise ImageTooLargeError("Too large even after compression")
+
+    if max_size and PIL_AVAILABLE:
+        image_data, media_type = resize_image(image_data, media_type, max_size)
+
+    return base64.b64encode(image_data).decode('utf-8'), media_type
+
+
+def resize_image(image_data: bytes, media_type: str, max_dimension: int = 512) -> Tuple[bytes, str]:
+    """
+    Resize image to max_dimension on longest side.
+    This significantly reduces API latency and costs.
+    
+    Args:
+        image_data: Raw image bytes
+        media_type: MIME type (e.g., 'image/jpeg')
+        max_dimension: Max pixels on longest side (default 512)
+    
+    Returns:
+        (resized_data, media_type) - JPEG output for consistency
+    """
+    if not PIL_AVAILABLE:
+        return image_data, media_type
+    
+    try:
+        img = Image.open(io.BytesIO(image_data))
+        
+        # Check if resize needed
+        if img.width <= max_dimension and img.height <= max_dimension:
+            return image_data, media_type
+        
+        # Let the JPEG decoder downscale by 1/2, 1/4 or 1/8 while decoding when the
+        # target is much smaller than the source (result is still >= max_dimension)
+        if img.format == 'JPEG' and max(img.width, img.height) >= DRAFT_MIN_RATIO * max_dimension:
+            img.draft('RGB', (max_dimension, max_dimension))
+        
+        # Calculate new dimensions maintaining aspect ratio
+        if img.width > img.height:
+            new_width = max_dimension
+            new_height = int(img.height * (max_dimension / img.width))
+        else:
+            new_height = max_dimension
+            new_width = int(img.width * (max_dimension / img.height))
+        
+        # Convert to RGB if necessary (for JPEG output)
+        if img.mode == 'RGBA':
+            background = Image.new('RGB', img.size, (255, 255, 255))
+            background.paste(img, mask=img.split()[3])
+            img = background
+        elif img.mode != 'RGB':
+            img = img.convert('RGB')
+        
+        # Resize with high-quality resampling
+        resized = img.resize((new_width, new_height), Image.Resampling.LANCZOS)
+        
+        # Save to JPEG with good quality
+        output = io.BytesIO()
+        resized.save(output, format='JPEG', quality=85, optimize=True)
+        resized_data = output.getvalue()
+        
+        original_kb = len(image_data) / 1024
+        new_kb = len(resized_data) / 1024
+        logger.debug(f"[IMAGES] Resized {img.width}x{img.height} -> {new_width}x{new_height} ({original_kb:.0f}KB -> {new_kb:.0f}KB)")
+        
+        return resized_data, 'image/jpeg'
+        
+    except Exception as e:
+        logger.warning(f"[IMAGES] Resize failed: {e}")
+        return image_data, media_type
@@ -107,6 +107,8 @@ from utils import (
     # Discord
     send_discord_alert as utils_send_discord_alert,
     DISCORD_SENT_ALERTS,
+    load_discord_alerts,
+    stop_alert_flusher,
     # Validation
     normalize_tcg_lego_keys as utils_normalize_tcg_lego_keys,
     parse_price as utils_parse_price,
@@ -277,7 +279,7 @@ from database import (
 
 from smart_cache import cache, start_cache_cleanup
 
-from image_fetcher import fetch_images_parallel, process_image_list
+from image_fetcher import fetch_images_parallel, process_image_list, start_image_pool, shutdown_image_pool
 
 from spot_prices import fetch_spot_prices, start_spot_updates, get_spot_prices
 
@@ -382,13 +384,48 @@ except Exception as e:
     BRICKLINK_AVAILABLE = False
     print(f"[BRICKLINK] Module not available: {e}")
 
-# Keepa is disabled - using dedicated KeepaTracker project on port 8001
-KEEPA_AVAILABLE = False
+# Off-loop lookup pools for PriceCharting/Bricklink (keeps blocking I/O off the event loop)
+from services.lookup_service import lookup_service
+from services.http_clients import http_clients
+from services.ebay_oauth import ebay_tokens
+
+# Keepa engine (shared with the standalone KeepaTracker server on port 8001:
+# same token scheduler per key, alert dedup, Deals cache and monitor lease)
+try:
+    from KeepaTracker import (
+        KeepaClientV2, PriceDrop, configure_engine,
+        get_client, set_client, start_deals_monitor, stop_monitor,
+        handle_keepa_webhook, send_discord_alert as keepa_send_discord_alert,
+    )
+    configure_engine(http_session=http_clients.session)
+    KEEPA_AVAILABLE = True
+except ImportError as e:
+    KEEPA_AVAILABLE = False
+    print(f"[KEEPA] Engine not available: {e}")
+
+if KEEPA_AVAILABLE:
+    configure_keepa(
+        KEEPA_AVAILABLE=KEEPA_AVAILABLE,
+        get_keepa_client=get_client,
+        set_keepa_client=set_client,
+        KeepaClientV2=KeepaClientV2,
+        get_client=get_client,
+        start_deals_monitor=start_deals_monitor,
+        stop_monitor=stop_monitor,
+        handle_keepa_webhook=handle_keepa_webhook,
+        PriceDrop=PriceDrop,
+        keepa_send_discord_alert=keepa_send_discord_alert,
+    )
 
 # Configure PriceCharting validation module
+# Bricklink calls go through their own bounded pool with a timeout; on timeout
+# the lookup reports not-found and PriceCharting is used instead.
 configure_pricecharting_validation(
     pc_lookup=pc_lookup if PRICECHARTING_AVAILABLE else None,
-    bricklink_lookup=bricklink_lookup if BRICKLINK_AVAILABLE else None,
+    bricklink_lookup=lookup_service.wrap_sync(
+        "bricklink", bricklink_lookup,
+        default=lambda: {"found": False, "error": "Bricklink lookup timed out", "source": "bricklink"},
+    ) if BRICKLINK_AVAILABLE else None,
     pricecharting_available=PRICECHARTING_AVAILABLE,
     bricklink_available=BRICKLINK_AVAILABLE,
     category_thresholds=CATEGORY_THRESHOLDS,
@@ -433,12 +470,10 @@ async def lifespan(app_instance: FastAPI):
     app_instance.state.app_state = app_state
     logger.info("[INIT] AppState attached to app.state")
 
-    # FIX: Create shared HTTP client for connection pooling
-    app_instance.state.http_client = httpx.AsyncClient(
-        timeout=10.0,
-        limits=httpx.Limits(max_connections=20, max_keepalive_connections=10)
-    )
-    logger.info("[INIT] HTTP client pool initialized")
+    # Shared per-host HTTP client pools (eBay API, images, Discord, Keepa)
+    app_instance.state.http_clients = http_clients
+    app_instance.state.http_client = http_clients.get("default")
+    logger.info(f"[INIT] HTTP client pools initialized (http2={http_clients.get_stats()['http2_enabled']})")
 
     # Import DEV_MODE setting
     from config import DEV_MODE
@@ -467,6 +502,11 @@ async def lifespan(app_instance: FastAPI):
     app_state.start_cleanup_task()
     logger.info(f"[INIT] AppState cleanup task started (TTL={app_state.IN_FLIGHT_TTL}s)")
 
+    # Fetch the eBay Browse token now; refreshed in the background from here on
+    if EBAY_POLLER_AVAILABLE and browse_api_available():
+        asyncio.create_task(ebay_tokens.start())
+        logger.info(f"[INIT] eBay token refresher started (cache: {ebay_tokens.cache_path})")
+
     # Start item tracking for sold status monitoring
     if EBAY_POLLER_AVAILABLE and browse_api_available():
         item_tracking.configure_ebay(get_token_func=get_oauth_token)
@@ -487,6 +527,26 @@ async def lifespan(app_instance: FastAPI):
         except Exception as e:
             logger.warning(f"[OLLAMA] Init error: {e}")
 
+    # Build the RAG purchase index in the background and keep it current
+    # (requests run without RAG until it is ready; new purchases are embedded incrementally)
+    try:
+        from utils.rag_context import start_index_watcher
+        start_index_watcher()
+    except ImportError:
+        logger.info("[RAG] Index watcher disabled (RAG dependencies not installed)")
+
+    # Start write-behind DB writer (listing/pattern writes are batched off the event loop)
+    db.start_writer()
+
+    # Load Discord alert dedup (and import the legacy JSON file) off the loop
+    await asyncio.to_thread(load_discord_alerts)
+
+    # Spawn the Pillow worker processes now instead of on the first listing's images
+    try:
+        await asyncio.to_thread(start_image_pool)
+    except Exception as e:
+        logger.warning(f"[IMAGES] Could not start image workers, processing inline: {e}")
+
     # Log database path
     logger.info(f"[DB] Database path: {db.path}")
     db_info = get_db_debug_info()
@@ -510,9 +570,9 @@ async def lifespan(app_instance: FastAPI):
             logger.error(f"[PC] Initialization error: {e}")
 
     # Start Keepa deals monitor
-    # DISABLED: Using dedicated KeepaTracker project on port 8001 instead
-    # This prevents duplicate token consumption from same API key
-    KEEPA_MONITOR_ENABLED = False  # Set to True to enable Keepa in ClaudeProxyV3
+    # Off by default (the dedicated KeepaTracker on port 8001 normally runs it).
+    # Safe to enable alongside it: only the process holding the monitor lease polls.
+    KEEPA_MONITOR_ENABLED = os.getenv("KEEPA_MONITOR_ENABLED", "false").lower() == "true"
     if KEEPA_AVAILABLE and KEEPA_MONITOR_ENABLED:
         try:
             asyncio.create_task(start_deals_monitor(
@@ -550,15 +610,46 @@ async def lifespan(app_instance: FastAPI):
         except Exception as e:
             logger.error(f"[SHUTDOWN] Error stopping Keepa monitor: {e}")
 
-    # FIX: Close HTTP client pool
-    if hasattr(app_instance.state, 'http_client'):
-        await app_instance.state.http_client.aclose()
-        logger.info("[SHUTDOWN] HTTP client pool closed")
+    # Stop the poller's analysis workers (before the HTTP pools they call through)
+    if EBAY_POLLER_AVAILABLE:
+        await ANALYSIS_DISPATCHER.stop()
+        logger.info("[SHUTDOWN] Analysis dispatcher stopped")
+
+    # Stop the eBay token refresher
+    await ebay_tokens.stop()
+
+    # Close shared HTTP client pools
+    await http_clients.aclose()
+    logger.info("[SHUTDOWN] HTTP client pools closed")
 
     # Stop AppState cleanup task
     app_state.stop_cleanup_task()
     logger.info("[SHUTDOWN] AppState cleanup task stopped")
 
+    # Stop RAG index watcher
+    try:
+        from utils.rag_context import stop_index_watcher
+        stop_index_watcher()
+    except ImportError:
+        pass
+
+    # Release PriceCharting/Bricklink lookup pools
+    lookup_service.shutdown()
+
+    # Stop sold-status polling and close the tracking store's connections
+    item_tracking.stop_polling()
+    await asyncio.to_thread(item_tracking.store.close)
+
+    # Stop Pillow worker processes
+    shutdown_image_pool()
+
+    # Write pending alert dedup marks
+    await stop_alert_flusher()
+
+    # Flush queued DB writes before exit
+    await asyncio.to_thread(db.stop_writer)
+    logger.info("[SHUTDOWN] DB write queue flushed")
+
 # ============================================================
 
 # FASTAPI APP
@@ -896,6 +987,7 @@ try:
         get_item_details,
         analyze_listing_callback,  # Callback for full AI analysis + source comparison
         get_oauth_token,  # OAuth token for item tracking polling
+        ANALYSIS_DISPATCHER,
     )
     EBAY_POLLER_AVAILABLE = True
     if browse_api_available():
@@ -1075,6 +1167,7 @@ configure_orchestrator(
     log_listing_received=log_listing_received,
     race_log_ubf_item=race_log_ubf_item,
     lookup_user_price=lookup_user_price,
+    lookup_service=lookup_service,
 )
 
 
@@ -53,7 +53,10 @@ async def run_ebay_poller():
 
 async def run_keepa_tracker():
     """Start the Keepa deals monitor"""
-    from keepa_tracker_v2 import start_deals_monitor
+    from KeepaTracker import configure_engine, start_deals_monitor
+    from services.http_clients import http_clients
+
+    configure_engine(http_session=http_clients.session)
 
     csv_path = os.getenv("KEEPA_CSV_PATH", "asin-tracker-tasks-export.csv")
     check_interval = int(os.getenv("KEEPA_CHECK_INTERVAL", "300"))
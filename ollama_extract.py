@@ -83,8 +83,8 @@ async def check_ollama_available() -> bool:
     global _ollama_available
 
     try:
-        import httpx
-        async with httpx.AsyncClient(timeout=5.0) as client:
+        from services.http_clients import http_clients
+        async with http_clients.session("default", timeout=5.0) as client:
             resp = await client.get("http://localhost:11434/api/tags")
             if resp.status_code == 200:
                 data = resp.json()
@@ -136,8 +136,8 @@ Respond with ONLY valid JSON in this exact format:
 {{"karat": 14, "weight_grams": 5.2, "has_stones": false, "category_hint": "gold"}}"""
 
     try:
-        import httpx
-        async with httpx.AsyncClient(timeout=OLLAMA_TIMEOUT) as client:
+        from services.http_clients import http_clients
+        async with http_clients.session("default", timeout=OLLAMA_TIMEOUT) as client:
             resp = await client.post(
                 OLLAMA_URL,
                 json={
@@ -239,8 +239,8 @@ Categories:
 Reply with ONLY the category word, nothing else."""
 
     try:
-        import httpx
-        async with httpx.AsyncClient(timeout=5.0) as client:
+        from services.http_clients import http_clients
+        async with http_clients.session("default", timeout=5.0) as client:
             resp = await client.post(
                 OLLAMA_URL,
                 json={
@@ -277,5 +277,8 @@ try:
         asyncio.create_task(_init())
     else:
         loop.run_until_complete(_init())
+        # Pools are per event loop; don't leave one open on this throwaway loop
+        from services.http_clients import http_clients
+        loop.run_until_complete(http_clients.aclose())
 except Exception:
     pass
@@ -4,7 +4,13 @@ Import into SQLite database and analyze profit/loss
 """
 
 import re
+import math
+import time
+import zlib
+import random
 import sqlite3
+from bisect import bisect_right
+from collections import defaultdict
 from datetime import datetime
 from pathlib import Path
 from html.parser import HTMLParser
@@ -441,7 +447,149 @@ def title_similarity(t1: str, t2: str) -> float:
 
 import csv
 
-def match_by_title(conn: sqlite3.Connection, min_similarity: float = 0.5, export_csv: bool = True):
+class SaleTitleIndex:
+    """
+    Inverted index over sale titles for purchase -> sale matching.
+
+    Titles are tokenized once (get_title_tokens) and each token maps to a
+    posting list of sales sorted by date, so a purchase only scores sales it
+    shares a token with that were sold after it was bought.
+
+    Only each title's prefix is indexed / probed: tokens are ordered rarest
+    first, and two sets with Jaccard >= t must share one of their first
+    len - ceil(t * len) + 1 tokens. Common tokens ("14k", "ring") mostly fall
+    outside the prefix, so the posting lists stay short. A shared token's
+    position in both orderings also bounds the overlap (PPJoin's positional
+    filter); postings are grouped by (position, title size) so whole groups
+    that cannot reach the threshold are skipped without being scored.
+    Survivors are verified with the exact similarity, so the result is the
+    same as scoring every pair.
+
+    With use_lsh=True candidates come from MinHash/LSH buckets instead
+    (approximate: pairs below ~50% similarity are often missed).
+    """
+
+    LSH_BANDS = 16
+    LSH_ROWS = 4
+    _PRIME = (1 << 61) - 1
+
+    def __init__(self, sales: list, min_similarity: float, use_lsh: bool = False):
+        # sales: (position, date, tokens) in sales order
+        self.tokens = [tokens for _, _, tokens in sales]
+        self.dates = [date for _, date, _ in sales]
+        self.used = [False] * len(sales)
+        self.min_similarity = min_similarity
+        self.use_lsh = use_lsh
+
+        frequency = defaultdict(int)
+        for tokens in self.tokens:
+            for token in tokens:
+                frequency[token] += 1
+        self.frequency = frequency
+
+        # token -> {(rank in the sale's ordering, sale size): sale positions by date}
+        postings = defaultdict(lambda: defaultdict(list))
+        for position, date, tokens in sorted(sales, key=lambda s: (s[1], s[0])):
+            for rank, token in enumerate(self._prefix(tokens)):
+                postings[token][(rank, len(tokens))].append(position)
+        self.postings = {
+            token: [(rank, size, positions, [self.dates[p] for p in positions])
+                    for (rank, size), positions in groups.items()]
+            for token, groups in postings.items()
+        }
+
+        if use_lsh:
+            rng = random.Random(0)
+            self._hashes = [(rng.randrange(1, self._PRIME), rng.randrange(0, self._PRIME))
+                            for _ in range(self.LSH_BANDS * self.LSH_ROWS)]
+            self.buckets = defaultdict(list)
+            for position, tokens in enumerate(self.tokens):
+                for key in self._band_keys(tokens):
+                    self.buckets[key].append(position)
+
+    def _prefix(self, tokens: set) -> list:
+        """Rarest tokens that any set with Jaccard >= min_similarity must hit"""
+        ordered = sorted(tokens, key=lambda token: (self.frequency.get(token, 0), token))
+        # Epsilon keeps float error (0.4 * 5 = 2.0000000000000004) from shortening the prefix
+        required = max(math.ceil(self.min_similarity * len(ordered) - 1e-9), 1)
+        return ordered[:len(ordered) - required + 1]
+
+    def _band_keys(self, tokens: set) -> list:
+        if not tokens:
+            return []
+        values = [zlib.crc32(token.encode()) for token in tokens]
+        signature = [min((a * v + b) % self._PRIME for v in values) for a, b in self._hashes]
+        rows = self.LSH_ROWS
+        return [(band, tuple(signature[band * rows:(band + 1) * rows])) for band in range(self.LSH_BANDS)]
+
+    def _candidates(self, tokens: set, after: datetime) -> set:
+        """Unused sales after `after` that could reach min_similarity"""
+        if self.use_lsh:
+            candidates = set()
+            for key in self._band_keys(tokens):
+                candidates.update(self.buckets.get(key, ()))
+            return {position for position in candidates
+                    if not self.used[position] and self.dates[position] > after}
+
+        size = len(tokens)
+        # Jaccard >= t  <=>  overlap >= t / (1 + t) * (|p| + |s|)
+        ratio = self.min_similarity / (1 + self.min_similarity)
+        candidates = set()
+        for i, token in enumerate(self._prefix(tokens)):
+            for rank, sale_size, positions, dates in self.postings.get(token, ()):
+                # Sharing token i / rank first leaves room for this many more matches
+                if 1 + min(size - i - 1, sale_size - rank - 1) < ratio * (size + sale_size) - 1e-9:
+                    continue
+                candidates.update(positions[bisect_right(dates, after):])
+        return candidates
+
+    def best_match(self, tokens: set, after: datetime) -> Optional[Tuple[int, float]]:
+        """
+        (position, similarity) of the unused sale after `after` with the
+        highest Jaccard similarity >= min_similarity; ties go to the earliest
+        sale in sales order, exactly like the old nested loop.
+        """
+        if not tokens:
+            return None
+        size, sale_tokens, used = len(tokens), self.tokens, self.used
+        best, best_sim = None, 0
+        # Ascending positions + strict '>' keep the nested loop's tie-breaking
+        for position in sorted(self._candidates(tokens, after)):
+            if used[position]:
+                continue
+            common = len(tokens & sale_tokens[position])
+            if not common:
+                continue
+            sim = common / (size + len(sale_tokens[position]) - common)
+            if sim > best_sim and sim >= self.min_similarity:
+                best, best_sim = position, sim
+        return (best, best_sim) if best is not None else None
+
+
+def greedy_title_matches(purchases: list, sales: list, min_similarity: float = 0.5,
+                         use_lsh: bool = False) -> List[Tuple[int, int, float]]:
+    """
+    Greedy purchase -> sale assignment by title similarity.
+
+    purchases / sales: (date, title) in processing order (purchases by date).
+    Each purchase in turn takes the most similar unused sale dated after it
+    (>= min_similarity). Returns (purchase_index, sale_index, similarity).
+    """
+    indexed = [(i, datetime.fromisoformat(date), get_title_tokens(title)) for i, (date, title) in enumerate(sales)]
+    index = SaleTitleIndex(indexed, min_similarity, use_lsh=use_lsh)
+
+    matches = []
+    for p_index, (p_date, p_title) in enumerate(purchases):
+        best = index.best_match(get_title_tokens(p_title), datetime.fromisoformat(p_date))
+        if best:
+            s_index, sim = best
+            index.used[s_index] = True
+            matches.append((p_index, s_index, sim))
+    return matches
+
+
+def match_by_title(conn: sqlite3.Connection, min_similarity: float = 0.5, export_csv: bool = True,
+                   use_lsh: bool = False):
     """Match purchases to sales by title similarity"""
     c = conn.cursor()
 
@@ -465,49 +613,36 @@ def match_by_title(conn: sqlite3.Connection, min_similarity: float = 0.5, export
     print(f"\nAnalyzing {len(purchases)} purchases and {len(sales)} sales...")
     print(f"Minimum similarity threshold: {min_similarity*100:.0f}%")
 
+    started = time.perf_counter()
+    pairs = greedy_title_matches(
+        [(p[1], p[3]) for p in purchases], [(s[1], s[3]) for s in sales],
+        min_similarity=min_similarity, use_lsh=use_lsh,
+    )
+    print(f"Matched in {time.perf_counter() - started:.2f}s{' (MinHash/LSH)' if use_lsh else ''}")
+
     matches = []
     used_sales = set()
 
-    for p_id, p_date, p_item_id, p_title, p_price, p_ship, p_total, p_seller in purchases:
+    for p_index, s_index, best_sim in pairs:
+        p_id, p_date, p_item_id, p_title, p_price, p_ship, p_total, p_seller = purchases[p_index]
+        s_id, s_date, s_item_id, s_title, s_price, s_ship, s_buyer = sales[s_index]
         p_cost = (p_total or p_price) + (p_ship or 0)
-        p_date_dt = datetime.fromisoformat(p_date)
-
-        best_match = None
-        best_sim = 0
-
-        for s_id, s_date, s_item_id, s_title, s_price, s_ship, s_buyer in sales:
-            if s_id in used_sales:
-                continue
-
-            s_date_dt = datetime.fromisoformat(s_date)
-
-            # Sale must be after purchase
-            if s_date_dt <= p_date_dt:
-                continue
-
-            sim = title_similarity(p_title, s_title)
-            if sim > best_sim and sim >= min_similarity:
-                best_sim = sim
-                best_match = (s_id, s_date, s_title, s_price, s_ship, s_buyer)
-
-        if best_match:
-            s_id, s_date, s_title, s_price, s_ship, s_buyer = best_match
-            used_sales.add(s_id)
-            profit = s_price - p_cost
-            hold_days = (datetime.fromisoformat(s_date) - p_date_dt).days
-            matches.append({
-                'p_title': p_title,
-                's_title': s_title,
-                'cost': p_cost,
-                'sold': s_price,
-                'profit': profit,
-                'similarity': best_sim,
-                'p_date': p_date[:10],
-                's_date': s_date[:10],
-                'hold_days': hold_days,
-                'seller': p_seller,
-                'buyer': s_buyer
-            })
+        used_sales.add(s_id)
+        profit = s_price - p_cost
+        hold_days = (datetime.fromisoformat(s_date) - datetime.fromisoformat(p_date)).days
+        matches.append({
+            'p_title': p_title,
+            's_title': s_title,
+            'cost': p_cost,
+            'sold': s_price,
+            'profit': profit,
+            'similarity': best_sim,
+            'p_date': p_date[:10],
+            's_date': s_date[:10],
+            'hold_days': hold_days,
+            'seller': p_seller,
+            'buyer': s_buyer
+        })
 
     # Sort by profit
     matches.sort(key=lambda x: x['profit'], reverse=True)
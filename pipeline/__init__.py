@@ -9,6 +9,7 @@ This module organizes the analysis pipeline into discrete stages:
 
 Usage:
     from pipeline.orchestrator import run_analysis, configure_orchestrator
+    from pipeline.orchestrator import analyze  # in-process, takes a StandardizedListing
 """
 
 from .tier0 import Tier0Filter
@@ -19,7 +20,7 @@ from .tier2 import (
     tier2_reanalyze,
     tier2_reanalyze_openai,
 )
-from .orchestrator import configure_orchestrator, run_analysis
+from .orchestrator import configure_orchestrator, run_analysis, analyze
 
 __all__ = [
     'Tier0Filter',
@@ -30,4 +31,5 @@ __all__ = [
     'tier2_reanalyze_openai',
     'configure_orchestrator',
     'run_analysis',
+    'analyze',
 ]
@@ -12,6 +12,8 @@ import logging
 import asyncio
 from typing import Optional, Tuple
 
+from utils.listing_features import get_listing_features
+
 logger = logging.getLogger(__name__)
 
 # Ollama integration for fallback extraction
@@ -38,40 +40,6 @@ def _get_ollama():
             _ollama_module = None
     return _ollama_module
 
-# Pre-compiled regex patterns for weight extraction
-# IMPORTANT: Word boundaries \b prevent matching years like "1997" as "1997g"
-# when followed by words starting with 'g'
-WEIGHT_PATTERNS = [
-    re.compile(r'(\d*\.?\d+)\s*(?:gram|grams|gr)\b', re.IGNORECASE),
-    re.compile(r'(\d*\.?\d+)\s*g\b', re.IGNORECASE),  # Added \b to prevent false matches
-    re.compile(r'(\d*\.?\d+)\s*(?:dwt|DWT)\b', re.IGNORECASE),
-    re.compile(r'(\d*\.?\d+)\s*(?:ozt|oz\.t|troy\s*oz)\b', re.IGNORECASE),
-    re.compile(r'(\d*\.?\d+)\s*oz\b', re.IGNORECASE),
-]
-
-# Years that should NOT be treated as weights (1900-2030)
-YEAR_RANGE = range(1900, 2031)
-
-# Fractional oz patterns
-FRACTION_OZT_PATTERN = re.compile(r'(\d+)/(\d+)\s*(?:ozt|oz\.t|troy\s*oz)', re.IGNORECASE)
-FRACTION_OZ_PATTERN = re.compile(r'(\d+)/(\d+)\s*oz', re.IGNORECASE)
-
-# Karat extraction patterns (pattern, karat_value)
-KARAT_PATTERNS = [
-    (re.compile(r'24\s*k(?:t|arat)?', re.IGNORECASE), 24),
-    (re.compile(r'22\s*k(?:t|arat)?', re.IGNORECASE), 22),
-    (re.compile(r'18\s*k(?:t|arat)?', re.IGNORECASE), 18),
-    (re.compile(r'14\s*k(?:t|arat)?', re.IGNORECASE), 14),
-    (re.compile(r'10\s*k(?:t|arat)?', re.IGNORECASE), 10),
-    (re.compile(r'9\s*k(?:t|arat)?', re.IGNORECASE), 9),
-    (re.compile(r'999'), 24),
-    (re.compile(r'916'), 22),
-    (re.compile(r'750'), 18),
-    (re.compile(r'585'), 14),
-    (re.compile(r'417'), 10),
-    (re.compile(r'375'), 9),
-]
-
 # Chain type weight estimation (grams per inch for 14K)
 HEAVY_CHAIN_TYPES = {
     'byzantine': 2.5,
@@ -178,74 +146,15 @@ def extract_weight_from_title(title: str, description: str = '') -> tuple:
     ONLY extracts clearly stated weights like "2.5g", "2.5 grams", "1/2 oz"
     Does NOT estimate - that's for AI to do.
 
-    Conversions:
-    - ozt (troy oz) = 31.1 grams (used for precious metals)
-    - oz (avoirdupois) = 28.35 grams (standard oz)
-    - dwt (pennyweight) = 1.555 grams
-
-    Uses pre-compiled patterns for performance.
+    Reads the memoized ListingFeatures (same rules as fast_extract: grams,
+    dwt, troy oz, fractional oz; title before description). Year-like whole
+    numbers (1900-2030) are skipped - "1997 NFC Champions" is not a weight.
+    No upper bound: a 100 oz bar is a stated weight too.
     """
-    # Check BOTH title and description for weight
-    combined_text = f"{title} {description}".lower()
-
-    # Check for fractional troy oz first (e.g., "1/2 ozt", "1/4 troy oz")
-    frac_ozt_match = FRACTION_OZT_PATTERN.search(combined_text)
-    if frac_ozt_match:
-        numerator = float(frac_ozt_match.group(1))
-        denominator = float(frac_ozt_match.group(2))
-        if denominator > 0:
-            oz_value = numerator / denominator
-            grams = oz_value * 31.1  # Troy oz
-            return grams, "stated"
-
-    # Check for fractional plain oz (e.g., "1/2 oz", "1/4 oz")
-    frac_oz_match = FRACTION_OZ_PATTERN.search(combined_text)
-    if frac_oz_match:
-        numerator = float(frac_oz_match.group(1))
-        denominator = float(frac_oz_match.group(2))
-        if denominator > 0:
-            oz_value = numerator / denominator
-            # For precious metals (silver/gold coins/bullion), use troy oz (31.1g)
-            # Check for silver/gold indicators in text
-            is_precious_metal = any(kw in combined_text for kw in [
-                '.999', '.925', '.900', '.800', 'silver', 'gold', 'platinum',
-                'bullion', 'coin', 'bar', 'round', 'eagle', 'maple', 'libertad',
-                'krugerrand', 'philharmonic', 'britannia', 'panda', 'kookaburra',
-                'lunar', 'koala', 'kangaroo', 'buffalo', 'proof'
-            ])
-            if is_precious_metal:
-                grams = oz_value * 31.1  # Troy oz for precious metals
-            else:
-                grams = oz_value * 28.35  # Avoirdupois oz for non-precious
-            return grams, "stated"
-
-    # Use pre-compiled patterns (ordered by specificity)
-    for pattern in WEIGHT_PATTERNS:
-        match = pattern.search(combined_text)
-        if match:
-            raw_weight = float(match.group(1))
-            matched_text = match.group(0).lower()
-
-            # YEAR CHECK: Reject numbers that look like years (1900-2030)
-            # These are often in titles like "1997 NFC Champions" and shouldn't be weights
-            if int(raw_weight) in YEAR_RANGE and raw_weight == int(raw_weight):
-                logger.debug(f"[WEIGHT] Skipping year-like number: {int(raw_weight)}")
-                continue  # Try next pattern
-
-            weight = raw_weight
-
-            # Convert to grams based on the MATCHED unit
-            if 'dwt' in matched_text:
-                weight *= 1.555  # pennyweight to grams
-            elif 'ozt' in matched_text or 'oz.t' in matched_text or 'troy' in matched_text:
-                weight *= 31.1  # troy oz to grams
-            elif 'oz' in matched_text:
-                weight *= 28.35  # avoirdupois oz to grams
-            # 'g', 'gram', 'grams', 'gr' are already in grams
-
-            return weight, "stated"
-
-    return None, None
+    weight, _ = get_listing_features(title, description).weight(max_weight=float("inf"), skip_years=True)
+    if weight is None:
+        return None, None
+    return weight, "stated"
 
 
 async def extract_with_ollama(title: str, description: str = "") -> Tuple[Optional[float], Optional[int]]:
@@ -274,26 +183,9 @@ async def extract_with_ollama(title: str, description: str = "") -> Tuple[Option
 
 
 def extract_karat_from_title(title: str) -> int:
+    """Extract karat from title. Returns karat number or None (memoized ListingFeatures)."""
+    return get_listing_features(title).karat
 
-    """
-
-    Extract karat from title. Returns karat number or None.
-
-    Uses pre-compiled KARAT_PATTERNS for performance.
-
-    """
-
-    title_lower = title.lower()
-
-    # Use pre-compiled patterns
-
-    for pattern, karat in KARAT_PATTERNS:
-
-        if pattern.search(title_lower):
-
-            return karat
-
-    return None
 
 def check_instant_pass(title: str, price: any, category: str, data: dict) -> tuple:
 
@@ -672,12 +564,11 @@ def check_instant_pass(title: str, price: any, category: str, data: dict) -> tup
     # If no weight in title, estimate based on piece type
     # ============================================================
     if category == 'silver':
-        from utils.extraction import detect_flatware, extract_weight_from_title as extract_weight_title
+        features = get_listing_features(title)
 
         # Only estimate if NO weight stated in title
-        stated_weight_check = extract_weight_title(title)
-        if not stated_weight_check:
-            is_flatware, piece_type, flat_qty, estimated_weight = detect_flatware(title)
+        if not features.weight_grams:
+            is_flatware, piece_type, flat_qty, estimated_weight = features.flatware
             if is_flatware and estimated_weight > 0:
                 # Calculate melt value based on estimated weight
                 spots = get_spot_prices()
@@ -6,7 +6,8 @@ Coordinates the full analysis pipeline:
   Tier 1 AI -> validation -> Tier 2 verification -> discord -> response
 
 All dependencies are injected via configure_orchestrator().
-Called by the thin route handler in routes/analysis.py.
+Called by the thin route handler in routes/analysis.py (run_analysis) and
+in-process by the API pollers (analyze).
 """
 
 import re
@@ -31,22 +32,24 @@ from .fast_pass import (
     check_user_price_db, check_pc_quick_pass, check_agent_quick_pass,
     check_textbook, check_gold_price_per_gram, check_fast_extract_pass,
 )
-from .response_builder import finalize_result
+from .response_builder import finalize_result, response_to_dict
+from services.perf_tracing import perf_tracer
+from utils.listing_adapter import StandardizedListing
 from .tier2 import (
     background_sonnet_verify,
     tier2_reanalyze,
     tier2_reanalyze_openai,
 )
 
+logger = logging.getLogger(__name__)
+
 # RAG context for similar purchase lookup
 try:
-    from utils.rag_context import build_rag_context, index_purchases
-    _RAG_AVAILABLE = True
+    from utils.rag_context import build_rag_context_async, EMBEDDINGS_AVAILABLE as _RAG_AVAILABLE
 except ImportError:
     _RAG_AVAILABLE = False
-    logger.warning("[RAG] rag_context module not available - RAG disabled")
-
-logger = logging.getLogger(__name__)
+if not _RAG_AVAILABLE:
+    logger.warning("[RAG] rag_context / sentence-transformers not available - RAG disabled")
 
 
 # ============================================================
@@ -126,6 +129,7 @@ _log_race_item = None
 _log_listing_received = None
 _race_log_ubf_item = None
 _lookup_user_price = None
+_lookup_service = None
 
 
 def configure_orchestrator(
@@ -196,6 +200,7 @@ def configure_orchestrator(
     log_listing_received=None,
     race_log_ubf_item=None,
     lookup_user_price=None,
+    lookup_service=None,
 ):
     """Inject all dependencies from main.py into the orchestrator module."""
     global _client, _openai_client, _STATS, _cache, _IN_FLIGHT, _IN_FLIGHT_RESULTS
@@ -218,7 +223,7 @@ def configure_orchestrator(
     global _update_pattern_outcome, _broadcast_new_listing
     global _check_openai_budget, _record_openai_cost
     global _log_race_item, _log_listing_received, _race_log_ubf_item
-    global _lookup_user_price
+    global _lookup_user_price, _lookup_service
 
     _client = client
     _openai_client = openai_client
@@ -280,17 +285,89 @@ def configure_orchestrator(
     _log_listing_received = log_listing_received
     _race_log_ubf_item = race_log_ubf_item
     _lookup_user_price = lookup_user_price
+    _lookup_service = lookup_service
 
     logger.info("[ORCHESTRATOR] Configured with all dependencies")
+    # The RAG index is built by the index watcher (utils/rag_context.py) after startup
+
+
+def _start_pricecharting_lookup(data: dict, title: str, total_price, category: str) -> Optional[asyncio.Task]:
+    """Kick off the PriceCharting/Bricklink lookup in the lookup thread pool.
 
-    # Initialize RAG index (runs in background, doesn't block startup)
-    if _RAG_AVAILABLE:
+    Returns a task resolving to (pc_result, pc_context), or None when the
+    category has no PriceCharting data. Started right after category detection
+    so the blocking FTS/HTTP work overlaps the rule-based checks.
+    """
+    if category not in ["tcg", "lego", "videogames"] or not _get_pricecharting_context:
+        return None
+    try:
+        price_float = float(str(total_price).replace('$', '').replace(',', ''))
+    except (ValueError, TypeError):
+        logger.error(f"[PC] Price parsing error: {total_price!r}")
+        return None
+
+    # Extract UPC if available (most accurate lookup method)
+    upc = data.get('UPC', '') or data.get('upc', '')
+    if upc:
+        logger.info(f"[PC] UPC found: {upc}")
+
+    # Extract condition for price tier selection (critical for video games!)
+    condition = data.get('Condition', '') or data.get('condition', '')
+    if condition:
+        logger.info(f"[PC] Condition: {condition}")
+
+    # Extract quantity for multi-item listings
+    quantity = 1
+    qty_raw = data.get('Quantity', '') or data.get('quantity', '')
+    if qty_raw:
+        try:
+            quantity = int(float(str(qty_raw).replace(',', '')))
+            if quantity > 1:
+                logger.info(f"[PC] Quantity: {quantity} items")
+        except:
+            quantity = 1
+
+    # === LOT QUANTITY DETECTION FROM TITLE ===
+    title_upper = title.upper() if title else ""
+    title_qty = None
+
+    # Pattern: "LOT OF X" or "LOT X" or "SET OF X"
+    lot_match = re.search(r'(?:LOT\s+(?:OF\s+)?(\d+)|SET\s+OF\s+(\d+))', title_upper)
+    if lot_match:
+        title_qty = int(lot_match.group(1) or lot_match.group(2))
+
+    # Pattern: "Xx" or "xX" (e.g., "10x" or "x10")
+    if not title_qty:
+        x_match = re.search(r'(?:^|\s)(\d+)\s*[xX](?:\s|$)|(?:^|\s)[xX]\s*(\d+)(?:\s|$)', title_upper)
+        if x_match:
+            title_qty = int(x_match.group(1) or x_match.group(2))
+
+    # Pattern: "X boxes" or "X ETBs" or "X booster"
+    if not title_qty:
+        boxes_match = re.search(r'(\d+)\s*(?:boxes|etbs|boosters|packs|cases)', title_upper, re.IGNORECASE)
+        if boxes_match:
+            title_qty = int(boxes_match.group(1))
+
+    # Use title quantity if found and > 1
+    if title_qty and title_qty > 1:
+        quantity = title_qty
+        logger.info(f"[LOT] Detected quantity {quantity} from title")
+
+    if _lookup_service is None:
+        # No lookup service configured - run inline (blocking) as before
+        future = asyncio.get_running_loop().create_future()
         try:
-            # Index purchases if not already done
-            count = index_purchases(force_rebuild=False)
-            logger.info(f"[RAG] Purchase index ready with {count} items")
+            future.set_result(_get_pricecharting_context(title, price_float, category, upc, quantity, condition))
         except Exception as e:
-            logger.warning(f"[RAG] Failed to initialize: {e}")
+            logger.error(f"[PC] Lookup error: {e}")
+            future.set_result((None, ""))
+        return future
+
+    return asyncio.create_task(_lookup_service.run(
+        "pricecharting", _get_pricecharting_context,
+        title, price_float, category, upc, quantity, condition,
+        default=(None, ""),
+    ))
 
 
 def _trim_listings():
@@ -310,21 +387,68 @@ async def run_analysis(request: Request):
 
     This is the full analyze_listing function moved from main.py.
     Called by the thin route handler in routes/analysis.py.
+
+    Every call is traced (per-stage spans + exit path, see /api/perf).
     """
+    trace = perf_tracer.start_trace()
+    try:
+        return await _run_analysis(request, trace)
+    finally:
+        trace.finish()
+
+
+async def _run_analysis(request: Request, _trace):
+    """run_analysis body - every early return goes through _trace.exit()"""
     logger.info("=" * 60)
     logger.info("[match_mydata] Endpoint called")
     logger.info("=" * 60)
 
-    # Log ALL request details
-    logger.info(f"[REQUEST] Method: {request.method}")
-    logger.info(f"[REQUEST] URL: {request.url}")
-    logger.info(f"[REQUEST] Headers:")
-    for key, value in request.headers.items():
-        logger.info(f"    {key}: {value}")
+    # Request details (DEBUG only - headers were logged for every listing)
+    logger.debug(f"[REQUEST] {request.method} {request.url}")
+    if logger.isEnabledFor(logging.DEBUG):
+        for key, value in request.headers.items():
+            logger.debug(f"    {key}: {value}")
+
+    # Parse request data
+    data = await parse_analysis_request(request)
+    _trace.stage("parse")
+    return await _analyze_data(data, _trace)
+
+
+async def analyze(listing: StandardizedListing, extra: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """Analyze a listing the process already holds, without the /match_mydata round trip.
+
+    Used by the API pollers (ebay_poller, race loop): the listing goes
+    straight into the pipeline as listing.to_pipeline_dict() (plus `extra`
+    fields such as Alias or llm_provider), so descriptions and image lists
+    are never URL-encoded and there is no loopback socket hop.
+
+    Returns the same result dict the route would have sent as JSON.
+    """
+    data = listing.to_pipeline_dict()
+    if extra:
+        data.update(extra)
+    trace = perf_tracer.start_trace()
+    try:
+        response = await _analyze_data(data, trace)
+    finally:
+        trace.finish()
+    return response_to_dict(response)
+
 
+def is_configured() -> bool:
+    """True once configure_orchestrator() ran in this process (analyze() is usable)"""
+    return _STATS is not None
+
+
+def tier1_provider() -> str:
+    """Backend Tier 1 calls go to: "openai" when its client is configured, else "anthropic" (Haiku)"""
+    return "openai" if _openai_client else "anthropic"
+
+
+async def _analyze_data(data: dict, _trace):
+    """Pipeline body for a parsed listing dict (shared by run_analysis and analyze)"""
     try:
-        # Parse request data
-        data = await parse_analysis_request(request)
         fields = extract_listing_fields(data)
         title = fields["title"]
         total_price = fields["total_price"]
@@ -341,10 +465,10 @@ async def run_analysis(request: Request):
         # ============================================================
         spam_response = check_spam(data, _check_seller_spam)
         if spam_response:
-            return spam_response
+            return _trace.exit("spam", spam_response)
         dedup_response = check_dedup(title, total_price)
         if dedup_response:
-            return dedup_response
+            return _trace.exit("dedup", dedup_response)
 
         # PRICE CORRECTIONS - Check user's logged market prices
         user_price_correction = None
@@ -364,7 +488,7 @@ async def run_analysis(request: Request):
         # ============================================================
         sold_response = check_sold(data)
         if sold_response:
-            return sold_response
+            return _trace.exit("sold", sold_response)
         listing_enhancements = build_enhancements(data, _analyze_new_seller)
         freshness_minutes = listing_enhancements.get("freshness_minutes")
         seller_name = listing_enhancements.get("seller_name", "")
@@ -378,7 +502,8 @@ async def run_analysis(request: Request):
 
         # Start timing for performance analysis
         _start_time = _time.time()
-        _timing = {}
+        _timing = _trace.timing
+        _trace.stage("pre_checks")
 
         _STATS["total_requests"] += 1
 
@@ -387,7 +512,7 @@ async def run_analysis(request: Request):
         # ============================================================
         cache_response = check_cache(title, total_price, response_type, _cache, data, _detect_category, _STATS)
         if cache_response:
-            return cache_response
+            return _trace.exit("cache", cache_response)
 
         # ============================================================
         # IN-FLIGHT DEDUP
@@ -396,14 +521,14 @@ async def run_analysis(request: Request):
             title, total_price, response_type, _IN_FLIGHT, _IN_FLIGHT_RESULTS, _IN_FLIGHT_LOCK
         )
         if inflight_response:
-            return inflight_response
+            return _trace.exit("in_flight", inflight_response)
 
         # ============================================================
         # DISABLED CHECK
         # ============================================================
         disabled_response = check_disabled(_ENABLED, _STATS)
         if disabled_response:
-            return disabled_response
+            return _trace.exit("disabled", disabled_response)
 
         # ============================================================
         # QUEUE MODE
@@ -414,7 +539,7 @@ async def run_analysis(request: Request):
             _render_queued_html
         )
         if queue_response:
-            return queue_response
+            return _trace.exit("queue", queue_response)
 
         # FULL ANALYSIS
         # ============================================================
@@ -424,200 +549,170 @@ async def run_analysis(request: Request):
         # Detect category
         category, category_reasons = _detect_category(data)
         logger.info(f"Category: {category}")
-        _timing['category'] = _time.time() - _start_time
+        _trace.stage('category', _start_time)
         logger.info(f"[TIMING] Category detect + setup: {_timing['category']*1000:.0f}ms")
 
         # ============================================================
-        # USER PRICE DATABASE CHECK
+        # START PRICECHARTING LOOKUP (off-loop, overlaps instant pass checks)
         # ============================================================
-        user_price_result = check_user_price_db(
-            title, total_price, category, listing_enhancements,
-            _lookup_user_price, _render_result_html, _cache
-        )
-        if user_price_result:
-            result, html = user_price_result
-            result['html'] = html
-            # Always return JSON with html field for uBuyFirst columns + display
-            return JSONResponse(content=result)
-
-        # ============================================================
-        # INSTANT PASS CHECK (Rule-based, no AI)
-        # ============================================================
-        instant_pass_result = _check_instant_pass(title, total_price, category, data)
-        if instant_pass_result:
-            reason = instant_pass_result[0]
-            rec = instant_pass_result[1]  # "PASS" or "BUY"
-            instant_data = instant_pass_result[2] if len(instant_pass_result) > 2 else {}
-            is_buy = (rec == "BUY")
-            logger.info(f"[INSTANT {'BUY' if is_buy else 'PASS'}] {reason}")
-            result = {
-                "Recommendation": rec,
-                "Qualify": "Yes" if is_buy else "No",
-                "reasoning": f"INSTANT {rec}: {reason}",
-                "confidence": instant_data.get("confidence", 95),
-                "instantPass": not is_buy,
-                "instantBuy": is_buy,
-                "karat": "NA", "weight": "NA",
-                "goldweight": "NA", "silverweight": "NA", "meltvalue": "NA",
-                "maxBuy": "NA", "sellPrice": "NA", "Profit": "NA",
-                "Margin": "NA", "pricePerGram": "NA",
-                "fakerisk": "low" if is_buy else "NA",
-                "itemtype": "NA", "stoneDeduction": "0",
-                "weightSource": "NA", "verified": "rule-based",
-            }
-            # Override NA values with real calculated data when available
-            if instant_data:
-                result.update(instant_data)
-                if 'weightSource' not in instant_data:
-                    result['weightSource'] = 'stated'
-            html = _render_result_html(result, category, title)
-            result['html'] = html
-            _cache.set(title, total_price, result, html, rec)
+        pc_task = _start_pricecharting_lookup(data, title, total_price, category)
+        # Cancel the lookup if an early exit below returns (or raises) before it is awaited
+        pc_handed_off = False
+        try:
+            # ============================================================
+            # USER PRICE DATABASE CHECK
+            # ============================================================
+            user_price_result = check_user_price_db(
+                title, total_price, category, listing_enhancements,
+                _lookup_user_price, _render_result_html, _cache
+            )
+            if user_price_result:
+                result, html = user_price_result
+                result['html'] = html
+                # Always return JSON with html field for uBuyFirst columns + display
+                return _trace.exit("user_price_db", JSONResponse(content=result))
 
-            # Update correct stat counter
-            if is_buy:
-                _STATS["buy_count"] += 1
-            else:
-                _STATS["pass_count"] += 1
+            # ============================================================
+            # INSTANT PASS CHECK (Rule-based, no AI)
+            # ============================================================
+            instant_pass_result = _check_instant_pass(title, total_price, category, data)
+            if instant_pass_result:
+                reason = instant_pass_result[0]
+                rec = instant_pass_result[1]  # "PASS" or "BUY"
+                instant_data = instant_pass_result[2] if len(instant_pass_result) > 2 else {}
+                is_buy = (rec == "BUY")
+                logger.info(f"[INSTANT {'BUY' if is_buy else 'PASS'}] {reason}")
+                result = {
+                    "Recommendation": rec,
+                    "Qualify": "Yes" if is_buy else "No",
+                    "reasoning": f"INSTANT {rec}: {reason}",
+                    "confidence": instant_data.get("confidence", 95),
+                    "instantPass": not is_buy,
+                    "instantBuy": is_buy,
+                    "karat": "NA", "weight": "NA",
+                    "goldweight": "NA", "silverweight": "NA", "meltvalue": "NA",
+                    "maxBuy": "NA", "sellPrice": "NA", "Profit": "NA",
+                    "Margin": "NA", "pricePerGram": "NA",
+                    "fakerisk": "low" if is_buy else "NA",
+                    "itemtype": "NA", "stoneDeduction": "0",
+                    "weightSource": "NA", "verified": "rule-based",
+                }
+                # Override NA values with real calculated data when available
+                if instant_data:
+                    result.update(instant_data)
+                    if 'weightSource' not in instant_data:
+                        result['weightSource'] = 'stated'
+                html = _render_result_html(result, category, title)
+                result['html'] = html
+                _cache.set(title, total_price, result, html, rec)
+
+                # Update correct stat counter
+                if is_buy:
+                    _STATS["buy_count"] += 1
+                else:
+                    _STATS["pass_count"] += 1
 
-            # Send Discord alert for instant BUY
-            if is_buy and _send_discord_alert:
-                try:
-                    price_float = float(str(total_price).replace('$', '').replace(',', ''))
-                    ebay_url_alert = data.get('ViewUrl', data.get('CheckoutUrl', ''))
-                    if not ebay_url_alert and _get_ebay_search_url:
-                        ebay_url_alert = _get_ebay_search_url(title)
-                    first_image = None
-                    raw_imgs = data.get('images', data.get('PictureURL', []))
-                    if isinstance(raw_imgs, str):
-                        raw_imgs = [raw_imgs]
-                    for img in (raw_imgs or []):
-                        if isinstance(img, str) and img.startswith('http'):
-                            first_image = img
-                            break
-                        elif isinstance(img, dict):
-                            url = img.get('url', img.get('URL', ''))
-                            if url.startswith('http'):
-                                first_image = url
+                # Send Discord alert for instant BUY
+                if is_buy and _send_discord_alert:
+                    try:
+                        price_float = float(str(total_price).replace('$', '').replace(',', ''))
+                        ebay_url_alert = data.get('ViewUrl', data.get('CheckoutUrl', ''))
+                        if not ebay_url_alert and _get_ebay_search_url:
+                            ebay_url_alert = _get_ebay_search_url(title)
+                        first_image = None
+                        raw_imgs = data.get('images', data.get('PictureURL', []))
+                        if isinstance(raw_imgs, str):
+                            raw_imgs = [raw_imgs]
+                        for img in (raw_imgs or []):
+                            if isinstance(img, str) and img.startswith('http'):
+                                first_image = img
                                 break
-                    profit_val = float(str(instant_data.get('Profit', '0')).replace('$', '').replace('+', ''))
-                    asyncio.create_task(_send_discord_alert(
-                        title=title, price=price_float,
-                        recommendation="BUY", category=category,
-                        profit=profit_val,
-                        reasoning=reason, ebay_url=ebay_url_alert,
-                        image_url=first_image,
-                        confidence=str(instant_data.get('confidence', 90)),
-                        extra_data={"instant_buy": True, "source": "rule-based"},
-                    ))
-                except Exception as e:
-                    logger.error(f"[DISCORD] Instant BUY alert error: {e}")
+                            elif isinstance(img, dict):
+                                url = img.get('url', img.get('URL', ''))
+                                if url.startswith('http'):
+                                    first_image = url
+                                    break
+                        profit_val = float(str(instant_data.get('Profit', '0')).replace('$', '').replace('+', ''))
+                        asyncio.create_task(_send_discord_alert(
+                            title=title, price=price_float,
+                            recommendation="BUY", category=category,
+                            profit=profit_val,
+                            reasoning=reason, ebay_url=ebay_url_alert,
+                            image_url=first_image,
+                            confidence=str(instant_data.get('confidence', 90)),
+                            extra_data={"instant_buy": True, "source": "rule-based"},
+                        ))
+                    except Exception as e:
+                        logger.error(f"[DISCORD] Instant BUY alert error: {e}")
 
-            # Always return JSON with html field for uBuyFirst columns + display
-            return JSONResponse(content=result)
+                # Always return JSON with html field for uBuyFirst columns + display
+                return _trace.exit("instant_pass", JSONResponse(content=result))
 
-        # ============================================================
-        # OLLAMA FALLBACK (if instant_pass didn't find weight for gold/silver)
-        # ============================================================
-        if not instant_pass_result and category in ['gold', 'silver']:
-            # Check if we might have weight in ConditionDescription that wasn't found by regex
-            condition_desc = data.get('ConditionDescription', '')
-            if condition_desc and ('gram' in condition_desc.lower() or 'g ' in condition_desc.lower() or 'oz' in condition_desc.lower()):
-                try:
-                    from pipeline.instant_pass import extract_with_ollama
-                    ollama_result = await extract_with_ollama(title, condition_desc)
-                    if ollama_result and ollama_result[0]:  # Found weight via Ollama
-                        weight_grams, karat = ollama_result
-                        logger.info(f"[OLLAMA] Extracted weight={weight_grams}g, karat={karat}K from ConditionDescription")
-                        # Add the discovered weight to the data and re-run instant pass
-                        modified_data = dict(data)
-                        modified_data['_ollama_weight'] = weight_grams
-                        modified_data['_ollama_karat'] = karat
-                        # Append weight to description so instant_pass can find it
-                        modified_data['description'] = f"{data.get('description', '')} {weight_grams} grams"
-                        instant_pass_result = _check_instant_pass(title, total_price, category, modified_data)
-                        if instant_pass_result:
-                            reason = instant_pass_result[0]
-                            rec = instant_pass_result[1]
-                            instant_data = instant_pass_result[2] if len(instant_pass_result) > 2 else {}
-                            is_buy = (rec == "BUY")
-                            logger.info(f"[OLLAMA→INSTANT {rec}] {reason}")
-                            result = {
-                                "Recommendation": rec,
-                                "Qualify": "Yes" if is_buy else "No",
-                                "reasoning": f"OLLAMA→INSTANT {rec}: {reason}",
-                                "confidence": instant_data.get("confidence", 85),
-                                "instantPass": not is_buy,
-                                "instantBuy": is_buy,
-                                "weightSource": "ollama",
-                            }
-                            html = _render_result_html(result, category, title)
-                            result['html'] = html
-                            _cache.set(title, total_price, result, html, rec)
-                            _STATS["pass_count" if not is_buy else "buy_count"] += 1
-                            # Always return JSON with html field for uBuyFirst columns + display
-                            return JSONResponse(content=result)
-                except Exception as e:
-                    logger.debug(f"[OLLAMA] Fallback error: {e}")
+            # ============================================================
+            # OLLAMA FALLBACK (if instant_pass didn't find weight for gold/silver)
+            # ============================================================
+            if not instant_pass_result and category in ['gold', 'silver']:
+                # Check if we might have weight in ConditionDescription that wasn't found by regex
+                condition_desc = data.get('ConditionDescription', '')
+                if condition_desc and ('gram' in condition_desc.lower() or 'g ' in condition_desc.lower() or 'oz' in condition_desc.lower()):
+                    try:
+                        from pipeline.instant_pass import extract_with_ollama
+                        ollama_result = await extract_with_ollama(title, condition_desc)
+                        if ollama_result and ollama_result[0]:  # Found weight via Ollama
+                            weight_grams, karat = ollama_result
+                            logger.info(f"[OLLAMA] Extracted weight={weight_grams}g, karat={karat}K from ConditionDescription")
+                            # Add the discovered weight to the data and re-run instant pass
+                            modified_data = dict(data)
+                            modified_data['_ollama_weight'] = weight_grams
+                            modified_data['_ollama_karat'] = karat
+                            # Append weight to description so instant_pass can find it
+                            modified_data['description'] = f"{data.get('description', '')} {weight_grams} grams"
+                            instant_pass_result = _check_instant_pass(title, total_price, category, modified_data)
+                            if instant_pass_result:
+                                reason = instant_pass_result[0]
+                                rec = instant_pass_result[1]
+                                instant_data = instant_pass_result[2] if len(instant_pass_result) > 2 else {}
+                                is_buy = (rec == "BUY")
+                                logger.info(f"[OLLAMA→INSTANT {rec}] {reason}")
+                                result = {
+                                    "Recommendation": rec,
+                                    "Qualify": "Yes" if is_buy else "No",
+                                    "reasoning": f"OLLAMA→INSTANT {rec}: {reason}",
+                                    "confidence": instant_data.get("confidence", 85),
+                                    "instantPass": not is_buy,
+                                    "instantBuy": is_buy,
+                                    "weightSource": "ollama",
+                                }
+                                html = _render_result_html(result, category, title)
+                                result['html'] = html
+                                _cache.set(title, total_price, result, html, rec)
+                                _STATS["pass_count" if not is_buy else "buy_count"] += 1
+                                # Always return JSON with html field for uBuyFirst columns + display
+                                return _trace.exit("ollama_instant", JSONResponse(content=result))
+                    except Exception as e:
+                        logger.debug(f"[OLLAMA] Fallback error: {e}")
+
+            pc_handed_off = True
+        finally:
+            if not pc_handed_off and pc_task is not None and not pc_task.done():
+                pc_task.cancel()
 
         # PriceCharting lookup for TCG and LEGO
         pc_result = None
         pc_context = ""
-        if category in ["tcg", "lego", "videogames"]:
+        if pc_task is not None:
             try:
                 price_float = float(str(total_price).replace('$', '').replace(',', ''))
 
-                # Extract UPC if available (most accurate lookup method)
-                upc = data.get('UPC', '') or data.get('upc', '')
-                if upc:
-                    logger.info(f"[PC] UPC found: {upc}")
-
-                # Extract condition for price tier selection (critical for video games!)
-                condition = data.get('Condition', '') or data.get('condition', '')
-                if condition:
-                    logger.info(f"[PC] Condition: {condition}")
-
-                # Extract quantity for multi-item listings
-                quantity = 1
-                qty_raw = data.get('Quantity', '') or data.get('quantity', '')
-                if qty_raw:
-                    try:
-                        quantity = int(float(str(qty_raw).replace(',', '')))
-                        if quantity > 1:
-                            logger.info(f"[PC] Quantity: {quantity} items")
-                    except:
-                        quantity = 1
-
-                # === LOT QUANTITY DETECTION FROM TITLE ===
-                title_upper = title.upper() if title else ""
-                title_qty = None
-
-                # Pattern: "LOT OF X" or "LOT X" or "SET OF X"
-                lot_match = re.search(r'(?:LOT\s+(?:OF\s+)?(\d+)|SET\s+OF\s+(\d+))', title_upper)
-                if lot_match:
-                    title_qty = int(lot_match.group(1) or lot_match.group(2))
-
-                # Pattern: "Xx" or "xX" (e.g., "10x" or "x10")
-                if not title_qty:
-                    x_match = re.search(r'(?:^|\s)(\d+)\s*[xX](?:\s|$)|(?:^|\s)[xX]\s*(\d+)(?:\s|$)', title_upper)
-                    if x_match:
-                        title_qty = int(x_match.group(1) or x_match.group(2))
-
-                # Pattern: "X boxes" or "X ETBs" or "X booster"
-                if not title_qty:
-                    boxes_match = re.search(r'(\d+)\s*(?:boxes|etbs|boosters|packs|cases)', title_upper, re.IGNORECASE)
-                    if boxes_match:
-                        title_qty = int(boxes_match.group(1))
-
-                # Use title quantity if found and > 1
-                if title_qty and title_qty > 1:
-                    quantity = title_qty
-                    logger.info(f"[LOT] Detected quantity {quantity} from title")
-
                 _pc_start = _time.time()
-                pc_result, pc_context = _get_pricecharting_context(title, price_float, category, upc, quantity, condition)
-                _timing['pricecharting'] = _time.time() - _pc_start
-                logger.info(f"[TIMING] PriceCharting lookup: {_timing['pricecharting']*1000:.0f}ms")
+                pc_result, pc_context = await pc_task
+                _trace.stage('pricecharting_wait', _pc_start)
+                logger.info(f"[TIMING] PriceCharting lookup (remaining wait): {_timing['pricecharting_wait']*1000:.0f}ms")
+                for source in (("pricecharting", "bricklink") if _lookup_service else ()):
+                    p50, p99 = _lookup_service.percentiles(source)
+                    if p50 is not None:
+                        _timing[f"{source}_p50"] = p50
+                        _timing[f"{source}_p99"] = p99
 
                 # === PRICE OVERRIDE CHECK - Manual market prices take precedence ===
                 override = _check_price_override(title, category)
@@ -643,7 +738,7 @@ async def run_analysis(request: Request):
                     _render_result_html, _cache, _STATS, response_type
                 )
                 if pc_quick_response:
-                    return pc_quick_response
+                    return _trace.exit("pc_quick_pass", pc_quick_response)
             except Exception as e:
                 logger.error(f"[PC] Price parsing error: {e}")
 
@@ -705,18 +800,18 @@ async def run_analysis(request: Request):
             except Exception as e:
                 logger.error(f"[DISCORD] Agent quick pass alert error: {e}")
 
-            return agent_qp_response
+            return _trace.exit("agent_quick_pass", agent_qp_response)
         textbook_response = await check_textbook(
             category, data, total_price, title, _get_agent,
             _render_result_html, _cache, _STATS, response_type
         )
         if textbook_response:
-            return textbook_response
+            return _trace.exit("textbook", textbook_response)
         gold_qp_response = check_gold_price_per_gram(
             category, title, total_price, _render_result_html, _cache, _STATS, response_type
         )
         if gold_qp_response:
-            return gold_qp_response
+            return _trace.exit("gold_price_per_gram", gold_qp_response)
 
         # ============================================================
         # FAST EXTRACTION - Instant server-side calculations (0ms)
@@ -784,7 +879,7 @@ async def run_analysis(request: Request):
                 else:
                     fast_result = _fast_extract_silver(title, price_float, description, silver_spot, item_specifics)
 
-                _timing['fast_extract'] = _time.time() - _fast_start
+                _trace.stage('fast_extract', _fast_start)
                 logger.info(f"[FAST] Extraction took {_timing['fast_extract']*1000:.1f}ms")
 
                 # Log what we found
@@ -805,7 +900,7 @@ async def run_analysis(request: Request):
                     _render_result_html, _cache, _STATS, response_type
                 )
                 if fast_extract_response:
-                    return fast_extract_response
+                    return _trace.exit("fast_extract_pass", fast_extract_response)
             except Exception as e:
                 logger.error(f"[FAST] Extraction error: {e}")
                 fast_result = None
@@ -866,7 +961,7 @@ async def run_analysis(request: Request):
                 _timing['total'] = _time.time() - _start_time
                 logger.info(f"[LAZY] Saved {2 + 4:.0f}+ seconds (no images, no AI) - PASS in {_timing['total']*1000:.0f}ms")
                 # Always return JSON with html field for uBuyFirst columns + display
-                return JSONResponse(content=quick_result)
+                return _trace.exit("lazy_skip", JSONResponse(content=quick_result))
             else:
                 needs_images_for_tier1 = True
                 logger.info(f"[LAZY] Need images: price ${price_float:.0f} near maxBuy ${fast_result.max_buy:.0f}, need AI verification")
@@ -881,7 +976,7 @@ async def run_analysis(request: Request):
                 max_count=max_imgs,
                 selection="first_last"
             )
-            _timing['images'] = _time.time() - _img_start
+            _trace.stage('images', _img_start)
             logger.info(f"[TIMING] Image fetch + resize: {_timing['images']*1000:.0f}ms ({len(images)} images)")
 
         # Build prompt
@@ -921,8 +1016,8 @@ async def run_analysis(request: Request):
         # === FLATWARE WEIGHT ESTIMATION ===
         if category == 'silver' and not (fast_result and fast_result.weight_grams):
             try:
-                from utils.extraction import detect_flatware
-                is_flatware, piece_type, flat_qty, estimated_weight = detect_flatware(title)
+                from utils.listing_features import get_listing_features
+                is_flatware, piece_type, flat_qty, estimated_weight = get_listing_features(title).flatware
                 if is_flatware and estimated_weight > 0:
                     spots = _get_spot_prices()
                     sterling_rate = spots.get('sterling', 2.50)
@@ -944,8 +1039,10 @@ async def run_analysis(request: Request):
         # === RAG CONTEXT: Similar past purchases ===
         rag_context = ""
         if _RAG_AVAILABLE and category in ('gold', 'silver'):
+            _rag_start = _time.time()
             try:
-                rag_context = build_rag_context(title, price_float, category, str(data.get('Description', '')))
+                rag_context = await build_rag_context_async(title, price_float, category, str(data.get('Description', '')))
+                _trace.stage('rag', _rag_start)
                 if rag_context and "No similar past purchases" not in rag_context:
                     fast_context += f"\n\n{rag_context}"
                     logger.info(f"[RAG] Injected historical purchase context for {category}")
@@ -993,13 +1090,13 @@ async def run_analysis(request: Request):
             # Check hourly budget before making OpenAI call
             if not _check_openai_budget(tier1_cost):
                 logger.warning(f"[TIER1] SKIPPED due to budget limit - returning instant PASS")
-                return {
+                return _trace.exit("budget_skip", {
                     "Recommendation": "PASS",
                     "Qualify": "No",
                     "reasoning": "Analysis skipped - hourly OpenAI budget exceeded",
                     "confidence": "Low",
                     "budget_skip": True,
-                }
+                })
             logger.info(f"[TIER1] Calling {tier1_model} for {category}...")
 
             # Convert images to OpenAI format if present
@@ -1100,7 +1197,7 @@ async def run_analysis(request: Request):
             _STATS["session_cost"] += _COST_PER_CALL_HAIKU
             tier1_model_used = "Haiku"
 
-        _timing['tier1'] = _time.time() - _tier1_start
+        _trace.stage('tier1', _tier1_start)
         logger.info(f"[TIMING] Tier 1 ({tier1_model_used}): {_timing['tier1']*1000:.0f}ms")
 
         response_text = _sanitize_json_response(raw_response)
@@ -1161,7 +1258,7 @@ async def run_analysis(request: Request):
             # SERVER-SIDE MATH VALIDATION
             _validation_start = _time.time()
             result = _validate_and_fix_margin(result, total_price, category, title, data)
-            _timing['validation'] = _time.time() - _validation_start
+            _trace.stage('validation', _validation_start)
             logger.info(f"[TIMING] Validation: {_timing['validation']*1000:.0f}ms")
 
             # TCG/LEGO VALIDATION
@@ -1311,7 +1408,7 @@ async def run_analysis(request: Request):
                     logger.info(f"[TIER2] Fetching images using first_last strategy (first 3 + last 3 of {len(raw_image_urls)} total)...")
                     images = await _process_image_list(raw_image_urls, max_size=_IMAGES.resize_for_tier2, selection="first_last")
                     logger.info(f"[TIER2] Fetched {len(images)} images @ {_IMAGES.resize_for_tier2}px")
-                _timing['images'] = _time.time() - _img_start
+                _trace.stage('images', _img_start)
                 logger.info(f"[TIMING] Image fetch (for Tier2): {_timing['images']*1000:.0f}ms")
 
                 price_float = float(str(total_price).replace('$', '').replace(',', ''))
@@ -1329,7 +1426,7 @@ async def run_analysis(request: Request):
                         data=data,
                         system_prompt=_get_agent_prompt(category)
                     )
-                    _timing['tier2'] = _time.time() - _tier2_start
+                    _trace.stage('tier2', _tier2_start)
                     logger.info(f"[TIMING] Tier 2 OpenAI: {_timing['tier2']*1000:.0f}ms")
                 else:
                     result = await tier2_reanalyze(
@@ -1341,7 +1438,7 @@ async def run_analysis(request: Request):
                         data=data,
                         system_prompt=_get_agent_prompt(category)
                     )
-                    _timing['tier2'] = _time.time() - _tier2_start
+                    _trace.stage('tier2', _tier2_start)
                     logger.info(f"[TIMING] Tier 2 Sonnet: {_timing['tier2']*1000:.0f}ms")
 
                 # Update recommendation after Tier 2
@@ -1781,6 +1878,7 @@ async def run_analysis(request: Request):
                 logger.info(f"[DISCORD] Skipping - final recommendation is {final_recommendation}, not BUY")
 
             # Build final response
+            _trace.stage('post_process')
             return finalize_result(
                 result, html, title, total_price, listing_enhancements,
                 response_type, _timing, _start_time, _cache
@@ -1799,7 +1897,7 @@ async def run_analysis(request: Request):
                 error_result['html'] = _render_result_html(error_result, category, title)
             except Exception:
                 pass
-            return JSONResponse(content=error_result)
+            return _trace.exit("parse_error", JSONResponse(content=error_result), outcome="error")
 
     except Exception as e:
         logger.error(f"Error: {e}")
@@ -1812,4 +1910,4 @@ async def run_analysis(request: Request):
             error_result['html'] = _render_result_html(error_result, locals().get('category', 'unknown'), locals().get('title', ''))
         except Exception:
             pass
-        return JSONResponse(content=error_result)
+        return _trace.exit("error", JSONResponse(content=error_result), outcome="error")
@@ -5,6 +5,7 @@ Assembles final result with enhancements, caches it,
 and formats for the appropriate response type (JSON/HTML).
 """
 
+import json
 import logging
 from typing import Tuple
 
@@ -57,3 +58,19 @@ def finalize_result(result: dict, html: str, title: str, total_price: str,
     # - html field for display template
     logger.info(f"[RESPONSE] Returning JSON with html field (response_type was: {response_type})")
     return JSONResponse(content=result)
+
+
+def response_to_dict(response) -> dict:
+    """
+    Result dict from a pipeline exit, for in-process callers of analyze().
+
+    Most exits are JSONResponse(content=result); queue mode returns the
+    queued-page HTMLResponse and a few exits return a plain dict.
+    """
+    if isinstance(response, dict):
+        return response
+    if isinstance(response, JSONResponse):
+        return json.loads(response.body)
+    if isinstance(response, HTMLResponse):
+        return {"Recommendation": "QUEUED", "html": response.body.decode("utf-8", errors="replace")}
+    return {"Recommendation": "ERROR", "reasoning": f"Unexpected pipeline response: {type(response).__name__}"}
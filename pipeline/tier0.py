@@ -21,6 +21,8 @@ Returns:
 import logging
 from typing import Optional, Tuple, Dict, Any
 
+from utils.keyword_matcher import KeywordMatcher
+
 logger = logging.getLogger(__name__)
 
 
@@ -46,6 +48,10 @@ class Tier0Filter:
         "estate find", "as is", "sold as is",
     ]
 
+    # Compiled once with the class
+    INSTANT_PASS_MATCHER = KeywordMatcher(INSTANT_PASS_KEYWORDS)
+    RESEARCH_MATCHER = KeywordMatcher(RESEARCH_KEYWORDS)
+
     def __init__(self, blocked_sellers: set = None, user_prices_db=None):
         """
         Initialize Tier 0 filter.
@@ -101,16 +107,16 @@ class Tier0Filter:
                     return (f"USER_PRICE_MATCH: {matched_name} - price above max buy", "RESEARCH")
 
         # 3. Instant-pass keywords
-        for keyword in self.INSTANT_PASS_KEYWORDS:
-            if keyword in title:
-                logger.debug(f"[TIER0] Instant-pass keyword: {keyword}")
-                return (f"Instant-pass keyword: {keyword}", "PASS")
+        keyword = self.INSTANT_PASS_MATCHER.first(title)
+        if keyword:
+            logger.debug(f"[TIER0] Instant-pass keyword: {keyword}")
+            return (f"Instant-pass keyword: {keyword}", "PASS")
 
         # 4. Research keywords
-        for keyword in self.RESEARCH_KEYWORDS:
-            if keyword in title:
-                logger.debug(f"[TIER0] Research keyword: {keyword}")
-                return (f"Needs manual verification: {keyword}", "RESEARCH")
+        keyword = self.RESEARCH_MATCHER.first(title)
+        if keyword:
+            logger.debug(f"[TIER0] Research keyword: {keyword}")
+            return (f"Needs manual verification: {keyword}", "RESEARCH")
 
         # 5. Agent-specific quick_pass
         if agent and hasattr(agent, 'quick_pass'):
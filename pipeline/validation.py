@@ -1249,8 +1249,8 @@ def validate_and_fix_margin(result: dict, listing_price, category: str, title: s
             # If AI couldn't determine weight, try server-side estimation for flatware
             if metal_weight == 0 and title:
                 try:
-                    from utils.extraction import detect_flatware
-                    is_flatware_est, piece_type, flat_qty, estimated_weight = detect_flatware(title)
+                    from utils.listing_features import get_listing_features
+                    is_flatware_est, piece_type, flat_qty, estimated_weight = get_listing_features(title).flatware
                     if is_flatware_est and estimated_weight > 0:
                         metal_weight = estimated_weight
                         result['weight'] = f"{estimated_weight:.0f}"
@@ -226,7 +226,51 @@ async def api_spot_prices():
 
 @router.get("/api/cache-stats")
 async def api_cache_stats():
-    return _cache.get_stats()
+    from image_cache import image_cache
+    stats = _cache.get_stats()
+    stats["images"] = image_cache.get_stats()
+    return stats
+
+
+@router.get("/api/db-write-stats")
+async def api_db_write_stats():
+    """Write-behind queue depth, batch sizes and drop counters"""
+    from database import db
+    return db.get_write_stats()
+
+
+@router.get("/api/rag-stats")
+async def api_rag_stats():
+    """RAG embedding cache hit rate, micro-batch sizes and index backend"""
+    try:
+        from utils.rag_context import get_rag_stats
+    except ImportError as e:
+        return {"available": False, "error": str(e)}
+    return {"available": True, **get_rag_stats()}
+
+
+@router.get("/api/ebay-budget")
+async def api_ebay_budget():
+    """Shared Browse API budget and the last sold-status polling cycle"""
+    from services.item_tracking import get_sold_poll_stats
+    return get_sold_poll_stats()
+
+
+@router.get("/api/perf")
+async def api_perf(recent: int = 10, reset: bool = False):
+    """Per-stage latency percentiles/histograms and exit paths for run_analysis"""
+    from services.perf_tracing import perf_tracer
+    stats = perf_tracer.get_stats(recent=recent)
+    if reset:
+        perf_tracer.reset()
+    return stats
+
+
+@router.get("/api/http-stats")
+async def api_http_stats():
+    """Shared HTTP pool request counts, new connections/TLS handshakes and reuse ratio"""
+    from services.http_clients import http_clients
+    return http_clients.get_stats()
 
 
 # ============================================================
@@ -265,6 +309,26 @@ async def dashboard(request: Request):
     # Get cache stats
     cache_stats = _cache.get_stats()
 
+    # Get DB write-behind queue stats
+    from database import db
+    write_stats = db.get_write_stats()
+    batch_hist = " | ".join(f"{k}: {v}" for k, v in write_stats['batch_size_histogram'].items())
+
+    # Pipeline latency per stage / exit path
+    from services.perf_tracing import perf_tracer
+    perf = perf_tracer.get_stats(recent=0)
+    perf_html = ""
+    for label, rows in (("Stage", perf['stages']), ("Exit path", perf['exit_paths'])):
+        perf_html += f'<tr><th>{label}</th><th>Count</th><th>p50 ms</th><th>p90 ms</th><th>p99 ms</th><th>Share</th></tr>'
+        for name, s in rows.items():
+            share = f"{s['share']*100:.0f}%" if 'share' in s else ""
+            perf_html += f'''
+                <tr><td>{name}</td><td>{s['count']}</td><td>{s.get('p50_ms', 0):.0f}</td><td>{s.get('p90_ms', 0):.0f}</td><td>{s.get('p99_ms', 0):.0f}</td><td>{share}</td></tr>'''
+    if perf['stages']:
+        perf_html = f'<table class="perf-table">{perf_html}</table>'
+    else:
+        perf_html = '<div style="text-align:center;color:#666;padding:20px;">No requests traced yet</div>'
+
     # Build recent listings HTML from database
     recent_html = ""
     analytics_data = _get_analytics()
@@ -351,6 +415,9 @@ body {{ font-family: -apple-system, system-ui, sans-serif; background: #0f0f1a;
 .spot-item {{ background: #252540; padding: 10px; border-radius: 8px; text-align: center; }}
 .spot-value {{ font-size: 18px; font-weight: 700; color: #22c55e; }}
 .spot-label {{ font-size: 11px; color: #888; }}
+.perf-table {{ width: 100%; border-collapse: collapse; font-size: 13px; }}
+.perf-table th {{ text-align: left; color: #888; font-weight: 600; padding: 6px 8px; border-bottom: 1px solid #333; }}
+.perf-table td {{ padding: 6px 8px; border-bottom: 1px solid #252540; }}
 </style>
 </head><body>
 <div class="header">
@@ -444,6 +511,31 @@ body {{ font-family: -apple-system, system-ui, sans-serif; background: #0f0f1a;
         </div>
     </div>
 
+    <!-- DB WRITE QUEUE -->
+    <div class="stats-row" style="margin-top:10px;">
+        <div class="stat-card">
+            <div class="stat-value">{write_stats['depth']}</div>
+            <div class="stat-label">DB Queue Depth (max {write_stats['max_depth']})</div>
+        </div>
+        <div class="stat-card">
+            <div class="stat-value">{write_stats['written']}</div>
+            <div class="stat-label">DB Writes</div>
+        </div>
+        <div class="stat-card">
+            <div class="stat-value">{write_stats['avg_batch_size']}</div>
+            <div class="stat-label">Avg Batch Size</div>
+        </div>
+        <div class="stat-card">
+            <div class="stat-value">{write_stats['avg_commit_ms']}ms</div>
+            <div class="stat-label">Avg Commit</div>
+        </div>
+        <div class="stat-card">
+            <div class="stat-value" style="color:{'#ef4444' if write_stats['dropped'] else '#888'}">{write_stats['dropped']}</div>
+            <div class="stat-label">DB Writes Dropped</div>
+        </div>
+    </div>
+    <div style="color:#666;font-size:11px;margin:-10px 0 20px 5px;">Batch sizes: {batch_hist}</div>
+
     <div class="section">
         <div class="section-header">Spot Prices ({spots.get('source', 'default')})</div>
         <div class="section-content">
@@ -472,6 +564,11 @@ body {{ font-family: -apple-system, system-ui, sans-serif; background: #0f0f1a;
         </div>
     </div>
 
+    <div class="section">
+        <div class="section-header">Pipeline Latency ({perf['requests']} requests) <a href="/api/perf" style="color:#6366f1;font-size:12px;font-weight:400;">JSON</a></div>
+        <div class="section-content">{perf_html}</div>
+    </div>
+
     <div style="display: grid; grid-template-columns: 1fr 1fr; gap: 20px;">
         <div class="section">
             <div class="section-header">Queue ({len(LISTING_QUEUE)})</div>
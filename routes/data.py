@@ -151,26 +151,26 @@ async def api_memory_stats(request: Request):
 @router.get("/api/tracking/stats")
 async def api_tracking_stats():
     """Get item tracking statistics including fast-sale patterns"""
-    return _item_tracking.get_tracking_stats()
+    return await _item_tracking.store.run(_item_tracking.get_tracking_stats)
 
 
 @router.get("/api/tracking/fast-sales")
 async def api_tracking_fast_sales(limit: int = 50):
     """Get items that sold within 5 minutes of listing"""
-    return _item_tracking.get_fast_sales(limit=limit)
+    return await _item_tracking.store.run(_item_tracking.get_fast_sales, limit=limit)
 
 
 @router.get("/api/tracking/active")
 async def api_tracking_active(limit: int = 100):
     """Get active items currently being tracked"""
-    return _item_tracking.get_active_items(limit=limit)
+    return await _item_tracking.store.run(_item_tracking.get_active_items, limit=limit)
 
 
 @router.post("/api/tracking/resolve-now")
 async def api_tracking_resolve_now():
     """Manually trigger eBay item ID resolution for pending items"""
     await _item_tracking.resolve_pending_items(batch_size=20)
-    stats = _item_tracking.get_tracking_stats()
+    stats = await _item_tracking.store.run(_item_tracking.get_tracking_stats)
     return {
         "status": "ok",
         "message": "Resolution completed",
@@ -183,7 +183,7 @@ async def api_tracking_resolve_now():
 async def api_tracking_poll_now():
     """Manually trigger ID resolution + poll for sold items"""
     await _item_tracking.resolve_pending_items(batch_size=20)
-    await _item_tracking.poll_items_for_sold_status(batch_size=50)
+    await _item_tracking.poll_items_for_sold_status()
     return {"status": "ok", "message": "Resolution and polling completed"}
 
 
@@ -194,13 +194,13 @@ async def api_tracking_poll_now():
 @router.get("/api/patterns/stats")
 async def api_pattern_stats():
     """Get statistics about logged learning patterns"""
-    return _item_tracking.get_pattern_stats()
+    return await _item_tracking.store.run(_item_tracking.get_pattern_stats)
 
 
 @router.get("/api/patterns/{category}")
 async def api_patterns_by_category(category: str, limit: int = 50):
     """Get recent patterns for a specific category"""
-    patterns = _item_tracking.get_patterns_by_category(category, limit)
+    patterns = await _item_tracking.store.run(_item_tracking.get_patterns_by_category, category, limit)
     return {"category": category, "count": len(patterns), "patterns": patterns}
 
 
@@ -220,7 +220,8 @@ async def api_log_manual_pattern(request: Request):
     result = data.get('result', {})
     notes = data.get('notes', '')
 
-    _item_tracking.log_pattern(
+    await _item_tracking.store.run(
+        _item_tracking.log_pattern,
         pattern_type=data['pattern_type'],
         category=data['category'],
         title=data['title'],
@@ -507,6 +508,13 @@ def log_purchase(listing_data: dict, analysis_data: dict, notes: str = ""):
             f.write(json.dumps(purchase_entry) + '\n')
 
         logger.info(f"[PURCHASE] Logged: {listing_data.get('title', '')[:50]} @ ${listing_data.get('price')}")
+
+        # Wake the RAG index watcher so the purchase is embedded within seconds
+        try:
+            from utils.rag_context import notify_purchases_changed
+            notify_purchases_changed()
+        except ImportError:
+            pass
         return True
     except Exception as e:
         logger.error(f"[PURCHASE] Failed to log: {e}")
@@ -4,7 +4,7 @@ Extracted from main.py for modularity
 
 This module contains:
 - /race/* endpoints for head-to-head race comparison
-- Full AI pipeline integration (calls /match_mydata internally)
+- Full AI pipeline integration (pipeline.orchestrator.analyze, in-process)
 - Race state management (RACE_DATA, RACE_TASK)
 - Helper functions for race matching and winner determination
 """
@@ -18,7 +18,7 @@ from typing import Dict, Any, Optional, Callable
 from fastapi import APIRouter
 from fastapi.responses import Response, JSONResponse
 
-import httpx
+from utils.keyword_matcher import KeywordMatcher
 
 logger = logging.getLogger(__name__)
 
@@ -50,6 +50,8 @@ _config: Dict = {
     "BLOCKED_SELLERS": set(),
     "INSTANT_PASS_KEYWORDS": [],
     "UBF_TITLE_FILTERS": [],
+    "INSTANT_PASS_MATCHER": KeywordMatcher(()),
+    "UBF_TITLE_MATCHER": KeywordMatcher(()),
     "UBF_LOCATION_FILTERS": [],
     "UBF_FEEDBACK_RULES": {"min_feedback_score": 3, "max_feedback_score": 30000},
     "dashboard_path": None,
@@ -70,6 +72,9 @@ def configure_race(
     _config["BLOCKED_SELLERS"] = BLOCKED_SELLERS
     _config["INSTANT_PASS_KEYWORDS"] = INSTANT_PASS_KEYWORDS
     _config["UBF_TITLE_FILTERS"] = UBF_TITLE_FILTERS
+    # Compiled once per configure (the filter lists only change here)
+    _config["INSTANT_PASS_MATCHER"] = KeywordMatcher(INSTANT_PASS_KEYWORDS)
+    _config["UBF_TITLE_MATCHER"] = KeywordMatcher(UBF_TITLE_FILTERS)
     _config["UBF_LOCATION_FILTERS"] = UBF_LOCATION_FILTERS
     _config["UBF_FEEDBACK_RULES"] = UBF_FEEDBACK_RULES
     _config["dashboard_path"] = dashboard_path or Path(__file__).parent.parent / "race_dashboard.html"
@@ -168,12 +173,14 @@ async def race_poll_loop(keyword: str):
 
     FULL AI PIPELINE:
     - Same blocked sellers and filters as uBuyFirst
-    - Calls /match_mydata internally for full AI analysis (GPT-4o-mini)
+    - Runs the /match_mydata pipeline in-process for full AI analysis (GPT-4o-mini)
     - Only sends BUY and RESEARCH to Discord
     - PASS items are filtered silently
     """
-    # Import ebay_poller functions locally to avoid circular imports
+    # Import ebay_poller / pipeline functions locally to avoid circular imports
     from ebay_poller import search_ebay, send_discord_listing
+    from pipeline.orchestrator import analyze
+    from utils.listing_adapter import normalize_api_listing
 
     BLOCKED_SELLERS = _config["BLOCKED_SELLERS"]
     INSTANT_PASS_KEYWORDS = _config["INSTANT_PASS_KEYWORDS"]
@@ -192,7 +199,7 @@ async def race_poll_loop(keyword: str):
     logger.info(f"[RACE] 7. Condition filters: For parts, tags, New other")
     logger.info(f"[RACE] 8. Seller country in location: Japan, China, France, etc.")
     logger.info(f"[RACE] 9. Freshness: max 5 minutes old")
-    logger.info(f"[RACE] 10. Full AI pipeline: /match_mydata (same as uBuyFirst)")
+    logger.info(f"[RACE] 10. Full AI pipeline: in-process /match_mydata pipeline (same as uBuyFirst)")
     logger.info(f"[RACE] =======================================")
 
     seen_ids = set()
@@ -230,6 +237,8 @@ async def race_poll_loop(keyword: str):
                 logger.info(f"[RACE] Initial poll: {len(listings)} items (building baseline)")
 
             now = datetime.now()
+            instant_pass_matcher = _config["INSTANT_PASS_MATCHER"]
+            ubf_title_matcher = _config["UBF_TITLE_MATCHER"]
 
             for listing in listings:
                 if listing.item_id in seen_ids:
@@ -263,25 +272,17 @@ async def race_poll_loop(keyword: str):
                         continue
 
                 # FILTER 2: Instant-pass keywords (gold plated, silver plated, etc.)
-                skip_instant = False
-                for kw in INSTANT_PASS_KEYWORDS:
-                    if kw in title_lower:
-                        skip_instant = True
-                        filtered_counts["instant_pass"] += 1
-                        logger.debug(f"[RACE] Filtered instant-pass '{kw}': {listing.title[:40]}")
-                        break
-                if skip_instant:
+                kw = instant_pass_matcher.first(title_lower)
+                if kw:
+                    filtered_counts["instant_pass"] += 1
+                    logger.debug(f"[RACE] Filtered instant-pass '{kw}': {listing.title[:40]}")
                     continue
 
                 # FILTER 3: UBF title keywords (prizm, coins, railroad, etc.)
-                skip_ubf = False
-                for kw in UBF_TITLE_FILTERS:
-                    if kw in title_lower:
-                        skip_ubf = True
-                        filtered_counts["ubf_title"] += 1
-                        logger.debug(f"[RACE] Filtered UBF title '{kw}': {listing.title[:40]}")
-                        break
-                if skip_ubf:
+                kw = ubf_title_matcher.first(title_lower)
+                if kw:
+                    filtered_counts["ubf_title"] += 1
+                    logger.debug(f"[RACE] Filtered UBF title '{kw}': {listing.title[:40]}")
                     continue
 
                 # FILTER 4: Location (China, Japan, Australia, etc.)
@@ -360,13 +361,14 @@ async def race_poll_loop(keyword: str):
 
                 # ============================================================
                 # FULL AI PIPELINE ANALYSIS
-                # Same pipeline as uBuyFirst - calls /match_mydata internally
+                # Same pipeline as uBuyFirst - run in-process, no /match_mydata loopback
                 # ============================================================
                 try:
-                    # Format listing data to match uBuyFirst format
-                    analysis_data = {
-                        "Title": listing.title,
-                        "TotalPrice": f"${listing.price:.2f}",
+                    # Search results already carry images; uBuyFirst-style fields the Browse API lacks
+                    standardized = await normalize_api_listing(listing, fetch_details=False)
+                    if getattr(listing, 'image_urls', None):
+                        standardized.images = listing.image_urls[:6]
+                    result = await analyze(standardized, {
                         "ItemPrice": f"${listing.price:.2f}",
                         "Alias": keyword,
                         "SellerName": listing.seller_id or "",
@@ -375,51 +377,31 @@ async def race_poll_loop(keyword: str):
                         "FromCountry": "US",
                         "Condition": "Used",
                         "CategoryName": "Jewelry",
-                        "PostedTime": listing.start_time.strftime("%m/%d/%Y %I:%M:%S %p") if listing.start_time else "",
-                        "ViewUrl": listing.view_url or "",
-                        "images": listing.image_urls[:6] if hasattr(listing, 'image_urls') and listing.image_urls else [],
-                        "response_type": "json",
                         "llm_provider": "openai",
                         "llm_model": "openai/gpt-4o-mini",
-                    }
-
-                    # Make internal HTTP call to /match_mydata
-                    async with httpx.AsyncClient(timeout=30.0) as client:
-                        response = await client.post(
-                            "http://127.0.0.1:8000/match_mydata",
-                            json=analysis_data,
-                            headers={"Content-Type": "application/json"}
-                        )
-
-                        if response.status_code == 200:
-                            result = response.json()
-                            recommendation = result.get("Recommendation", "PASS")
-                            reasoning = result.get("reasoning", result.get("Qualify", ""))[:100]
-                            melt_value = None
-                            max_buy = None
-
-                            # Extract melt/max values if present
-                            melt_str = result.get("meltvalue", result.get("melt", ""))
-                            if melt_str and melt_str != "NA":
-                                try:
-                                    melt_value = float(str(melt_str).replace("$", "").replace(",", ""))
-                                except:
-                                    pass
-
-                            max_str = result.get("maxBuy", "")
-                            if max_str and max_str != "NA":
-                                try:
-                                    max_buy = float(str(max_str).replace("$", "").replace(",", ""))
-                                except:
-                                    pass
-
-                            logger.info(f"[RACE-API] AI Result: {recommendation} - {listing.title[:40]}...")
-                        else:
-                            logger.warning(f"[RACE-API] Analysis failed ({response.status_code}): {listing.title[:40]}")
-                            recommendation = "RESEARCH"
-                            reasoning = "Analysis failed - manual review needed"
-                            melt_value = None
-                            max_buy = None
+                    })
+
+                    recommendation = result.get("Recommendation", "PASS")
+                    reasoning = result.get("reasoning", result.get("Qualify", ""))[:100]
+                    melt_value = None
+                    max_buy = None
+
+                    # Extract melt/max values if present
+                    melt_str = result.get("meltvalue", result.get("melt", ""))
+                    if melt_str and melt_str != "NA":
+                        try:
+                            melt_value = float(str(melt_str).replace("$", "").replace(",", ""))
+                        except:
+                            pass
+
+                    max_str = result.get("maxBuy", "")
+                    if max_str and max_str != "NA":
+                        try:
+                            max_buy = float(str(max_str).replace("$", "").replace(",", ""))
+                        except:
+                            pass
+
+                    logger.info(f"[RACE-API] AI Result: {recommendation} - {listing.title[:40]}...")
 
                 except Exception as analysis_error:
                     logger.error(f"[RACE-API] Analysis error: {analysis_error}")
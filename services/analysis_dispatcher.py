@@ -0,0 +1,261 @@
+"""
+Analysis Dispatcher - bounded, prioritized analysis of poller listings
+
+The eBay poller used to fire one create_task() per new listing, so a burst
+of fresh listings started every image fetch and Tier 1 call at once and the
+best listings waited behind the rest. Listings now go through one queue:
+
+- Priority mixes the seller score (enrich_listing_with_seller_profile), a
+  price-vs-melt estimate from the title and how recently it was listed
+- A fixed pool of workers takes the highest priority listing whose
+  provider (openai / anthropic / proxy) has a free slot, so one backend
+  never gets more calls than its limit and a full backend doesn't park
+  workers on listings the other backends could be running
+- Listings that waited past stale_after or were listed too long ago are
+  dropped at dequeue; when the queue is full the lowest priority is shed
+
+Usage:
+    dispatcher = AnalysisDispatcher(provider_for=lambda listing: "openai")
+    dispatcher.submit(callback, listing)   # never blocks the poller
+    dispatcher.get_stats()                 # depth, waits, drops
+"""
+
+import time
+import heapq
+import asyncio
+import itertools
+import logging
+from collections import deque
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from config import ANALYSIS_QUEUE, SPOT_PRICES
+from utils.listing_features import get_listing_features
+
+logger = logging.getLogger(__name__)
+
+WAIT_SAMPLES = 500  # Rolling window for wait-time percentiles
+
+
+def _listing_age(listing: Any) -> Optional[float]:
+    """Seconds since the listing started, None if unknown"""
+    start_time = getattr(listing, "start_time", None)
+    if not start_time:
+        return None
+    try:
+        now = datetime.now(timezone.utc) if start_time.tzinfo else datetime.now()
+        return max((now - start_time).total_seconds(), 0.0)
+    except Exception:
+        return None
+
+
+def estimate_melt(title: str) -> Optional[float]:
+    """Rough melt value from the title alone (weight x karat/sterling rate), None if unknown"""
+    features = get_listing_features(title)
+    weight = features.weight_grams
+    if not weight:
+        return None
+    if features.karat and f"{features.karat}K" in SPOT_PRICES:
+        return weight * SPOT_PRICES[f"{features.karat}K"]
+    if features.silver_purity:
+        return weight * SPOT_PRICES["silver_gram"] * features.silver_purity
+    return None
+
+
+def listing_priority(listing: Any, config=None) -> float:
+    """0-100 score: weighted seller score, price-vs-melt and freshness (unknowns count as 50)"""
+    config = config or ANALYSIS_QUEUE
+    seller = float(getattr(listing, "seller_score", 50))
+
+    value = 50.0
+    price = getattr(listing, "price", 0) or 0
+    melt = estimate_melt(getattr(listing, "title", "") or "")
+    if melt and price > 0:
+        value = min(melt / price, 2.0) * 50.0  # 100 at melt >= 2x price
+
+    freshness = 50.0
+    age = _listing_age(listing)
+    if age is not None:
+        freshness = max(0.0, 1.0 - age / config.fresh_window) * 100.0
+
+    total = config.seller_weight + config.value_weight + config.freshness_weight
+    score = (seller * config.seller_weight + value * config.value_weight
+             + freshness * config.freshness_weight) / (total or 1.0)
+    return round(score, 1)
+
+
+class _Job:
+    __slots__ = ("callback", "listing", "priority", "provider", "queued_at")
+
+    def __init__(self, callback, listing, priority: float, provider: str):
+        self.callback = callback
+        self.listing = listing
+        self.priority = priority
+        self.provider = provider
+        self.queued_at = time.monotonic()
+
+
+class AnalysisDispatcher:
+    """
+    Priority queue + worker pool for poller-sourced analysis.
+
+    provider_for(listing) names the backend a listing's analysis will call;
+    a job is only popped once that provider has a free slot, and the worker
+    holds the slot for the whole callback.
+    """
+
+    def __init__(self, config=None, provider_for: Callable[[Any], str] = None):
+        self._config = config or ANALYSIS_QUEUE
+        self.provider_for = provider_for or (lambda listing: "default")
+        self._heap: List[Tuple[float, int, _Job]] = []
+        self._seq = itertools.count()
+        self._ready: Optional[asyncio.Event] = None
+        self._workers: List[asyncio.Task] = []
+        self._in_flight: Dict[str, int] = {}
+        self._waits: deque = deque(maxlen=WAIT_SAMPLES)
+        self._hot_waits: deque = deque(maxlen=WAIT_SAMPLES)
+        self._stats = {"submitted": 0, "completed": 0, "errors": 0, "max_depth": 0}
+        self._drops = {"shed": 0, "stale": 0, "too_old": 0}
+
+    # ----------------------------------------------------------
+    # Submitting
+    # ----------------------------------------------------------
+
+    def submit(self, callback: Callable[[Any], Awaitable], listing: Any, priority: Optional[float] = None):
+        """Queue listing for callback(listing). Must be called from the event loop."""
+        self._ensure_workers()
+        if priority is None:
+            priority = listing_priority(listing, self._config)
+        try:
+            provider = self.provider_for(listing)
+        except Exception:
+            provider = "default"
+        job = _Job(callback, listing, priority, provider)
+        heapq.heappush(self._heap, (-priority, next(self._seq), job))
+        self._stats["submitted"] += 1
+        if len(self._heap) > self._config.max_queued:
+            self._shed_lowest()
+        self._stats["max_depth"] = max(self._stats["max_depth"], len(self._heap))
+        self._ready.set()
+
+    def _shed_lowest(self):
+        """Drop the lowest-priority (then newest) queued listing"""
+        lowest = max(range(len(self._heap)), key=lambda i: self._heap[i][:2])
+        _, _, job = self._heap[lowest]
+        self._heap[lowest] = self._heap[-1]
+        self._heap.pop()
+        heapq.heapify(self._heap)
+        self._drops["shed"] += 1
+        logger.debug(f"[DISPATCH] Queue full - shed p{job.priority:.0f}: {getattr(job.listing, 'title', '')[:40]}")
+
+    # ----------------------------------------------------------
+    # Workers
+    # ----------------------------------------------------------
+
+    def _ensure_workers(self):
+        if self._workers and not all(w.done() for w in self._workers):
+            return
+        loop = asyncio.get_running_loop()
+        self._ready = asyncio.Event()
+        self._workers = [loop.create_task(self._worker(i)) for i in range(self._config.workers)]
+        logger.info(f"[DISPATCH] Started {self._config.workers} analysis workers")
+
+    def _has_slot(self, provider: str) -> bool:
+        limit = self._config.provider_limits.get(provider, self._config.default_provider_limit)
+        return self._in_flight.get(provider, 0) < max(limit, 1)
+
+    def _pop_runnable(self) -> Optional[_Job]:
+        """Pop the highest priority job whose provider has a free slot, None if there is none"""
+        if not self._heap:
+            return None
+        if self._has_slot(self._heap[0][2].provider):
+            return heapq.heappop(self._heap)[2]
+        runnable = [i for i, (_, _, job) in enumerate(self._heap) if self._has_slot(job.provider)]
+        if not runnable:
+            return None
+        best = min(runnable, key=lambda i: self._heap[i][:2])
+        _, _, job = self._heap[best]
+        self._heap[best] = self._heap[-1]
+        self._heap.pop()
+        heapq.heapify(self._heap)
+        return job
+
+    async def _next_job(self) -> _Job:
+        """Wait for a runnable job and take its provider slot (release with _release)"""
+        while True:
+            job = self._pop_runnable()
+            if job is not None:
+                self._in_flight[job.provider] = self._in_flight.get(job.provider, 0) + 1
+                return job
+            self._ready.clear()
+            await self._ready.wait()
+
+    def _release(self, job: _Job):
+        self._in_flight[job.provider] -= 1
+        # Jobs for this provider may be waiting behind the freed slot
+        self._ready.set()
+
+    def _is_stale(self, job: _Job, waited: float) -> Optional[str]:
+        if waited > self._config.stale_after:
+            return "stale"
+        age = _listing_age(job.listing)
+        if age is not None and age > self._config.max_listing_age:
+            return "too_old"
+        return None
+
+    async def _worker(self, index: int):
+        while True:
+            job = await self._next_job()
+            try:
+                waited = time.monotonic() - job.queued_at
+                reason = self._is_stale(job, waited)
+                if reason:
+                    self._drops[reason] += 1
+                    logger.debug(f"[DISPATCH] Dropped ({reason}, waited {waited:.1f}s): "
+                                 f"{getattr(job.listing, 'title', '')[:40]}")
+                    continue
+                self._waits.append(waited)
+                if job.priority >= self._config.hot_priority:
+                    self._hot_waits.append(waited)
+                await job.callback(job.listing)
+                self._stats["completed"] += 1
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self._stats["errors"] += 1
+                logger.error(f"[DISPATCH] Analysis error: {e}")
+            finally:
+                self._release(job)
+
+    async def stop(self):
+        """Cancel the workers and drop anything still queued"""
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        self._heap.clear()
+
+    # ----------------------------------------------------------
+    # Stats
+    # ----------------------------------------------------------
+
+    @staticmethod
+    def _wait_summary(samples) -> Dict[str, Any]:
+        if not samples:
+            return {"samples": 0}
+        ordered = sorted(samples)
+        pick = lambda q: round(ordered[min(int(q * len(ordered)), len(ordered) - 1)] * 1000, 1)
+        return {"samples": len(ordered), "p50_ms": pick(0.5), "p90_ms": pick(0.9),
+                "p99_ms": pick(0.99), "max_ms": round(ordered[-1] * 1000, 1)}
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "workers": sum(1 for w in self._workers if not w.done()),
+            "queue_depth": len(self._heap),
+            "in_flight": {p: n for p, n in self._in_flight.items() if n},
+            "provider_limits": dict(self._config.provider_limits),
+            **self._stats,
+            "dropped": dict(self._drops),
+            "wait": self._wait_summary(self._waits),
+            "hot_wait": self._wait_summary(self._hot_waits),
+        }
@@ -4,6 +4,7 @@ from contextlib import asynccontextmanager
 from typing import AsyncGenerator
 
 from services.app_state import AppState
+from services.http_clients import http_clients
 
 
 def create_app(state: AppState) -> FastAPI:
@@ -26,9 +27,12 @@ def create_app(state: AppState) -> FastAPI:
 
         # Store state in app for access by routes
         app.state.app_state = state
+        app.state.http_clients = http_clients
 
         yield
 
+        await http_clients.aclose()
+
         # Shutdown
         print(f"[SHUTDOWN] ClaudeProxy v3 shutting down...")
         print(f"[SHUTDOWN] Total requests: {state.stats['total_requests']}")
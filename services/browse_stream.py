@@ -0,0 +1,127 @@
+"""
+Browse Search Streaming - incremental parsing of newest-first search pages
+
+A keyword poll asked for 50 items, parsed the whole JSON body and built an
+EbayListing for every item, although most polls contain 0-2 new ones. The
+poller now reads the body as it arrives:
+
+- BrowseItemStream yields each itemSummaries element as soon as its bytes
+  are in, decoding one element at a time (json raw_decode), so the caller
+  can stop once it reaches listings it has already seen
+- PageSizer picks each keyword's page size from how many new listings its
+  recent polls actually found, and grows it again when a page ran out
+  before reaching seen listings. It also remembers when each keyword was
+  last searched: a listing posted more than index_lag before that search
+  was already visible to it, so seen listings that old mean nothing
+  unseen can follow
+
+Usage:
+    stream = BrowseItemStream()
+    async for chunk in response.aiter_bytes():
+        for item in stream.feed(chunk):
+            ...
+"""
+
+import re
+import json
+import math
+import time
+import codecs
+from typing import Any, Dict, List, Optional
+
+from config import BROWSE_STREAM
+
+ITEMS_START = re.compile(r'"itemSummaries"\s*:\s*\[')
+TOTAL_FIELD = re.compile(r'"total"\s*:\s*(\d+)')
+SEPARATOR = re.compile(r'[\s,]*')
+
+
+class BrowseItemStream:
+    """Feed response body chunks; get back the itemSummaries elements completed so far"""
+
+    def __init__(self):
+        self._decoder = codecs.getincrementaldecoder("utf-8")()
+        self._json = json.JSONDecoder()
+        self._buffer = ""
+        self._in_items = False
+        self.total: Optional[int] = None
+        self.items_seen = 0
+        self.done = False  # closing bracket of itemSummaries reached
+
+    def feed(self, chunk: bytes) -> List[Dict[str, Any]]:
+        if self.done:
+            return []
+        self._buffer += self._decoder.decode(chunk)
+
+        if not self._in_items:
+            match = ITEMS_START.search(self._buffer)
+            if not match:
+                return []
+            total = TOTAL_FIELD.search(self._buffer, 0, match.start())
+            if total:
+                self.total = int(total.group(1))
+            self._buffer = self._buffer[match.end():]
+            self._in_items = True
+
+        items = []
+        pos = 0
+        buffer = self._buffer
+        while True:
+            pos = SEPARATOR.match(buffer, pos).end()
+            if pos >= len(buffer):
+                break
+            if buffer[pos] == "]":
+                self.done = True
+                break
+            try:
+                item, pos = self._json.raw_decode(buffer, pos)
+            except ValueError:
+                break  # Element still incomplete - wait for the next chunk
+            items.append(item)
+        self._buffer = buffer[pos:]
+        self.items_seen += len(items)
+        return items
+
+
+class PageSizer:
+    """Per-keyword page size from the new listings recent polls found"""
+
+    def __init__(self, config=None, smoothing: float = 0.3):
+        self.config = config or BROWSE_STREAM
+        self.smoothing = smoothing
+        self._arrivals: Dict[str, float] = {}  # keyword -> smoothed new listings per poll
+        self._grow: Dict[str, int] = {}        # keyword -> page size forced after a short page
+        self._last_search: Dict[str, float] = {}
+
+    def size(self, keyword: str) -> int:
+        cfg = self.config
+        if keyword in self._grow:
+            return self._grow[keyword]
+        if keyword not in self._arrivals:
+            return cfg.max_page
+        wanted = math.ceil(self._arrivals[keyword] * cfg.page_headroom) + cfg.page_pad
+        return min(max(wanted, cfg.min_page), cfg.max_page)
+
+    def stop_horizon(self, keyword: str, now: Optional[float] = None) -> Optional[float]:
+        """Listing age past which everything was already visible to the previous search (None: no previous search)"""
+        last = self._last_search.get(keyword)
+        if last is None:
+            return None
+        now = time.time() if now is None else now
+        return self.config.index_lag + max(now - last, 0.0)
+
+    def observe(self, keyword: str, arrivals: int, page_size: int, reached_seen: bool, searched_at: float = None):
+        """arrivals: unseen listings on the page; reached_seen: the page got back to known listings"""
+        self._last_search[keyword] = time.time() if searched_at is None else searched_at
+        previous = self._arrivals.get(keyword)
+        self._arrivals[keyword] = arrivals if previous is None else (
+            previous * (1 - self.smoothing) + arrivals * self.smoothing)
+        if reached_seen:
+            self._grow.pop(keyword, None)
+        else:
+            # Everything on the page was new: there may be more behind it
+            self._grow[keyword] = min(page_size * 2, self.config.max_page)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {keyword: {"new_per_poll": round(rate, 2), "page_size": self.size(keyword)}
+                for keyword, rate in self._arrivals.items()}
@@ -0,0 +1,183 @@
+"""
+Shared eBay Browse API Call Budget
+
+ebay_poller (new-listing searches) and item_tracking (sold-status getItems
+checks) draw from the same daily Browse API quota. This token bucket is the
+single place both spend from:
+
+- The poller is the foreground consumer: spend() never blocks and may push
+  the bucket into debt, so new-listing latency is never traded for tracking.
+  Debt stops at -burst: calls past that are counted as overspent instead of
+  deepening the hole, so background callers are back within
+  (burst + reserve) / refill seconds once the poller slows down.
+  get_stats() reports how long the bucket has been in debt and the
+  overspend, which mean the poller is pacing above the quota.
+- Background callers acquire() and only get tokens while the bucket stays
+  above a reserve, so sold-status polling soaks up whatever quota the poller
+  is not using and backs off when the poller is busy.
+- background_share of the refill goes to a small separate bucket that only
+  background callers draw from. A poller pacing at or above the quota
+  (round-robin every 2s is ~0.5 calls/s against ~0.29/s of refill) keeps
+  the main bucket at -burst, but sold-status polling still gets its
+  guaranteed share - about 1.7 getItems calls (34 items) a minute at the
+  default quota.
+
+A 429 from eBay calls throttle(), which empties both buckets so background
+work pauses until the quota has refilled.
+"""
+
+import time
+import asyncio
+import logging
+import threading
+from typing import Any, Dict, Optional
+
+from config import EBAY_BUDGET
+
+logger = logging.getLogger(__name__)
+
+
+class EbayCallBudget:
+    """
+    Token bucket over the daily Browse API quota.
+
+    Usage:
+        ebay_budget.spend(1, "search")                       # foreground, never waits
+        if await ebay_budget.acquire(1, "get_items"):        # background, waits for headroom
+            ...
+    """
+
+    def __init__(self, config=None):
+        self._config = config or EBAY_BUDGET
+        rate = self._config.daily_calls / 86400.0  # tokens per second
+        share = min(max(self._config.background_share, 0.0), 1.0)
+        self.rate = rate * (1 - share)
+        self.capacity = float(self._config.burst)
+        self._tokens = self.capacity
+        # Background-only bucket: foreground spend() never touches it
+        self.background_rate = rate * share
+        self.background_capacity = float(self._config.background_burst)
+        self._background_tokens = self.background_capacity
+        self._updated = time.monotonic()
+        self._solvent_at = self._updated  # Last time the bucket was above zero
+        self._overspent = 0.0
+        self._lock = threading.Lock()
+        self._spent: Dict[str, int] = {}
+        self._waits = 0
+        self._wait_seconds = 0.0
+        self._timeouts = 0
+        self._throttles = 0
+
+    def _refill(self, now: float):
+        """Caller holds the lock."""
+        elapsed = now - self._updated
+        self._tokens = min(self.capacity, self._tokens + elapsed * self.rate)
+        self._background_tokens = min(self.background_capacity,
+                                      self._background_tokens + elapsed * self.background_rate)
+        self._updated = now
+        if self._tokens > 0:
+            self._solvent_at = now
+
+    def _count(self, consumer: str, n: int):
+        self._spent[consumer] = self._spent.get(consumer, 0) + n
+
+    def spend(self, n: int = 1, consumer: str = "poller"):
+        """Record foreground calls. Never waits; can drive the bucket down to -capacity."""
+        with self._lock:
+            self._refill(time.monotonic())
+            self._tokens -= n
+            if self._tokens < -self.capacity:
+                self._overspent += -self.capacity - self._tokens
+                self._tokens = -self.capacity
+            self._count(consumer, n)
+
+    def try_acquire(self, n: int = 1, consumer: str = "background", reserve: Optional[int] = None) -> float:
+        """
+        Take n tokens if that leaves `reserve` behind, else from the
+        background-only share. Returns 0 on success, else seconds to wait.
+        """
+        reserve = self._config.background_reserve if reserve is None else reserve
+        with self._lock:
+            self._refill(time.monotonic())
+            needed = n + reserve - self._tokens
+            if needed <= 0:
+                self._tokens -= n
+                self._count(consumer, n)
+                return 0.0
+            if self._background_tokens >= n:
+                self._background_tokens -= n
+                self._count(consumer, n)
+                return 0.0
+            waits = [needed / self.rate if self.rate > 0 else float("inf")]
+            if n <= self.background_capacity and self.background_rate > 0:
+                waits.append((n - self._background_tokens) / self.background_rate)
+            return min(waits)
+
+    async def acquire(self, n: int = 1, consumer: str = "background",
+                      timeout: Optional[float] = None, reserve: Optional[int] = None) -> bool:
+        """Wait (up to timeout) for n tokens above the reserve. Returns False on timeout."""
+        timeout = self._config.acquire_timeout if timeout is None else timeout
+        deadline = time.monotonic() + timeout
+        started = time.monotonic()
+        waited = False
+        while True:
+            wait = self.try_acquire(n, consumer, reserve)
+            if wait == 0:
+                if waited:
+                    with self._lock:
+                        self._waits += 1
+                        self._wait_seconds += time.monotonic() - started
+                return True
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                with self._lock:
+                    self._timeouts += 1
+                return False
+            waited = True
+            await asyncio.sleep(min(wait, remaining, 5.0))
+
+    def throttle(self, reason: str = "429"):
+        """eBay pushed back - empty both buckets so background callers pause."""
+        with self._lock:
+            self._refill(time.monotonic())
+            self._tokens = min(self._tokens, 0.0)
+            self._background_tokens = 0.0
+            self._throttles += 1
+        logger.warning(f"[EBAY BUDGET] Throttled ({reason}) - background calls paused until quota refills")
+
+    def headroom(self, reserve: Optional[int] = None) -> int:
+        """Whole calls a background caller could take right now without waiting (both buckets)"""
+        reserve = self._config.background_reserve if reserve is None else reserve
+        with self._lock:
+            self._refill(time.monotonic())
+            return max(int(self._tokens - reserve), 0) + int(self._background_tokens)
+
+    @property
+    def available(self) -> float:
+        with self._lock:
+            self._refill(time.monotonic())
+            return self._tokens
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            return {
+                "tokens": round(self._tokens, 1),
+                "in_debt_seconds": round(now - self._solvent_at, 1) if self._tokens <= 0 else 0.0,
+                "overspent": round(self._overspent, 1),
+                "capacity": self.capacity,
+                "refill_per_minute": round(self.rate * 60, 2),
+                "background_reserve": self._config.background_reserve,
+                "background_tokens": round(self._background_tokens, 1),
+                "background_refill_per_minute": round(self.background_rate * 60, 2),
+                "spent": dict(self._spent),
+                "background_waits": self._waits,
+                "background_wait_seconds": round(self._wait_seconds, 1),
+                "background_timeouts": self._timeouts,
+                "throttles": self._throttles,
+            }
+
+
+# Global budget instance (shared by ebay_poller and item_tracking)
+ebay_budget = EbayCallBudget()
@@ -13,7 +13,7 @@ import urllib.parse
 from typing import Optional
 from urllib.parse import unquote
 
-import httpx
+from .http_clients import http_clients
 
 logger = logging.getLogger(__name__)
 
@@ -64,7 +64,7 @@ async def lookup_ebay_item(title: str, price: float = None) -> Optional[str]:
         if http_client:
             response = await http_client.get(api_url, params=params, timeout=5.0)
         else:
-            async with httpx.AsyncClient(timeout=5.0) as client:
+            async with http_clients.session("ebay_api", timeout=5.0) as client:
                 response = await client.get(api_url, params=params)
 
         if response.status_code != 200:
@@ -136,6 +136,7 @@ async def lookup_ebay_item_by_seller(title: str, seller_name: str, price: float
     try:
         # Import ebay_poller functions lazily to avoid circular imports
         from ebay_poller import get_oauth_token, browse_api_available, BROWSE_API_URL
+        from services.ebay_oauth import ebay_tokens
 
         # Clean up seller name and title (remove URL encoding)
         clean_seller = unquote(seller_name.replace('+', ' ')).strip().lower()
@@ -210,7 +211,7 @@ async def lookup_ebay_item_by_seller(title: str, seller_name: str, price: float
                 }
 
                 try:
-                    async with httpx.AsyncClient(timeout=10.0) as client:
+                    async with http_clients.session("ebay_api", timeout=10.0) as client:
                         response = await client.get(BROWSE_API_URL, headers=headers, params=params)
 
                         if response.status_code == 200:
@@ -327,6 +328,8 @@ async def lookup_ebay_item_by_seller(title: str, seller_name: str, price: float
                                     except Exception as e2:
                                         logger.debug(f"[EBAY] Fallback search error: {e2}")
                         else:
+                            if response.status_code == 401:
+                                ebay_tokens.invalidate(token)
                             logger.warning(f"[EBAY] Browse API returned {response.status_code}")
 
                 except Exception as e:
@@ -352,7 +355,7 @@ async def lookup_ebay_item_by_seller(title: str, seller_name: str, price: float
             }
 
             try:
-                async with httpx.AsyncClient(timeout=5.0) as http_client:
+                async with http_clients.session("ebay_api", timeout=5.0) as http_client:
                     response = await http_client.get(api_url, params=store_params)
 
                 if response.status_code == 200:
@@ -391,7 +394,7 @@ async def lookup_ebay_item_by_seller(title: str, seller_name: str, price: float
             }
 
             try:
-                async with httpx.AsyncClient(timeout=5.0) as http_client:
+                async with http_clients.session("ebay_api", timeout=5.0) as http_client:
                     response = await http_client.get(api_url, params=params)
 
                 if response.status_code == 200:
@@ -0,0 +1,310 @@
+"""
+eBay OAuth Token Service - one application token for every eBay caller
+
+get_oauth_token() used to cache the Browse API token per process and mint
+a new one inline when it expired, so every two hours some search, item
+check or seller lookup waited on the OAuth round trip - once per process
+(main server, mini PC runner, KeepaTracker-side lookups). The token now
+comes from one manager per process that shares it through a small file:
+
+- get_token() returns the token held in memory; a request only waits on
+  OAuth when there is no usable token at all (cold start, failed refresh,
+  or right after a 401)
+- A background task refreshes refresh_ahead seconds before expiry. It
+  first re-reads the cache file and adopts a token another process already
+  refreshed; otherwise it takes an exclusive lock on <cache>.lock, reads
+  the file again and only then mints, so processes refreshing at the same
+  moment produce one token between them
+- The cache file (keyed by app id) is written atomically with owner-only
+  permissions; invalidate() drops a token the API rejected so the next
+  refresh mints instead of adopting it again
+
+Usage:
+    token = await ebay_tokens.get_token()
+    if response.status_code == 401:
+        ebay_tokens.invalidate(token)
+    ebay_tokens.get_stats()
+"""
+
+import os
+import json
+import time
+import base64
+import asyncio
+import hashlib
+import logging
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from config import EBAY_APP_ID, EBAY_CERT_ID, EBAY_OAUTH
+from services.http_clients import http_clients
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+logger = logging.getLogger(__name__)
+
+OAUTH_URL = "https://api.ebay.com/identity/v1/oauth2/token"
+OAUTH_SCOPE = "https://api.ebay.com/oauth/api_scope"
+LOCK_POLL_INTERVAL = 0.05
+
+
+class _FileLock:
+    """Exclusive lock on a file shared by every process (flock, or msvcrt on Windows)"""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._fd: Optional[int] = None
+
+    def acquire(self, timeout: float) -> bool:
+        """Blocking (run via asyncio.to_thread); False if not taken within timeout"""
+        fd = os.open(str(self.path), os.O_RDWR | os.O_CREAT, 0o600)
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                if fcntl:
+                    fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                else:
+                    os.lseek(fd, 0, os.SEEK_SET)
+                    msvcrt.locking(fd, msvcrt.LK_NBLCK, 1)
+                self._fd = fd
+                return True
+            except OSError:
+                if time.monotonic() >= deadline:
+                    os.close(fd)
+                    return False
+                time.sleep(LOCK_POLL_INTERVAL)
+
+    def release(self):
+        fd, self._fd = self._fd, None
+        if fd is None:
+            return
+        try:
+            if fcntl:
+                fcntl.flock(fd, fcntl.LOCK_UN)
+            else:
+                os.lseek(fd, 0, os.SEEK_SET)
+                msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+        finally:
+            os.close(fd)
+
+
+class EbayTokenManager:
+    """
+    Client-credentials token for the Browse API, refreshed in the background
+    and shared with other processes through config.cache_path.
+    """
+
+    def __init__(self, app_id: Optional[str] = None, cert_id: Optional[str] = None, config=None):
+        self.config = config or EBAY_OAUTH
+        self.app_id = app_id
+        self.cert_id = cert_id
+        self.cache_path = Path(self.config.cache_path)
+        self._file_lock = _FileLock(self.cache_path.with_name(self.cache_path.name + ".lock"))
+        self._cache_key = hashlib.sha256((app_id or "").encode()).hexdigest()[:16]
+        self._token: Optional[str] = None
+        self._expires_at = 0.0
+        self._rejected: Optional[str] = None  # Last token the API answered 401 for
+        self._refresh_lock: Optional[asyncio.Lock] = None
+        self._refresher: Optional[asyncio.Task] = None
+        self._kick: Optional[asyncio.Task] = None  # Refresh started by invalidate()
+        self._stats = {"minted": 0, "adopted": 0, "request_waits": 0, "failures": 0, "invalidated": 0}
+
+    @property
+    def configured(self) -> bool:
+        return bool(self.app_id and self.cert_id)
+
+    def _remaining(self, now: Optional[float] = None) -> float:
+        return self._expires_at - (time.time() if now is None else now)
+
+    # ----------------------------------------------------------
+    # Request path
+    # ----------------------------------------------------------
+
+    async def get_token(self) -> Optional[str]:
+        """Current token; only waits on a refresh when none is usable"""
+        if not self.configured:
+            logger.warning("[EBAY OAuth] Missing EBAY_APP_ID or EBAY_CERT_ID")
+            return None
+        self._ensure_refresher()
+        if self._token and self._remaining() > self.config.min_validity:
+            return self._token
+        self._stats["request_waits"] += 1
+        return await self._refresh(self.config.min_validity)
+
+    def invalidate(self, token: Optional[str] = None):
+        """The API rejected token (401): stop handing it out and refresh now"""
+        token = token or self._token
+        if not token or token == self._rejected:
+            return
+        self._rejected = token
+        self._stats["invalidated"] += 1
+        if token != self._token:
+            return  # Already replaced
+        self._token = None
+        self._expires_at = 0.0
+        logger.warning("[EBAY OAuth] Token rejected by the API, refreshing")
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        self._kick = loop.create_task(self._refresh(self.config.min_validity))
+
+    # ----------------------------------------------------------
+    # Refreshing
+    # ----------------------------------------------------------
+
+    async def start(self) -> bool:
+        """Fetch a token now and start the background refresher (app startup)"""
+        return await self.get_token() is not None
+
+    def _ensure_refresher(self):
+        if self._refresher is None or self._refresher.done():
+            self._refresher = asyncio.get_running_loop().create_task(self._refresh_loop())
+
+    async def _refresh_loop(self):
+        while True:
+            if self._token:
+                delay = self._remaining() - self.config.refresh_ahead
+            else:
+                delay = 0.0
+            if delay > 0:
+                await asyncio.sleep(delay)
+            try:
+                token = await self._refresh(self.config.refresh_ahead)
+            except Exception as e:
+                logger.error(f"[EBAY OAuth] Background refresh error: {e}")
+                token = None
+            if token is None or self._remaining() <= self.config.refresh_ahead:
+                await asyncio.sleep(self.config.retry_interval)
+
+    async def _refresh(self, needed: float) -> Optional[str]:
+        """
+        A token valid for at least `needed` more seconds: the one in memory,
+        one another process cached, or a newly minted one (single-flight
+        within the process, file-locked across processes).
+        """
+        if self._refresh_lock is None:
+            self._refresh_lock = asyncio.Lock()
+        async with self._refresh_lock:
+            if self._token and self._remaining() > needed:
+                return self._token
+            if self._adopt(await asyncio.to_thread(self._read_cache), needed):
+                return self._token
+            try:
+                locked = await asyncio.to_thread(self._file_lock.acquire, self.config.lock_timeout)
+            except OSError as e:
+                logger.warning(f"[EBAY OAuth] Could not open token cache lock: {e}")
+                locked = False
+            try:
+                if not locked:
+                    logger.warning("[EBAY OAuth] Token cache lock unavailable, minting without it")
+                elif self._adopt(await asyncio.to_thread(self._read_cache), needed):
+                    return self._token
+                token, expires_at = await self._mint()
+                if token is None:
+                    self._stats["failures"] += 1
+                    return self._token if self._token and self._remaining() > self.config.min_validity else None
+                self._token, self._expires_at = token, expires_at
+                self._stats["minted"] += 1
+                await asyncio.to_thread(self._write_cache, token, expires_at)
+                return token
+            finally:
+                if locked:
+                    await asyncio.to_thread(self._file_lock.release)
+
+    def _adopt(self, entry: Optional[Dict[str, Any]], needed: float) -> bool:
+        if not entry:
+            return False
+        token, expires_at = entry.get("access_token"), float(entry.get("expires_at", 0))
+        if not token or token == self._rejected or token == self._token:
+            return False
+        if expires_at - time.time() <= needed:
+            return False
+        self._token, self._expires_at = token, expires_at
+        self._stats["adopted"] += 1
+        logger.info(f"[EBAY OAuth] Using token refreshed by another process, expires in {self._remaining():.0f}s")
+        return True
+
+    async def _mint(self):
+        """(token, expires_at) from the client credentials grant, (None, 0) on failure"""
+        credentials = base64.b64encode(f"{self.app_id}:{self.cert_id}".encode()).decode()
+        headers = {
+            "Content-Type": "application/x-www-form-urlencoded",
+            "Authorization": f"Basic {credentials}",
+        }
+        data = {"grant_type": "client_credentials", "scope": OAUTH_SCOPE}
+        try:
+            async with http_clients.session("ebay_api", timeout=10.0) as client:
+                response = await client.post(OAUTH_URL, headers=headers, data=data)
+            if response.status_code != 200:
+                logger.error(f"[EBAY OAuth] Token request failed: {response.status_code} - {response.text[:200]}")
+                return None, 0.0
+            token_data = response.json()
+            access_token = token_data.get("access_token")
+            if not access_token:
+                logger.error("[EBAY OAuth] No access_token in response")
+                return None, 0.0
+            expires_in = token_data.get("expires_in", 7200)  # Default 2 hours
+            logger.info(f"[EBAY OAuth] Token acquired, expires in {expires_in}s")
+            return access_token, time.time() + expires_in
+        except Exception as e:
+            logger.error(f"[EBAY OAuth] Error getting token: {e}")
+            return None, 0.0
+
+    # ----------------------------------------------------------
+    # Cache file
+    # ----------------------------------------------------------
+
+    def _read_cache(self) -> Optional[Dict[str, Any]]:
+        try:
+            with open(self.cache_path) as f:
+                return json.load(f).get(self._cache_key)
+        except (OSError, ValueError, AttributeError):
+            return None
+
+    def _write_cache(self, token: str, expires_at: float):
+        """Replace this app id's entry (caller holds the file lock)"""
+        try:
+            with open(self.cache_path) as f:
+                entries = json.load(f)
+            if not isinstance(entries, dict):
+                entries = {}
+        except (OSError, ValueError):
+            entries = {}
+        entries[self._cache_key] = {"access_token": token, "expires_at": expires_at, "pid": os.getpid()}
+        tmp_path = self.cache_path.with_name(f"{self.cache_path.name}.{os.getpid()}.tmp")
+        try:
+            fd = os.open(str(tmp_path), os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+            with os.fdopen(fd, "w") as f:
+                json.dump(entries, f)
+            os.replace(tmp_path, self.cache_path)
+        except OSError as e:
+            logger.warning(f"[EBAY OAuth] Could not write token cache: {e}")
+
+    # ----------------------------------------------------------
+    # Stats
+    # ----------------------------------------------------------
+
+    async def stop(self):
+        if self._refresher:
+            self._refresher.cancel()
+            await asyncio.gather(self._refresher, return_exceptions=True)
+            self._refresher = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "configured": self.configured,
+            "has_token": bool(self._token),
+            "expires_in_s": round(self._remaining()) if self._token else None,
+            "refresher_running": bool(self._refresher and not self._refresher.done()),
+            "cache_path": str(self.cache_path),
+            **self._stats,
+        }
+
+
+# Global token manager instance
+ebay_tokens = EbayTokenManager(EBAY_APP_ID, EBAY_CERT_ID)
@@ -0,0 +1,245 @@
+"""
+Shared HTTP Client Pools
+
+One long-lived httpx.AsyncClient per upstream host group (eBay API, eBay
+images, Discord, Keepa, everything else) so TCP/TLS connections are reused
+across requests instead of being rebuilt by a throwaway client per call.
+
+HTTP/2 is enabled when the optional `h2` package is installed.
+
+Every pooled request carries an httpcore trace hook, so we can count how many
+requests actually opened a new connection / did a TLS handshake and report a
+connection reuse ratio per pool (see /api/http-stats).
+"""
+
+import asyncio
+import logging
+import threading
+import weakref
+import importlib.util
+from contextlib import asynccontextmanager
+from typing import Any, Dict, Optional
+
+import httpx
+
+from config import HTTP_POOLS, IMAGES
+
+logger = logging.getLogger(__name__)
+
+H2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+# Pool name -> hostnames routed to it by for_url()
+POOL_HOSTS = {
+    "ebay_api": ("api.ebay.com", "svcs.ebay.com", "open.api.ebay.com"),
+    "ebay_images": ("i.ebayimg.com", "thumbs.ebaystatic.com"),
+    "discord": ("discord.com", "discordapp.com"),
+    "keepa": ("api.keepa.com", "api.amazon.com", "sellingpartnerapi-na.amazon.com"),
+}
+
+
+class _PooledSession:
+    """
+    Borrowed view of a shared client with a per-call-site default timeout.
+
+    Mirrors the subset of httpx.AsyncClient that call sites use, so
+    `async with http_clients.session("discord", timeout=10.0) as client:`
+    is a drop-in for `async with httpx.AsyncClient(timeout=10.0) as client:`
+    without closing the shared pool on exit.
+    """
+
+    def __init__(self, client: httpx.AsyncClient, timeout: Optional[float] = None):
+        self._client = client
+        self._timeout = timeout
+
+    def _with_timeout(self, kwargs: Dict[str, Any]) -> Dict[str, Any]:
+        if self._timeout is not None and "timeout" not in kwargs:
+            kwargs["timeout"] = self._timeout
+        return kwargs
+
+    async def request(self, method: str, url, **kwargs) -> httpx.Response:
+        return await self._client.request(method, url, **self._with_timeout(kwargs))
+
+    async def get(self, url, **kwargs) -> httpx.Response:
+        return await self._client.get(url, **self._with_timeout(kwargs))
+
+    async def post(self, url, **kwargs) -> httpx.Response:
+        return await self._client.post(url, **self._with_timeout(kwargs))
+
+    async def put(self, url, **kwargs) -> httpx.Response:
+        return await self._client.put(url, **self._with_timeout(kwargs))
+
+    async def delete(self, url, **kwargs) -> httpx.Response:
+        return await self._client.delete(url, **self._with_timeout(kwargs))
+
+    def stream(self, method: str, url, **kwargs):
+        return self._client.stream(method, url, **self._with_timeout(kwargs))
+
+
+class HttpClientRegistry:
+    """
+    Named, lazily created httpx.AsyncClient pools.
+
+    Clients are bound to the event loop that created them (httpcore pools
+    can't be shared across loops), so a caller running its own loop - e.g.
+    a sync wrapper using asyncio.run() - transparently gets its own set.
+
+    Usage:
+        client = http_clients.get("ebay_images")
+        response = await client.get(url)
+
+        async with http_clients.session("ebay_api", timeout=15.0) as client:
+            response = await client.get(BROWSE_API_URL, headers=headers)
+    """
+
+    def __init__(self, config=None):
+        self._config = config or HTTP_POOLS
+        self._clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, httpx.AsyncClient]]" = (
+            weakref.WeakKeyDictionary()
+        )
+        self._stats: Dict[str, Dict[str, int]] = {}
+        self._lock = threading.Lock()
+
+    # ----------------------------------------------------------
+    # Pool construction
+    # ----------------------------------------------------------
+
+    def _pool_options(self, name: str) -> Dict[str, Any]:
+        cfg = self._config
+        options: Dict[str, Any] = {"timeout": cfg.default_timeout}
+        if name == "ebay_api":
+            max_connections = cfg.ebay_api_connections
+        elif name == "ebay_images":
+            max_connections = cfg.ebay_images_connections
+            options["timeout"] = IMAGES.timeout
+            options["headers"] = {"User-Agent": IMAGES.user_agent}
+            options["follow_redirects"] = True
+        elif name == "discord":
+            max_connections = cfg.discord_connections
+        elif name == "keepa":
+            max_connections = cfg.keepa_connections
+        else:
+            max_connections = cfg.default_connections
+        options["limits"] = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_connections,
+            keepalive_expiry=cfg.keepalive_expiry,
+        )
+        return options
+
+    def _counters(self, name: str) -> Dict[str, int]:
+        with self._lock:
+            counters = self._stats.get(name)
+            if counters is None:
+                counters = {
+                    "requests": 0,
+                    "connections_opened": 0,
+                    "tls_handshakes": 0,
+                    "http2_responses": 0,
+                    "clients_created": 0,
+                }
+                self._stats[name] = counters
+            return counters
+
+    def _create(self, name: str) -> httpx.AsyncClient:
+        counters = self._counters(name)
+
+        async def trace(event_name: str, info: Dict[str, Any]):
+            if event_name == "connection.connect_tcp.complete":
+                counters["connections_opened"] += 1
+            elif event_name == "connection.start_tls.complete":
+                counters["tls_handshakes"] += 1
+
+        async def on_request(request: httpx.Request):
+            counters["requests"] += 1
+            request.extensions["trace"] = trace
+
+        async def on_response(response: httpx.Response):
+            if response.http_version == "HTTP/2":
+                counters["http2_responses"] += 1
+
+        client = httpx.AsyncClient(
+            http2=self._config.http2 and H2_AVAILABLE,
+            event_hooks={"request": [on_request], "response": [on_response]},
+            **self._pool_options(name),
+        )
+        counters["clients_created"] += 1
+        logger.debug(f"[HTTP] Created '{name}' client pool (http2={self._config.http2 and H2_AVAILABLE})")
+        return client
+
+    # ----------------------------------------------------------
+    # Public API
+    # ----------------------------------------------------------
+
+    def get(self, name: str = "default") -> httpx.AsyncClient:
+        """Return the shared client for a pool, creating it on first use."""
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            loop = asyncio.get_event_loop()
+        with self._lock:
+            clients = self._clients.get(loop)
+            if clients is None:
+                clients = {}
+                self._clients[loop] = clients
+            client = clients.get(name)
+        if client is None or client.is_closed:
+            client = self._create(name)
+            with self._lock:
+                clients[name] = client
+        return client
+
+    def for_url(self, url: str) -> httpx.AsyncClient:
+        """Return the shared client whose host group matches the URL."""
+        host = httpx.URL(url).host
+        for name, hosts in POOL_HOSTS.items():
+            if host in hosts:
+                return self.get(name)
+        return self.get("default")
+
+    @asynccontextmanager
+    async def session(self, name: str = "default", timeout: Optional[float] = None):
+        """Borrow a pooled client for a block; the pool stays open afterwards."""
+        yield _PooledSession(self.get(name), timeout)
+
+    async def aclose(self):
+        """Close every pool owned by the running loop (call from lifespan shutdown)."""
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            clients = self._clients.pop(loop, {})
+        for name, client in clients.items():
+            try:
+                await client.aclose()
+            except Exception as e:
+                logger.debug(f"[HTTP] Error closing '{name}' pool: {e}")
+        if clients:
+            logger.info(f"[HTTP] Closed {len(clients)} client pools")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Per-pool request/connection counters and reuse ratio"""
+        with self._lock:
+            snapshot = {name: dict(counters) for name, counters in self._stats.items()}
+        totals = {"requests": 0, "connections_opened": 0, "tls_handshakes": 0}
+        pools = {}
+        for name, counters in snapshot.items():
+            requests = counters["requests"]
+            opened = counters["connections_opened"]
+            counters["reused_requests"] = max(requests - opened, 0)
+            counters["reuse_ratio"] = round(counters["reused_requests"] / requests, 3) if requests else None
+            pools[name] = counters
+            for key in totals:
+                totals[key] += counters[key]
+        total_requests = totals["requests"]
+        totals["reuse_ratio"] = (
+            round(max(total_requests - totals["connections_opened"], 0) / total_requests, 3)
+            if total_requests else None
+        )
+        return {
+            "http2_available": H2_AVAILABLE,
+            "http2_enabled": self._config.http2 and H2_AVAILABLE,
+            "pools": pools,
+            "totals": totals,
+        }
+
+
+# Global registry instance
+http_clients = HttpClientRegistry()
@@ -10,9 +10,9 @@ This data is valuable for:
 - Improving buying decisions based on historical velocity
 """
 
+import os
 import sqlite3
 import asyncio
-import aiohttp
 import hashlib
 import logging
 import time
@@ -22,10 +22,20 @@ from pathlib import Path
 from typing import Dict, Any, Optional, List, Tuple
 from dataclasses import dataclass, asdict
 
+from config import EBAY_BUDGET, SOLD_SCHEDULE
+from services.http_clients import http_clients
+from services.ebay_budget import ebay_budget
+from services.ebay_oauth import ebay_tokens
+from services.sold_scheduler import sold_scheduler
+from services.tracking_store import TrackingStore
+
 logger = logging.getLogger(__name__)
 
 # Database path
-DB_PATH = Path(__file__).parent.parent / "item_tracking.db"
+DB_PATH = Path(os.getenv("ITEM_TRACKING_DB", str(Path(__file__).parent.parent / "item_tracking.db")))
+
+# Long-lived per-thread connections (and the async facade: await store.run(fn, ...))
+store = TrackingStore(DB_PATH)
 
 # eBay API config (will be set from main.py)
 _ebay_app_id: Optional[str] = None
@@ -53,9 +63,10 @@ class TrackedItem:
     status: str = "active"  # active, sold, ended, error
 
 
+@store.transactional
 def init_database():
     """Initialize the SQLite database for item tracking"""
-    conn = sqlite3.connect(DB_PATH)
+    conn = store.connection()
     cursor = conn.cursor()
 
     cursor.execute("""
@@ -206,7 +217,6 @@ def init_database():
     """)
 
     conn.commit()
-    conn.close()
     logger.info(f"[TRACKING] Database initialized at {DB_PATH}")
 
 
@@ -245,7 +255,22 @@ def _parse_price_value(price_value) -> float:
     return 0.0
 
 
-def track_item(
+_INSERT_TRACKED_ITEM = """
+    INSERT INTO tracked_items
+    (item_id, title, price, category, alias, seller_name, posted_time, first_seen, recommendation, original_data_json)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+
+def _tracking_id(item_id: str, title: str, price: float) -> str:
+    """item_id, or a title+price hash when the ID couldn't be extracted (GAP FIX #4)"""
+    if item_id:
+        return item_id
+    tracking_key = f"{title}|{price}"
+    return "hash_" + hashlib.md5(tracking_key.encode()).hexdigest()[:12]
+
+
+def _tracked_item_row(
     item_id: str,
     title: str,
     price: float,
@@ -255,19 +280,13 @@ def track_item(
     posted_time: str = "",
     recommendation: str = "",
     original_data: Dict[str, Any] = None
-) -> bool:
-    """
-    Track a new item. Returns True if item was newly added, False if already existed.
-    GAP FIX #4: Generates hash-based ID if item_id extraction failed.
-
-    Now also stores original_data_json for learning from missed opportunities.
-    """
+) -> tuple:
+    """Values for _INSERT_TRACKED_ITEM (item_id first, original_data_json last)"""
     import json as json_lib
 
     # GAP FIX: Generate hash-based ID if item_id is missing
     if not item_id:
-        tracking_key = f"{title}|{price}"
-        item_id = "hash_" + hashlib.md5(tracking_key.encode()).hexdigest()[:12]
+        item_id = _tracking_id(item_id, title, price)
         logger.debug(f"[TRACKING] Generated hash-based ID: {item_id}")
 
     # Ensure price is a float
@@ -285,7 +304,33 @@ def track_item(
         except Exception as e:
             logger.debug(f"[TRACKING] Could not serialize original_data: {e}")
 
-    conn = sqlite3.connect(DB_PATH)
+    return (item_id, title, price_float, category, alias, seller_name, posted_time,
+            datetime.now().isoformat(), recommendation, original_data_json)
+
+
+@store.transactional
+def track_item(
+    item_id: str,
+    title: str,
+    price: float,
+    category: str = "",
+    alias: str = "",
+    seller_name: str = "",
+    posted_time: str = "",
+    recommendation: str = "",
+    original_data: Dict[str, Any] = None
+) -> bool:
+    """
+    Track a new item. Returns True if item was newly added, False if already existed.
+    GAP FIX #4: Generates hash-based ID if item_id extraction failed.
+
+    Now also stores original_data_json for learning from missed opportunities.
+    """
+    row = _tracked_item_row(item_id, title, price, category, alias, seller_name,
+                            posted_time, recommendation, original_data)
+    item_id, original_data_json = row[0], row[-1]
+
+    conn = store.connection()
     cursor = conn.cursor()
 
     # Check if item already exists
@@ -309,24 +354,96 @@ def track_item(
                 params
             )
             conn.commit()
-        conn.close()
         return False
 
     # Insert new item with original_data_json
-    now = datetime.now().isoformat()
-    cursor.execute("""
-        INSERT INTO tracked_items
-        (item_id, title, price, category, alias, seller_name, posted_time, first_seen, recommendation, original_data_json)
-        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-    """, (item_id, title, price_float, category, alias, seller_name, posted_time, now, recommendation, original_data_json))
+    cursor.execute(_INSERT_TRACKED_ITEM, row)
 
     conn.commit()
-    conn.close()
 
     logger.info(f"[TRACKING] New item tracked: {item_id} - {title[:50]} (data: {'YES' if original_data_json else 'NO'})")
     return True
 
 
+def track_items_many(items: List[Dict[str, Any]]) -> List[str]:
+    """
+    Bulk track_item for pollers: each dict takes track_item's keyword
+    arguments. New items are inserted and existing ones get the same
+    recommendation / original_data updates track_item applies, all in one
+    transaction. An item_id repeated in the batch is handled like repeated
+    track_item calls. Returns the item_ids that were newly added.
+    """
+    rows: Dict[str, tuple] = {}
+    repeats: List[tuple] = []  # later rows for an item_id already in this batch
+    for item in items:
+        row = _tracked_item_row(**item)
+        if row[0] in rows:
+            repeats.append(row)
+        else:
+            rows[row[0]] = row
+    if not rows:
+        return []
+
+    with store.transaction() as conn:
+        existing = set()
+        ids = list(rows)
+        for start in range(0, len(ids), 500):
+            chunk = ids[start:start + 500]
+            existing.update(r[0] for r in conn.execute(
+                f"SELECT item_id FROM tracked_items WHERE item_id IN ({','.join('?' * len(chunk))})", chunk))
+        new_ids = [item_id for item_id in ids if item_id not in existing]
+        conn.executemany(_INSERT_TRACKED_ITEM, [rows[item_id] for item_id in new_ids])
+        conn.executemany("""
+            UPDATE tracked_items
+            SET recommendation = COALESCE(NULLIF(?, ''), recommendation),
+                original_data_json = COALESCE(original_data_json, ?)
+            WHERE item_id = ?
+        """, [(row[8] or None, row[9], row[0])
+              for row in [rows[item_id] for item_id in ids if item_id in existing] + repeats])
+
+    if new_ids:
+        logger.info(f"[TRACKING] Bulk tracked {len(new_ids)} new items ({len(existing)} already tracked)")
+    return new_ids
+
+
+# Async track requests arriving within TRACK_BATCH_DELAY of each other are
+# written by one track_items_many call (one transaction on the store's threads)
+TRACK_BATCH_DELAY = 0.05
+_track_queue: List[Tuple[Dict[str, Any], asyncio.Future]] = []
+_track_flush: Optional[asyncio.Task] = None
+
+
+async def _flush_track_queue():
+    while _track_queue:
+        await asyncio.sleep(TRACK_BATCH_DELAY)
+        batch = list(_track_queue)
+        _track_queue.clear()
+        try:
+            new_ids = set(await store.run(track_items_many, [item for item, _ in batch]))
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            continue
+        for item, future in batch:
+            item_id = _tracking_id(item.get("item_id"), item["title"], item["price"])
+            is_new = item_id in new_ids
+            new_ids.discard(item_id)  # a repeat later in the batch was already tracked
+            if not future.done():
+                future.set_result(is_new)
+
+
+async def track_item_batched(**item) -> bool:
+    """track_item from the event loop, batched with other calls into track_items_many"""
+    global _track_flush
+    loop = asyncio.get_running_loop()
+    future = loop.create_future()
+    _track_queue.append((item, future))
+    if _track_flush is None or _track_flush.done():
+        _track_flush = loop.create_task(_flush_track_queue())
+    return await future
+
+
 async def track_item_with_resolution(
     item_id: str,
     title: str,
@@ -349,8 +466,12 @@ async def track_item_with_resolution(
     - 60 seconds: Second attempt
     - 120 seconds: Third attempt
     """
-    # First, track the item synchronously (now with original_data for learning)
-    is_new = track_item(item_id, title, price, category, alias, seller_name, posted_time, recommendation, original_data)
+    # First, track the item (batched onto the store's threads - now with original_data for learning)
+    is_new = await track_item_batched(
+        item_id=item_id, title=title, price=price, category=category, alias=alias,
+        seller_name=seller_name, posted_time=posted_time, recommendation=recommendation,
+        original_data=original_data,
+    )
 
     if not is_new:
         return False  # Already tracked
@@ -383,13 +504,7 @@ async def _delayed_resolution(item_id: str, title: str, price: float, seller_nam
         await asyncio.sleep(delay)
 
         # Check if already resolved (another process might have done it)
-        conn = sqlite3.connect(DB_PATH)
-        cursor = conn.cursor()
-        cursor.execute("SELECT ebay_item_id FROM tracked_items WHERE item_id = ?", (item_id,))
-        row = cursor.fetchone()
-        conn.close()
-
-        if row and row[0]:
+        if await store.run(get_ebay_item_id, item_id):
             logger.debug(f"[TRACKING] Already resolved: {item_id}")
             return  # Already resolved, stop trying
 
@@ -399,7 +514,7 @@ async def _delayed_resolution(item_id: str, title: str, price: float, seller_nam
             ebay_id = await resolve_ebay_item_id(clean_title, clean_seller, price_float)
 
             if ebay_id:
-                update_ebay_item_id(item_id, ebay_id)
+                await store.run(update_ebay_item_id, item_id, ebay_id)
                 logger.info(f"[TRACKING] DELAYED resolution SUCCESS after {delay}s: {item_id} -> {ebay_id}")
                 return  # Success, stop trying
         except Exception as e:
@@ -408,21 +523,31 @@ async def _delayed_resolution(item_id: str, title: str, price: float, seller_nam
     logger.debug(f"[TRACKING] All resolution attempts failed for: {clean_title[:40]}")
 
 
+@store.transactional
+def get_ebay_item_id(tracking_id: str) -> Optional[str]:
+    """Resolved eBay item ID for a tracked item, if any"""
+    row = store.connection().execute(
+        "SELECT ebay_item_id FROM tracked_items WHERE item_id = ?", (tracking_id,)
+    ).fetchone()
+    return row[0] if row and row[0] else None
+
+
+@store.transactional
 def update_item_recommendation(item_id: str, recommendation: str):
     """Update the recommendation for a tracked item"""
     if not item_id:
         return
 
-    conn = sqlite3.connect(DB_PATH)
+    conn = store.connection()
     cursor = conn.cursor()
     cursor.execute(
         "UPDATE tracked_items SET recommendation = ? WHERE item_id = ?",
         (recommendation, item_id)
     )
     conn.commit()
-    conn.close()
 
 
+@store.transactional
 def store_analysis_result(item_id: str, result: Dict[str, Any], data: Dict[str, Any] = None):
     """
     Store the full analysis result for a tracked item.
@@ -433,7 +558,7 @@ def store_analysis_result(item_id: str, result: Dict[str, Any], data: Dict[str,
     if not item_id:
         return
 
-    conn = sqlite3.connect(DB_PATH)
+    conn = store.connection()
     cursor = conn.cursor()
 
     try:
@@ -450,10 +575,9 @@ def store_analysis_result(item_id: str, result: Dict[str, Any], data: Dict[str,
         logger.debug(f"[TRACKING] Stored analysis result for {item_id}")
     except Exception as e:
         logger.warning(f"[TRACKING] Error storing analysis result: {e}")
-    finally:
-        conn.close()
 
 
+@store.transactional
 def log_missed_opportunity(
     ebay_item_id: str,
     title: str,
@@ -466,13 +590,12 @@ def log_missed_opportunity(
     Manually log a missed opportunity (item we passed on that sold quickly).
     This helps train our agents to catch similar items in the future.
     """
-    conn = sqlite3.connect(DB_PATH)
+    conn = store.connection()
     cursor = conn.cursor()
 
     # Check if already exists
     cursor.execute("SELECT item_id FROM tracked_items WHERE ebay_item_id = ?", (ebay_item_id,))
     if cursor.fetchone():
-        conn.close()
         logger.info(f"[TRACKING] Item {ebay_item_id} already tracked")
         return False
 
@@ -488,12 +611,12 @@ def log_missed_opportunity(
           now, now, 0.0))
 
     conn.commit()
-    conn.close()
 
     logger.warning(f"[TRACKING] MISSED OPPORTUNITY logged: {title[:50]} @ ${price}")
     return True
 
 
+@store.transactional
 def log_pattern(
     pattern_type: str,  # BUY, PASS, RESEARCH
     category: str,
@@ -519,7 +642,7 @@ def log_pattern(
     if data is None:
         data = {}
 
-    conn = sqlite3.connect(DB_PATH)
+    conn = store.connection()
     cursor = conn.cursor()
 
     # Extract features from result
@@ -603,12 +726,12 @@ def log_pattern(
     ))
 
     conn.commit()
-    conn.close()
 
     logger.info(f"[PATTERN] Logged {pattern_type} pattern: {category} - {title[:40]}... @ ${price}")
     return True
 
 
+@store.transactional
 def update_seller_signal(
     seller_name: str,
     category: str = "",
@@ -630,7 +753,7 @@ def update_seller_signal(
     if not seller_name:
         return
 
-    conn = sqlite3.connect(DB_PATH)
+    conn = store.connection()
     cursor = conn.cursor()
 
     now = datetime.now().isoformat()
@@ -720,31 +843,27 @@ def update_seller_signal(
         ))
 
     conn.commit()
-    conn.close()
     logger.debug(f"[SELLER] Updated signal for: {seller_name}")
 
 
+@store.transactional
 def get_seller_signal(seller_name: str) -> Optional[Dict]:
     """Get seller signal data if exists."""
     if not seller_name:
         return None
 
-    conn = sqlite3.connect(DB_PATH)
-    conn.row_factory = sqlite3.Row
-    cursor = conn.cursor()
+    cursor = store.row_cursor()
 
     cursor.execute("SELECT * FROM seller_signals WHERE seller_name = ?", (seller_name,))
     row = cursor.fetchone()
-    conn.close()
 
     return dict(row) if row else None
 
 
+@store.transactional
 def get_hot_sellers(min_fast_sales: int = 2) -> List[Dict]:
     """Get sellers with multiple fast sales - potential collection dumpers."""
-    conn = sqlite3.connect(DB_PATH)
-    conn.row_factory = sqlite3.Row
-    cursor = conn.cursor()
+    cursor = store.row_cursor()
 
     cursor.execute("""
         SELECT * FROM seller_signals
@@ -754,16 +873,14 @@ def get_hot_sellers(min_fast_sales: int = 2) -> List[Dict]:
     """, (min_fast_sales,))
 
     rows = cursor.fetchall()
-    conn.close()
 
     return [dict(row) for row in rows]
 
 
+@store.transactional
 def get_patterns_by_category(category: str, limit: int = 50) -> List[Dict]:
     """Get recent patterns for a category to analyze trends."""
-    conn = sqlite3.connect(DB_PATH)
-    conn.row_factory = sqlite3.Row
-    cursor = conn.cursor()
+    cursor = store.row_cursor()
 
     cursor.execute("""
         SELECT * FROM learning_patterns
@@ -773,14 +890,14 @@ def get_patterns_by_category(category: str, limit: int = 50) -> List[Dict]:
     """, (category, limit))
 
     rows = cursor.fetchall()
-    conn.close()
 
     return [dict(row) for row in rows]
 
 
+@store.transactional
 def get_pattern_stats() -> Dict[str, Any]:
     """Get statistics about logged patterns."""
-    conn = sqlite3.connect(DB_PATH)
+    conn = store.connection()
     cursor = conn.cursor()
 
     stats = {}
@@ -815,7 +932,6 @@ def get_pattern_stats() -> Dict[str, Any]:
     """)
     stats['last_24h'] = cursor.fetchone()[0]
 
-    conn.close()
     return stats
 
 
@@ -828,11 +944,21 @@ def mark_item_sold(item_id: str, sold_time: Optional[str] = None) -> Optional[fl
     - Complete AI analysis (melt value, weight, profit, reasoning)
     - Original request data (title, description, seller info, etc.)
     """
-    import json as json_lib
+    with store.transaction() as conn:
+        sale = _mark_sold_in_transaction(conn.cursor(), item_id, sold_time)
+
+    if sale is None:
+        return None
+    _log_item_sold(item_id, sale)
+    return sale["time_to_sell"]
 
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
 
+def _mark_sold_in_transaction(cursor, item_id: str, sold_time: Optional[str] = None) -> Optional[Dict[str, Any]]:
+    """
+    UPDATE half of mark_item_sold - runs on the caller's cursor so a whole
+    polling cycle can commit at once. Returns the sale (row data + timing)
+    for _log_item_sold, or None if the item isn't tracked.
+    """
     # Get ALL item data including stored analysis result
     cursor.execute("""
         SELECT posted_time, first_seen, title, price, category, recommendation,
@@ -842,7 +968,6 @@ def mark_item_sold(item_id: str, sold_time: Optional[str] = None) -> Optional[fl
     row = cursor.fetchone()
 
     if not row:
-        conn.close()
         return None
 
     (posted_time_str, first_seen_str, title, price, category, recommendation,
@@ -872,10 +997,34 @@ def mark_item_sold(item_id: str, sold_time: Optional[str] = None) -> Optional[fl
         WHERE item_id = ?
     """, (sold_time_dt.isoformat(), time_to_sell, is_fast_sale, item_id))
 
-    conn.commit()
-    conn.close()
+    return {
+        "time_to_sell": time_to_sell,
+        "is_fast_sale": is_fast_sale,
+        "sold_time_dt": sold_time_dt,
+        "posted_time_str": posted_time_str,
+        "title": title,
+        "price": price,
+        "category": category,
+        "recommendation": recommendation,
+        "seller_name": seller_name,
+        "alias": alias,
+        "analysis_result_json": analysis_result_json,
+        "original_data_json": original_data_json,
+    }
+
 
-    if is_fast_sale:
+def _log_item_sold(item_id: str, sale: Dict[str, Any]):
+    """Post-commit half of mark_item_sold: fast-sale logging, MISSED patterns, seller signals"""
+    import json as json_lib
+
+    time_to_sell = sale["time_to_sell"]
+    sold_time_dt = sale["sold_time_dt"]
+    posted_time_str = sale["posted_time_str"]
+    title, price, category = sale["title"], sale["price"], sale["category"]
+    recommendation, seller_name, alias = sale["recommendation"], sale["seller_name"], sale["alias"]
+    analysis_result_json, original_data_json = sale["analysis_result_json"], sale["original_data_json"]
+
+    if sale["is_fast_sale"]:
         logger.warning(f"[TRACKING] FAST SALE! Item {item_id} sold in {time_to_sell:.1f} minutes")
 
         # If we passed on this item and it sold fast, log as MISSED opportunity
@@ -980,14 +1129,11 @@ def mark_item_sold(item_id: str, sold_time: Optional[str] = None) -> Optional[fl
     else:
         logger.info(f"[TRACKING] Item {item_id} sold in {time_to_sell:.1f} minutes")
 
-    return time_to_sell
-
 
+@store.transactional
 def get_active_items(limit: int = 100, max_age_hours: int = 24) -> List[Dict]:
     """Get active items that need to be checked for sold status"""
-    conn = sqlite3.connect(DB_PATH)
-    conn.row_factory = sqlite3.Row
-    cursor = conn.cursor()
+    cursor = store.row_cursor()
 
     # Get items that are still active and were seen within max_age_hours
     cutoff = (datetime.now() - timedelta(hours=max_age_hours)).isoformat()
@@ -1000,16 +1146,14 @@ def get_active_items(limit: int = 100, max_age_hours: int = 24) -> List[Dict]:
     """, (cutoff, limit))
 
     items = [dict(row) for row in cursor.fetchall()]
-    conn.close()
 
     return items
 
 
+@store.transactional
 def get_fast_sales(limit: int = 100) -> List[Dict]:
     """Get items that sold within 5 minutes"""
-    conn = sqlite3.connect(DB_PATH)
-    conn.row_factory = sqlite3.Row
-    cursor = conn.cursor()
+    cursor = store.row_cursor()
 
     cursor.execute("""
         SELECT * FROM tracked_items
@@ -1019,14 +1163,14 @@ def get_fast_sales(limit: int = 100) -> List[Dict]:
     """, (limit,))
 
     items = [dict(row) for row in cursor.fetchall()]
-    conn.close()
 
     return items
 
 
+@store.transactional
 def get_tracking_stats() -> Dict[str, Any]:
     """Get overall tracking statistics"""
-    conn = sqlite3.connect(DB_PATH)
+    conn = store.connection()
     cursor = conn.cursor()
 
     stats = {}
@@ -1099,23 +1243,63 @@ def get_tracking_stats() -> Dict[str, Any]:
         for row in cursor.fetchall()
     ]
 
-    conn.close()
     return stats
 
 
-def update_item_check(item_id: str, status: str = "active"):
-    """Update item's check count and last_checked timestamp"""
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-
-    cursor.execute("""
+def _update_checks(cursor, checks: List[Tuple[str, str]], now: Optional[str] = None):
+    """check_count/last_checked/status bump for (item_id, status) pairs on the caller's cursor"""
+    now = now or datetime.now().isoformat()
+    cursor.executemany("""
         UPDATE tracked_items
         SET check_count = check_count + 1, last_checked = ?, status = ?
         WHERE item_id = ?
-    """, (datetime.now().isoformat(), status, item_id))
+    """, [(now, status, item_id) for item_id, status in checks])
+
+
+def update_item_check(item_id: str, status: str = "active"):
+    """Update item's check count and last_checked timestamp"""
+    update_checks_many([(item_id, status)])
 
-    conn.commit()
-    conn.close()
+
+def update_checks_many(checks: List[Tuple[str, str]]):
+    """Bulk update_item_check: (item_id, status) pairs in one transaction"""
+    if not checks:
+        return
+    with store.transaction() as conn:
+        _update_checks(conn.cursor(), checks)
+
+
+def apply_status_updates(statuses: Dict[str, str]) -> Dict[str, float]:
+    """
+    Write one polling cycle's results (tracking item_id -> status) in a
+    single transaction: sold items get mark_item_sold's UPDATE, everything
+    else a check_count/last_checked bump. Fast-sale/MISSED logging runs
+    after the commit.
+
+    Returns tracking item_id -> time_to_sell_minutes for the sold items.
+    """
+    if not statuses:
+        return {}
+
+    now = datetime.now().isoformat()
+    sales: Dict[str, Dict[str, Any]] = {}
+
+    with store.transaction() as conn:
+        cursor = conn.cursor()
+        _update_checks(cursor, [(item_id, status) for item_id, status in statuses.items() if status != "sold"], now)
+        for item_id, status in statuses.items():
+            if status == "sold":
+                sale = _mark_sold_in_transaction(cursor, item_id)
+                if sale:
+                    sales[item_id] = sale
+
+    for item_id, sale in sales.items():
+        try:
+            _log_item_sold(item_id, sale)
+        except Exception as e:
+            logger.warning(f"[TRACKING] Error logging sale of {item_id}: {e}")
+
+    return {item_id: sale["time_to_sell"] for item_id, sale in sales.items()}
 
 
 # ============================================================
@@ -1176,9 +1360,10 @@ async def resolve_ebay_item_id(title: str, seller_name: str, price: float) -> Op
         return None
 
 
+@store.transactional
 def update_ebay_item_id(tracking_id: str, ebay_item_id: str):
     """Update a tracked item with its resolved eBay item ID"""
-    conn = sqlite3.connect(DB_PATH)
+    conn = store.connection()
     cursor = conn.cursor()
 
     cursor.execute(
@@ -1187,10 +1372,10 @@ def update_ebay_item_id(tracking_id: str, ebay_item_id: str):
     )
 
     conn.commit()
-    conn.close()
     logger.info(f"[TRACKING] Updated item {tracking_id} with eBay ID: {ebay_item_id}")
 
 
+@store.transactional
 def get_items_without_ebay_id(limit: int = 20, max_age_minutes: int = 30) -> List[Dict]:
     """
     Get tracked items that need eBay ID resolution.
@@ -1199,9 +1384,7 @@ def get_items_without_ebay_id(limit: int = 20, max_age_minutes: int = 30) -> Lis
     Items older than 30 min aren't fast-sale candidates anyway,
     so no point resolving their IDs.
     """
-    conn = sqlite3.connect(DB_PATH)
-    conn.row_factory = sqlite3.Row
-    cursor = conn.cursor()
+    cursor = store.row_cursor()
 
     cutoff = (datetime.now() - timedelta(minutes=max_age_minutes)).isoformat()
 
@@ -1217,20 +1400,18 @@ def get_items_without_ebay_id(limit: int = 20, max_age_minutes: int = 30) -> Lis
     """, (cutoff, limit))
 
     items = [dict(row) for row in cursor.fetchall()]
-    conn.close()
 
     return items
 
 
+@store.transactional
 def get_error_items_for_retry(limit: int = 10, max_age_hours: int = 2) -> List[Dict]:
     """
     GAP FIX #2: Get items with 'error' status for retry.
     Only returns items that had errors within max_age_hours (default 2 hours).
     Older error items are likely permanently unavailable.
     """
-    conn = sqlite3.connect(DB_PATH)
-    conn.row_factory = sqlite3.Row
-    cursor = conn.cursor()
+    cursor = store.row_cursor()
 
     cutoff = (datetime.now() - timedelta(hours=max_age_hours)).isoformat()
 
@@ -1244,7 +1425,6 @@ def get_error_items_for_retry(limit: int = 10, max_age_hours: int = 2) -> List[D
     """, (cutoff, limit))
 
     items = [dict(row) for row in cursor.fetchall()]
-    conn.close()
 
     logger.debug(f"[TRACKING] Found {len(items)} error items for retry")
     return items
@@ -1255,7 +1435,7 @@ async def resolve_pending_items(batch_size: int = 10):
     Background task to resolve eBay item IDs for tracked items.
     Should be called periodically to fill in missing IDs.
     """
-    items = get_items_without_ebay_id(limit=batch_size)
+    items = await store.run(get_items_without_ebay_id, limit=batch_size)
 
     if not items:
         logger.debug("[TRACKING] No items pending eBay ID resolution")
@@ -1291,7 +1471,7 @@ async def resolve_pending_items(batch_size: int = 10):
                 logger.debug(f"[TRACKING] Title-only lookup failed: {e}")
 
         if ebay_id:
-            update_ebay_item_id(tracking_id, ebay_id)
+            await store.run(update_ebay_item_id, tracking_id, ebay_id)
             resolved_count += 1
 
         # Small delay between API calls
@@ -1315,7 +1495,7 @@ def configure_ebay(app_id: str = None, get_token_func: callable = None):
     logger.info("[TRACKING] eBay API configured for item status polling")
 
 
-async def check_items_batch_ebay(item_ids: List[str], session: aiohttp.ClientSession) -> Dict[str, str]:
+async def check_items_batch_ebay(item_ids: List[str], session=None) -> Dict[str, str]:
     """
     Check multiple items at once using Browse API getItems (up to 20 per call).
     Returns dict mapping item_id -> status ('active', 'sold', 'error')
@@ -1345,49 +1525,54 @@ async def check_items_batch_ebay(item_ids: List[str], session: aiohttp.ClientSes
             "X-EBAY-C-MARKETPLACE-ID": "EBAY_US",
         }
 
-        async with session.get(url, headers=headers, timeout=15) as resp:
-            if resp.status == 200:
-                data = await resp.json()
-                items = data.get("items", [])
-
-                # Process returned items
-                for item in items:
-                    item_id_full = item.get("itemId", "")
-                    # Extract numeric ID from v1|123456|0 format
-                    parts = item_id_full.split("|")
-                    item_id = parts[1] if len(parts) >= 2 else item_id_full
-
-                    # Check if sold
-                    if item.get("itemEndDate"):
+        client = session or http_clients.get("ebay_api")
+        resp = await client.get(url, headers=headers, timeout=15)
+        if resp.status_code == 200:
+            data = resp.json()
+            items = data.get("items", [])
+
+            # Process returned items
+            for item in items:
+                item_id_full = item.get("itemId", "")
+                # Extract numeric ID from v1|123456|0 format
+                parts = item_id_full.split("|")
+                item_id = parts[1] if len(parts) >= 2 else item_id_full
+
+                # Check if sold
+                if item.get("itemEndDate"):
+                    results[item_id] = "sold"
+                else:
+                    avails = item.get("estimatedAvailabilities", [])
+                    if avails and avails[0].get("estimatedAvailabilityStatus") == "OUT_OF_STOCK":
                         results[item_id] = "sold"
                     else:
-                        avails = item.get("estimatedAvailabilities", [])
-                        if avails and avails[0].get("estimatedAvailabilityStatus") == "OUT_OF_STOCK":
-                            results[item_id] = "sold"
-                        else:
-                            results[item_id] = "active"
-
-                # Items not in response are likely sold/removed (404)
-                for item_id in item_ids:
-                    if item_id not in results:
-                        results[item_id] = "sold"
+                        results[item_id] = "active"
 
-                return results
+            # Items not in response are likely sold/removed (404)
+            for item_id in item_ids:
+                if item_id not in results:
+                    results[item_id] = "sold"
 
-            elif resp.status == 404:
-                # All items not found
-                return {item_id: "sold" for item_id in item_ids}
-            else:
-                logger.warning(f"[TRACKING] Batch API returned {resp.status}")
-                # Fall back to individual checks would go here
-                return {item_id: "error" for item_id in item_ids}
+            return results
+
+        elif resp.status_code == 404:
+            # All items not found
+            return {item_id: "sold" for item_id in item_ids}
+        else:
+            if resp.status_code == 401:
+                ebay_tokens.invalidate(token)
+            elif resp.status_code == 429:
+                ebay_budget.throttle("getItems 429")
+            logger.warning(f"[TRACKING] Batch API returned {resp.status_code}")
+            # Fall back to individual checks would go here
+            return {item_id: "error" for item_id in item_ids}
 
     except Exception as e:
         logger.warning(f"[TRACKING] Batch check error: {e}")
         return {item_id: "error" for item_id in item_ids}
 
 
-async def check_item_status_ebay(item_id: str, session: aiohttp.ClientSession) -> str:
+async def check_item_status_ebay(item_id: str, session=None) -> str:
     """
     Check single item status (fallback for when batch fails).
     Returns: 'active', 'sold', or 'error'
@@ -1408,137 +1593,178 @@ async def check_item_status_ebay(item_id: str, session: aiohttp.ClientSession) -
             "X-EBAY-C-MARKETPLACE-ID": "EBAY_US",
         }
 
-        async with session.get(url, headers=headers, timeout=10) as resp:
-            if resp.status == 200:
-                data = await resp.json()
-                if data.get("itemEndDate"):
-                    return "sold"
-                availabilities = data.get("estimatedAvailabilities", [])
-                for avail in availabilities:
-                    if avail.get("estimatedAvailabilityStatus") == "OUT_OF_STOCK":
-                        return "sold"
-                return "active"
-            elif resp.status == 404:
+        client = session or http_clients.get("ebay_api")
+        resp = await client.get(url, headers=headers, timeout=10)
+        if resp.status_code == 200:
+            data = resp.json()
+            if data.get("itemEndDate"):
                 return "sold"
-            else:
-                return "error"
+            availabilities = data.get("estimatedAvailabilities", [])
+            for avail in availabilities:
+                if avail.get("estimatedAvailabilityStatus") == "OUT_OF_STOCK":
+                    return "sold"
+            return "active"
+        elif resp.status_code == 404:
+            return "sold"
+        else:
+            if resp.status_code == 401:
+                ebay_tokens.invalidate(token)
+            elif resp.status_code == 429:
+                ebay_budget.throttle("getItem 429")
+            return "error"
 
     except Exception as e:
         logger.warning(f"[TRACKING] Error checking item {item_id}: {e}")
         return "error"
 
 
-def get_items_by_priority(limit: int = 100) -> Tuple[List[Dict], List[Dict], List[Dict]]:
-    """
-    Get active items grouped by priority based on age.
-    Returns: (high_priority, medium_priority, low_priority)
-
-    High priority: < 10 min old (fast-sale candidates)
-    Medium priority: 10-60 min old
-    Low priority: 1-6 hours old
-    """
-    conn = sqlite3.connect(DB_PATH)
-    conn.row_factory = sqlite3.Row
-    cursor = conn.cursor()
-
-    now = datetime.now()
-    cutoff_high = (now - timedelta(minutes=10)).isoformat()
-    cutoff_medium = (now - timedelta(hours=1)).isoformat()
-    cutoff_low = (now - timedelta(hours=6)).isoformat()
+@store.transactional
+def get_sold_check_candidates(max_age_hours: float = None) -> List[Dict]:
+    """Every active item with a resolved eBay ID young enough to still be a fast-sale candidate"""
+    max_age_hours = max_age_hours or SOLD_SCHEDULE.max_age_hours
+    cutoff = (datetime.now() - timedelta(hours=max_age_hours)).isoformat()
 
-    # High priority: items < 10 min old with resolved IDs
+    cursor = store.row_cursor()
     cursor.execute("""
-        SELECT * FROM tracked_items
+        SELECT item_id, ebay_item_id, title, price, category, recommendation,
+               seller_name, first_seen, last_checked, check_count
+        FROM tracked_items
         WHERE status = 'active'
         AND ebay_item_id IS NOT NULL AND ebay_item_id != ''
         AND first_seen > ?
-        ORDER BY first_seen DESC
-        LIMIT ?
-    """, (cutoff_high, limit))
-    high = [dict(row) for row in cursor.fetchall()]
-
-    # Medium priority: 10-60 min old
-    cursor.execute("""
-        SELECT * FROM tracked_items
-        WHERE status = 'active'
-        AND ebay_item_id IS NOT NULL AND ebay_item_id != ''
-        AND first_seen <= ? AND first_seen > ?
-        ORDER BY first_seen DESC
-        LIMIT ?
-    """, (cutoff_high, cutoff_medium, limit))
-    medium = [dict(row) for row in cursor.fetchall()]
+    """, (cutoff,))
+    items = [dict(row) for row in cursor.fetchall()]
+    return items
 
-    # Low priority: 1-6 hours old
-    cursor.execute("""
-        SELECT * FROM tracked_items
-        WHERE status = 'active'
-        AND ebay_item_id IS NOT NULL AND ebay_item_id != ''
-        AND first_seen <= ? AND first_seen > ?
-        ORDER BY first_seen DESC
-        LIMIT ?
-    """, (cutoff_medium, cutoff_low, limit))
-    low = [dict(row) for row in cursor.fetchall()]
 
-    conn.close()
-    return high, medium, low
+async def check_items_status(ebay_ids: List[str], consumer: str = "sold_poll") -> Dict[str, str]:
+    """
+    Check many eBay item IDs with concurrent getItems batches (20 IDs each).
 
+    Every call is paid for from the Browse API budget shared with
+    ebay_poller, so this only uses quota the poller isn't. Items in a batch
+    that failed outright are retried one at a time, but only while the
+    budget has headroom right now (never after a 429). Items the budget
+    couldn't cover this cycle are left out of the result.
 
-async def poll_items_for_sold_status(batch_size: int = 30):
+    Returns ebay_id -> 'active' / 'sold' / 'error'.
     """
-    Poll active items with PRIORITY-BASED checking to minimize API calls.
+    ebay_ids = list(dict.fromkeys(ebay_ids))
+    if not _get_ebay_token:
+        return {ebay_id: "error" for ebay_id in ebay_ids}
+    size = max(1, min(EBAY_BUDGET.sold_poll_batch, 20))
+    batches = [ebay_ids[i:i + size] for i in range(0, len(ebay_ids), size)]
+    semaphore = asyncio.Semaphore(EBAY_BUDGET.sold_poll_concurrency)
+    results: Dict[str, str] = {}
 
-    Strategy:
-    - High priority (< 10 min): Check ALL (fast-sale candidates)
-    - Medium priority (10-60 min): Check up to 10
-    - Low priority (1-6 hr): Check up to 5
-    - Very old (> 6 hr): Stop checking (not fast sales)
+    async with http_clients.session("ebay_api") as session:
+        async def run_batch(batch: List[str]):
+            async with semaphore:
+                if not await ebay_budget.acquire(1, consumer):
+                    return
+                statuses = await check_items_batch_ebay(batch, session)
+                for ebay_id in batch:
+                    status = statuses.get(ebay_id, "error")
+                    # Whole-batch failures come back as all-error: fall back per item
+                    if status == "error" and ebay_budget.try_acquire(1, f"{consumer}_fallback") == 0:
+                        status = await check_item_status_ebay(ebay_id, session)
+                    results[ebay_id] = status
+
+        await asyncio.gather(*(run_batch(batch) for batch in batches))
 
-    This limits API calls to ~25-30 per poll cycle instead of hundreds.
+    return results
+
+
+# Last sold-status cycle (for /api/ebay-budget)
+_last_sold_poll: Dict[str, Any] = {}
+
+
+async def poll_items_for_sold_status(max_items: int = None):
+    """
+    Poll active items for sold status with batched getItems calls.
+
+    The adaptive scheduler (services/sold_scheduler.py) gives every
+    candidate a check interval from its age, price, recommendation and
+    seller, and picks the most overdue items - exactly as many as the
+    Browse API budget left over after ebay_poller covers this cycle.
+    Picked items are checked 20 per call with a few calls in flight, and
+    the whole cycle's updates are committed in one transaction.
     """
-    high, medium, low = get_items_by_priority(limit=batch_size)
+    max_items = max_items or EBAY_BUDGET.sold_poll_max_items
+    candidates = await store.run(get_sold_check_candidates)
+    if not candidates:
+        logger.debug("[TRACKING] No items with resolved eBay IDs to check")
+        return
 
-    # Smart selection: prioritize fresh items, limit older ones
-    items_to_check = high + medium[:10] + low[:5]
+    quota = min(max_items, ebay_budget.headroom() * EBAY_BUDGET.sold_poll_batch)
+    try:
+        hot_sellers = {s["seller_name"] for s in await store.run(get_hot_sellers) if s.get("seller_name")}
+    except sqlite3.Error:
+        hot_sellers = set()
+    items_to_check = sold_scheduler.select(candidates, quota, hot_sellers=hot_sellers)
 
     if not items_to_check:
-        logger.debug("[TRACKING] No items with resolved eBay IDs to check")
+        logger.debug(f"[TRACKING] Nothing due ({len(candidates)} candidates, quota={quota})")
         return
 
-    logger.info(f"[TRACKING] Checking {len(items_to_check)} items (new={len(high)}, med={min(10, len(medium))}, old={min(5, len(low))})")
+    started = time.time()
+    spent_before = ebay_budget.get_stats()["spent"]
+    logger.info(f"[TRACKING] Checking {len(items_to_check)}/{len(candidates)} items (quota={quota})")
 
-    sold_count = 0
-    fast_sale_count = 0
+    by_ebay_id: Dict[str, List[Dict]] = {}
+    for item in items_to_check:
+        by_ebay_id.setdefault(item["ebay_item_id"], []).append(item)
 
-    async with aiohttp.ClientSession() as session:
-        for item in items_to_check:
-            tracking_id = item["item_id"]
-            ebay_id = item["ebay_item_id"]
+    ebay_statuses = await check_items_status(list(by_ebay_id))
 
-            status = await check_item_status_ebay(ebay_id, session)
+    statuses = {
+        item["item_id"]: status
+        for ebay_id, status in ebay_statuses.items()
+        for item in by_ebay_id[ebay_id]
+    }
+    sold_times = await store.run(apply_status_updates, statuses)
+
+    items_by_id = {item["item_id"]: item for item in items_to_check}
+    fast_sale_count = 0
+    for tracking_id, time_to_sell in sold_times.items():
+        item = items_by_id[tracking_id]
+        if time_to_sell is not None and time_to_sell <= 5:
+            fast_sale_count += 1
+            logger.warning(
+                f"[TRACKING] FAST SALE: {item['title'][:50]} | "
+                f"${item['price']} | {time_to_sell:.1f}min | "
+                f"rec={item.get('recommendation', '?')}"
+            )
+        elif time_to_sell is not None:
+            logger.info(f"[TRACKING] Sold: {item['title'][:40]} in {time_to_sell:.0f}min")
+
+    spent_after = ebay_budget.get_stats()["spent"]
+    calls = sum(spent_after.get(k, 0) - spent_before.get(k, 0) for k in ("sold_poll", "sold_poll_fallback"))
+    errors = sum(1 for status in statuses.values() if status == "error")
+    _last_sold_poll.update({
+        "at": datetime.now().isoformat(),
+        "candidates": len(candidates),
+        "quota": quota,
+        "scheduled": len(items_to_check),
+        "checked": len(statuses),
+        "deferred": len(items_to_check) - len(statuses),
+        "hot_sellers": len(hot_sellers),
+        "sold": len(sold_times),
+        "fast_sales": fast_sale_count,
+        "errors": errors,
+        "api_calls": calls,
+        "seconds": round(time.time() - started, 2),
+    })
+
+    logger.info(
+        f"[TRACKING] Checked {len(statuses)}/{len(items_to_check)} items in {calls} calls "
+        f"({time.time() - started:.1f}s): {len(sold_times)} sold ({fast_sale_count} fast), {errors} errors"
+    )
 
-            if status == "sold":
-                time_to_sell = mark_item_sold(tracking_id)
-                sold_count += 1
-
-                if time_to_sell and time_to_sell <= 5:
-                    fast_sale_count += 1
-                    logger.warning(
-                        f"[TRACKING] FAST SALE: {item['title'][:50]} | "
-                        f"${item['price']} | {time_to_sell:.1f}min | "
-                        f"rec={item.get('recommendation', '?')}"
-                    )
-                elif time_to_sell:
-                    logger.info(f"[TRACKING] Sold: {item['title'][:40]} in {time_to_sell:.0f}min")
-            elif status == "error":
-                update_item_check(tracking_id, "error")
-            else:
-                update_item_check(tracking_id, "active")
-
-            # Small delay between calls
-            await asyncio.sleep(0.2)
 
-    if sold_count > 0:
-        logger.info(f"[TRACKING] Found {sold_count} sold ({fast_sale_count} fast sales)")
+def get_sold_poll_stats() -> Dict[str, Any]:
+    """Last sold-status cycle summary, the shared eBay budget and DB store state"""
+    return {"last_cycle": dict(_last_sold_poll), "budget": ebay_budget.get_stats(), "store": store.get_stats()}
 
 
 # Background polling task
@@ -1547,12 +1773,27 @@ _polling_interval: int = 300  # 5 minutes default
 
 
 async def _polling_loop():
-    """Background task that periodically resolves IDs and checks for sold items"""
-    logger.info(f"[TRACKING] Background polling started (interval={_polling_interval}s)")
+    """
+    Background task that periodically resolves IDs and checks for sold items.
+
+    Sold-status checks run every SOLD_SCHEDULE.cycle_seconds (the scheduler
+    decides which items are due, bounded by the API budget); ID resolution,
+    BUY validation and error retries run every _polling_interval.
+    """
+    logger.info(f"[TRACKING] Background polling started (interval={_polling_interval}s, "
+                f"sold checks every {SOLD_SCHEDULE.cycle_seconds:.0f}s)")
+    last_full_cycle = time.time()
 
     while True:
         try:
-            await asyncio.sleep(_polling_interval)
+            await asyncio.sleep(min(SOLD_SCHEDULE.cycle_seconds, _polling_interval))
+
+            # Sold status for whatever the scheduler says is due
+            await poll_items_for_sold_status()
+
+            if time.time() - last_full_cycle < _polling_interval:
+                continue
+            last_full_cycle = time.time()
 
             # Step 1: Resolve eBay item IDs for items that don't have them yet
             try:
@@ -1560,29 +1801,28 @@ async def _polling_loop():
             except Exception as e:
                 logger.warning(f"[TRACKING] Error resolving item IDs: {e}")
 
-            # Step 2: Check for sold status on items with resolved IDs
-            await poll_items_for_sold_status()
-
-            # Step 3: Validate BUY recommendations (check if they sold)
+            # Step 2: Validate BUY recommendations (check if they sold)
             try:
                 await validate_buy_recommendations()
             except Exception as e:
                 logger.warning(f"[TRACKING] Error validating BUY recommendations: {e}")
 
-            # GAP FIX #2: Step 4 - Retry error items periodically
+            # GAP FIX #2: Step 3 - Retry error items periodically
             try:
-                error_items = get_error_items_for_retry(limit=5)
+                error_items = await store.run(get_error_items_for_retry, limit=5)
                 if error_items:
                     logger.info(f"[TRACKING] Retrying {len(error_items)} error items...")
-                    async with aiohttp.ClientSession() as session:
-                        for item in error_items:
-                            ebay_id = item.get("ebay_item_id")
-                            if ebay_id:
-                                status = await check_item_status_ebay(ebay_id, session)
-                                if status != "error":
-                                    update_item_check(item["item_id"], status)
-                                    logger.info(f"[TRACKING] Retry success: {item['item_id']} -> {status}")
-                                await asyncio.sleep(0.3)
+                    statuses = await check_items_status(
+                        [item["ebay_item_id"] for item in error_items if item.get("ebay_item_id")],
+                        consumer="error_retry",
+                    )
+                    retried = []
+                    for item in error_items:
+                        status = statuses.get(item.get("ebay_item_id"), "error")
+                        if status != "error":
+                            retried.append((item["item_id"], status))
+                            logger.info(f"[TRACKING] Retry success: {item['item_id']} -> {status}")
+                    await store.run(update_checks_many, retried)
             except Exception as e:
                 logger.debug(f"[TRACKING] Error retry failed: {e}")
 
@@ -1616,6 +1856,7 @@ def stop_polling():
 # Check if BUY recommendations actually sold (validates our AI)
 # ============================================================
 
+@store.transactional
 def get_buy_items_for_validation(max_age_minutes: int = 15, limit: int = 50) -> Tuple[List[Dict], List[Dict]]:
     """
     Get BUY recommendations that need validation.
@@ -1626,9 +1867,7 @@ def get_buy_items_for_validation(max_age_minutes: int = 15, limit: int = 50) ->
 
     Note: Uses 24-hour window for stale items since eBay ID resolution can take time.
     """
-    conn = sqlite3.connect(DB_PATH)
-    conn.row_factory = sqlite3.Row
-    cursor = conn.cursor()
+    cursor = store.row_cursor()
 
     now = datetime.now()
     cutoff_fresh = (now - timedelta(minutes=max_age_minutes)).isoformat()
@@ -1660,10 +1899,10 @@ def get_buy_items_for_validation(max_age_minutes: int = 15, limit: int = 50) ->
     """, (cutoff_stale, cutoff_max, limit))
     stale_buys = [dict(row) for row in cursor.fetchall()]
 
-    conn.close()
     return fresh_buys, stale_buys
 
 
+@store.transactional
 def log_buy_validation(
     item_id: str,
     title: str,
@@ -1681,7 +1920,7 @@ def log_buy_validation(
     """
     import json as json_lib
 
-    conn = sqlite3.connect(DB_PATH)
+    conn = store.connection()
     cursor = conn.cursor()
 
     # Log to learning_patterns table
@@ -1699,7 +1938,6 @@ def log_buy_validation(
     ))
 
     conn.commit()
-    conn.close()
 
     if validation_type == "VALIDATED_BUY":
         logger.warning(f"[BUY-VALID] CONFIRMED: {title[:50]} sold in {time_to_sell:.1f}m - BUY was correct!")
@@ -1707,9 +1945,10 @@ def log_buy_validation(
         logger.warning(f"[BUY-VALID] FALSE POSITIVE: {title[:50]} didn't sell - BUY was wrong")
 
 
+@store.transactional
 def mark_buy_as_false_positive(item_id: str):
     """Mark a BUY recommendation as a false positive (didn't sell)"""
-    conn = sqlite3.connect(DB_PATH)
+    conn = store.connection()
     cursor = conn.cursor()
 
     cursor.execute("""
@@ -1719,7 +1958,6 @@ def mark_buy_as_false_positive(item_id: str):
     """, (item_id,))
 
     conn.commit()
-    conn.close()
 
 
 async def validate_buy_recommendations():
@@ -1731,7 +1969,7 @@ async def validate_buy_recommendations():
     - Check stale BUY items (> 15 min still active) - likely FALSE_BUY
     - Log results for learning
     """
-    fresh_buys, stale_buys = get_buy_items_for_validation(max_age_minutes=10, limit=30)
+    fresh_buys, stale_buys = await store.run(get_buy_items_for_validation, max_age_minutes=10, limit=30)
 
     if not fresh_buys and not stale_buys:
         return
@@ -1739,7 +1977,7 @@ async def validate_buy_recommendations():
     validated_count = 0
     false_positive_count = 0
 
-    async with aiohttp.ClientSession() as session:
+    async with http_clients.session("ebay_api") as session:
         # Check fresh BUY items - see if they sold (validates our recommendation)
         for item in fresh_buys:
             tracking_id = item["item_id"]
@@ -1751,11 +1989,12 @@ async def validate_buy_recommendations():
             status = await check_item_status_ebay(ebay_id, session)
 
             if status == "sold":
-                time_to_sell = mark_item_sold(tracking_id)
+                time_to_sell = await store.run(mark_item_sold, tracking_id)
                 validated_count += 1
 
                 # Log as VALIDATED_BUY
-                log_buy_validation(
+                await store.run(
+                    log_buy_validation,
                     item_id=tracking_id,
                     title=title,
                     price=price,
@@ -1765,7 +2004,7 @@ async def validate_buy_recommendations():
                     notes=f"Sold in {time_to_sell:.1f}m - BUY recommendation confirmed"
                 )
             elif status == "active":
-                update_item_check(tracking_id, "active")
+                await store.run(update_item_check, tracking_id, "active")
 
             await asyncio.sleep(0.2)
 
@@ -1782,9 +2021,10 @@ async def validate_buy_recommendations():
 
             if status == "sold":
                 # It did sell eventually
-                time_to_sell = mark_item_sold(tracking_id)
+                time_to_sell = await store.run(mark_item_sold, tracking_id)
                 validated_count += 1
-                log_buy_validation(
+                await store.run(
+                    log_buy_validation,
                     item_id=tracking_id,
                     title=title,
                     price=price,
@@ -1802,8 +2042,9 @@ async def validate_buy_recommendations():
 
                     if minutes_listed > 15:  # If it's been 15+ min and still active
                         false_positive_count += 1
-                        mark_buy_as_false_positive(tracking_id)
-                        log_buy_validation(
+                        await store.run(mark_buy_as_false_positive, tracking_id)
+                        await store.run(
+                            log_buy_validation,
                             item_id=tracking_id,
                             title=title,
                             price=price,
@@ -1820,9 +2061,10 @@ async def validate_buy_recommendations():
         logger.info(f"[BUY-VALID] Results: {validated_count} confirmed, {false_positive_count} false positives")
 
 
+@store.transactional
 def get_buy_validation_stats() -> Dict[str, Any]:
     """Get statistics on BUY recommendation accuracy."""
-    conn = sqlite3.connect(DB_PATH)
+    conn = store.connection()
     cursor = conn.cursor()
 
     stats = {}
@@ -1868,7 +2110,6 @@ def get_buy_validation_stats() -> Dict[str, Any]:
         for row in cursor.fetchall()
     ]
 
-    conn.close()
     return stats
 
 
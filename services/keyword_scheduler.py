@@ -0,0 +1,431 @@
+"""
+Adaptive Keyword Poll Scheduler
+
+poll_staggered used to cycle every keyword round-robin with one fixed
+interval, so a keyword that never turns up anything got the same refresh
+rate as the one producing most of the BUYs. This scheduler gives each
+keyword its own search rate instead:
+
+- value: the keyword's new-listing arrival rate (exponentially decayed
+  over rate_half_life) times (1 + buy_weight x its BUY rate). BUY rates
+  start from buy_prior, are seeded from the outcome lines of the poll log
+  (keyed by the search keyword that found the listing) and are updated as
+  the pipeline returns recommendations
+- budget: the total search rate is the poller's share of the daily Browse
+  API quota left today (API_STATS calls_today), spread over the seconds
+  left in the day, capped by min_call_gap. The floor of one search per
+  max_interval per keyword never exceeds the poller's share of the
+  sustained refill rate, so a long keyword list can't starve sold-status
+  polling of the shared budget
+- allocation: rates are proportional to sqrt(value) - the split that
+  minimizes value-weighted detection delay for a fixed number of calls -
+  clipped to [1/max_interval, 1/min_interval], so every keyword keeps a
+  floor and none is polled pointlessly often
+
+next_keyword() returns whichever keyword is most due. Every poll that found
+new listings (and every outcome) is appended to a JSONL log; simulate()
+replays such a log under a policy to compare schedules (see
+simulate_keyword_schedule.py).
+"""
+
+import os
+import json
+import math
+import time
+import logging
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from config import EBAY_BUDGET, KEYWORD_SCHEDULE
+
+logger = logging.getLogger(__name__)
+
+
+def _seconds_left_today(now: float) -> float:
+    """Seconds until local midnight (when update_api_stats resets calls_today)"""
+    current = datetime.fromtimestamp(now)
+    midnight = datetime.combine(current.date() + timedelta(days=1), datetime.min.time())
+    return max((midnight - current).total_seconds(), 60.0)
+
+
+def allocate_rates(values: Dict[str, float], total_rate: float, min_rate: float, max_rate: float) -> Dict[str, float]:
+    """
+    Per-keyword polls/second proportional to sqrt(value), clipped to
+    [min_rate, max_rate] and summing to total_rate where the bounds allow.
+    """
+    if not values:
+        return {}
+    n = len(values)
+    if total_rate <= n * min_rate:
+        return {k: total_rate / n for k in values}
+    if total_rate >= n * max_rate:
+        return {k: max_rate for k in values}
+
+    weights = {k: math.sqrt(max(v, 0.0)) for k, v in values.items()}
+    if not any(weights.values()):
+        return {k: total_rate / n for k in values}
+
+    # Binary search the scale so the clipped rates spend exactly total_rate
+    low, high = 0.0, total_rate / min(w for w in weights.values() if w > 0)
+    for _ in range(60):
+        scale = (low + high) / 2
+        spent = sum(min(max(w * scale, min_rate), max_rate) for w in weights.values())
+        if spent > total_rate:
+            high = scale
+        else:
+            low = scale
+    return {k: min(max(w * low, min_rate), max_rate) for k, w in weights.items()}
+
+
+class _KeywordState:
+    __slots__ = ("info", "polls", "new_items", "arrival_rate", "rate_updated", "outcomes", "buys",
+                 "last_polled", "rate")
+
+    def __init__(self, info: Dict[str, Any]):
+        self.info = info
+        self.polls = 0
+        self.new_items = 0
+        self.arrival_rate: Optional[float] = None  # new listings per second (decayed)
+        self.rate_updated: Optional[float] = None
+        self.outcomes = 0
+        self.buys = 0
+        self.last_polled: Optional[float] = None
+        self.rate = 0.0  # allocated polls per second
+
+
+class KeywordPollScheduler:
+    """
+    Yield-weighted search rates for the staggered poller's keywords.
+
+    Usage:
+        scheduler = KeywordPollScheduler(build_staggered_keyword_list())
+        kw_info, wait = scheduler.next_keyword(calls_today=API_STATS["calls_today"])
+        ...
+        scheduler.record_poll(kw_info["keyword"], new_listings)
+        scheduler.record_outcome(keyword, "BUY")
+    """
+
+    def __init__(self, keywords: List[Dict[str, Any]], config=None, log_path: Optional[Path] = None,
+                 fixed_rate: Optional[float] = None):
+        self.config = config or KEYWORD_SCHEDULE
+        self.fixed_rate = fixed_rate  # searches/second instead of daily quota pacing (replays)
+        self.keywords: Dict[str, _KeywordState] = {kw["keyword"]: _KeywordState(kw) for kw in keywords}
+        self.log_path = Path(log_path) if log_path else None
+        self._log_buffer: List[str] = []
+        self._last_call: Optional[float] = None
+        self.total_rate = 0.0
+
+    # ----------------------------------------------------------
+    # Observations
+    # ----------------------------------------------------------
+
+    def record_poll(self, keyword: str, listings: Iterable[Any] = (), now: Optional[float] = None):
+        """A poll of keyword finished; listings are the new ones it found"""
+        state = self.keywords.get(keyword)
+        if state is None:
+            return
+        now = time.time() if now is None else now
+        listings = list(listings)
+        found = len(listings)
+        since = state.last_polled if state.last_polled is not None else state.rate_updated
+
+        if since is not None and now > since:
+            # Decayed average of found / elapsed, weighted by elapsed time
+            observed = found / (now - since)
+            if state.arrival_rate is None:
+                state.arrival_rate = observed
+            else:
+                keep = 0.5 ** ((now - since) / self.config.rate_half_life)
+                state.arrival_rate = state.arrival_rate * keep + observed * (1 - keep)
+        state.rate_updated = now
+        state.last_polled = now
+        state.polls += 1
+        state.new_items += found
+
+        if found and self.log_path:
+            self._log({"t": round(now, 1), "kw": keyword,
+                       "new": [[l.item_id, _timestamp(getattr(l, "start_time", None)), getattr(l, "price", 0)]
+                               for l in listings]})
+
+    def mark_polled(self, keyword: str, now: Optional[float] = None):
+        """A poll whose results don't count toward the arrival rate (baseline poll)"""
+        state = self.keywords.get(keyword)
+        if state is not None:
+            state.last_polled = state.rate_updated = time.time() if now is None else now
+
+    def record_outcome(self, keyword: str, recommendation: str, item_id: str = "", now: Optional[float] = None):
+        """Pipeline recommendation for a listing this keyword found"""
+        state = self.keywords.get(keyword)
+        if state is None:
+            return
+        state.outcomes += 1
+        if str(recommendation).upper() == "BUY":
+            state.buys += 1
+        if self.log_path:
+            self._log({"t": round(time.time() if now is None else now, 1), "kw": keyword,
+                       "item": item_id, "rec": recommendation})
+
+    def seed_outcomes(self, outcomes: Dict[str, Dict[str, int]]):
+        """Add history counts ({keyword: {"items": n, "buys": b}}, e.g. load_keyword_outcomes)"""
+        seeded = 0
+        for keyword, counts in outcomes.items():
+            state = self.keywords.get(keyword)
+            if state is not None:
+                state.outcomes += counts.get("items", 0)
+                state.buys += counts.get("buys", 0)
+                seeded += 1
+        return seeded
+
+    # ----------------------------------------------------------
+    # Allocation
+    # ----------------------------------------------------------
+
+    def buy_rate(self, state: _KeywordState) -> float:
+        cfg = self.config
+        return (state.buys + cfg.buy_prior * cfg.buy_prior_weight) / (state.outcomes + cfg.buy_prior_weight)
+
+    def value(self, state: _KeywordState) -> float:
+        """Expected value per second of listings arriving on this keyword"""
+        arrival = state.arrival_rate
+        if arrival is None:
+            observed = [s.arrival_rate for s in self.keywords.values() if s.arrival_rate is not None]
+            arrival = (sum(observed) / len(observed)) if observed else self.config.default_arrivals_per_hour / 3600
+        return arrival * (1 + self.config.buy_weight * self.buy_rate(state))
+
+    def budget_rate(self, calls_today: int, now: float) -> float:
+        """Searches per second the remaining daily quota allows, within [keyword floor (capped at the sustained share), 1/min_call_gap]"""
+        cfg = self.config
+        if self.fixed_rate is not None:
+            return self.fixed_rate
+        remaining = EBAY_BUDGET.daily_calls * cfg.poller_share - calls_today
+        quota_rate = max(remaining, 0) / _seconds_left_today(now)
+        sustained = EBAY_BUDGET.daily_calls * cfg.poller_share / 86400
+        floor = min(len(self.keywords) / cfg.max_interval, sustained)
+        return min(max(quota_rate, floor), 1 / cfg.min_call_gap)
+
+    def reallocate(self, calls_today: int = 0, now: Optional[float] = None) -> Dict[str, float]:
+        now = time.time() if now is None else now
+        self.total_rate = self.budget_rate(calls_today, now)
+        rates = allocate_rates({k: self.value(s) for k, s in self.keywords.items()}, self.total_rate,
+                               1 / self.config.max_interval, 1 / self.config.min_interval)
+        for keyword, rate in rates.items():
+            self.keywords[keyword].rate = rate
+        return rates
+
+    def next_keyword(self, calls_today: int = 0, now: Optional[float] = None) -> Tuple[Dict[str, Any], float]:
+        """(kw_info, seconds to wait) for the most overdue keyword; never-polled keywords go first"""
+        now = time.time() if now is None else now
+        self.reallocate(calls_today, now)
+
+        def due(state: _KeywordState) -> float:
+            if state.last_polled is None:
+                return float("-inf")
+            return state.last_polled + 1 / state.rate
+
+        state = min(self.keywords.values(), key=due)
+        wait = max(due(state) - now, 0.0)
+        if self._last_call is not None:
+            wait = max(wait, self._last_call + self.config.min_call_gap - now)
+        self._last_call = now + wait
+        return state.info, wait
+
+    # ----------------------------------------------------------
+    # Poll log
+    # ----------------------------------------------------------
+
+    def _log(self, entry: Dict[str, Any]):
+        self._log_buffer.append(json.dumps(entry, separators=(",", ":")))
+
+    def flush_log(self) -> int:
+        """Append buffered poll/outcome lines (blocking - run via asyncio.to_thread)"""
+        if not self._log_buffer or not self.log_path:
+            return 0
+        lines, self._log_buffer = self._log_buffer, []
+        try:
+            if self.log_path.exists() and self.log_path.stat().st_size > self.config.poll_log_max_mb * 1024 * 1024:
+                os.replace(self.log_path, self.log_path.with_suffix(self.log_path.suffix + ".1"))
+            with open(self.log_path, "a") as f:
+                f.write("\n".join(lines) + "\n")
+        except OSError as e:
+            logger.warning(f"[SCHEDULE] Could not write poll log: {e}")
+            return 0
+        return len(lines)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "searches_per_minute": round(self.total_rate * 60, 2),
+            "keywords": {
+                keyword: {
+                    "interval_s": round(1 / s.rate, 1) if s.rate else None,
+                    "new_per_hour": round(s.arrival_rate * 3600, 2) if s.arrival_rate is not None else None,
+                    "buy_rate": round(self.buy_rate(s), 4),
+                    "buys": s.buys,
+                    "outcomes": s.outcomes,
+                    "polls": s.polls,
+                    "new_items": s.new_items,
+                }
+                for keyword, s in self.keywords.items()
+            },
+        }
+
+
+def _timestamp(value) -> Optional[float]:
+    if value is None:
+        return None
+    try:
+        return round(value.timestamp(), 1)
+    except (AttributeError, ValueError, OSError):
+        return None
+
+
+# ============================================================
+# REPLAY
+# ============================================================
+
+def load_poll_log(path: Path) -> List[Dict[str, Any]]:
+    """keyword_polls.jsonl -> arrivals [{keyword, item_id, listed_at, price, recommendation}]"""
+    arrivals: Dict[str, Dict[str, Any]] = {}
+    outcomes: Dict[str, str] = {}
+    with open(path) as f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue
+            if "new" in entry:
+                for item_id, listed_at, price in entry["new"]:
+                    arrivals.setdefault(item_id, {"keyword": entry["kw"], "item_id": item_id,
+                                                  "listed_at": listed_at if listed_at else entry["t"],
+                                                  "price": price})
+            elif entry.get("item"):
+                outcomes[entry["item"]] = entry.get("rec", "")
+    for item_id, arrival in arrivals.items():
+        arrival["recommendation"] = outcomes.get(item_id, "")
+    return list(arrivals.values())
+
+
+def load_keyword_outcomes(path: Path, since: float) -> Dict[str, Dict[str, int]]:
+    """
+    Outcome lines newer than since from keyword_polls.jsonl and its rotated
+    .1 file -> {keyword: {"items": n, "buys": b}} for seed_outcomes().
+    """
+    outcomes: Dict[str, Dict[str, int]] = {}
+    for log in (path.with_suffix(path.suffix + ".1"), path):
+        try:
+            f = open(log)
+        except OSError:
+            continue
+        with f:
+            for line in f:
+                if '"rec"' not in line:
+                    continue
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue
+                if entry.get("t", 0) < since or not entry.get("kw"):
+                    continue
+                counts = outcomes.setdefault(entry["kw"], {"items": 0, "buys": 0})
+                counts["items"] += 1
+                if str(entry.get("rec", "")).upper() == "BUY":
+                    counts["buys"] += 1
+    return outcomes
+
+
+POLICIES = ("round_robin", "adaptive")
+
+
+def simulate(arrivals: List[Dict[str, Any]], policy: str = "adaptive", calls_per_day: Optional[float] = None,
+             config=None) -> Dict[str, Any]:
+    """
+    Replay listing arrivals under a polling policy at the same call budget.
+
+    Each search of a keyword finds every listing on it posted since that
+    keyword's previous search. A listing counts as caught if that search
+    lands within freshness_seconds of its posting (the poller skips older
+    ones), and the delay from posting to search is its detection lag.
+    Adaptive learns online from exactly what its own searches would have
+    seen, including the recorded recommendation of each caught listing.
+
+    Arrivals were recorded under whatever schedule ran at the time (a
+    keyword nobody polled has none), so both policies see the same data.
+    """
+    config = config or KEYWORD_SCHEDULE
+    if not arrivals:
+        return {"policy": policy, "items": 0}
+
+    by_keyword: Dict[str, List[Dict[str, Any]]] = {}
+    for arrival in sorted(arrivals, key=lambda a: a["listed_at"]):
+        by_keyword.setdefault(arrival["keyword"], []).append(arrival)
+    keywords = sorted(by_keyword)
+    start = min(a["listed_at"] for a in arrivals)
+    end = max(a["listed_at"] for a in arrivals) + config.freshness_seconds
+
+    calls_per_day = calls_per_day or EBAY_BUDGET.daily_calls * config.poller_share
+    rate = min(calls_per_day / 86400, 1 / config.min_call_gap)
+    gap = 1 / rate
+
+    scheduler = None
+    if policy == "adaptive":
+        scheduler = KeywordPollScheduler([{"keyword": k} for k in keywords], config=config, fixed_rate=rate)
+        for keyword in keywords:
+            scheduler.mark_polled(keyword, start)
+
+    cursor = {k: 0 for k in keywords}
+    caught = buys = buys_caught = calls = 0
+    lags: List[float] = []
+    buy_lags: List[float] = []
+    now = start
+    index = 0
+
+    while now <= end:
+        if scheduler is not None:
+            kw_info, wait = scheduler.next_keyword(now=now)
+            keyword = kw_info["keyword"]
+            now += max(wait, 0.0)
+        else:
+            keyword = keywords[index % len(keywords)]
+            index += 1
+            now += gap
+        if now > end:
+            break
+        calls += 1
+
+        found = []
+        items = by_keyword[keyword]
+        while cursor[keyword] < len(items) and items[cursor[keyword]]["listed_at"] <= now:
+            found.append(items[cursor[keyword]])
+            cursor[keyword] += 1
+        fresh = [a for a in found if now - a["listed_at"] <= config.freshness_seconds]
+        for arrival in fresh:
+            lag = now - arrival["listed_at"]
+            lags.append(lag)
+            if str(arrival["recommendation"]).upper() == "BUY":
+                buys_caught += 1
+                buy_lags.append(lag)
+
+        if scheduler is not None:
+            scheduler.record_poll(keyword, fresh, now=now)
+            for arrival in fresh:
+                scheduler.record_outcome(keyword, arrival["recommendation"], now=now)
+        caught += len(fresh)
+
+    buys = sum(1 for a in arrivals if str(a["recommendation"]).upper() == "BUY")
+    lags.sort()
+    buy_lags.sort()
+    pct = lambda values, q: round(values[int(q * (len(values) - 1))], 1) if values else None
+    return {
+        "policy": policy,
+        "keywords": len(keywords),
+        "items": len(arrivals),
+        "caught": caught,
+        "buys": buys,
+        "buys_caught": buys_caught,
+        "calls": calls,
+        "calls_per_day": round(calls / max((end - start) / 86400, 1 / 24), 1),
+        "lag_p50_s": pct(lags, 0.5),
+        "lag_p90_s": pct(lags, 0.9),
+        "buy_lag_p50_s": pct(buy_lags, 0.5),
+        "buy_lag_p90_s": pct(buy_lags, 0.9),
+    }
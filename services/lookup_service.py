@@ -0,0 +1,163 @@
+"""
+Off-loop Lookup Service
+
+Runs blocking price lookups (PriceCharting FTS queries, Bricklink OAuth HTTP)
+in per-source thread pools so a slow lookup never stalls the event loop.
+
+Each source gets its own executor sized to its concurrency limit, a timeout,
+and a rolling latency window for p50/p99 reporting.
+"""
+
+import time
+import asyncio
+import logging
+import threading
+import functools
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from config import LOOKUPS
+
+logger = logging.getLogger(__name__)
+
+
+class LookupService:
+    """
+    Per-source thread pools for blocking lookups.
+
+    Usage (async, from the request path):
+        pc_result, pc_context = await lookup_service.run(
+            "pricecharting", get_pricecharting_context, title, price, category,
+            default=(None, ""))
+
+    Usage (sync, from inside another worker thread):
+        bricklink_lookup = lookup_service.wrap_sync("bricklink", lookup_set, default={...})
+    """
+
+    def __init__(self, config=None):
+        config = config or LOOKUPS
+        self._limits = {
+            "pricecharting": config.pricecharting_workers,
+            "bricklink": config.bricklink_workers,
+        }
+        self._timeouts = {
+            "pricecharting": config.pricecharting_timeout,
+            "bricklink": config.bricklink_timeout,
+        }
+        self._latency_window = config.latency_window
+        self._executors: Dict[str, ThreadPoolExecutor] = {}
+        self._latency: Dict[str, deque] = {}
+        self._counts: Dict[str, Dict[str, int]] = {}
+        self._lock = threading.Lock()
+
+    def _executor(self, source: str) -> ThreadPoolExecutor:
+        with self._lock:
+            executor = self._executors.get(source)
+            if executor is None:
+                workers = self._limits.get(source, 2)
+                executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix=f"lookup-{source}")
+                self._executors[source] = executor
+                self._latency[source] = deque(maxlen=self._latency_window)
+                self._counts[source] = {"calls": 0, "timeouts": 0, "errors": 0}
+            return executor
+
+    def _record(self, source: str, elapsed: float, outcome: str):
+        with self._lock:
+            self._latency[source].append(elapsed)
+            counts = self._counts[source]
+            counts["calls"] += 1
+            if outcome != "ok":
+                counts[outcome] += 1
+
+    async def run(self, source: str, fn: Callable, *args,
+                  timeout: Optional[float] = None, default: Any = None, **kwargs) -> Any:
+        """Run fn in the source's pool without blocking the event loop.
+
+        Returns `default` (called if callable) on timeout or error - the worker
+        thread is left to finish on its own.
+        """
+        executor = self._executor(source)
+        timeout = timeout if timeout is not None else self._timeouts.get(source)
+        loop = asyncio.get_running_loop()
+        start = time.perf_counter()
+        try:
+            result = await asyncio.wait_for(
+                loop.run_in_executor(executor, functools.partial(fn, *args, **kwargs)),
+                timeout,
+            )
+        except asyncio.TimeoutError:
+            self._record(source, time.perf_counter() - start, "timeouts")
+            logger.warning(f"[LOOKUP] {source} timed out after {timeout}s")
+            return default() if callable(default) else default
+        except Exception as e:
+            self._record(source, time.perf_counter() - start, "errors")
+            logger.error(f"[LOOKUP] {source} error: {e}")
+            return default() if callable(default) else default
+        self._record(source, time.perf_counter() - start, "ok")
+        return result
+
+    def run_sync(self, source: str, fn: Callable, *args,
+                 timeout: Optional[float] = None, default: Any = None, **kwargs) -> Any:
+        """Blocking variant for callers already on a worker thread."""
+        executor = self._executor(source)
+        timeout = timeout if timeout is not None else self._timeouts.get(source)
+        start = time.perf_counter()
+        future = executor.submit(fn, *args, **kwargs)
+        try:
+            result = future.result(timeout)
+        except FutureTimeoutError:
+            self._record(source, time.perf_counter() - start, "timeouts")
+            logger.warning(f"[LOOKUP] {source} timed out after {timeout}s")
+            return default() if callable(default) else default
+        except Exception as e:
+            self._record(source, time.perf_counter() - start, "errors")
+            logger.error(f"[LOOKUP] {source} error: {e}")
+            return default() if callable(default) else default
+        self._record(source, time.perf_counter() - start, "ok")
+        return result
+
+    def wrap_sync(self, source: str, fn: Callable, default: Any = None) -> Callable:
+        """Wrap a blocking function so every call goes through the source's pool."""
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            return self.run_sync(source, fn, *args, default=default, **kwargs)
+        return wrapper
+
+    def percentiles(self, source: str) -> Tuple[Optional[float], Optional[float]]:
+        """Return (p50, p99) latency in seconds for a source, or (None, None)."""
+        with self._lock:
+            samples = sorted(self._latency.get(source, ()))
+        if not samples:
+            return None, None
+        p50 = samples[int(0.50 * (len(samples) - 1))]
+        p99 = samples[int(0.99 * (len(samples) - 1))]
+        return p50, p99
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Per-source call counts and latency percentiles (ms)"""
+        stats = {}
+        for source in list(self._counts):
+            p50, p99 = self.percentiles(source)
+            with self._lock:
+                counts = dict(self._counts[source])
+            stats[source] = {
+                **counts,
+                "workers": self._limits.get(source, 2),
+                "timeout_s": self._timeouts.get(source),
+                "p50_ms": round(p50 * 1000, 1) if p50 is not None else None,
+                "p99_ms": round(p99 * 1000, 1) if p99 is not None else None,
+            }
+        return stats
+
+    def shutdown(self):
+        """Stop accepting work; in-flight lookups finish on their own."""
+        with self._lock:
+            executors = list(self._executors.values())
+            self._executors.clear()
+        for executor in executors:
+            executor.shutdown(wait=False)
+
+
+# Global lookup service instance
+lookup_service = LookupService()
@@ -0,0 +1,208 @@
+"""
+Per-Stage Request Tracing
+
+Each run_analysis call gets a RequestTrace. Pipeline stages (category
+detection, PriceCharting wait, fast extract, images, RAG, Tier 1, validation,
+Tier 2) are recorded as spans with a name, start, duration and outcome, and
+every exit path - early returns included - closes the trace with its total
+time.
+
+Finished traces feed rolling per-stage and per-exit-path windows, reported
+as percentiles + histograms by /api/perf and the dashboard latency panel.
+"""
+
+import time
+import logging
+import threading
+from collections import deque
+from dataclasses import dataclass, asdict
+from typing import Any, Dict, List, Optional
+
+from config import PERF
+
+logger = logging.getLogger(__name__)
+
+# Histogram bucket upper bounds (ms); the last bucket is open-ended
+HISTOGRAM_BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+
+@dataclass
+class Span:
+    """One timed pipeline stage"""
+    name: str
+    start: float       # epoch seconds
+    duration: float    # seconds
+    outcome: str = "ok"  # "ok", "exit" (request returned here) or "error"
+
+
+class RequestTrace:
+    """
+    Spans for a single request.
+
+    Usage (inside run_analysis):
+        _timing = trace.timing                  # legacy [TIMING] dict, filled by stage()
+        ...
+        trace.stage("images", _img_start)       # span from _img_start to now
+        ...
+        if spam_response:
+            return trace.exit("spam", spam_response)
+    """
+
+    def __init__(self, tracer: "PerfTracer"):
+        self._tracer = tracer
+        self.start = time.time()
+        self.spans: List[Span] = []
+        self.timing: Dict[str, float] = {}
+        self.exit_path: Optional[str] = None
+        self._mark = self.start
+        self._finished = False
+
+    def stage(self, name: str, start: Optional[float] = None, outcome: str = "ok") -> float:
+        """Close a span that began at `start` (default: end of the previous span)."""
+        end = time.time()
+        start = self._mark if start is None else start
+        duration = end - start
+        self.spans.append(Span(name, start, duration, outcome))
+        self.timing[name] = duration
+        self._mark = end
+        return duration
+
+    def exit(self, path: str, response: Any = None, outcome: str = "exit") -> Any:
+        """Record the exit path (with a span since the last stage) and pass the response through."""
+        self.stage(path, outcome=outcome)
+        self.exit_path = path
+        return response
+
+    @property
+    def total(self) -> float:
+        return time.time() - self.start
+
+    def finish(self):
+        """Close the trace and hand it to the aggregator (idempotent)."""
+        if self._finished:
+            return
+        self._finished = True
+        self._tracer.record(self)
+
+
+class _Window:
+    """Rolling window of durations (seconds) with percentile/histogram summaries"""
+
+    def __init__(self, size: int):
+        self.samples: deque = deque(maxlen=size)
+        self.count = 0
+
+    def add(self, seconds: float):
+        self.samples.append(seconds)
+        self.count += 1
+
+    def summary(self) -> Dict[str, Any]:
+        samples = sorted(self.samples)
+        n = len(samples)
+        if not n:
+            return {"count": self.count, "window": 0}
+        histogram = {f"<={b}ms": 0 for b in HISTOGRAM_BUCKETS_MS}
+        histogram[f">{HISTOGRAM_BUCKETS_MS[-1]}ms"] = 0
+        for s in samples:
+            ms = s * 1000
+            for b in HISTOGRAM_BUCKETS_MS:
+                if ms <= b:
+                    histogram[f"<={b}ms"] += 1
+                    break
+            else:
+                histogram[f">{HISTOGRAM_BUCKETS_MS[-1]}ms"] += 1
+        total = sum(samples)
+        return {
+            "count": self.count,
+            "window": n,
+            "total_ms": round(total * 1000, 1),
+            "mean_ms": round(total / n * 1000, 1),
+            "p50_ms": round(samples[int(0.50 * (n - 1))] * 1000, 1),
+            "p90_ms": round(samples[int(0.90 * (n - 1))] * 1000, 1),
+            "p99_ms": round(samples[int(0.99 * (n - 1))] * 1000, 1),
+            "max_ms": round(samples[-1] * 1000, 1),
+            "histogram": histogram,
+        }
+
+
+class PerfTracer:
+    """
+    In-memory aggregation of request traces.
+
+    Keeps a rolling window per stage and per exit path plus the most recent
+    traces, so /api/perf shows which tier dominates latency under load.
+    """
+
+    def __init__(self, config=None):
+        self._config = config or PERF
+        self._stages: Dict[str, _Window] = {}
+        self._exits: Dict[str, _Window] = {}
+        self._outcomes: Dict[str, Dict[str, int]] = {}
+        self._recent: deque = deque(maxlen=self._config.recent_traces)
+        self._lock = threading.Lock()
+        self._started = time.time()
+
+    def start_trace(self) -> RequestTrace:
+        return RequestTrace(self)
+
+    def record(self, trace: RequestTrace):
+        total = trace.total
+        exit_path = trace.exit_path or "full"
+        window = self._config.window
+        with self._lock:
+            for span in trace.spans:
+                stage = self._stages.get(span.name)
+                if stage is None:
+                    stage = self._stages[span.name] = _Window(window)
+                    self._outcomes[span.name] = {}
+                stage.add(span.duration)
+                outcomes = self._outcomes[span.name]
+                outcomes[span.outcome] = outcomes.get(span.outcome, 0) + 1
+            path = self._exits.get(exit_path)
+            if path is None:
+                path = self._exits[exit_path] = _Window(window)
+            path.add(total)
+            self._recent.append({
+                "start": trace.start,
+                "exit_path": exit_path,
+                "total_ms": round(total * 1000, 1),
+                "spans": [
+                    {**asdict(span), "start": round(span.start - trace.start, 4), "duration": round(span.duration * 1000, 1)}
+                    for span in trace.spans
+                ],
+            })
+        if total * 1000 >= self._config.slow_request_ms:
+            slowest = max(trace.spans, key=lambda s: s.duration, default=None)
+            logger.info(f"[PERF] Slow request {total*1000:.0f}ms via '{exit_path}'"
+                        + (f" (slowest stage: {slowest.name} {slowest.duration*1000:.0f}ms)" if slowest else ""))
+
+    def get_stats(self, recent: int = 10) -> Dict[str, Any]:
+        """Per-stage and per-exit-path percentiles/histograms plus the latest traces"""
+        with self._lock:
+            stages = {name: {**w.summary(), "outcomes": dict(self._outcomes[name])}
+                      for name, w in self._stages.items()}
+            exits = {name: w.summary() for name, w in self._exits.items()}
+            latest = list(self._recent)[-recent:] if recent else []
+        # Share of all traced stage time in the window - the "who dominates" view
+        stage_total = sum(s.get("total_ms", 0) for s in stages.values()) or 1
+        for s in stages.values():
+            s["share"] = round(s.get("total_ms", 0) / stage_total, 3)
+        return {
+            "since": self._started,
+            "requests": sum(e["count"] for e in exits.values()),
+            "stages": dict(sorted(stages.items(), key=lambda kv: -kv[1].get("total_ms", 0))),
+            "exit_paths": dict(sorted(exits.items(), key=lambda kv: -kv[1]["count"])),
+            "recent": latest,
+        }
+
+    def reset(self):
+        with self._lock:
+            self._stages.clear()
+            self._exits.clear()
+            self._outcomes.clear()
+            self._recent.clear()
+            self._started = time.time()
+
+
+# Global tracer instance
+perf_tracer = PerfTracer()
@@ -0,0 +1,272 @@
+"""
+Adaptive Sold-Status Scheduler
+
+Decides which tracked items get a getItems check this cycle. Instead of
+fixed age buckets with hard caps, every active item gets its own check
+interval from:
+
+- age: fresh listings are fast-sale candidates and are checked about once a
+  minute; the interval grows by min_interval every fast_window_minutes
+- price: expensive items are checked more often (sqrt(price / reference))
+- recommendation: BUY / RESEARCH items are checked more often
+- seller: sellers with repeated fast sales (get_hot_sellers) are checked more often
+
+Priority is how overdue an item is (time since last check / its interval,
+capped so long-unchecked old items can't pile up ahead of fresh ones),
+times its factor. Items still inside the 5-minute fast-sale window rank
+ahead of every older item (a later check can't catch a fast sale), so
+valuable older items never crowd out fast-sale candidates; older items are
+discounted by age the same way their interval grows.
+select() takes the top `quota` items - exactly as many as the cycle's API
+budget covers - with a heap, so a quota of 300 out of 5,000 candidates does
+not sort everything.
+
+simulate() replays tracked_items history against a policy to count how
+many fast sales each policy would have caught (see simulate_sold_schedule.py).
+"""
+
+import math
+import heapq
+import logging
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+from config import SOLD_SCHEDULE
+
+logger = logging.getLogger(__name__)
+
+# mark_item_sold's threshold for a fast sale
+FAST_SALE_MINUTES = 5.0
+
+# Overdue ratio at which an item stops gaining priority
+MAX_OVERDUE = 3.0
+
+
+def parse_timestamp(value: Optional[str]) -> Optional[float]:
+    """tracked_items ISO timestamp -> epoch seconds (None if missing/invalid)"""
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(str(value).replace('Z', '+00:00')).timestamp()
+    except ValueError:
+        return None
+
+
+class SoldCheckScheduler:
+    """
+    Per-item check intervals and quota-bounded selection.
+
+    Items are tracked_items rows (dicts) with at least item_id, price,
+    recommendation, seller_name, first_seen and last_checked.
+
+    Usage:
+        scheduler = SoldCheckScheduler()
+        to_check = scheduler.select(candidates, quota=calls * 20, hot_sellers=hot)
+    """
+
+    def __init__(self, config=None):
+        self.config = config or SOLD_SCHEDULE
+
+    def factor(self, item: Dict[str, Any], hot_sellers: Set[str] = frozenset()) -> float:
+        """How much more often than a plain $100 PASS item this one is checked"""
+        cfg = self.config
+        value = math.sqrt(max(_price(item), 0.0) / cfg.value_reference) if cfg.value_reference else 1.0
+        factor = min(max(value, 1.0 / cfg.max_value_factor), cfg.max_value_factor)
+
+        recommendation = str(item.get("recommendation") or "").upper()
+        for key, boost in cfg.recommendation_factors.items():
+            if key in recommendation:
+                factor *= boost
+                break
+
+        if item.get("seller_name") and item["seller_name"] in hot_sellers:
+            factor *= cfg.hot_seller_factor
+        return factor
+
+    def interval(self, item: Dict[str, Any], now: float, hot_sellers: Set[str] = frozenset(),
+                 listed_at: Optional[float] = None) -> Optional[float]:
+        """Seconds between checks for this item, or None once it's too old to track"""
+        cfg = self.config
+        listed_at = listed_at if listed_at is not None else parse_timestamp(item.get("first_seen"))
+        if listed_at is None:
+            return None
+        age_minutes = max(now - listed_at, 0.0) / 60
+        if age_minutes > cfg.max_age_hours * 60:
+            return None
+        base = cfg.min_interval * (1 + age_minutes / cfg.fast_window_minutes)
+        return min(max(base / self.factor(item, hot_sellers), cfg.min_interval), cfg.max_interval)
+
+    def select(self, items: Iterable[Dict[str, Any]], quota: int, now: Optional[float] = None,
+               hot_sellers: Set[str] = frozenset()) -> List[Dict[str, Any]]:
+        """
+        Up to `quota` items, highest priority first. Items checked less than
+        min_interval ago are never picked; everything else competes on
+        priority, so spare quota goes to the items closest to being due.
+        """
+        if quota <= 0:
+            return []
+        now = now if now is not None else datetime.now().timestamp()
+        cfg = self.config
+        min_interval = cfg.min_interval
+
+        scored = []
+        for i, item in enumerate(items):
+            listed_at = item.get("_listed_at")
+            if listed_at is None:
+                listed_at = parse_timestamp(item.get("first_seen"))
+            interval = self.interval(item, now, hot_sellers, listed_at=listed_at)
+            if interval is None:
+                continue
+            last = item.get("_last_checked_at")
+            if last is None:
+                last = parse_timestamp(item.get("last_checked"))
+            if last is not None and now - last < min_interval:
+                continue
+            elapsed = now - (last if last is not None else listed_at)
+            age = max(now - listed_at, 0.0)
+            priority = min(elapsed / interval, MAX_OVERDUE) * self.factor(item, hot_sellers)
+            # Only a check inside this window can catch a fast sale, so those
+            # items go ahead of every older one
+            in_window = age <= FAST_SALE_MINUTES * 60
+            if not in_window:
+                priority /= 1 + age / 60 / cfg.fast_window_minutes
+            scored.append((in_window, priority, -i, item))
+
+        return [s[-1] for s in heapq.nlargest(quota, scored, key=lambda s: s[:3])]
+
+
+# ============================================================
+# HISTORY REPLAY
+# ============================================================
+
+def _price(item: Dict[str, Any]) -> float:
+    try:
+        return float(item.get("price") or 0)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def _legacy_buckets(active: List[Dict[str, Any]], now: float, quota: int, **_) -> List[Dict[str, Any]]:
+    """Pre-scheduler policy: all < 10 min (max 30), 10 from 10-60 min, 5 from 1-6 hr"""
+    high, medium, low = [], [], []
+    for item in sorted(active, key=lambda it: -it["_listed_at"]):
+        age = now - item["_listed_at"]
+        if age < 600:
+            high.append(item)
+        elif age < 3600:
+            medium.append(item)
+        elif age < 6 * 3600:
+            low.append(item)
+    return high[:30] + medium[:10] + low[:5]
+
+
+def _newest_first(active: List[Dict[str, Any]], now: float, quota: int, **_) -> List[Dict[str, Any]]:
+    """Fill the quota with the newest items under 6 hr (batched polling, no scheduling)"""
+    fresh = [item for item in active if now - item["_listed_at"] < 6 * 3600]
+    return heapq.nlargest(quota, fresh, key=lambda it: it["_listed_at"])
+
+
+POLICIES = {
+    "buckets": _legacy_buckets,
+    "newest": _newest_first,
+    "adaptive": None,  # SoldCheckScheduler.select
+}
+
+
+def simulate(rows: List[Dict[str, Any]], policy: str = "adaptive", cycle_seconds: Optional[float] = None,
+             calls_per_cycle: int = 17, batch_size: int = 20, hot_sellers: Set[str] = frozenset(),
+             scheduler: Optional[SoldCheckScheduler] = None) -> Dict[str, Any]:
+    """
+    Replay tracked_items rows under a scheduling policy.
+
+    Each row is listed at first_seen and (if it sold) sells at
+    first_seen + time_to_sell_minutes. Every cycle the policy picks items to
+    check; a sold item is detected at its first check after the sale, and
+    counts as a detected fast sale only if that check lands within
+    FAST_SALE_MINUTES of listing - the same rule mark_item_sold applies.
+
+    History was recorded by whichever poller ran at the time, so sale times
+    are upper bounds; policies are compared on the same data.
+    """
+    cycle_seconds = cycle_seconds or SOLD_SCHEDULE.cycle_seconds
+    scheduler = scheduler or SoldCheckScheduler()
+    quota = calls_per_cycle * batch_size
+    pick = POLICIES[policy]
+
+    items = []
+    for row in rows:
+        listed_at = parse_timestamp(row.get("first_seen"))
+        if listed_at is None:
+            continue
+        sold_at = None
+        if row.get("time_to_sell_minutes") is not None and row.get("sold_time"):
+            sold_at = listed_at + max(float(row["time_to_sell_minutes"]), 0.0) * 60
+        elif row.get("sold_time"):
+            sold_at = parse_timestamp(row["sold_time"])
+        items.append({**row, "_listed_at": listed_at, "_sold_at": sold_at, "_last_checked_at": None,
+                      "last_checked": None})
+    if not items:
+        return {"policy": policy, "items": 0}
+
+    items.sort(key=lambda it: it["_listed_at"])
+    fast = [it for it in items
+            if it["_sold_at"] is not None and it["_sold_at"] - it["_listed_at"] <= FAST_SALE_MINUTES * 60]
+    max_age = SOLD_SCHEDULE.max_age_hours * 3600
+
+    active: List[Dict[str, Any]] = []
+    next_listing = 0
+    detected = fast_detected = checks = calls = cycles = 0
+    fast_value_detected = 0.0
+    lags = []
+    now = items[0]["_listed_at"]
+    end = items[-1]["_listed_at"] + max_age
+
+    while now <= end:
+        while next_listing < len(items) and items[next_listing]["_listed_at"] <= now:
+            active.append(items[next_listing])
+            next_listing += 1
+        active = [it for it in active if now - it["_listed_at"] <= max_age]
+
+        if pick is None:
+            chosen = scheduler.select(active, quota, now=now, hot_sellers=hot_sellers)
+        else:
+            chosen = pick(active, now, quota)
+
+        if chosen:
+            cycles += 1
+            checks += len(chosen)
+            calls += len(chosen) if policy == "buckets" else math.ceil(len(chosen) / batch_size)
+            found = set()
+            for item in chosen:
+                item["_last_checked_at"] = now
+                if item["_sold_at"] is not None and item["_sold_at"] <= now:
+                    found.add(id(item))
+                    detected += 1
+                    lags.append(now - item["_sold_at"])
+                    if now - item["_listed_at"] <= FAST_SALE_MINUTES * 60:
+                        fast_detected += 1
+                        fast_value_detected += _price(item)
+            if found:
+                active = [it for it in active if id(it) not in found]
+        now += cycle_seconds
+
+    lags.sort()
+    return {
+        "policy": policy,
+        "items": len(items),
+        "sold": sum(1 for it in items if it["_sold_at"] is not None),
+        "fast_sales": len(fast),
+        "fast_sales_detected": fast_detected,
+        "fast_sale_value": round(sum(_price(it) for it in fast), 2),
+        "fast_sale_value_detected": round(fast_value_detected, 2),
+        "sales_detected": detected,
+        "checks": checks,
+        "api_calls": calls,
+        "calls_per_day": round(calls / max((end - items[0]["_listed_at"]) / 86400, 1 / 24), 1),
+        "detection_lag_p50_s": round(lags[len(lags) // 2], 1) if lags else None,
+        "detection_lag_p90_s": round(lags[int(0.9 * (len(lags) - 1))], 1) if lags else None,
+    }
+
+
+# Global scheduler instance
+sold_scheduler = SoldCheckScheduler()
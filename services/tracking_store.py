@@ -0,0 +1,191 @@
+"""
+Tracking Store - long-lived SQLite connections for item_tracking.db
+
+item_tracking used to open a fresh sqlite3 connection for every call
+(track_item, update_item_check, mark_item_sold, log_pattern, ...), paying
+for the open, schema parse and PRAGMA setup several times per analyzed
+listing. The store keeps one WAL-mode connection per thread instead
+(in a threading.local, closed when its thread exits or on close()), so:
+
+- sqlite3's per-connection statement cache acts as a prepared-statement
+  cache (the same INSERT/UPDATE text is compiled once per thread)
+- transaction() / @transactional group a function's statements into one
+  commit and roll back on error, so a failure never leaves a long-lived
+  connection holding an open write transaction
+- run() is the async facade: it executes tracking functions on the store's
+  own worker threads, so the event loop never blocks on sqlite
+- rows are plain tuples; row_cursor() gives a sqlite3.Row cursor for the
+  reads that want columns by name
+
+Usage:
+    store = TrackingStore(DB_PATH)
+    with store.transaction() as conn:
+        conn.execute("UPDATE tracked_items SET ... WHERE item_id = ?", (item_id,))
+    rows = store.connection().execute("SELECT ...").fetchall()
+    items = [dict(row) for row in store.row_cursor().execute("SELECT ...")]
+    stats = await store.run(get_tracking_stats)
+"""
+
+import asyncio
+import sqlite3
+import logging
+import threading
+import weakref
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial, wraps
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional
+
+from config import DATABASE
+
+logger = logging.getLogger(__name__)
+
+# Statements cached per connection (sqlite3 default is 128)
+STATEMENT_CACHE_SIZE = 256
+
+
+class _ThreadConnection:
+    """One thread's connection; closed when the thread's local is dropped (thread exit) or by close()"""
+    __slots__ = ("conn", "__weakref__")
+
+    def __init__(self, conn: sqlite3.Connection):
+        self.conn = conn
+
+    def close(self):
+        conn, self.conn = self.conn, None
+        if conn is not None:
+            try:
+                conn.close()
+            except sqlite3.Error:
+                pass
+
+    def __del__(self):
+        self.close()
+
+
+class TrackingStore:
+    """Per-thread persistent connections + transactions + an async facade"""
+
+    def __init__(self, path: Path, workers: int = 2):
+        self.path = str(path)
+        self.workers = workers
+        self._local = threading.local()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._executor_lock = threading.Lock()
+        self._connections: "weakref.WeakSet[_ThreadConnection]" = weakref.WeakSet()
+        self._connections_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._stats = {"connections_opened": 0, "transactions": 0, "rollbacks": 0, "async_calls": 0}
+
+    # ---------------- connections ----------------
+
+    def _open(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=DATABASE.busy_timeout / 1000,
+                               cached_statements=STATEMENT_CACHE_SIZE, check_same_thread=False)
+        if DATABASE.wal_mode:
+            conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(f"PRAGMA synchronous={DATABASE.synchronous}")
+        conn.execute(f"PRAGMA busy_timeout={DATABASE.busy_timeout}")
+        conn.execute(f"PRAGMA cache_size={DATABASE.cache_size}")
+        with self._stats_lock:
+            self._stats["connections_opened"] += 1
+        return conn
+
+    def connection(self) -> sqlite3.Connection:
+        """This thread's connection (opened on first use, kept until close() or thread exit)"""
+        holder = getattr(self._local, "conn", None)
+        if holder is None or holder.conn is None:
+            holder = self._local.conn = _ThreadConnection(self._open())
+            with self._connections_lock:
+                self._connections.add(holder)
+        return holder.conn
+
+    def row_cursor(self) -> sqlite3.Cursor:
+        """A cursor on this thread's connection returning sqlite3.Row (columns by name)"""
+        cursor = self.connection().cursor()
+        cursor.row_factory = sqlite3.Row
+        return cursor
+
+    def _current(self) -> Optional[sqlite3.Connection]:
+        holder = getattr(self._local, "conn", None)
+        return holder.conn if holder is not None else None
+
+    @contextmanager
+    def transaction(self):
+        """Commit on success, roll back on any exception."""
+        conn = self.connection()
+        try:
+            yield conn
+            conn.commit()
+        except BaseException:
+            conn.rollback()
+            with self._stats_lock:
+                self._stats["rollbacks"] += 1
+            raise
+        with self._stats_lock:
+            self._stats["transactions"] += 1
+
+    def transactional(self, fn: Callable) -> Callable:
+        """
+        Decorator for functions that use connection() directly: whatever
+        they leave uncommitted is committed on return and rolled back if
+        they raise, so the long-lived connection never stays mid-transaction.
+        """
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            try:
+                result = fn(*args, **kwargs)
+            except BaseException:
+                conn = self._current()
+                if conn is not None and conn.in_transaction:
+                    conn.rollback()
+                    with self._stats_lock:
+                        self._stats["rollbacks"] += 1
+                raise
+            conn = self._current()
+            if conn is not None and conn.in_transaction:
+                conn.commit()
+            return result
+        return wrapper
+
+    def close(self):
+        """Close every thread's connection and the worker pool (shutdown / tests)"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+        with self._connections_lock:
+            connections = list(self._connections)
+            self._connections.clear()
+        for holder in connections:
+            holder.close()
+        self._local = threading.local()
+
+    def reopen(self, path: Optional[Path] = None):
+        """Close everything and point the store at another database (tests / benchmarks)"""
+        self.close()
+        if path is not None:
+            self.path = str(path)
+
+    # ---------------- async facade ----------------
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            with self._executor_lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="tracking-db")
+        return self._executor
+
+    async def run(self, fn: Callable, *args, **kwargs) -> Any:
+        """Run a (sync) tracking function on the store's worker threads."""
+        with self._stats_lock:
+            self._stats["async_calls"] += 1
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._get_executor(), partial(fn, *args, **kwargs))
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._stats_lock:
+            stats = dict(self._stats)
+        with self._connections_lock:
+            stats["open_connections"] = len(self._connections)
+        return stats
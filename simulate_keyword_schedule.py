@@ -0,0 +1,59 @@
+"""
+Replay recorded keyword poll results under each keyword scheduling policy.
+
+Policies:
+1. round_robin - the fixed staggered rotation (every keyword gets the same interval)
+2. adaptive    - services/keyword_scheduler.py (new-listing rate x BUY yield,
+                 sqrt allocation with a per-keyword floor)
+
+Both run at the same number of searches per day, replaying the
+keyword_polls.jsonl written by the running poller (new listings per search
+keyword + the pipeline recommendation for each).
+
+Reports how many listings each policy would have found while still fresh
+(the poller skips listings older than 5 minutes), how many of the BUYs,
+and the posting-to-search lag.
+
+Usage:
+    python simulate_keyword_schedule.py
+    python simulate_keyword_schedule.py --log keyword_polls.jsonl --calls-per-day 10000
+"""
+
+import argparse
+from pathlib import Path
+
+from config import EBAY_BUDGET, KEYWORD_SCHEDULE
+from services.keyword_scheduler import POLICIES, load_poll_log, simulate
+
+DEFAULT_LOG = Path(__file__).parent / "keyword_polls.jsonl"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare keyword polling schedules on recorded arrivals")
+    parser.add_argument("--log", default=str(DEFAULT_LOG), help="keyword_polls.jsonl to replay")
+    parser.add_argument("--calls-per-day", type=float,
+                        default=EBAY_BUDGET.daily_calls * KEYWORD_SCHEDULE.poller_share,
+                        help="Searches per day for every policy (default: poller share of the quota)")
+    parser.add_argument("--policies", default=",".join(POLICIES), help="Comma-separated policies to run")
+    args = parser.parse_args()
+
+    arrivals = load_poll_log(Path(args.log)) if Path(args.log).exists() else []
+    if not arrivals:
+        raise SystemExit(f"No recorded arrivals in {args.log}")
+    keywords = len({a["keyword"] for a in arrivals})
+    print(f"Replaying {len(arrivals)} listings on {keywords} keywords from {args.log}, "
+          f"{args.calls_per_day:.0f} searches/day\n")
+
+    print(f"{'policy':<12} {'items':>6} {'caught':>7} {'buys':>5} {'caught':>7} {'calls':>8} "
+          f"{'lag p50':>8} {'lag p90':>8} {'buy p50':>8} {'buy p90':>8}")
+    fmt = lambda v: f"{v:.0f}s" if v is not None else "-"
+    for policy in args.policies.split(","):
+        r = simulate(arrivals, policy, calls_per_day=args.calls_per_day)
+        if not r.get("items"):
+            continue
+        print(f"{policy:<12} {r['items']:>6} {r['caught']:>7} {r['buys']:>5} {r['buys_caught']:>7} {r['calls']:>8} "
+              f"{fmt(r['lag_p50_s']):>8} {fmt(r['lag_p90_s']):>8} {fmt(r['buy_lag_p50_s']):>8} {fmt(r['buy_lag_p90_s']):>8}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+Replay tracked_items history under each sold-status scheduling policy.
+
+Policies:
+1. buckets  - the old fixed tiers (all < 10 min capped at 30, 10 from
+              10-60 min, 5 from 1-6 hr), one getItem call per item, every 5 min
+2. newest   - batched getItems, newest items first up to the call quota
+3. adaptive - services/sold_scheduler.py (age/price/recommendation/seller
+              intervals, most overdue first up to the call quota)
+
+Reports how many of the recorded fast sales (<= 5 min) each policy would
+have detected in time (by count and by listing value), plus API calls and
+detection lag.
+
+Usage:
+    python simulate_sold_schedule.py
+    python simulate_sold_schedule.py --db item_tracking.db --calls-per-cycle 10 --cycle 60
+    python simulate_sold_schedule.py --days 7
+"""
+
+import sqlite3
+import argparse
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from config import EBAY_BUDGET, SOLD_SCHEDULE
+from services.sold_scheduler import POLICIES, simulate
+
+DEFAULT_DB = Path(__file__).parent / "item_tracking.db"
+
+
+def load_history(db_path: Path, days: float = None) -> tuple:
+    conn = sqlite3.connect(db_path)
+    conn.row_factory = sqlite3.Row
+    query = """
+        SELECT item_id, price, recommendation, seller_name, first_seen,
+               sold_time, time_to_sell_minutes
+        FROM tracked_items
+    """
+    params = ()
+    if days:
+        query += " WHERE first_seen > ?"
+        params = ((datetime.now() - timedelta(days=days)).isoformat(),)
+    rows = [dict(row) for row in conn.execute(query, params)]
+    try:
+        hot = {row[0] for row in conn.execute(
+            "SELECT seller_name FROM seller_signals WHERE fast_sales >= 2") if row[0]}
+    except sqlite3.OperationalError:
+        hot = set()
+    conn.close()
+    return rows, hot
+
+
+def main():
+    default_calls = max(1, int(EBAY_BUDGET.daily_calls / 86400 * SOLD_SCHEDULE.cycle_seconds))
+    parser = argparse.ArgumentParser(description="Compare sold-status scheduling policies on tracked history")
+    parser.add_argument("--db", default=str(DEFAULT_DB), help="item_tracking.db to replay")
+    parser.add_argument("--days", type=float, help="Only replay items first seen in the last N days")
+    parser.add_argument("--cycle", type=float, default=SOLD_SCHEDULE.cycle_seconds,
+                        help="Seconds between scheduling cycles (newest/adaptive)")
+    parser.add_argument("--legacy-cycle", type=float, default=300, help="Seconds between cycles for 'buckets'")
+    parser.add_argument("--calls-per-cycle", type=int, default=default_calls,
+                        help="getItems calls available per cycle (default: full daily quota share)")
+    parser.add_argument("--policies", default=",".join(POLICIES), help="Comma-separated policies to run")
+    args = parser.parse_args()
+
+    rows, hot = load_history(Path(args.db), args.days)
+    if not rows:
+        raise SystemExit(f"No tracked items in {args.db}")
+    print(f"Replaying {len(rows)} tracked items ({len(hot)} hot sellers), "
+          f"{args.calls_per_cycle} calls/cycle\n")
+
+    print(f"{'policy':<10} {'fast':>6} {'caught':>7} {'$ caught':>9} {'sales':>7} {'checks':>8} {'calls':>8} "
+          f"{'calls/day':>10} {'lag p50':>8} {'lag p90':>8}")
+    for policy in args.policies.split(","):
+        cycle = args.legacy_cycle if policy == "buckets" else args.cycle
+        r = simulate(rows, policy, cycle_seconds=cycle, calls_per_cycle=args.calls_per_cycle,
+                     batch_size=EBAY_BUDGET.sold_poll_batch, hot_sellers=hot)
+        if not r.get("items"):
+            continue
+        lag50 = f"{r['detection_lag_p50_s']:.0f}s" if r["detection_lag_p50_s"] is not None else "-"
+        lag90 = f"{r['detection_lag_p90_s']:.0f}s" if r["detection_lag_p90_s"] is not None else "-"
+        value_pct = r["fast_sale_value_detected"] / r["fast_sale_value"] * 100 if r["fast_sale_value"] else 0
+        print(f"{policy:<10} {r['fast_sales']:>6} {r['fast_sales_detected']:>7} {value_pct:>8.0f}% {r['sales_detected']:>7} "
+              f"{r['checks']:>8} {r['api_calls']:>8} {r['calls_per_day']:>10} {lag50:>8} {lag90:>8}")
+
+
+if __name__ == "__main__":
+    main()
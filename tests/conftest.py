@@ -0,0 +1,17 @@
+"""
+Shared pytest setup: import the proxy from the repo root and point the
+runtime databases at a temp directory before any module opens them.
+"""
+
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+_RUNTIME_DIR = tempfile.mkdtemp(prefix="proxy-tests-")
+os.environ.setdefault("ITEM_TRACKING_DB", os.path.join(_RUNTIME_DIR, "item_tracking.db"))
+os.environ.setdefault("ALERT_STORE_DB", os.path.join(_RUNTIME_DIR, "alert_dedup.db"))
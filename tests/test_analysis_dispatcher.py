@@ -0,0 +1,91 @@
+"""Ordering of the poller analysis dispatcher under provider limits (services/analysis_dispatcher.py)"""
+
+import asyncio
+import types
+from dataclasses import replace
+
+from config import ANALYSIS_QUEUE
+from services.analysis_dispatcher import AnalysisDispatcher
+
+
+def make_dispatcher(workers: int, limits: dict) -> AnalysisDispatcher:
+    config = replace(ANALYSIS_QUEUE, workers=workers, provider_limits=limits, default_provider_limit=1,
+                     stale_after=60.0)
+    return AnalysisDispatcher(config, provider_for=lambda listing: listing.provider)
+
+
+def listing(title: str, provider: str):
+    return types.SimpleNamespace(title=title, provider=provider)
+
+
+class Recorder:
+    """Callback that records start/end order and per-provider concurrency"""
+
+    def __init__(self, hold: float = 0.02):
+        self.hold = hold
+        self.events = []
+        self.running = {}
+        self.peak = {}
+
+    async def __call__(self, item):
+        self.running[item.provider] = self.running.get(item.provider, 0) + 1
+        self.peak[item.provider] = max(self.peak.get(item.provider, 0), self.running[item.provider])
+        self.events.append(("start", item.title))
+        await asyncio.sleep(self.hold)
+        self.events.append(("end", item.title))
+        self.running[item.provider] -= 1
+
+    def started(self):
+        return [title for event, title in self.events if event == "start"]
+
+
+async def drain(dispatcher: AnalysisDispatcher, expected: int, timeout: float = 2.0):
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    while dispatcher.get_stats()["completed"] < expected and loop.time() < deadline:
+        await asyncio.sleep(0.005)
+    await dispatcher.stop()
+
+
+def test_full_provider_does_not_hold_back_others():
+    async def scenario():
+        dispatcher = make_dispatcher(workers=2, limits={"openai": 1, "anthropic": 1})
+        recorder = Recorder()
+        dispatcher.submit(recorder, listing("openai-1", "openai"), priority=90)
+        dispatcher.submit(recorder, listing("openai-2", "openai"), priority=80)
+        dispatcher.submit(recorder, listing("anthropic-1", "anthropic"), priority=10)
+        await drain(dispatcher, 3)
+        return recorder
+
+    recorder = asyncio.run(scenario())
+    # The second worker skips the blocked openai listing instead of parking on it
+    assert recorder.started()[:2] == ["openai-1", "anthropic-1"]
+    assert recorder.events.index(("start", "openai-2")) > recorder.events.index(("end", "openai-1"))
+
+
+def test_provider_limits_are_never_exceeded():
+    async def scenario():
+        dispatcher = make_dispatcher(workers=6, limits={"openai": 2, "anthropic": 1})
+        recorder = Recorder(hold=0.01)
+        for i in range(8):
+            dispatcher.submit(recorder, listing(f"o{i}", "openai"), priority=50 + i)
+            dispatcher.submit(recorder, listing(f"a{i}", "anthropic"), priority=50 + i)
+        await drain(dispatcher, 16)
+        return dispatcher, recorder
+
+    dispatcher, recorder = asyncio.run(scenario())
+    assert recorder.peak == {"openai": 2, "anthropic": 1}
+    assert dispatcher.get_stats()["completed"] == 16
+    assert dispatcher.get_stats()["in_flight"] == {}
+
+
+def test_highest_priority_runs_first_within_a_provider():
+    async def scenario():
+        dispatcher = make_dispatcher(workers=3, limits={"openai": 1})
+        recorder = Recorder(hold=0.005)
+        for title, priority in (("low", 10), ("high", 90), ("mid", 50)):
+            dispatcher.submit(recorder, listing(title, "openai"), priority=priority)
+        await drain(dispatcher, 3)
+        return recorder
+
+    assert asyncio.run(scenario()).started() == ["high", "mid", "low"]
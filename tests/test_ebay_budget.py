@@ -0,0 +1,100 @@
+"""Token-bucket arithmetic of the shared eBay call budget (services/ebay_budget.py)"""
+
+import types
+from dataclasses import replace
+
+import pytest
+
+from config import EBAY_BUDGET
+from services import ebay_budget as budget_module
+from services.ebay_budget import EbayCallBudget
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self) -> float:
+        return self.now
+
+    def advance(self, seconds: float):
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(budget_module, "time", types.SimpleNamespace(monotonic=fake.monotonic))
+    return fake
+
+
+def make_budget(**overrides) -> EbayCallBudget:
+    # 86400 calls/day = 1 token/s: 0.75/s to the main bucket, 0.25/s to the background share
+    settings = dict(daily_calls=86400, burst=10, background_reserve=2, background_share=0.25, background_burst=4)
+    config = replace(EBAY_BUDGET, **{**settings, **overrides})
+    return EbayCallBudget(config)
+
+
+def test_refill_is_split_between_buckets(clock):
+    budget = make_budget()
+    assert budget.rate == pytest.approx(0.75)
+    assert budget.background_rate == pytest.approx(0.25)
+
+
+def test_headroom_is_main_above_reserve_plus_background(clock):
+    budget = make_budget()
+    assert budget.headroom() == (10 - 2) + 4
+
+    budget.spend(7)  # 3 left: one above the reserve
+    assert budget.headroom() == 1 + 4
+
+
+def test_spend_floors_debt_at_minus_burst(clock):
+    budget = make_budget()
+    budget.spend(100)
+    stats = budget.get_stats()
+    assert stats["tokens"] == -10
+    assert stats["overspent"] == 100 - 10 - 10
+    assert budget.headroom() == 4  # only the background share is left
+
+
+def test_background_share_survives_saturated_poller(clock):
+    budget = make_budget()
+    budget.spend(100)
+    # Poller keeps spending faster than the whole refill for ten minutes
+    for _ in range(300):
+        clock.advance(2.0)
+        budget.spend(2)
+    assert budget.available == -10
+
+    assert budget.headroom() == 4
+    for _ in range(4):
+        assert budget.try_acquire(1) == 0.0
+    assert budget.headroom() == 0
+    # Next background token comes from the share's refill, not the indebted main bucket
+    assert budget.try_acquire(1) == pytest.approx(1 / 0.25)
+
+
+def test_try_acquire_prefers_main_bucket_above_reserve(clock):
+    budget = make_budget()
+    assert budget.try_acquire(3) == 0.0
+    stats = budget.get_stats()
+    assert stats["tokens"] == 7
+    assert stats["background_tokens"] == 4
+
+
+def test_throttle_empties_both_buckets(clock):
+    budget = make_budget()
+    budget.throttle()
+    assert budget.headroom() == 0
+    # Main needs reserve + 1 at 0.75/s, the share 1 token at 0.25/s
+    assert budget.try_acquire(1) == pytest.approx(min(3 / 0.75, 1 / 0.25))
+
+
+def test_zero_share_leaves_background_on_main_bucket_only(clock):
+    budget = make_budget(background_share=0.0)
+    assert budget.background_rate == 0.0
+    budget.spend(100)
+    budget.throttle()
+    assert budget.headroom() == 0
+    assert budget.try_acquire(1) == pytest.approx((1 + 2 + 10) / 1.0)
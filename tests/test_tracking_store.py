@@ -0,0 +1,97 @@
+"""Bulk vs. single-call parity of the item tracking store (services/item_tracking.py)"""
+
+import asyncio
+
+import pytest
+
+from services import item_tracking
+
+COMPARED_COLUMNS = ("item_id", "title", "price", "category", "alias", "seller_name", "posted_time",
+                    "recommendation", "original_data_json", "status", "check_count")
+
+FIRST_BATCH = [
+    dict(item_id="v1", title="14K Gold Chain 10g", price=250.0, category="gold", seller_name="s1"),
+    dict(item_id="v2", title="Sterling Spoon Lot", price="$45.50", category="silver", recommendation="PASS"),
+    dict(item_id="", title="Untitled 10k ring", price=80.0, original_data={"Title": "ring", "api_key": "x"}),
+    dict(item_id="v1", title="14K Gold Chain 10g", price=250.0, recommendation="BUY"),
+]
+
+SECOND_BATCH = [
+    dict(item_id="v2", title="Sterling Spoon Lot", price=45.5, recommendation="RESEARCH",
+         original_data={"Title": "spoons"}),
+    dict(item_id="v3", title="Omega Seamaster", price=900.0, category="watches"),
+    dict(item_id="v1", title="14K Gold Chain 10g", price=250.0),
+]
+
+CHECKS = [("v1", "active"), ("v2", "sold"), ("v1", "active"), ("missing", "active")]
+
+
+def snapshot():
+    rows = item_tracking.store.row_cursor().execute(
+        f"SELECT {', '.join(COMPARED_COLUMNS)} FROM tracked_items ORDER BY item_id").fetchall()
+    return [dict(row) for row in rows]
+
+
+@pytest.fixture
+def use_db(tmp_path):
+    """Point the tracking store at a fresh database file per call"""
+    def switch(name: str):
+        item_tracking.store.reopen(tmp_path / name)
+        item_tracking.init_database()
+    yield switch
+    item_tracking.store.reopen(item_tracking.DB_PATH)
+
+
+def run_single():
+    new_ids = []
+    for batch in (FIRST_BATCH, SECOND_BATCH):
+        for item in batch:
+            if item_tracking.track_item(**item):
+                new_ids.append(item_tracking._tracking_id(item["item_id"], item["title"], item["price"]))
+    for item_id, status in CHECKS:
+        item_tracking.update_item_check(item_id, status)
+    return new_ids
+
+
+def run_bulk():
+    new_ids = item_tracking.track_items_many(FIRST_BATCH) + item_tracking.track_items_many(SECOND_BATCH)
+    item_tracking.update_checks_many(CHECKS)
+    return new_ids
+
+
+def test_bulk_matches_single_calls(use_db):
+    use_db("single.db")
+    single_new = run_single()
+    single_rows = snapshot()
+
+    use_db("bulk.db")
+    bulk_new = run_bulk()
+    bulk_rows = snapshot()
+
+    assert sorted(bulk_new) == sorted(single_new)
+    assert len(single_new) == 4
+    assert bulk_rows == single_rows
+
+
+def test_batched_async_tracking_matches_single_calls(use_db):
+    use_db("single.db")
+    expected = [item_tracking.track_item(**item) for item in FIRST_BATCH]
+    single_rows = snapshot()
+
+    use_db("batched.db")
+    transactions = item_tracking.store.get_stats()["transactions"]
+
+    async def track_all():
+        return await asyncio.gather(*[item_tracking.track_item_batched(**item) for item in FIRST_BATCH])
+
+    assert asyncio.run(track_all()) == expected
+    assert snapshot() == single_rows
+    assert item_tracking.store.get_stats()["transactions"] == transactions + 1
+
+
+def test_rows_are_tuples_unless_a_row_cursor_is_asked_for(use_db):
+    use_db("rows.db")
+    item_tracking.track_item("v1", "14K Gold Chain 10g", 250.0)
+    row = item_tracking.store.connection().execute("SELECT item_id FROM tracked_items").fetchone()
+    assert row == ("v1",)
+    assert item_tracking.get_active_items()[0]["item_id"] == "v1"
@@ -97,6 +97,18 @@ from .budget import (
     OPENAI_HOURLY_BUDGET,
 )
 
+# Expiring seen-ID set (eBay poller dedup)
+from .expiring_set import ExpiringSet
+
+# Persistent alert dedup (Discord, Keepa)
+from .alert_store import AlertDedup, get_alert_dedup, stop_alert_flusher
+
+# Compiled multi-keyword title matching
+from .keyword_matcher import KeywordMatcher, matcher_for
+
+# Memoized single-pass listing feature extraction (weight, karat, flags)
+from .listing_features import ListingFeatures, get_listing_features
+
 # Unified Listing Adapter - normalizes both uBuyFirst and Direct API data
 from .listing_adapter import (
     StandardizedListing,
@@ -193,4 +205,16 @@ __all__ = [
     'set_hourly_budget',
     'reset_budget_tracker',
     'OPENAI_HOURLY_BUDGET',
+    # Expiring set
+    'ExpiringSet',
+    # Alert store
+    'AlertDedup',
+    'get_alert_dedup',
+    'stop_alert_flusher',
+    # Keyword matcher
+    'KeywordMatcher',
+    'matcher_for',
+    # Listing features
+    'ListingFeatures',
+    'get_listing_features',
 ]
@@ -36,6 +36,8 @@ from typing import Dict, List, Optional, Tuple
 from collections import defaultdict
 from datetime import datetime, timedelta
 
+from utils.keyword_matcher import KeywordMatcher
+
 logger = logging.getLogger(__name__)
 
 # Paths to data sources
@@ -57,6 +59,7 @@ _learned_patterns: Dict[str, List[Dict]] = {
 }
 _patterns_lock = threading.Lock()
 _last_reload = None
+_rule_indexes: Dict[str, "_RuleIndex"] = {}
 _stats = {
     "checks": 0,
     "pass_matches": 0,
@@ -68,6 +71,54 @@ _stats = {
 }
 
 
+class _RuleIndex:
+    """
+    Rules compiled into one keyword matcher.
+
+    first() returns the same rule the old `for rule in rules: if kw in title`
+    loop did - the earliest rule in list order whose keyword is a substring
+    of the title or one of the title's extracted keywords.
+    """
+
+    def __init__(self, rules: List[Dict], field: str):
+        self.rules = rules
+        self.index: Dict[str, int] = {}
+        for i, rule in enumerate(rules):
+            self.index.setdefault(rule[field], i)
+        self.matcher = KeywordMatcher(self.index)
+
+    def first(self, title_lower: str, title_keywords=()) -> Optional[Dict]:
+        if not self.rules:
+            return None
+        hits = self.matcher.find_all(title_lower)
+        hits.update(kw for kw in title_keywords if kw in self.index)
+        if not hits:
+            return None
+        return self.rules[min(self.index[kw] for kw in hits)]
+
+
+def _rebuild_matchers():
+    """Recompile rule matchers from _learned_patterns. Caller holds _patterns_lock."""
+    global _rule_indexes
+    _rule_indexes = {
+        "exact_phrases": _RuleIndex(_learned_patterns.get("exact_phrases", []), "phrase"),
+        # Only rules that can fire (thresholds are checked after a match)
+        "pass_keywords": _RuleIndex(
+            [r for r in _learned_patterns.get("pass_keywords", [])
+             if r["pass_rate"] >= 0.85 and r["pass_count"] >= 5],
+            "keyword",
+        ),
+        "buy_boost_keywords": _RuleIndex(_learned_patterns.get("buy_boost_keywords", []), "keyword"),
+        "missed_keywords": _RuleIndex(
+            [r for r in _learned_patterns.get("missed_keywords", []) if r["missed_count"] >= 3],
+            "keyword",
+        ),
+    }
+
+
+_rebuild_matchers()
+
+
 def extract_keywords(title: str) -> List[str]:
     """Extract meaningful keywords from title for pattern matching."""
     # Decode URL encoding
@@ -433,6 +484,7 @@ def reload_patterns(force: bool = False) -> int:
             "exact_phrases": pass_patterns.get("exact_phrases", []),
         }
         _last_reload = datetime.now()
+        _rebuild_matchers()
 
         # Update stats
         _stats["pass_rules"] = len(_learned_patterns["pass_keywords"])
@@ -485,32 +537,30 @@ def check_learned_pattern(title: str, category: str = "", price: float = 0) -> O
 
     with _patterns_lock:
         # Check exact phrases first (highest confidence)
-        for rule in _learned_patterns.get("exact_phrases", []):
-            if rule["phrase"] in title_lower:
-                _stats["matches"] += 1
-                logger.info(f"[ADAPTIVE] MATCH phrase '{rule['phrase']}' (seen {rule['count']}x) -> PASS")
-                return {
-                    "action": "PASS",
-                    "reason": f"ADAPTIVE: '{rule['phrase']}' matched (overridden {rule['count']}x before)",
-                    "pattern_type": "exact_phrase",
-                    "pattern": rule["phrase"],
-                }
-
-        # Check PASS keywords
+        rule = _rule_indexes["exact_phrases"].first(title_lower)
+        if rule:
+            _stats["matches"] += 1
+            logger.info(f"[ADAPTIVE] MATCH phrase '{rule['phrase']}' (seen {rule['count']}x) -> PASS")
+            return {
+                "action": "PASS",
+                "reason": f"ADAPTIVE: '{rule['phrase']}' matched (overridden {rule['count']}x before)",
+                "pattern_type": "exact_phrase",
+                "pattern": rule["phrase"],
+            }
+
+        # Check PASS keywords (index only holds rules with high pass rate for single keyword match)
         title_keywords = set(extract_keywords(title))
-        for rule in _learned_patterns.get("pass_keywords", []):
-            if rule["keyword"] in title_keywords or rule["keyword"] in title_lower:
-                # Require high pass rate for single keyword match
-                if rule["pass_rate"] >= 0.85 and rule["pass_count"] >= 5:
-                    _stats["pass_matches"] += 1
-                    logger.info(f"[ADAPTIVE] MATCH keyword '{rule['keyword']}' "
-                               f"({rule['pass_count']}/{rule['total_count']} = {rule['pass_rate']*100:.0f}% PASS) -> PASS")
-                    return {
-                        "action": "PASS",
-                        "reason": f"ADAPTIVE: keyword '{rule['keyword']}' -> PASS {rule['pass_rate']*100:.0f}% of time ({rule['pass_count']} cases)",
-                        "pattern_type": "keyword",
-                        "pattern": rule["keyword"],
-                    }
+        rule = _rule_indexes["pass_keywords"].first(title_lower, title_keywords)
+        if rule:
+            _stats["pass_matches"] += 1
+            logger.info(f"[ADAPTIVE] MATCH keyword '{rule['keyword']}' "
+                       f"({rule['pass_count']}/{rule['total_count']} = {rule['pass_rate']*100:.0f}% PASS) -> PASS")
+            return {
+                "action": "PASS",
+                "reason": f"ADAPTIVE: keyword '{rule['keyword']}' -> PASS {rule['pass_rate']*100:.0f}% of time ({rule['pass_count']} cases)",
+                "pattern_type": "keyword",
+                "pattern": rule["keyword"],
+            }
 
         # Category + price rules DISABLED - too broad, would PASS good deals
         # TODO: Re-enable with much higher thresholds or more specific conditions
@@ -546,18 +596,18 @@ def get_buy_boost(title: str, category: str = "", price: float = 0) -> Optional[
     title_keywords = set(extract_keywords(title))
 
     with _patterns_lock:
-        for rule in _learned_patterns.get("buy_boost_keywords", []):
-            if rule["keyword"] in title_keywords or rule["keyword"] in title_lower:
-                _stats["buy_boosts"] += 1
-                logger.info(f"[ADAPTIVE] BUY BOOST '{rule['keyword']}' "
-                           f"(avg profit ${rule['avg_profit']:.0f}) -> +{rule['confidence_boost']} confidence")
-                return {
-                    "action": "BOOST",
-                    "confidence_boost": rule["confidence_boost"],
-                    "reason": f"ADAPTIVE: '{rule['keyword']}' profitable {rule['count']}x (avg ${rule['avg_profit']:.0f})",
-                    "pattern_type": "buy_boost",
-                    "pattern": rule["keyword"],
-                }
+        rule = _rule_indexes["buy_boost_keywords"].first(title_lower, title_keywords)
+        if rule:
+            _stats["buy_boosts"] += 1
+            logger.info(f"[ADAPTIVE] BUY BOOST '{rule['keyword']}' "
+                       f"(avg profit ${rule['avg_profit']:.0f}) -> +{rule['confidence_boost']} confidence")
+            return {
+                "action": "BOOST",
+                "confidence_boost": rule["confidence_boost"],
+                "reason": f"ADAPTIVE: '{rule['keyword']}' profitable {rule['count']}x (avg ${rule['avg_profit']:.0f})",
+                "pattern_type": "buy_boost",
+                "pattern": rule["keyword"],
+            }
 
     return None
 
@@ -577,17 +627,17 @@ def get_missed_alert(title: str, category: str = "", price: float = 0) -> Option
     title_keywords = set(extract_keywords(title))
 
     with _patterns_lock:
-        for rule in _learned_patterns.get("missed_keywords", []):
-            if rule["keyword"] in title_keywords or rule["keyword"] in title_lower:
-                if rule["missed_count"] >= 3:  # Only alert if missed 3+ times
-                    logger.info(f"[ADAPTIVE] MISSED ALERT '{rule['keyword']}' "
-                               f"(missed {rule['missed_count']}x, avg sold {rule['avg_sell_time_min']:.0f}min)")
-                    return {
-                        "action": "RESEARCH",
-                        "reason": rule["reason"],
-                        "pattern_type": "missed",
-                        "pattern": rule["keyword"],
-                    }
+        # Index only holds rules missed 3+ times
+        rule = _rule_indexes["missed_keywords"].first(title_lower, title_keywords)
+        if rule:
+            logger.info(f"[ADAPTIVE] MISSED ALERT '{rule['keyword']}' "
+                       f"(missed {rule['missed_count']}x, avg sold {rule['avg_sell_time_min']:.0f}min)")
+            return {
+                "action": "RESEARCH",
+                "reason": rule["reason"],
+                "pattern_type": "missed",
+                "pattern": rule["keyword"],
+            }
 
     return None
 
@@ -714,6 +764,7 @@ def inject_historical_patterns():
         for pattern in HISTORICAL_BUY_BOOST_PATTERNS:
             if pattern["keyword"].lower() not in existing_buy_keywords:
                 _learned_patterns["buy_boost_keywords"].append(pattern)
+        _rebuild_matchers()
 
         # Historical PASS patterns need special handling with price thresholds
         # They're checked in check_learned_pattern_with_price()
@@ -0,0 +1,400 @@
+"""
+Alert Dedup Store - "was this already alerted?" shared by every alert sender
+
+Replaces the JSON files that were rewritten in full on every alert
+(discord_sent_alerts.json, alerted_asins.json). One SQLite table holds
+(namespace, key, sent_at) rows for all senders:
+
+- discord: utils/discord.py title+price keys (30 minute window)
+- keepa: ASINs alerted by the KeepaTracker engine and deal_monitor.py
+  (24 hour window, shared across processes)
+
+Each namespace keeps its unexpired keys in memory in time order, so expiry
+only pops from the head instead of scanning every entry. The database is
+opened and a namespace's keys are loaded on first use, not at import.
+Marks are buffered and written in one transaction per flush; flushes run on
+a worker thread when called from the event loop, and expired rows are
+compacted away every COMPACT_INTERVAL seconds. The first mark made on an
+event loop starts a periodic flusher, so a quiet period after a few alerts
+still gets them written within FLUSH_INTERVAL.
+
+Shared namespaces (marked by several processes) never query the table from
+the event loop: the flusher pulls other processes' new marks into memory on
+a worker thread every FLUSH_INTERVAL. Outside an event loop a miss is looked
+up directly.
+
+Usage:
+    dedup = get_alert_dedup("discord", window=1800)
+    if dedup.check_and_mark(key):   # True = not alerted within the window
+        ...
+    await dedup.aflush()            # or let the periodic flush pick it up
+    await stop_alert_flusher()      # shutdown: stop the flusher, write everything
+"""
+
+import os
+import time
+import atexit
+import asyncio
+import logging
+import sqlite3
+import threading
+from pathlib import Path
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Mapping, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+ALERT_STORE_DB = os.getenv("ALERT_STORE_DB", str(Path(__file__).resolve().parent.parent / "alert_dedup.db"))
+
+FLUSH_BATCH = 25          # pending marks that trigger a flush
+FLUSH_INTERVAL = 10.0     # seconds between flushes while marks are pending
+COMPACT_INTERVAL = 600.0  # seconds between deletes of expired rows
+
+
+class AlertStoreDB:
+    """One SQLite connection (WAL) holding every namespace's alert rows"""
+
+    def __init__(self, path: str = ALERT_STORE_DB):
+        self.path = str(path)
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(self.path, check_same_thread=False, timeout=10.0)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS sent_alerts (
+                namespace TEXT NOT NULL,
+                key TEXT NOT NULL,
+                sent_at REAL NOT NULL,
+                PRIMARY KEY (namespace, key)
+            )
+        """)
+        self.conn.commit()
+
+    def load(self, namespace: str, since: float) -> List[Tuple[str, float]]:
+        with self.lock:
+            return self.conn.execute(
+                "SELECT key, sent_at FROM sent_alerts WHERE namespace = ? AND sent_at > ? ORDER BY sent_at",
+                (namespace, since),
+            ).fetchall()
+
+    def lookup(self, namespace: str, key: str) -> Optional[float]:
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT sent_at FROM sent_alerts WHERE namespace = ? AND key = ?", (namespace, key)
+            ).fetchone()
+        return row[0] if row else None
+
+    def count(self, namespace: str) -> int:
+        with self.lock:
+            return self.conn.execute("SELECT COUNT(*) FROM sent_alerts WHERE namespace = ?", (namespace,)).fetchone()[0]
+
+    def write(self, namespace: str, rows: Iterable[Tuple[str, float]], expire_before: Optional[float] = None):
+        """Upsert rows (keeping the newest sent_at) and optionally delete expired ones, in one transaction"""
+        with self.lock:
+            self.conn.executemany(
+                "INSERT INTO sent_alerts (namespace, key, sent_at) VALUES (?, ?, ?) "
+                "ON CONFLICT(namespace, key) DO UPDATE SET sent_at = MAX(sent_at, excluded.sent_at)",
+                [(namespace, key, sent_at) for key, sent_at in rows],
+            )
+            if expire_before is not None:
+                self.conn.execute(
+                    "DELETE FROM sent_alerts WHERE namespace = ? AND sent_at <= ?", (namespace, expire_before)
+                )
+            self.conn.commit()
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
+
+
+class AlertDedup:
+    """
+    Keys alerted within the last `window` seconds for one namespace.
+
+    shared=True also picks up keys marked by other processes: refresh()
+    (run off the loop by the periodic flusher) pulls new rows into memory,
+    and a miss outside an event loop is looked up in the table.
+    """
+
+    def __init__(self, namespace: str, window: float, db: Optional[AlertStoreDB] = None, shared: bool = False):
+        self.namespace = namespace
+        self.window = window
+        self._db = db
+        self._loaded = False
+        self.shared = shared
+        self.entries: "OrderedDict[str, float]" = OrderedDict()  # key -> sent_at, oldest first
+        self._pending: Dict[str, float] = {}
+        self._lock = threading.Lock()
+        self._flushing = False
+        self._last_flush = time.time()
+        self._last_compact = 0.0
+        self._synced_at = 0.0  # newest sent_at read from the store
+        self._stats = {"checks": 0, "suppressed": 0, "marked": 0, "flushes": 0, "rows_written": 0,
+                       "refreshed": 0}
+
+    @property
+    def db(self) -> AlertStoreDB:
+        """The store (the process-wide one unless given, opened on first use)"""
+        if self._db is None:
+            self._db = get_alert_store()
+        return self._db
+
+    def _load(self):
+        """Load unexpired keys from the store on first use. Caller holds the lock."""
+        if not self._loaded:
+            self.entries.update(self.db.load(self.namespace, time.time() - self.window))
+            if self.entries:
+                self._synced_at = next(reversed(self.entries.values()))
+            self._loaded = True
+
+    def load(self):
+        """Load the namespace now (blocking - use from a worker thread or at startup)"""
+        with self._lock:
+            self._load()
+
+    def _expire(self, now: float):
+        """Pop expired keys from the head. Caller holds the lock."""
+        cutoff = now - self.window
+        entries = self.entries
+        while entries:
+            key, sent_at = next(iter(entries.items()))
+            if sent_at > cutoff:
+                break
+            entries.popitem(last=False)
+
+    def _insert(self, key: str, sent_at: float):
+        """Insert keeping time order (marks are almost always the newest). Caller holds the lock."""
+        entries = self.entries
+        entries.pop(key, None)
+        entries[key] = sent_at
+        if len(entries) > 1 and sent_at < next(reversed(entries.items()))[1]:
+            ordered = sorted(entries.items(), key=lambda kv: kv[1])
+            entries.clear()
+            entries.update(ordered)
+
+    def last_sent(self, key: str) -> Optional[float]:
+        """When key was last alerted within the window, else None"""
+        now = time.time()
+        with self._lock:
+            self._load()
+            self._expire(now)
+            sent_at = self.entries.get(key)
+        if sent_at is None and self.shared:
+            if _on_event_loop():
+                # Other processes' marks arrive through refresh() on the flusher
+                _ensure_flusher()
+                return None
+            sent_at = self.db.lookup(self.namespace, key)
+            if sent_at is not None and now - sent_at < self.window:
+                with self._lock:
+                    self._insert(key, sent_at)
+            else:
+                sent_at = None
+        return sent_at
+
+    def is_recent(self, key: str) -> bool:
+        """True if key was alerted within the window"""
+        self._stats["checks"] += 1
+        if self.last_sent(key) is None:
+            return False
+        self._stats["suppressed"] += 1
+        return True
+
+    def mark(self, key: str, sent_at: Optional[float] = None):
+        """Record an alert for key (written with the next flush)"""
+        sent_at = time.time() if sent_at is None else sent_at
+        with self._lock:
+            self._load()
+            self._insert(key, sent_at)
+            self._pending[key] = sent_at
+            pending = len(self._pending)
+        self._stats["marked"] += 1
+        _ensure_flusher()
+        if pending >= FLUSH_BATCH or time.time() - self._last_flush >= FLUSH_INTERVAL:
+            self._schedule_flush()
+
+    def check_and_mark(self, key: str) -> bool:
+        """Mark key and return True unless it was alerted within the window"""
+        if self.is_recent(key):
+            return False
+        self.mark(key)
+        return True
+
+    def refresh(self) -> int:
+        """Pull keys marked (by any process) since the last refresh into memory (blocking)"""
+        with self._lock:
+            self._load()
+            since = max(self._synced_at, time.time() - self.window)
+        rows = self.db.load(self.namespace, since)
+        with self._lock:
+            for key, sent_at in rows:
+                if sent_at > self.entries.get(key, 0.0):
+                    self._insert(key, sent_at)
+            if rows:
+                self._synced_at = max(self._synced_at, rows[-1][1])
+        self._stats["refreshed"] += len(rows)
+        return len(rows)
+
+    def import_entries(self, entries: Mapping[str, float]):
+        """Bring in legacy (key -> unix time) entries that are still inside the window"""
+        cutoff = time.time() - self.window
+        rows = [(key, sent_at) for key, sent_at in entries.items() if sent_at > cutoff]
+        if not rows:
+            return 0
+        with self._lock:
+            self._load()
+            for key, sent_at in sorted(rows, key=lambda kv: kv[1]):
+                self._insert(key, sent_at)
+        self.db.write(self.namespace, rows)
+        return len(rows)
+
+    def __contains__(self, key: str) -> bool:
+        return self.last_sent(key) is not None
+
+    def __len__(self) -> int:
+        with self._lock:
+            self._load()
+            self._expire(time.time())
+            return len(self.entries)
+
+    # ----------------------------------------------------------
+    # Persistence
+    # ----------------------------------------------------------
+
+    def _schedule_flush(self):
+        """Flush on a worker thread when on the event loop, inline otherwise"""
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self.flush()
+            return
+        if not self._flushing:
+            self._flushing = True
+            loop.run_in_executor(None, self._drain)
+
+    def _drain(self):
+        """Worker-thread flush loop: keeps writing while marks arrive during a write"""
+        try:
+            while self.flush():
+                pass
+        finally:
+            self._flushing = False
+
+    def flush(self) -> int:
+        """Write pending marks in one transaction (compacting periodically); returns rows written"""
+        now = time.time()
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            self._last_flush = now
+            compact = self._loaded and now - self._last_compact >= COMPACT_INTERVAL
+            if compact:
+                self._last_compact = now
+        try:
+            if pending or compact:
+                self.db.write(self.namespace, pending.items(), expire_before=now - self.window if compact else None)
+        except sqlite3.Error as e:
+            logger.error(f"[ALERTS] Error writing {self.namespace} alerts: {e}")
+            with self._lock:
+                for key, sent_at in pending.items():
+                    self._pending.setdefault(key, sent_at)
+            return 0
+        if pending:
+            self._stats["flushes"] += 1
+            self._stats["rows_written"] += len(pending)
+        return len(pending)
+
+    async def aflush(self) -> int:
+        """flush() without blocking the event loop"""
+        return await asyncio.to_thread(self.flush)
+
+    def flush_due(self, interval: float = FLUSH_INTERVAL) -> bool:
+        """Marks pending longer than interval, or expired rows due for compaction"""
+        now = time.time()
+        if self._pending and now - self._last_flush >= interval:
+            return True
+        return self._loaded and now - self._last_compact >= COMPACT_INTERVAL
+
+    def maybe_flush(self, interval: float = FLUSH_INTERVAL):
+        """Flush if marks are pending and the last flush is older than interval (or compaction is due)"""
+        if self.flush_due(interval):
+            self._schedule_flush()
+
+    def get_stats(self) -> Dict:
+        return {
+            "namespace": self.namespace,
+            "window_seconds": self.window,
+            "tracked": len(self),
+            "pending_writes": len(self._pending),
+            **self._stats,
+        }
+
+
+# Global store instances (one connection per process, one dedup per namespace)
+_store_db: Optional[AlertStoreDB] = None
+_store_lock = threading.Lock()
+_dedups: Dict[str, AlertDedup] = {}
+_flush_task: Optional[asyncio.Task] = None
+
+
+def _on_event_loop() -> bool:
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return False
+    return True
+
+
+def get_alert_store() -> AlertStoreDB:
+    global _store_db
+    if _store_db is None:
+        with _store_lock:
+            if _store_db is None:
+                _store_db = AlertStoreDB()
+                atexit.register(flush_all)
+    return _store_db
+
+
+def get_alert_dedup(namespace: str, window: float, shared: bool = False) -> AlertDedup:
+    """The process-wide dedup for a namespace (no database access until first use)"""
+    if namespace not in _dedups:
+        _dedups[namespace] = AlertDedup(namespace, window, shared=shared)
+    return _dedups[namespace]
+
+
+async def _flush_loop(interval: float):
+    while True:
+        await asyncio.sleep(interval)
+        for dedup in list(_dedups.values()):
+            try:
+                dedup.maybe_flush(interval)
+                if dedup.shared:
+                    await asyncio.to_thread(dedup.refresh)
+            except Exception as e:
+                logger.error(f"[ALERTS] Periodic flush of {dedup.namespace} failed: {e}")
+
+
+def _ensure_flusher():
+    """Start the periodic flusher on the running loop (no-op outside one)"""
+    global _flush_task
+    if _flush_task is not None and not _flush_task.done():
+        return
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        return
+    _flush_task = loop.create_task(_flush_loop(FLUSH_INTERVAL))
+
+
+async def stop_alert_flusher():
+    """Stop the periodic flusher and write every pending mark (app shutdown)"""
+    global _flush_task
+    if _flush_task is not None:
+        _flush_task.cancel()
+        await asyncio.gather(_flush_task, return_exceptions=True)
+        _flush_task = None
+    await asyncio.to_thread(flush_all)
+
+
+def flush_all():
+    """Write every namespace's pending marks (atexit / shutdown)"""
+    for dedup in _dedups.values():
+        dedup.flush()
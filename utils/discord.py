@@ -5,7 +5,6 @@ Functions for sending Discord alerts with deduplication.
 """
 
 import json
-import time as _time
 import logging
 import subprocess
 import urllib.parse
@@ -14,7 +13,8 @@ from pathlib import Path
 from datetime import datetime
 from typing import Dict, Optional
 
-import httpx
+from services.http_clients import http_clients
+from .alert_store import get_alert_dedup
 
 logger = logging.getLogger(__name__)
 
@@ -22,87 +22,66 @@ logger = logging.getLogger(__name__)
 # DISCORD ALERT DEDUPLICATION (PERSISTENT)
 # ============================================================
 
-DISCORD_ALERTS_FILE = Path("discord_sent_alerts.json")
-DISCORD_SENT_ALERTS: Dict[str, float] = {}  # {item_key: timestamp}
+DISCORD_ALERTS_FILE = Path("discord_sent_alerts.json")  # legacy file, imported at startup
 DISCORD_DEDUP_WINDOW = 1800  # 30 minutes
 _DISCORD_LOCK = asyncio.Lock()  # Lock for thread-safe duplicate checking
 
+# Sent alerts live in the shared alert store (utils/alert_store.py)
+_discord_dedup = get_alert_dedup("discord", DISCORD_DEDUP_WINDOW)
+
+
+def _alert_key(title: str, price: float) -> str:
+    return f"{title[:50].lower().strip()}_{price:.2f}"
+
 
 def load_discord_alerts() -> Dict[str, float]:
-    """Load sent alerts from file to survive restarts"""
-    if DISCORD_ALERTS_FILE.exists():
+    """
+    Load recent sent alerts, importing the legacy JSON file on first run.
+    Blocking - the lifespan startup runs it via asyncio.to_thread.
+    """
+    _discord_dedup.load()
+    if DISCORD_ALERTS_FILE.exists() and not _discord_dedup.db.count("discord"):
         try:
             with open(DISCORD_ALERTS_FILE, 'r') as f:
-                data = json.load(f)
-                alerts = data.get('alerts', {})
-                # Clean old entries on load
-                current_time = _time.time()
-                alerts = {k: v for k, v in alerts.items() if current_time - v < DISCORD_DEDUP_WINDOW}
-                logger.info(f"[DISCORD] Loaded {len(alerts)} recent alerts from file")
-                return alerts
+                alerts = json.load(f).get('alerts', {})
+            imported = _discord_dedup.import_entries(alerts)
+            logger.info(f"[DISCORD] Imported {imported} recent alerts from {DISCORD_ALERTS_FILE}")
         except Exception as e:
             logger.error(f"[DISCORD] Error loading alerts file: {e}")
-    return {}
+    return _discord_dedup.entries
 
 
 def save_discord_alerts():
-    """Save sent alerts to file"""
-    try:
-        with open(DISCORD_ALERTS_FILE, 'w') as f:
-            json.dump({
-                'alerts': DISCORD_SENT_ALERTS,
-                'updated': datetime.now().isoformat(),
-                'count': len(DISCORD_SENT_ALERTS)
-            }, f, indent=2)
-    except Exception as e:
-        logger.error(f"[DISCORD] Error saving alerts file: {e}")
+    """Write pending sent-alert marks to the alert store"""
+    _discord_dedup.flush()
 
 
 def is_duplicate_alert(title: str, price: float) -> bool:
     """Check if this alert was recently sent"""
-    global DISCORD_SENT_ALERTS
-
-    item_key = f"{title[:50].lower().strip()}_{price:.2f}"
-    current_time = _time.time()
-
-    # Clean old entries
-    expired_keys = [k for k, t in DISCORD_SENT_ALERTS.items() if current_time - t > DISCORD_DEDUP_WINDOW]
-    for k in expired_keys:
-        del DISCORD_SENT_ALERTS[k]
-
-    return item_key in DISCORD_SENT_ALERTS
+    return _discord_dedup.is_recent(_alert_key(title, price))
 
 
 def mark_alert_sent(title: str, price: float):
-    """Mark an alert as sent"""
-    global DISCORD_SENT_ALERTS
-
-    item_key = f"{title[:50].lower().strip()}_{price:.2f}"
-    DISCORD_SENT_ALERTS[item_key] = _time.time()
-    save_discord_alerts()
+    """Mark an alert as sent (persisted in batches, off the event loop)"""
+    _discord_dedup.mark(_alert_key(title, price))
 
 
 def get_alert_count() -> int:
     """Get number of alerts in dedup cache"""
-    return len(DISCORD_SENT_ALERTS)
+    return len(_discord_dedup)
 
 
 def clear_old_alerts():
     """Clean up expired alerts"""
-    global DISCORD_SENT_ALERTS
-
-    current_time = _time.time()
-    expired_keys = [k for k, t in DISCORD_SENT_ALERTS.items() if current_time - t > DISCORD_DEDUP_WINDOW]
-    for k in expired_keys:
-        del DISCORD_SENT_ALERTS[k]
-
-    if expired_keys:
-        save_discord_alerts()
-        logger.info(f"[DISCORD] Cleaned up {len(expired_keys)} expired alerts")
+    tracked = len(_discord_dedup.entries)
+    expired = tracked - len(_discord_dedup)
+    _discord_dedup.maybe_flush(interval=0)
+    if expired > 0:
+        logger.info(f"[DISCORD] Cleaned up {expired} expired alerts")
 
 
-# Load alerts on module init
-DISCORD_SENT_ALERTS = load_discord_alerts()
+# Time-ordered key -> sent_at view of the store (filled by load_discord_alerts or first use)
+DISCORD_SENT_ALERTS = _discord_dedup.entries
 
 
 # ============================================================
@@ -248,7 +227,7 @@ async def send_discord_alert(
             payload["content"] = f"**SNIPE ALERT** - {category.upper()} - ${price:.2f} - Profit: {profit_str}"
 
         # Send webhook
-        async with httpx.AsyncClient(timeout=10.0) as http_client:
+        async with http_clients.session("discord", timeout=10.0) as http_client:
             response = await http_client.post(webhook_url, json=payload)
 
             if response.status_code in (200, 204):
@@ -285,7 +264,7 @@ async def send_simple_discord_message(webhook_url: str, message: str, username:
         return False
 
     try:
-        async with httpx.AsyncClient(timeout=10.0) as http_client:
+        async with http_clients.session("discord", timeout=10.0) as http_client:
             response = await http_client.post(
                 webhook_url,
                 json={"username": username, "content": message}
@@ -0,0 +1,154 @@
+"""
+Expiring Set - seen-ID tracking with O(1) amortized expiry
+
+Used by the eBay poller to remember which listings it has already emitted.
+Entries live in an OrderedDict in insertion (= time) order, so expiring old
+entries only pops from the head instead of scanning everything, and a whole
+poll result can be checked-and-marked under one lock acquisition.
+
+Persists to a compact text file (one "<age offset> <id>" line per entry) so a
+restart doesn't re-emit everything in the first baseline poll.
+"""
+
+import os
+import time
+import logging
+import threading
+from pathlib import Path
+from collections import OrderedDict
+from typing import Iterable, List, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+
+class ExpiringSet:
+    """
+    Set of string keys that forget themselves after max_age seconds.
+
+    Usage:
+        seen = ExpiringSet(max_age=3600)
+        if seen.add("12345"):            # True = was new
+            ...
+        new_ids = seen.add_many(ids)     # batch check-and-mark for a poll result
+    """
+
+    def __init__(self, max_age: float, path: Optional[Path] = None):
+        self.max_age = max_age
+        self.path = Path(path) if path else None
+        self._entries: "OrderedDict[str, float]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._dirty = False
+        self._last_save = 0.0
+
+    def _expire(self, now: float):
+        """Pop expired entries from the head (oldest first). Caller holds the lock."""
+        cutoff = now - self.max_age
+        entries = self._entries
+        while entries:
+            key, added = next(iter(entries.items()))
+            if added > cutoff:
+                break
+            entries.popitem(last=False)
+
+    def add(self, key: str) -> bool:
+        """Mark key as seen. Returns True if it was not already seen."""
+        now = time.time()
+        with self._lock:
+            self._expire(now)
+            if key in self._entries:
+                return False
+            self._entries[key] = now
+            self._dirty = True
+            return True
+
+    def add_many(self, keys: Iterable[str]) -> Set[str]:
+        """Mark every key as seen, return the subset that was new."""
+        now = time.time()
+        new_keys = set()
+        with self._lock:
+            self._expire(now)
+            entries = self._entries
+            for key in keys:
+                if key not in entries:
+                    entries[key] = now
+                    new_keys.add(key)
+            if new_keys:
+                self._dirty = True
+        return new_keys
+
+    def __contains__(self, key: str) -> bool:
+        with self._lock:
+            added = self._entries.get(key)
+            return added is not None and time.time() - added < self.max_age
+
+    def __len__(self) -> int:
+        with self._lock:
+            self._expire(time.time())
+            return len(self._entries)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._dirty = True
+
+    # ----------------------------------------------------------
+    # Persistence
+    # ----------------------------------------------------------
+
+    def save(self, path: Optional[Path] = None) -> int:
+        """Write unexpired entries to disk atomically, return count written."""
+        path = Path(path) if path else self.path
+        if not path:
+            return 0
+        now = time.time()
+        with self._lock:
+            self._expire(now)
+            lines = [f"{int(now - added)} {key}" for key, added in self._entries.items()]
+            self._dirty = False
+            self._last_save = now
+        tmp = path.with_suffix(path.suffix + ".tmp")
+        try:
+            tmp.write_text(f"{int(now)}\n" + "\n".join(lines))
+            os.replace(tmp, path)
+        except OSError as e:
+            logger.warning(f"[SEEN] Could not save {path.name}: {e}")
+            return 0
+        return len(lines)
+
+    def maybe_save(self, interval: float = 30.0) -> int:
+        """Save if anything changed and the last save is older than interval."""
+        if not self._dirty or time.time() - self._last_save < interval:
+            return 0
+        return self.save()
+
+    def load(self, path: Optional[Path] = None) -> int:
+        """Load entries saved by save(), dropping any that expired meanwhile."""
+        path = Path(path) if path else self.path
+        if not path or not path.exists():
+            return 0
+        try:
+            saved_at_line, *lines = path.read_text().splitlines()
+            saved_at = float(saved_at_line)
+        except (OSError, ValueError) as e:
+            logger.warning(f"[SEEN] Could not load {path.name}: {e}")
+            return 0
+        cutoff = time.time() - self.max_age
+        loaded: List[tuple] = []
+        for line in lines:
+            age, _, key = line.partition(" ")
+            try:
+                added = saved_at - int(age)
+            except ValueError:
+                continue
+            if key and added > cutoff:
+                loaded.append((added, key))
+        loaded.sort()
+        with self._lock:
+            for added, key in loaded:
+                if key not in self._entries:
+                    self._entries[key] = added
+            # Keep insertion order == time order if entries were already present
+            if len(self._entries) != len(loaded):
+                self._entries = OrderedDict(sorted(self._entries.items(), key=lambda kv: kv[1]))
+            self._last_save = time.time()
+        return len(loaded)
@@ -0,0 +1,156 @@
+"""
+Keyword Matcher - compiled multi-keyword substring matching
+
+Replaces `for kw in KEYWORDS: if kw in title` loops with one compiled regex
+per keyword list. Keywords are folded into a trie-shaped alternation
+(shared prefixes are matched once), so each title is scanned in a single
+pass no matter how many keywords there are.
+
+Semantics match the loops they replace:
+- matching is plain, case-sensitive substring matching (callers lowercase)
+- first() returns the earliest keyword *in list order* that occurs, exactly
+  like `next((kw for kw in keywords if kw in text), None)`
+- find_all() returns every keyword that occurs, including overlapping ones
+
+Hot paths hold a matcher built once per list (module level, class level,
+or when a configure_*() call hands in a new list): matcher_for() has to
+turn the list into a tuple, hash it and take a lock on every call, which
+costs more than scanning a short title.
+
+Usage:
+    from utils.keyword_matcher import KeywordMatcher
+
+    INSTANT_PASS_MATCHER = KeywordMatcher(INSTANT_PASS_KEYWORDS)
+
+    if INSTANT_PASS_MATCHER.search(title_lower):      # boolean filter
+        ...
+    hit = INSTANT_PASS_MATCHER.first(title_lower)     # which keyword (logging)
+"""
+
+import re
+import threading
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+# Compiled matchers kept by matcher_for() (keyed by keyword tuple)
+MAX_CACHED_MATCHERS = 64
+
+
+def _trie_pattern(keywords: Iterable[str]) -> str:
+    """Build a regex alternation shaped like a trie of the keywords.
+
+    At any position the pattern matches the longest keyword starting there
+    (a terminal node with children becomes an optional, greedy group).
+    """
+    trie: Dict = {}
+    for kw in keywords:
+        node = trie
+        for ch in kw:
+            node = node.setdefault(ch, {})
+        node[""] = True
+
+    def build(node: Dict) -> str:
+        terminal = "" in node
+        branches = [re.escape(ch) + build(child) for ch, child in node.items() if ch != ""]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        if terminal:
+            return "(?:" + body + ")?"
+        return body
+
+    return build(trie)
+
+
+class KeywordMatcher:
+    """One keyword list compiled into a single-pass matcher."""
+
+    def __init__(self, keywords: Iterable[str]):
+        # Preserve list order (first() semantics) and drop duplicates/empties
+        self.keywords: List[str] = list(dict.fromkeys(kw for kw in keywords if kw))
+        self._order = {kw: i for i, kw in enumerate(self.keywords)}
+
+        self._search_re = re.compile(_trie_pattern(self.keywords)) if self.keywords else None
+
+        # A hit of keyword L at some position implies a hit of every other
+        # keyword that is a prefix of L at the same position
+        self._prefixes: Dict[str, Tuple[str, ...]] = {
+            kw: tuple(other for other in self.keywords if other != kw and kw.startswith(other))
+            for kw in self.keywords
+        }
+        # (list index, keyword) of the earliest-listed keyword such a hit implies
+        self._earliest: Dict[str, Tuple[int, str]] = {
+            kw: min((self._order[k], k) for k in (kw,) + self._prefixes[kw])
+            for kw in self.keywords
+        }
+
+    def __len__(self) -> int:
+        return len(self.keywords)
+
+    def search(self, text: str) -> bool:
+        """True if any keyword occurs in text."""
+        return self._search_re is not None and self._search_re.search(text) is not None
+
+    # Both scans below resume one character after each hit's start, so every
+    # start position is tried once and overlapping keywords are still seen.
+
+    def find_all(self, text: str) -> Set[str]:
+        """Every keyword that occurs in text (one scan)."""
+        hits: Set[str] = set()
+        if self._search_re is None:
+            return hits
+        search = self._search_re.search
+        prefixes = self._prefixes
+        m = search(text)
+        while m is not None:
+            longest = m.group()
+            if longest not in hits:
+                hits.add(longest)
+                hits.update(prefixes[longest])
+            m = search(text, m.start() + 1)
+        return hits
+
+    def first(self, text: str) -> Optional[str]:
+        """Earliest keyword in list order that occurs in text, or None (one scan)."""
+        if self._search_re is None:
+            return None
+        search = self._search_re.search
+        m = search(text)
+        if m is None:
+            return None
+        earliest = self._earliest
+        best = earliest[m.group()]
+        while best[0]:
+            m = search(text, m.start() + 1)
+            if m is None:
+                break
+            hit = earliest[m.group()]
+            if hit < best:
+                best = hit
+        return best[1]
+
+
+_matchers: "OrderedDict[Tuple[str, ...], KeywordMatcher]" = OrderedDict()
+_matchers_lock = threading.Lock()
+
+
+def matcher_for(keywords: Iterable[str]) -> KeywordMatcher:
+    """
+    Return a compiled matcher for a keyword list, building it on first use.
+
+    Keyed by the list's current contents, so a list that is edited at
+    runtime (filters, blocked terms) gets a fresh matcher automatically.
+    For ad-hoc lists - per-title hot paths should keep a KeywordMatcher.
+    """
+    key = tuple(keywords)
+    with _matchers_lock:
+        matcher = _matchers.get(key)
+        if matcher is not None:
+            _matchers.move_to_end(key)
+            return matcher
+    matcher = KeywordMatcher(key)
+    with _matchers_lock:
+        _matchers[key] = matcher
+        while len(_matchers) > MAX_CACHED_MATCHERS:
+            _matchers.popitem(last=False)
+    return matcher
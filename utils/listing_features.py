@@ -0,0 +1,275 @@
+"""
+Listing Features - one memoized extraction pass per listing
+
+Weight and karat used to be parsed separately by fast_extract,
+pipeline/instant_pass, utils/extraction, utils/rag_context and
+analyze_missed_opportunities, each with its own regexes, so one listing was
+scanned a dozen times per request and the parsers could disagree (troy vs
+avoirdupois oz, combined text vs title-first, 'gr' vs 'gm').
+
+get_listing_features() scans the normalized title and description once:
+- weight: one tokenizer pass over each text collects the first gram (g, gr,
+  gm) / dwt / fractional oz / word-fraction oz / oz (oz, ozt, oz.t, troy oz)
+  token, then fast_extract's precedence (title before description, grams
+  first, 0.1g..max_weight) picks the weight, so each caller can apply its
+  own max_weight and year rule without rescanning
+- karat: one pass collects every karat / fineness mark and the
+  fast_extract priority (24K..9K marks before 999..375 fineness) picks one;
+  MetalPurity / Fineness item specifics still win
+- lot quantity, heavy non-metal, plated/filled and sterling flatware flags
+
+Results are memoized per (title, description), so every pipeline stage that
+asks about the same listing reads the same ListingFeatures. The legacy
+helpers (fast_extract.extract_weight, instant_pass.extract_weight_from_title,
+...) are thin wrappers over this module.
+
+Usage:
+    features = get_listing_features(title, description, item_specifics)
+    weight, source = features.weight(max_weight=500)
+    if features.karat and not features.is_plated:
+        ...
+
+benchmark_features.py checks parity against listing_features_golden.jsonl
+and times the extractor.
+"""
+
+import re
+from dataclasses import dataclass, field, replace
+from functools import lru_cache
+from typing import Any, Dict, Optional, Tuple
+
+# Listings memoized by get_listing_features() (title + description)
+FEATURE_CACHE_SIZE = 4096
+
+TROY_OZ_GRAMS = 31.1035
+DWT_GRAMS = 1.555
+
+# Ounce spellings: oz, ozt / oz.t (troy), ounce(s), optionally preceded by "troy"
+OZ_UNIT = r'(?:troy\s*)?(?:oz\.?t|oz|ounce)s?\b'
+
+# One alternation per weight unit, scanned left to right in a single pass.
+# Fractions come before plain oz so "1/2 oz" is not read as "2 oz".
+WEIGHT_TOKEN_PATTERN = re.compile(
+    r'(?P<frac>(?P<num>\d+)/(?P<den>\d+)\s*' + OZ_UNIT + r')'
+    r'|(?P<word>\b(?:one\s+)?(?P<word_frac>half|quarter|tenth)\s+' + OZ_UNIT + r')'
+    r'|(?P<gram>(?P<gram_value>\d*\.?\d+)\s*(?:g(?:ram)?s?|gr|gm|gms)\b)'
+    r'|(?P<dwt>(?P<dwt_value>\d+\.?\d*)\s*dwt\b)'
+    r'|(?P<oz>(?P<oz_value>\d+\.?\d*)\s*' + OZ_UNIT + r')',
+    re.IGNORECASE
+)
+
+# Whole numbers in this range are usually years ("1997 NFC Champions"), not
+# weights - instant_pass skips them (weight(skip_years=True))
+YEAR_RANGE = range(1900, 2031)
+
+# fast_extract.extract_weight's unit precedence
+WEIGHT_UNIT_ORDER = ("gram", "dwt", "frac", "word", "oz")
+WORD_FRAC_MAP = {'half': 0.5, 'quarter': 0.25, 'tenth': 0.1}
+
+KARAT_TOKEN_PATTERN = re.compile(
+    r'\b(?P<mark>24|22|18|14|10|9)\s*k(?:t|arat)?\b|\b(?P<fineness>999|916|750|585|417|375)\b',
+    re.IGNORECASE
+)
+
+# Karat marks beat fineness numbers; within each, higher karat wins
+KARAT_MARK_ORDER = (24, 22, 18, 14, 10, 9)
+FINENESS_TO_KARAT = {'999': 24, '916': 22, '750': 18, '585': 14, '417': 10, '375': 9}
+SPECIFICS_FINENESS_TO_KARAT = {'999': 24, '9999': 24, **FINENESS_TO_KARAT}
+
+NO_STONE_VALUES = ('no stone', 'none', 'n/a', 'na', '')
+
+
+@dataclass(frozen=True)
+class ListingFeatures:
+    """Everything the rule-based stages read from a listing's text"""
+    # (source, unit, grams, year_like) for the first token of each unit, in precedence order
+    weight_candidates: Tuple[Tuple[str, str, float, bool], ...] = ()
+    karat: Optional[int] = None
+    karat_source: str = "none"
+    # True when the karat came from a fineness number (585, 750) rather than a K mark
+    karat_is_fineness: bool = False
+    silver_purity: Optional[float] = None
+    is_lot: bool = False
+    lot_quantity: int = 0
+    has_non_metal: bool = False
+    non_metal_type: str = ""
+    is_plated: bool = False
+    plated_reason: str = ""
+    # detect_flatware's (is_flatware, piece_type, quantity, estimated_grams)
+    flatware: Tuple[bool, str, int, float] = field(default=(False, "", 0, 0))
+
+    def weight(self, max_weight: float = 3000, skip_years: bool = False) -> Tuple[Optional[float], str]:
+        """(grams, "title"/"description") of the first in-range token, else (None, "none")"""
+        for source, _, grams, year_like in self.weight_candidates:
+            if skip_years and year_like:
+                continue
+            if 0.1 <= grams <= max_weight:
+                return grams, source
+        return None, "none"
+
+    @property
+    def weight_grams(self) -> Optional[float]:
+        return self.weight()[0]
+
+    @property
+    def is_flatware(self) -> bool:
+        return self.flatware[0]
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Flat JSON-friendly view (golden corpus / debugging)"""
+        weight, weight_source = self.weight()
+        return {
+            "weight_grams": round(weight, 3) if weight is not None else None,
+            "weight_source": weight_source,
+            "karat": self.karat,
+            "karat_source": self.karat_source,
+            "karat_is_fineness": self.karat_is_fineness,
+            "silver_purity": self.silver_purity,
+            "is_lot": self.is_lot,
+            "lot_quantity": self.lot_quantity,
+            "has_non_metal": self.has_non_metal,
+            "non_metal_type": self.non_metal_type,
+            "is_plated": self.is_plated,
+            "plated_reason": self.plated_reason,
+            "flatware": [self.flatware[0], self.flatware[1], self.flatware[2], round(self.flatware[3], 1)],
+        }
+
+
+def _weight_tokens(text_lower: str, source: str) -> list:
+    """First token of each unit in one scan, ordered by WEIGHT_UNIT_ORDER"""
+    first: Dict[str, Tuple[float, bool]] = {}
+    for match in WEIGHT_TOKEN_PATTERN.finditer(text_lower):
+        unit = match.lastgroup
+        if unit in first:
+            continue
+        value = None
+        if unit == "gram":
+            value = float(match.group("gram_value"))
+            grams = value
+        elif unit == "dwt":
+            value = float(match.group("dwt_value"))
+            grams = value * DWT_GRAMS
+        elif unit == "frac":
+            denominator = float(match.group("den"))
+            if denominator <= 0:
+                continue
+            grams = float(match.group("num")) / denominator * TROY_OZ_GRAMS
+        elif unit == "word":
+            grams = WORD_FRAC_MAP[match.group("word_frac").lower()] * TROY_OZ_GRAMS
+        else:
+            value = float(match.group("oz_value"))
+            grams = value * TROY_OZ_GRAMS
+        year_like = value is not None and value == int(value) and int(value) in YEAR_RANGE
+        first[unit] = (grams, year_like)
+        if len(first) == len(WEIGHT_UNIT_ORDER):
+            break
+    return [(source, unit, *first[unit]) for unit in WEIGHT_UNIT_ORDER if unit in first]
+
+
+def _text_karat(text: str) -> Tuple[Optional[int], bool]:
+    """(karat, came_from_fineness) by fast_extract's pattern priority"""
+    marks, fineness = set(), set()
+    for match in KARAT_TOKEN_PATTERN.finditer(text):
+        if match.group("mark"):
+            marks.add(int(match.group("mark")))
+        else:
+            fineness.add(FINENESS_TO_KARAT[match.group("fineness")])
+    for karat in KARAT_MARK_ORDER:
+        if karat in marks:
+            return karat, False
+    for karat in KARAT_MARK_ORDER:
+        if karat in fineness:
+            return karat, True
+    return None, False
+
+
+@lru_cache(maxsize=FEATURE_CACHE_SIZE)
+def _text_features(title: str, description: str) -> ListingFeatures:
+    """The memoized pass over title + description (no item specifics)"""
+    from fast_extract import detect_non_metal, detect_plated
+    from utils.extraction import detect_flatware, extract_lot_info, extract_silver_purity
+
+    candidates = []
+    for text, source in ((title, "title"), (description, "description")):
+        if text:
+            candidates.extend(_weight_tokens(text.replace('+', ' ').lower(), source))
+
+    (karat, karat_is_fineness), karat_source = _text_karat(title), "title"
+    if karat is None and description:
+        (karat, karat_is_fineness), karat_source = _text_karat(description), "description"
+
+    is_lot, lot_quantity = extract_lot_info(title)
+    has_non_metal, non_metal_type = detect_non_metal(title, description)
+    is_plated, plated_reason = detect_plated(title, description)
+
+    return ListingFeatures(
+        weight_candidates=tuple(candidates),
+        karat=karat,
+        karat_source=karat_source if karat is not None else "none",
+        karat_is_fineness=karat_is_fineness,
+        silver_purity=extract_silver_purity(title),
+        is_lot=is_lot,
+        lot_quantity=lot_quantity,
+        has_non_metal=has_non_metal,
+        non_metal_type=non_metal_type,
+        is_plated=is_plated,
+        plated_reason=plated_reason,
+        flatware=detect_flatware(title),
+    )
+
+
+def _apply_item_specifics(features: ListingFeatures, item_specifics: dict) -> ListingFeatures:
+    """MetalPurity / Fineness override the karat; a heavy MainStone flags non-metal"""
+    from fast_extract import NON_METAL_HEAVY
+
+    updates = {}
+    metal_purity = str(item_specifics.get('MetalPurity', '') or '').lower().strip()
+    specifics_karat = None
+    if metal_purity:
+        karat, is_fineness = _text_karat(metal_purity)
+        if karat is not None:
+            specifics_karat = (karat, "MetalPurity", is_fineness)
+    if specifics_karat is None:
+        fineness = str(item_specifics.get('Fineness', '') or '').strip()
+        if fineness:
+            for value, karat in SPECIFICS_FINENESS_TO_KARAT.items():
+                if value in fineness:
+                    specifics_karat = (karat, "Fineness", True)
+                    break
+    if specifics_karat:
+        updates["karat"], updates["karat_source"], updates["karat_is_fineness"] = specifics_karat
+
+    main_stone = str(item_specifics.get('MainStone', '') or '').lower().strip()
+    if main_stone not in NO_STONE_VALUES and any(heavy in main_stone for heavy in NON_METAL_HEAVY):
+        updates["has_non_metal"] = True
+        updates["non_metal_type"] = f"MainStone: {main_stone}"
+
+    return replace(features, **updates) if updates else features
+
+
+def get_listing_features(title: str, description: str = "", item_specifics: dict = None) -> ListingFeatures:
+    """
+    Features for one listing. The text pass is memoized, so repeated calls
+    for the same title/description (every stage of one request) are free;
+    item specifics are layered on top per call.
+    """
+    features = _text_features(title or "", description or "")
+    if item_specifics:
+        features = _apply_item_specifics(features, item_specifics)
+    return features
+
+
+def get_feature_cache_stats() -> Dict[str, Any]:
+    info = _text_features.cache_info()
+    lookups = info.hits + info.misses
+    return {
+        "hits": info.hits,
+        "misses": info.misses,
+        "size": info.currsize,
+        "max_size": info.maxsize,
+        "hit_rate": round(info.hits / lookups, 3) if lookups else 0.0,
+    }
+
+
+def clear_feature_cache():
+    _text_features.cache_clear()
@@ -1,20 +1,52 @@
 """
 RAG Context System for Arbitrage Analysis
 
-Uses LanceDB + sentence-transformers to find similar past purchases
+Uses sentence-transformers embeddings to find similar past purchases
 and provide relevant context for weight estimation and pricing decisions.
+
+Request path:
+- build_rag_context_async() embeds the title through EmbeddingService, which
+  caches embeddings by normalized title and micro-batches concurrent requests
+  into one model call on a worker thread
+- search runs against an in-memory NumPy index of the purchase set (default)
+  or LanceDB (RAG_BACKEND=lancedb), returning plain rows - no pandas
+- the index is built by the watcher task on a worker thread after startup;
+  until it is ready requests are served without RAG context
+- sentence-transformers is imported when the model is first loaded, so this
+  module imports (and reports EMBEDDINGS_AVAILABLE = False) without it
 """
 
 import os
-import re
+import json
+import time
+import asyncio
 import sqlite3
 import logging
+import threading
+import importlib.util
 from pathlib import Path
-from typing import Optional, List, Dict, Any
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, Optional, List, Dict, Any, Tuple, Set, Iterable
 from dataclasses import dataclass
 
-import lancedb
-from sentence_transformers import SentenceTransformer
+import numpy as np
+
+from config import RAG, PURCHASE_LOG_PATH
+from utils.listing_features import get_listing_features
+
+try:
+    import lancedb
+    LANCEDB_AVAILABLE = True
+except ImportError:
+    lancedb = None
+    LANCEDB_AVAILABLE = False
+
+# Checked without importing: sentence-transformers (and torch) load with the model
+EMBEDDINGS_AVAILABLE = importlib.util.find_spec("sentence_transformers") is not None
+
+if TYPE_CHECKING:
+    from sentence_transformers import SentenceTransformer
 
 logger = logging.getLogger(__name__)
 
@@ -22,11 +54,44 @@ logger = logging.getLogger(__name__)
 BASE_DIR = Path(__file__).parent.parent
 PURCHASE_DB = BASE_DIR / "purchase_history.db"
 LANCE_DB_PATH = BASE_DIR / "rag_vectors"
+WATERMARK_PATH = LANCE_DB_PATH / "watermark.json"
 
 # Global instances (lazy loaded)
-_model: Optional[SentenceTransformer] = None
-_db: Optional[lancedb.DBConnection] = None
+_model: Optional["SentenceTransformer"] = None
+_model_lock = threading.Lock()
+_db = None
 _table = None
+_numpy_index: Optional["NumpyPurchaseIndex"] = None
+_numpy_index_lock = threading.Lock()
+_index_update_lock = threading.RLock()
+
+# Columns carried alongside each vector
+RESULT_COLUMNS = ["id", "item_id", "title", "price", "category", "weight_grams", "karat"]
+
+# purchases.jsonl category -> indexed category (others aren't indexed)
+LOGGED_CATEGORY_MAP = {"gold": "gold", "silver": "silver", "watch": "watches", "watches": "watches"}
+
+# Incremental indexing state: how far each source has been embedded
+_watermark = {"purchase_id": 0, "log_offset": 0}
+# eBay item ids already in the index (a purchase can be in both sources)
+_indexed_item_ids: Set[str] = set()
+_metrics_lock = threading.Lock()
+_index_metrics: Dict[str, Any] = {
+    "full_builds": 0,
+    "updates": 0,
+    "rows_appended": 0,
+    "last_build_ms": None,
+    "last_build_at": None,
+    "last_update_ms": None,
+    "last_update_at": None,
+    "synced_mtime": 0.0,      # Source mtime covered by the last build/update
+    "pending_since": None,    # When a not-yet-indexed purchase was first noticed
+}
+
+# Background watcher (see start_index_watcher)
+_watch_task: Optional[asyncio.Task] = None
+_watch_event: Optional[asyncio.Event] = None
+_watch_loop: Optional[asyncio.AbstractEventLoop] = None
 
 
 @dataclass
@@ -50,61 +115,19 @@ class SimilarPurchase:
 
 
 def extract_weight_from_title(title: str) -> Optional[float]:
-    """
-    Extract weight in grams from a title string.
-    Handles: grams, g, dwt, oz, pennyweight
-    """
-    title_lower = title.lower()
-
-    # Grams patterns: "14 grams", "14g", "14.5 grams"
-    gram_patterns = [
-        r'(\d+\.?\d*)\s*(?:gram|grams|gr|g)(?:\s|$|[,.])',
-        r'(\d+\.?\d*)\s*g(?:ram)?s?\b',
-    ]
-    for pattern in gram_patterns:
-        match = re.search(pattern, title_lower)
-        if match:
-            return float(match.group(1))
-
-    # DWT (pennyweight) - 1 dwt = 1.555g
-    dwt_patterns = [
-        r'(\d+\.?\d*)\s*(?:dwt|pennyweight)',
-    ]
-    for pattern in dwt_patterns:
-        match = re.search(pattern, title_lower)
-        if match:
-            return float(match.group(1)) * 1.555
-
-    # Troy ounces - 1 ozt = 31.1g
-    oz_patterns = [
-        r'(\d+\.?\d*)\s*(?:troy\s*)?(?:oz|ounce)',
-    ]
-    for pattern in oz_patterns:
-        match = re.search(pattern, title_lower)
-        if match:
-            return float(match.group(1)) * 31.1
-
-    return None
+    """Weight in grams stated in a title (grams, dwt, troy oz; memoized ListingFeatures)"""
+    return get_listing_features(title).weight_grams
 
 
 def extract_karat_from_title(title: str) -> Optional[str]:
     """Extract karat marking from title."""
-    title_lower = title.lower()
+    features = get_listing_features(title)
 
-    # Gold karats
-    karat_patterns = [
-        r'\b(24k|24kt|24 karat)\b',
-        r'\b(22k|22kt|22 karat)\b',
-        r'\b(18k|18kt|18 karat)\b',
-        r'\b(14k|14kt|14 karat)\b',
-        r'\b(10k|10kt|10 karat)\b',
-        r'\b(9k|9kt|9 karat)\b',
-    ]
-    for pattern in karat_patterns:
-        if re.search(pattern, title_lower):
-            match = re.search(r'(\d+)k', title_lower)
-            if match:
-                return f"{match.group(1)}K"
+    # Gold karats (K marks only - a bare 999/925 here is usually silver fineness)
+    if features.karat and not features.karat_is_fineness:
+        return f"{features.karat}K"
+
+    title_lower = title.lower()
 
     # Sterling silver
     if any(x in title_lower for x in ['sterling', '925', '.925']):
@@ -142,19 +165,48 @@ def extract_item_type(title: str) -> str:
     return 'jewelry'
 
 
-def get_model() -> SentenceTransformer:
-    """Get or initialize the embedding model."""
+def normalize_title(title: str) -> str:
+    """Embedding cache key and model input: '+' decoded, lowercase, single spaces."""
+    return " ".join(title.replace('+', ' ').lower().split())
+
+
+def get_model() -> "SentenceTransformer":
+    """Get or initialize the embedding model (loaded once, under _model_lock)."""
     global _model
     if _model is None:
-        logger.info("[RAG] Loading embedding model (all-MiniLM-L6-v2)...")
-        _model = SentenceTransformer('all-MiniLM-L6-v2')
-        logger.info("[RAG] Embedding model loaded")
+        with _model_lock:
+            if _model is None:
+                from sentence_transformers import SentenceTransformer
+                logger.info("[RAG] Loading embedding model (all-MiniLM-L6-v2)...")
+                _model = SentenceTransformer('all-MiniLM-L6-v2')
+                logger.info("[RAG] Embedding model loaded")
     return _model
 
 
+def encode_titles(titles: List[str], chunk_size: Optional[int] = None) -> np.ndarray:
+    """
+    L2-normalized embeddings of titles (blocking). Every model call goes
+    through here and holds _model_lock, so index builds and the micro-batch
+    worker never run the model at the same time; large inputs take the lock
+    once per chunk so request-path batches can run in between.
+    """
+    model = get_model()
+    chunk_size = chunk_size or len(titles) or 1
+    chunks = []
+    for start in range(0, len(titles), chunk_size):
+        with _model_lock:
+            chunks.append(model.encode(titles[start:start + chunk_size], convert_to_numpy=True,
+                                       normalize_embeddings=True, show_progress_bar=False))
+    if not chunks:
+        return np.zeros((0, 0), dtype=np.float32)
+    return np.asarray(np.concatenate(chunks), dtype=np.float32)
+
+
 def get_db():
     """Get or initialize the LanceDB connection."""
     global _db, _table
+    if not LANCEDB_AVAILABLE:
+        return None, None
     if _db is None:
         logger.info(f"[RAG] Connecting to LanceDB at {LANCE_DB_PATH}")
         _db = lancedb.connect(str(LANCE_DB_PATH))
@@ -170,77 +222,632 @@ def get_db():
     return _db, _table
 
 
-def index_purchases(force_rebuild: bool = False) -> int:
+# ============================================================
+# EMBEDDINGS (cached + micro-batched)
+# ============================================================
+
+class EmbeddingService:
     """
-    Index all purchases from purchase_history.db into the vector store.
-    Returns the number of items indexed.
+    Title embeddings with an LRU cache and async micro-batching.
+
+    embed() calls that arrive within RAG.batch_window_ms of each other are
+    encoded together in one model call on a dedicated worker thread, so the
+    event loop never runs the model and concurrent listings share a batch.
+    Vectors are L2-normalized, so a dot product is the cosine similarity.
     """
-    global _table
 
-    db, table = get_db()
-    model = get_model()
+    def __init__(self, config=None):
+        self._config = config or RAG
+        self._cache: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._pending: Dict[str, List[asyncio.Future]] = {}
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        self._stats = {
+            'requests': 0,
+            'cache_hits': 0,
+            'coalesced': 0,
+            'encoded': 0,
+            'batches': 0,
+            'largest_batch': 0,
+        }
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            # One worker: the model is never run from two threads at once
+            self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="rag-encode")
+        return self._executor
+
+    def _lookup(self, keys: List[str]) -> Dict[str, np.ndarray]:
+        found = {}
+        with self._lock:
+            self._stats['requests'] += len(keys)
+            for key in keys:
+                vector = self._cache.get(key)
+                if vector is not None:
+                    self._cache.move_to_end(key)
+                    found[key] = vector
+                    self._stats['cache_hits'] += 1
+        return found
+
+    def _remember(self, keys: List[str], vectors: np.ndarray):
+        with self._lock:
+            for key, vector in zip(keys, vectors):
+                self._cache[key] = vector
+                self._cache.move_to_end(key)
+            while len(self._cache) > self._config.embedding_cache_size:
+                self._cache.popitem(last=False)
+
+    def _encode(self, keys: List[str]) -> np.ndarray:
+        """Run the model on normalized titles (blocking)."""
+        vectors = encode_titles(keys)
+        with self._lock:
+            self._stats['encoded'] += len(keys)
+            self._stats['batches'] += 1
+            self._stats['largest_batch'] = max(self._stats['largest_batch'], len(keys))
+        return vectors
+
+    def encode(self, titles: List[str]) -> np.ndarray:
+        """Blocking, cached embedding of titles (rows in input order)."""
+        keys = [normalize_title(t) for t in titles]
+        found = self._lookup(keys)
+        missing = [key for key in dict.fromkeys(keys) if key not in found]
+        if missing:
+            vectors = self._encode(missing)
+            self._remember(missing, vectors)
+            found.update(zip(missing, vectors))
+        return np.stack([found[key] for key in keys])
+
+    async def embed(self, title: str) -> np.ndarray:
+        """Embedding for one title, batched with other concurrent callers."""
+        key = normalize_title(title)
+        cached = self._lookup([key]).get(key)
+        if cached is not None:
+            return cached
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        waiters = self._pending.setdefault(key, [])
+        if waiters:
+            self._stats['coalesced'] += 1
+        waiters.append(future)
+
+        if len(self._pending) >= self._config.max_batch:
+            self._flush()
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(self._config.batch_window_ms / 1000, self._flush)
+        return await future
+
+    def _flush(self):
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        batch, self._pending = self._pending, {}
+        if batch:
+            asyncio.ensure_future(self._run_batch(batch))
+
+    async def _run_batch(self, batch: Dict[str, List[asyncio.Future]]):
+        keys = list(batch)
+        loop = asyncio.get_running_loop()
+        try:
+            vectors = await loop.run_in_executor(self._get_executor(), self._encode, keys)
+        except Exception as e:
+            for waiters in batch.values():
+                for future in waiters:
+                    if not future.done():
+                        future.set_exception(e)
+            return
+        self._remember(keys, vectors)
+        for key, vector in zip(keys, vectors):
+            for future in batch[key]:
+                if not future.done():
+                    future.set_result(vector)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get embedding cache/batching statistics"""
+        with self._lock:
+            requests = self._stats['requests']
+            batches = self._stats['batches']
+            return {
+                **self._stats,
+                'hit_rate': f"{self._stats['cache_hits'] / requests * 100:.1f}%" if requests else "0.0%",
+                'avg_batch': round(self._stats['encoded'] / batches, 2) if batches else 0,
+                'cached': len(self._cache),
+                'pending': len(self._pending),
+            }
+
+
+# Global embedding service
+embeddings = EmbeddingService()
+
+
+# ============================================================
+# VECTOR INDEXES
+# ============================================================
+
+class NumpyPurchaseIndex:
+    """
+    In-memory brute-force cosine search over the purchase set.
 
-    # Check if we need to rebuild
-    if table is not None and not force_rebuild:
-        count = table.count_rows()
-        logger.info(f"[RAG] Table already has {count} rows, skipping rebuild")
-        return count
+    Purchase history is a few thousand rows, so one matrix-vector product
+    beats a LanceDB query and needs no dataframe round trip.
+    """
+
+    def __init__(self, rows: List[Dict[str, Any]], vectors: np.ndarray):
+        self.rows = rows
+        vectors = np.asarray(vectors, dtype=np.float32)
+        if rows:
+            vectors = vectors.reshape(len(rows), -1)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        self.vectors = vectors / np.maximum(norms, 1e-12)
+        self.categories = np.array([row.get("category") for row in rows], dtype=object)
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def extend(self, rows: List[Dict[str, Any]], vectors: np.ndarray) -> "NumpyPurchaseIndex":
+        """Return a new index with rows appended (this one is left untouched)."""
+        if not self.rows:
+            return NumpyPurchaseIndex(list(rows), vectors)
+        return NumpyPurchaseIndex(self.rows + list(rows),
+                                  np.vstack([self.vectors, np.asarray(vectors, dtype=np.float32)]))
+
+    def search(self, query: np.ndarray, category: Optional[str] = None,
+               limit: int = 5) -> List[Tuple[Dict[str, Any], float]]:
+        """Return up to `limit` (row, cosine similarity) pairs, best first."""
+        if not self.rows or limit <= 0:
+            return []
+        scores = self.vectors @ np.asarray(query, dtype=np.float32)
+        if category:
+            scores = np.where(self.categories == category, scores, -np.inf)
+        k = min(limit, len(scores))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [(self.rows[i], float(scores[i])) for i in top if np.isfinite(scores[i])]
 
-    logger.info("[RAG] Building purchase index...")
 
-    # Load purchases from SQLite
+def _purchase_row(id_: int, title: str, price, category: str, keywords: str = "",
+                  item_id=None) -> Dict[str, Any]:
+    """One indexable purchase with fields extracted from the title."""
+    try:
+        price = float(price) if price else 0.0
+    except (TypeError, ValueError):
+        price = 0.0
+    return {
+        "id": id_,
+        "item_id": str(item_id or ""),
+        "title": title,
+        "price": price,
+        "category": category or "unknown",
+        "weight_grams": extract_weight_from_title(title),
+        "karat": extract_karat_from_title(title),
+        "item_type": extract_item_type(title),
+        "keywords": keywords or "",
+    }
+
+
+def _load_purchase_rows(min_id: int = 0) -> List[Dict[str, Any]]:
+    """Read indexable purchases with id > min_id from purchase_history.db."""
+    if not PURCHASE_DB.exists():
+        return []
     conn = sqlite3.connect(PURCHASE_DB)
     cursor = conn.cursor()
-    cursor.execute("""
-        SELECT id, title, price, category, keywords
+    columns = {row[1] for row in cursor.execute("PRAGMA table_info(purchases)")}
+    item_id = "item_id" if "item_id" in columns else "''"
+    cursor.execute(f"""
+        SELECT id, title, price, category, keywords, {item_id}
         FROM purchases
-        WHERE category IN ('gold', 'silver', 'watches')
-    """)
+        WHERE category IN ('gold', 'silver', 'watches') AND id > ?
+        ORDER BY id
+    """, (min_id,))
     rows = cursor.fetchall()
     conn.close()
 
-    if not rows:
-        logger.warning("[RAG] No purchases found to index")
-        return 0
+    return [_purchase_row(id_, title, price, category, keywords, item_id)
+            for id_, title, price, category, keywords, item_id in rows if title]
+
+
+def _load_logged_purchases(offset: int = 0,
+                           skip_item_ids: Iterable[str] = ()) -> Tuple[List[Dict[str, Any]], int]:
+    """
+    Read purchases appended to purchases.jsonl (routes/data.log_purchase) after
+    byte offset. Returns (rows, new_offset); a partially written last line is
+    left for the next read. Purchases whose eBay item id is in skip_item_ids
+    (already in purchase_history.db or the index) are left out.
+
+    Logged rows get id = -(byte offset of the line end), so they never collide
+    with purchase_history.db ids.
+    """
+    try:
+        with open(PURCHASE_LOG_PATH, 'rb') as f:
+            f.seek(offset)
+            chunk = f.read()
+    except FileNotFoundError:
+        return [], offset
+
+    skip_item_ids = set(skip_item_ids)
+    rows = []
+    pos = offset
+    for line in chunk.splitlines(keepends=True):
+        if not line.endswith(b"\n"):
+            break
+        pos += len(line)
+        try:
+            listing = json.loads(line).get("listing") or {}
+        except ValueError:
+            continue
+        title = listing.get("title") or ""
+        category = LOGGED_CATEGORY_MAP.get((listing.get("category") or "").lower())
+        item_id = str(listing.get("item_id") or "")
+        if not (title and category) or (item_id and item_id in skip_item_ids):
+            continue
+        skip_item_ids.add(item_id)
+        rows.append(_purchase_row(-pos, title, listing.get("price"), category, item_id=item_id))
+    return rows, pos
+
+
+def _item_ids(rows: Iterable[Dict[str, Any]]) -> Set[str]:
+    return {row["item_id"] for row in rows if row.get("item_id")}
+
+
+def _load_all_purchases() -> Tuple[List[Dict[str, Any]], int]:
+    """Every indexable purchase, purchase_history.db first, and the log end offset."""
+    rows = _load_purchase_rows()
+    logged, log_offset = _load_logged_purchases(skip_item_ids=_item_ids(rows))
+    return rows + logged, log_offset
+
+
+def _set_watermark(rows: List[Dict[str, Any]], saved: Optional[Dict[str, int]] = None):
+    """
+    Remember what an index holds: max db id, purchases.jsonl byte offset and
+    item ids. Offsets come from saved (the persisted watermark) when given;
+    ids in the rows only give a lower bound, since skipped log lines and
+    duplicate db rows leave no row behind.
+    """
+    global _indexed_item_ids
+    ids = [row.get("id") or 0 for row in rows]
+    saved = saved or {}
+    _watermark["purchase_id"] = max([saved.get("purchase_id", 0)] + [i for i in ids if i > 0])
+    _watermark["log_offset"] = max([saved.get("log_offset", 0)] + [-i for i in ids if i < 0])
+    _indexed_item_ids = _item_ids(rows)
+
+
+def _load_saved_watermark() -> Optional[Dict[str, int]]:
+    """Watermark stored next to the LanceDB table, if any."""
+    try:
+        with open(WATERMARK_PATH) as f:
+            saved = json.load(f)
+        return {key: int(saved[key]) for key in ("purchase_id", "log_offset")}
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+
+
+def _save_watermark():
+    """Persist the watermark with the LanceDB table (atomic replace)."""
+    tmp_path = WATERMARK_PATH.with_suffix(".tmp")
+    try:
+        with open(tmp_path, "w") as f:
+            json.dump(_watermark, f)
+        os.replace(tmp_path, WATERMARK_PATH)
+    except OSError as e:
+        logger.warning(f"[RAG] Could not save index watermark: {e}")
+
+
+def _table_rows(table) -> List[Dict[str, Any]]:
+    """id/item_id of every row in a LanceDB table (item_id is missing on older tables)."""
+    arrow_table = table.to_arrow()
+    columns = [c for c in ("id", "item_id") if c in arrow_table.column_names]
+    return arrow_table.select(columns).to_pylist()
+
+
+def _index_from_arrow(arrow_table) -> NumpyPurchaseIndex:
+    """Build the NumPy index from a LanceDB table's arrow data (no re-encoding)."""
+    vector_column = arrow_table.column("vector").combine_chunks()
+    vectors = vector_column.flatten().to_numpy(zero_copy_only=False)
+    columns = [c for c in RESULT_COLUMNS if c in arrow_table.column_names]
+    rows = arrow_table.select(columns).to_pylist()
+    return NumpyPurchaseIndex(rows, vectors)
 
-    logger.info(f"[RAG] Processing {len(rows)} purchases...")
 
-    # Build data for indexing
-    data = []
-    titles = []
+def get_numpy_index(rebuild: bool = False) -> NumpyPurchaseIndex:
+    """Get or build the in-memory purchase index.
 
-    for row in rows:
-        id_, title, price, category, keywords = row
-        weight = extract_weight_from_title(title)
-        karat = extract_karat_from_title(title)
-        item_type = extract_item_type(title)
+    Reuses vectors from an existing LanceDB table when there is one, else
+    embeds purchase_history.db and purchases.jsonl directly. The build runs
+    outside _numpy_index_lock, so searches keep using the current index
+    until the new one is swapped in.
+    """
+    global _numpy_index
+    index = _numpy_index
+    if index is not None and not rebuild:
+        return index
+
+    with _index_update_lock:
+        if _numpy_index is not None and not rebuild:
+            return _numpy_index
+
+        start = time.perf_counter()
+        synced_mtime = None
+        saved = None
+        _, table = get_db()
+        if table is not None and not rebuild:
+            index = _index_from_arrow(table.to_arrow())
+            saved = _load_saved_watermark()
+            # The table may predate newer purchases; let the watcher catch up
+            synced_mtime = 0.0
+            logger.info(f"[RAG] Loaded {len(index)} purchase vectors from LanceDB into memory")
+        else:
+            rows, log_offset = _load_all_purchases()
+            saved = {"log_offset": log_offset}
+            if rows:
+                logger.info(f"[RAG] Embedding {len(rows)} purchases for in-memory index...")
+                vectors = encode_titles([r["title"] for r in rows], RAG.build_chunk)
+            else:
+                logger.warning("[RAG] No purchases found to index")
+                vectors = np.zeros((0, 0), dtype=np.float32)
+            index = NumpyPurchaseIndex(rows, vectors)
+        _set_watermark(index.rows, saved)
+        _record_build(time.perf_counter() - start, full=True, synced_mtime=synced_mtime)
+        with _numpy_index_lock:
+            _numpy_index = index
+        return index
+
+
+def _use_lancedb() -> bool:
+    return RAG.backend == "lancedb" and LANCEDB_AVAILABLE
+
+
+def index_purchases(force_rebuild: bool = False) -> int:
+    """
+    Index all purchases from purchase_history.db (and purchases.jsonl) into
+    the vector store. Returns the number of items indexed.
+
+    Existing indexes are kept; update_purchase_index() appends new rows.
+    """
+    global _table
+
+    with _index_update_lock:
+        if not _use_lancedb():
+            return len(get_numpy_index(rebuild=force_rebuild))
+
+        db, table = get_db()
+
+        # Check if we need to rebuild
+        if table is not None and not force_rebuild:
+            count = table.count_rows()
+            _set_watermark(_table_rows(table), _load_saved_watermark())
+            logger.info(f"[RAG] Table already has {count} rows, skipping rebuild")
+            return count
+
+        logger.info("[RAG] Building purchase index...")
+        start = time.perf_counter()
+
+        # Load purchases from SQLite (+ purchases logged since the last export)
+        data, log_offset = _load_all_purchases()
+
+        if not data:
+            logger.warning("[RAG] No purchases found to index")
+            return 0
+
+        logger.info(f"[RAG] Processing {len(data)} purchases...")
+
+        # Generate embeddings in batch
+        logger.info("[RAG] Generating embeddings...")
+        vectors = encode_titles([row["title"] for row in data], RAG.build_chunk)
 
-        titles.append(title)
-        data.append({
-            "id": id_,
-            "title": title,
-            "price": float(price) if price else 0.0,
-            "category": category or "unknown",
-            "weight_grams": weight,
-            "karat": karat,
-            "item_type": item_type,
-            "keywords": keywords or "",
-        })
+        # Add embeddings to data
+        for i, embedding in enumerate(vectors):
+            data[i]["vector"] = embedding.tolist()
 
-    # Generate embeddings in batch
-    logger.info("[RAG] Generating embeddings...")
-    embeddings = model.encode(titles, show_progress_bar=True)
+        # Create/replace table
+        logger.info("[RAG] Writing to LanceDB...")
+        _table = db.create_table("purchases", data, mode="overwrite")
+        _set_watermark(data, {"log_offset": log_offset})
+        _save_watermark()
+        _record_build(time.perf_counter() - start, full=True)
 
-    # Add embeddings to data
-    for i, embedding in enumerate(embeddings):
-        data[i]["vector"] = embedding.tolist()
+        logger.info(f"[RAG] Indexed {len(data)} purchases")
+        return len(data)
 
-    # Create/replace table
-    logger.info("[RAG] Writing to LanceDB...")
-    _table = db.create_table("purchases", data, mode="overwrite")
 
-    logger.info(f"[RAG] Indexed {len(data)} purchases")
-    return len(data)
+def _index_ready() -> bool:
+    if _use_lancedb():
+        return get_db()[1] is not None
+    return _numpy_index is not None
+
+
+def index_ready() -> bool:
+    """True once an index is loaded (no LanceDB connect, safe on the event loop)"""
+    if _use_lancedb():
+        return _table is not None
+    return _numpy_index is not None
+
+
+def update_purchase_index() -> int:
+    """
+    Embed and append only purchases added since the last build/update.
+
+    New rows come from purchase_history.db (id above the indexed max) and
+    purchases.jsonl (bytes past the indexed offset). Returns rows added.
+    """
+    global _numpy_index
+
+    with _index_update_lock:
+        if not _index_ready():
+            index_purchases()
+            return 0
+
+        if PURCHASE_LOG_PATH.exists() and PURCHASE_LOG_PATH.stat().st_size < _watermark["log_offset"]:
+            # purchases.jsonl was truncated/rotated - offsets no longer line up
+            logger.info("[RAG] Purchase log shrank, rebuilding index")
+            return index_purchases(force_rebuild=True)
+
+        start = time.perf_counter()
+        synced_mtime = _sources_mtime()
+        before = dict(_watermark)
+        db_rows = _load_purchase_rows(min_id=_watermark["purchase_id"])
+        # A purchase logged to purchases.jsonl and later imported into
+        # purchase_history.db is only indexed once
+        rows = [row for row in db_rows if not row["item_id"] or row["item_id"] not in _indexed_item_ids]
+        logged, log_offset = _load_logged_purchases(_watermark["log_offset"],
+                                                    skip_item_ids=_indexed_item_ids | _item_ids(db_rows))
+        rows += logged
+
+        if rows:
+            vectors = embeddings.encode([row["title"] for row in rows])
+            if _use_lancedb():
+                _, table = get_db()
+                columns = set(table.schema.names)
+                table.add([{**{k: v for k, v in row.items() if k in columns}, "vector": vector.tolist()}
+                           for row, vector in zip(rows, vectors)])
+            if _numpy_index is not None:
+                # Swap in a new index object; searches in flight keep the old one
+                with _numpy_index_lock:
+                    _numpy_index = _numpy_index.extend(rows, vectors)
+            _indexed_item_ids.update(_item_ids(rows))
+        _watermark["purchase_id"] = max([_watermark["purchase_id"]] + [r["id"] for r in db_rows])
+        _watermark["log_offset"] = log_offset
+        if _use_lancedb() and _watermark != before:
+            _save_watermark()
+
+        _record_build(time.perf_counter() - start, full=False, added=len(rows), synced_mtime=synced_mtime)
+        if rows:
+            logger.info(f"[RAG] Appended {len(rows)} new purchases to index "
+                        f"({_index_metrics['last_update_ms']:.0f}ms)")
+        return len(rows)
+
+
+# ============================================================
+# INDEX METRICS + BACKGROUND WATCHER
+# ============================================================
+
+def _sources_mtime() -> float:
+    """Newest modification time of the purchase sources."""
+    return max((p.stat().st_mtime for p in (PURCHASE_DB, PURCHASE_LOG_PATH) if p.exists()), default=0.0)
+
+
+def _record_build(seconds: float, full: bool, added: int = 0, synced_mtime: float = None):
+    now = time.time()
+    with _metrics_lock:
+        if full:
+            _index_metrics["full_builds"] += 1
+            _index_metrics["last_build_ms"] = round(seconds * 1000, 1)
+            _index_metrics["last_build_at"] = now
+        else:
+            _index_metrics["updates"] += 1
+            _index_metrics["rows_appended"] += added
+            _index_metrics["last_update_ms"] = round(seconds * 1000, 1)
+            _index_metrics["last_update_at"] = now
+        _index_metrics["synced_mtime"] = synced_mtime if synced_mtime is not None else _sources_mtime()
+        _index_metrics["pending_since"] = None
+
+
+def get_index_metrics() -> Dict[str, Any]:
+    """Index build/update times and staleness (seconds purchases have waited unindexed)"""
+    with _metrics_lock:
+        metrics = dict(_index_metrics)
+    pending_since = metrics.pop("pending_since")
+    source_mtime = _sources_mtime()
+    if source_mtime > metrics["synced_mtime"]:
+        pending_since = min(pending_since or source_mtime, source_mtime)
+    metrics["staleness_seconds"] = round(max(0.0, time.time() - pending_since), 1) if pending_since else 0.0
+    metrics["watermark"] = dict(_watermark)
+    metrics["watcher_running"] = _watch_task is not None and not _watch_task.done()
+    return metrics
+
+
+def notify_purchases_changed():
+    """Wake the index watcher (call after a purchase is logged). Thread-safe."""
+    with _metrics_lock:
+        if _index_metrics["pending_since"] is None:
+            _index_metrics["pending_since"] = time.time()
+    if _watch_loop is not None and _watch_event is not None:
+        _watch_loop.call_soon_threadsafe(_watch_event.set)
+
+
+async def _index_watch_loop(interval: float):
+    # Initial build off the loop; requests run without RAG until it is ready
+    try:
+        count = await asyncio.to_thread(index_purchases)
+        logger.info(f"[RAG] Purchase index ready with {count} items")
+    except Exception as e:
+        logger.warning(f"[RAG] Initial index build failed (retried on the next update): {e}")
+
+    while True:
+        try:
+            await asyncio.wait_for(_watch_event.wait(), timeout=interval)
+        except asyncio.TimeoutError:
+            pass
+        _watch_event.clear()
+
+        if _sources_mtime() <= _index_metrics["synced_mtime"] and _index_metrics["pending_since"] is None:
+            continue
+        # Let a burst of logged purchases land before embedding
+        await asyncio.sleep(RAG.watch_debounce)
+        try:
+            await asyncio.to_thread(update_purchase_index)
+        except Exception as e:
+            logger.warning(f"[RAG] Incremental index update failed: {e}")
+
+
+def start_index_watcher(interval_seconds: float = None):
+    """Start the background task that builds the index, then appends new purchases to it"""
+    global _watch_task, _watch_event, _watch_loop
+    if not EMBEDDINGS_AVAILABLE:
+        logger.info("[RAG] Index watcher disabled (sentence-transformers not installed)")
+        return
+    if _watch_task is None or _watch_task.done():
+        interval = interval_seconds or RAG.watch_interval
+        _watch_loop = asyncio.get_running_loop()
+        _watch_event = asyncio.Event()
+        _watch_task = asyncio.create_task(_index_watch_loop(interval))
+        logger.info(f"[RAG] Index watcher started (every {interval:.0f}s + on logged purchases)")
+
+
+def stop_index_watcher():
+    """Stop the background index watcher"""
+    global _watch_task, _watch_loop
+    if _watch_task and not _watch_task.done():
+        _watch_task.cancel()
+        logger.info("[RAG] Index watcher stopped")
+    _watch_loop = None
+
+
+def _search(query_embedding: np.ndarray, category: Optional[str], limit: int,
+            min_similarity: float) -> List[SimilarPurchase]:
+    """Vector search on the configured backend (blocking)."""
+    if _use_lancedb():
+        _, table = get_db()
+        if table is None:
+            logger.warning("[RAG] No index available - run index_purchases() first")
+            return []
+        try:
+            query = table.search(query_embedding)
+            if category:
+                query = query.where(f"category = '{category}'")
+            rows = query.limit(limit).to_arrow().to_pylist()
+        except Exception as e:
+            logger.error(f"[RAG] Search error: {e}")
+            return []
+        # LanceDB returns distance, convert to similarity (1 - normalized_distance)
+        # For cosine distance, similarity = 1 - distance/2
+        hits = [(row, max(0, 1 - (row.get('_distance') or 0) / 2)) for row in rows]
+    else:
+        hits = get_numpy_index().search(query_embedding, category, limit)
+
+    # Convert to SimilarPurchase objects
+    return [
+        SimilarPurchase(
+            title=row['title'],
+            price=row['price'],
+            category=row['category'],
+            weight_grams=row.get('weight_grams'),
+            karat=row.get('karat'),
+            similarity=similarity,
+        )
+        for row, similarity in hits
+        if similarity >= min_similarity
+    ]
 
 
 def find_similar_purchases(
@@ -261,51 +868,37 @@ def find_similar_purchases(
     Returns:
         List of SimilarPurchase objects sorted by similarity
     """
-    db, table = get_db()
+    query_embedding = embeddings.encode([title])[0]
+    return _search(query_embedding, category, limit, min_similarity)
 
-    if table is None:
-        logger.warning("[RAG] No index available - run index_purchases() first")
-        return []
 
-    model = get_model()
-
-    # Generate embedding for query
-    query_embedding = model.encode([title])[0]
-
-    # Search with optional category filter
-    try:
-        if category:
-            results = table.search(query_embedding).where(f"category = '{category}'").limit(limit).to_pandas()
-        else:
-            results = table.search(query_embedding).limit(limit).to_pandas()
-    except Exception as e:
-        logger.error(f"[RAG] Search error: {e}")
+async def find_similar_purchases_async(
+    title: str,
+    category: Optional[str] = None,
+    limit: int = 5,
+    min_similarity: float = 0.3
+) -> List[SimilarPurchase]:
+    """find_similar_purchases() for the request path: batched embedding, search off the loop."""
+    if not index_ready():
         return []
+    query_embedding = await embeddings.embed(title)
+    return await asyncio.to_thread(_search, query_embedding, category, limit, min_similarity)
 
-    # Convert to SimilarPurchase objects
-    purchases = []
-    for _, row in results.iterrows():
-        # LanceDB returns distance, convert to similarity (1 - normalized_distance)
-        # For cosine distance, similarity = 1 - distance/2
-        distance = row.get('_distance', 0)
-        similarity = max(0, 1 - distance / 2)
-
-        if similarity >= min_similarity:
-            purchases.append(SimilarPurchase(
-                title=row['title'],
-                price=row['price'],
-                category=row['category'],
-                weight_grams=row.get('weight_grams'),
-                karat=row.get('karat'),
-                similarity=similarity
-            ))
 
-    return purchases
+def get_rag_stats() -> Dict[str, Any]:
+    """Embedding cache/batching stats and index backend info"""
+    return {
+        "backend": "lancedb" if _use_lancedb() else "numpy",
+        "indexed": len(_numpy_index) if _numpy_index is not None else None,
+        "embeddings": embeddings.get_stats(),
+        "index": get_index_metrics(),
+    }
 
 
 def get_weight_reference(
     title: str,
-    category: str = None
+    category: str = None,
+    similar: Optional[List[SimilarPurchase]] = None
 ) -> Dict[str, Any]:
     """
     Get weight estimation context for a listing.
@@ -314,6 +907,7 @@ def get_weight_reference(
     Args:
         title: The listing title
         category: 'gold' or 'silver'
+        similar: Pre-fetched similar purchases (searched if None)
 
     Returns:
         Dict with:
@@ -322,7 +916,8 @@ def get_weight_reference(
         - confidence: 'high', 'medium', 'low'
         - context_string: Formatted string for AI prompt
     """
-    similar = find_similar_purchases(title, category=category, limit=8)
+    if similar is None:
+        similar = find_similar_purchases(title, category=category, limit=8)
 
     if not similar:
         return {
@@ -383,15 +978,16 @@ def build_rag_context(
     title: str,
     price: float,
     category: str,
-    description: str = ""
+    description: str = "",
+    similar: Optional[List[SimilarPurchase]] = None
 ) -> str:
     """
     Build complete RAG context string for injection into AI prompt.
 
-    This is the main function to call from the pipeline.
+    Blocking; the pipeline calls build_rag_context_async().
     """
     # Get weight reference from similar purchases
-    weight_ref = get_weight_reference(title, category)
+    weight_ref = get_weight_reference(title, category, similar=similar)
 
     # Extract what we can from the current listing
     stated_weight = extract_weight_from_title(title)
@@ -424,6 +1020,25 @@ def build_rag_context(
     return "\n".join(lines)
 
 
+async def build_rag_context_async(
+    title: str,
+    price: float,
+    category: str,
+    description: str = ""
+) -> str:
+    """
+    Build complete RAG context string for injection into AI prompt.
+
+    This is the main function to call from the pipeline: the embedding is
+    micro-batched with concurrent listings and nothing blocks the event loop.
+    Returns "" while the index is still being built.
+    """
+    if not index_ready():
+        return ""
+    similar = await find_similar_purchases_async(title, category=category, limit=8)
+    return build_rag_context(title, price, category, description, similar=similar)
+
+
 # CLI for testing/rebuilding index
 if __name__ == "__main__":
     import sys